@@ -31,6 +31,8 @@ class Settings(BaseSettings):
     QDRANT_HOST: str = os.getenv("QDRANT_HOST", "localhost")
     QDRANT_PORT: int = int(os.getenv("QDRANT_PORT", "6333"))
     QDRANT_COLLECTION: str = os.getenv("QDRANT_COLLECTION", "assessment_docs_minilm")
+    QDRANT_TIMEOUT_S: float = float(os.getenv("QDRANT_TIMEOUT_S", "10.0"))  # Per-call timeout on retrieval paths
+    QDRANT_MAX_CONNECTIONS: int = int(os.getenv("QDRANT_MAX_CONNECTIONS", "32"))  # Async client pool size
 
     # Chat Configuration (Task 3.1)
     CHAT_HISTORY_LIMIT: int = 10
@@ -45,10 +47,16 @@ class Settings(BaseSettings):
     # RAG Configuration (Task 3.2)
     CHUNK_SIZE: int = 512
     CHUNK_OVERLAP: int = 50
+    CHUNK_TOKENS: int = int(os.getenv("CHUNK_TOKENS", "256"))  # >0: sentence-aware chunks of this many embedding tokens (else CHUNK_SIZE chars)
+    CHUNK_TOKEN_OVERLAP: int = int(os.getenv("CHUNK_TOKEN_OVERLAP", "32"))  # Tokens of trailing sentences repeated in the next chunk
+    INGEST_EMBED_BATCH_SIZE: int = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))  # Chunks per embedding call
+    INGEST_UPSERT_BATCH_SIZE: int = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", "256"))  # Points per Qdrant upsert
+    INGEST_QUEUE_BATCHES: int = int(os.getenv("INGEST_QUEUE_BATCHES", "4"))  # Batches buffered between stages
     RETRIEVAL_TOP_K: int = 20  # Candidates for reranking
     RERANK_TOP_N: int = 5
     TARGET_RETRIEVAL_MS: int = 300  # Target <300ms
     METADATA_TITLE_MATCH_LIMIT: int = int(os.getenv("METADATA_TITLE_MATCH_LIMIT", "5"))
+    METADATA_TITLE_BOOST_ENABLED: bool = os.getenv("METADATA_TITLE_BOOST_ENABLED", "true").lower() == "true"
     RAG_VECTOR_SIZE: int = int(os.getenv("RAG_VECTOR_SIZE", "1024"))
     RERANK_SCORE_THRESHOLD: float = float(os.getenv("RERANK_SCORE_THRESHOLD", "-1.0"))  # Filter out results below this score
 
@@ -61,10 +69,18 @@ class Settings(BaseSettings):
     EMBED_FALLBACK_MODEL_PATH: Optional[str] = os.getenv("EMBED_FALLBACK_MODEL_PATH", "./models/minilm-embed-int8")
     RERANK_FALLBACK_MODEL_PATH: Optional[str] = os.getenv("RERANK_FALLBACK_MODEL_PATH", "./models/minilm-reranker-onnx")
     RERANK_CPU_SWITCH_THRESHOLD_MS: float = float(os.getenv("RERANK_CPU_SWITCH_THRESHOLD_MS", "450.0"))
+    RERANK_CASCADE_ENABLED: bool = os.getenv("RERANK_CASCADE_ENABLED", "false").lower() == "true"
+    RERANK_CASCADE_MODEL_PATH: Optional[str] = os.getenv("RERANK_CASCADE_MODEL_PATH", RERANK_FALLBACK_MODEL_PATH)
+    RERANK_CASCADE_KEEP: int = int(os.getenv("RERANK_CASCADE_KEEP", "10"))  # Candidates passed to the full reranker
+    RERANK_MAX_LENGTH: int = int(os.getenv("RERANK_MAX_LENGTH", "512"))  # Max tokens per (query, document) pair
+    RERANK_MAX_LENGTH_OVERRIDES: str = os.getenv("RERANK_MAX_LENGTH_OVERRIDES", "")  # Per model dir, e.g. "minilm-reranker-onnx=256"
+    RERANK_MAX_BATCH_TOKENS: int = int(os.getenv("RERANK_MAX_BATCH_TOKENS", "1024"))  # Padded tokens per reranker ONNX call (small buckets win on CPU)
+    EMBED_MAX_BATCH_TOKENS: int = int(os.getenv("EMBED_MAX_BATCH_TOKENS", "16384"))  # Padded tokens per ONNX embedding call
 
     # Agent Configuration (Task 3.3)
     AGENT_MAX_ITERATIONS: int = 10
-    AGENT_TOOL_TIMEOUT: int = 5
+    AGENT_TOOL_TIMEOUT: float = float(os.getenv("AGENT_TOOL_TIMEOUT", "5"))  # Seconds per tool call
+    AGENT_TOOL_TIMEOUT_OVERRIDES: str = os.getenv("AGENT_TOOL_TIMEOUT_OVERRIDES", "")  # Per tool, e.g. "search_flights=8"
     AGENT_RETRY_ATTEMPTS: int = 3
 
     # Code Assistant Configuration (Task 3.4)
@@ -115,6 +131,7 @@ RAG_CONFIG = {
 AGENT_CONFIG = {
     "max_iterations": settings.AGENT_MAX_ITERATIONS,
     "tool_timeout": settings.AGENT_TOOL_TIMEOUT,
+    "tool_timeout_overrides": settings.AGENT_TOOL_TIMEOUT_OVERRIDES,
     "retry_attempts": settings.AGENT_RETRY_ATTEMPTS,
 }
 
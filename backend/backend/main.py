@@ -27,6 +27,7 @@ from prometheus_client import make_asgi_app
 
 from backend.config.settings import settings
 from backend.services.qdrant_seed import ensure_seed_collection
+from backend.services.code_executor import get_code_executor
 from backend.services.telemetry import init_telemetry, shutdown_telemetry, get_telemetry_config
 from backend.services.smart_bandit_state import (
     set_enabled as set_bandit_enabled,
@@ -125,12 +126,38 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     # Start background warm-up task (non-blocking)
     logger.info("🔄 Starting background tasks: Qdrant seeding → Smart RAG warm-up")
     loop.create_task(_warm_smart_rag())
+    # Pre-start sandbox interpreters for the code assistant's test runs
+    loop.create_task(get_code_executor().warm_up())
+    # Create the answer cache now so its warm start (a worker thread) is not on the first request
+    try:
+        from backend.services.enhanced_rag_pipeline import _get_answer_cache
+        _get_answer_cache()
+    except ImportError:
+        pass
     logger.info("✅ Backend is ready! Background tasks running...")
 
     yield
 
     logger.info("👋 Shutting down AI Assessment API...")
 
+    # Stop idle sandbox interpreters
+    await get_code_executor().close()
+
+    # Write out bandit updates still waiting for the write-behind flush
+    try:
+        from backend.routers.rag_routes import _bandit_store
+        await _bandit_store.close()
+    except ImportError:
+        pass
+
+    # Same for knowledge access counts, and stop the cold-document rehydrator
+    # (imported like utils/rag.py does, so this is the module holding the tracker)
+    try:
+        from services.knowledge_tier import close_access_tracker
+        await close_access_tracker()
+    except ImportError:
+        pass
+
     # Shutdown telemetry
     shutdown_telemetry()
 
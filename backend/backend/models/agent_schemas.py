@@ -32,6 +32,7 @@ class ToolCall(BaseModel):
     result: Optional[Dict[str, Any]] = Field(None, description="Tool execution result")
     error: Optional[str] = Field(None, description="Error message if tool failed")
     execution_time_ms: float = Field(..., description="Tool execution time in milliseconds")
+    cached: bool = Field(default=False, description="Result reused from an identical call earlier in the request")
 
 
 class ReasoningStep(BaseModel):
@@ -118,6 +119,11 @@ class PlanResponse(BaseModel):
     constraint_violations: List[str] = Field(default=[], description="List of violated constraints")
     constraint_satisfaction: Optional[float] = Field(None, description="Constraint satisfaction score (0..1) for learning")
     tool_errors_count: int = Field(default=0, description="Number of tool errors for learning")
+    tool_time_ms: Optional[float] = Field(default=None, description="Summed execution time of all tool calls")
+    tool_wall_time_ms: Optional[float] = Field(
+        default=None,
+        description="Wall-clock time spent waiting on tools (calls in one step run concurrently)",
+    )
     strategy_used: Optional[Dict[str, Any]] = Field(None, description="Strategy selected by learning system")
     llm_token_usage: Optional[Dict[str, int]] = Field(
         default=None,
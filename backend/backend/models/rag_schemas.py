@@ -124,6 +124,7 @@ class DocumentResponse(BaseModel):
     title: str = Field(..., description="Document title")
     num_chunks: int = Field(..., description="Number of chunks created")
     embedding_time_ms: float = Field(..., description="Embedding time in milliseconds")
+    duplicate_chunks: int = Field(0, description="Chunks skipped because identical content is already stored")
 
 
 class UserFeedback(BaseModel):
@@ -1,6 +1,7 @@
 """
 Task 3.2: High-Performance RAG endpoints backed by Qdrant.
 """
+import asyncio
 import logging
 import structlog
 import os
@@ -33,10 +34,12 @@ from backend.services.onnx_inference import (
     switch_to_primary_mode,
 )
 from backend.services.qdrant_client import get_qdrant_client, ensure_collection
+from backend.services import bm25_index, metadata_index
 from backend.services.qdrant_seed import get_seed_status
 from backend.services.rag_pipeline import (
     answer_question,
     ingest_document,
+    ingest_documents,
     retrieve_chunks,
     _generate_answer_with_llm_stream,
     VECTOR_LIMIT_MIN,
@@ -53,66 +56,36 @@ from backend.services.data_monitor import get_data_monitor
 from backend.utils.file_loader import load_document_from_path
 from backend.config.knowledge_config.inference_config import inference_config
 from backend.services.smart_bandit_state import get_status as get_bandit_status, set_cold_start
+from backend.services.bandit_store import BanditStore, FeedbackHistory
+from backend.services.ingestion_pipeline import IngestDocument
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
 COLLECTION_NAME = settings.QDRANT_COLLECTION
 
 # ------------------------------------------------------------------
-# Smart RAG bandit state (in-memory, process-level)
+# Smart RAG bandit state (in-memory, write-behind persisted)
 # ------------------------------------------------------------------
 # Bandit state persistence
 BANDIT_STATE_FILE = os.getenv("BANDIT_STATE_FILE", "/tmp/smart_bandit_state.json")
 DEFAULT_BANDIT_STATE_FILE = "./config/default_bandit_state.json"
 
-def _load_bandit_state() -> Dict[str, Dict[str, float]]:
-    """Load bandit state from persistent storage or default config"""
-    try:
-        # Try to load from runtime state file first
-        if os.path.exists(BANDIT_STATE_FILE):
-            with open(BANDIT_STATE_FILE, 'r') as f:
-                state = json.load(f)
-                logger.info(f"Loaded bandit state from {BANDIT_STATE_FILE}", state=state)
-                return state
-
-        # If no runtime state, try to load from default config (pre-warmed)
-        if os.path.exists(DEFAULT_BANDIT_STATE_FILE):
-            with open(DEFAULT_BANDIT_STATE_FILE, 'r') as f:
-                state = json.load(f)
-                logger.info(f"Loaded default pre-warmed bandit state from {DEFAULT_BANDIT_STATE_FILE}", state=state)
-                # Save as runtime state for future updates
-                _save_bandit_state(state)
-                return state
-    except Exception as e:
-        logger.warning(f"Failed to load bandit state: {e}")
-
-    # Fallback: cold start with uniform priors
-    logger.warning("No bandit state found - starting with cold uniform priors. Consider running warm_smart_bandit.py")
+# Updates are applied in memory and merged into BANDIT_STATE_FILE in batches
+_bandit_store = BanditStore(
+    BANDIT_STATE_FILE,
+    default_state_file=DEFAULT_BANDIT_STATE_FILE,
+    flush_interval_s=float(os.getenv("BANDIT_FLUSH_INTERVAL_S", "5")),
+)
+if _bandit_store.cold_start:
     set_cold_start(True)  # Mark as cold start so frontend knows to run warm-up
-    return {
-        "hybrid": {"alpha": 1.0, "beta": 1.0},
-        "iterative": {"alpha": 1.0, "beta": 1.0},
-        "graph": {"alpha": 1.0, "beta": 1.0},
-        "table": {"alpha": 1.0, "beta": 1.0},
-    }
-
-def _save_bandit_state(state: Dict[str, Dict[str, float]]) -> None:
-    """Save bandit state to persistent storage"""
-    try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(BANDIT_STATE_FILE), exist_ok=True)
-        with open(BANDIT_STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2)
-        logger.debug(f"Saved bandit state to {BANDIT_STATE_FILE}")
-    except Exception as e:
-        logger.warning(f"Failed to save bandit state: {e}")
-
-# Load initial state from persistent storage
-_smart_bandit: Dict[str, Dict[str, float]] = _load_bandit_state()
+_smart_bandit: Dict[str, Dict[str, float]] = _bandit_store.arms
 
 # Query tracking for user feedback
 # Maps query_id -> {"strategy": str, "reward": float, "timestamp": float}
-_query_history: Dict[str, Dict[str, Any]] = {}
+_query_history = FeedbackHistory(
+    max_entries=int(os.getenv("BANDIT_FEEDBACK_MAX_QUERIES", "1000")),
+    ttl_s=float(os.getenv("BANDIT_FEEDBACK_TTL_S", "3600")),
+)
 
 
 def _bandit_enabled() -> bool:
@@ -169,7 +142,7 @@ def _choose_bandit_arm(available: list[str]) -> str:
 
 def _update_bandit(arm: str, reward: float, user_rating: Optional[float] = None) -> None:
     """
-    Update Beta parameters with normalized reward in [0,1] and persist state.
+    Update Beta parameters with normalized reward in [0,1] (persisted write-behind).
 
     Args:
         arm: Strategy name (hybrid, iterative, graph, table)
@@ -194,12 +167,8 @@ def _update_bandit(arm: str, reward: float, user_rating: Optional[float] = None)
         # Normal automated reward
         final_reward = reward
 
-    r = max(0.0, min(1.0, final_reward))
-    _smart_bandit[arm]["alpha"] += r
-    _smart_bandit[arm]["beta"] += (1.0 - r)
-
-    # Persist state after every update
-    _save_bandit_state(_smart_bandit)
+    # Memory only; the store's background task persists the batch
+    _bandit_store.update(arm, final_reward)
 
 
 def _ensure_vector_collection() -> None:
@@ -552,32 +521,32 @@ async def upload_file(
             dest_path = None
 
         try:
-            # Load and process document
-            docs = load_document_from_path(tmp_path)
+            # Load and process document (parsing is blocking; keep it off the event loop)
+            docs = await asyncio.to_thread(load_document_from_path, tmp_path)
 
             if not docs:
                 raise HTTPException(status_code=400, detail="No content extracted from file")
 
-            # Process all documents
-            responses = []
-            total_chunks = 0
-
-            for doc in docs:
-                response = await ingest_document(
-                    title=doc.title or file.filename,
-                    content=doc.content,
-                    source=file.filename,
-                    metadata={
-                        **doc.metadata,
-                        "uploaded_file": file.filename,
-                        "file_path": str(dest_path) if dest_path else None,
-                        "upload_dir": str(uploads_dir),
-                        "collection": target_collection
-                    },
-                    collection_name=target_collection,
-                )
-                responses.append(response)
-                total_chunks += response.num_chunks
+            # Process all documents through one streaming pipeline
+            responses = await ingest_documents(
+                [
+                    IngestDocument(
+                        title=doc.title or file.filename,
+                        content=doc.content,
+                        source=file.filename,
+                        metadata={
+                            **doc.metadata,
+                            "uploaded_file": file.filename,
+                            "file_path": str(dest_path) if dest_path else None,
+                            "upload_dir": str(uploads_dir),
+                            "collection": target_collection
+                        },
+                    )
+                    for doc in docs
+                ],
+                collection_name=target_collection,
+            )
+            total_chunks = sum(response.num_chunks for response in responses)
 
             logger.info(f"✅ Successfully ingested {file.filename} to {target_collection}: {total_chunks} chunks")
 
@@ -1302,10 +1271,6 @@ async def ask_question_smart(request: RAGRequest) -> RAGResponse:
                         "is_cached": existing_entry.get("is_cached", False),
                         "cache_layer": existing_entry.get("cache_layer", None),
                     }
-                    # Keep only last 1000 queries in memory
-                    if len(_query_history) > 1000:
-                        oldest_id = min(_query_history.keys(), key=lambda k: _query_history[k]["timestamp"])
-                        del _query_history[oldest_id]
         except Exception as bandit_error:
             logger.warning(f"Bandit reward update failed: {bandit_error}")
 
@@ -2116,6 +2081,8 @@ async def clear_user_collection() -> Dict[str, Any]:
 
         try:
             client.delete_collection(collection_name="user_uploaded_docs")
+            bm25_index.record_delete("user_uploaded_docs")
+            metadata_index.record_delete("user_uploaded_docs")
             logger.info("✅ User collection cleared")
             return {
                 "success": True,
@@ -2220,16 +2187,39 @@ async def search_multi_collection(request: RAGRequest) -> RAGResponse:
         last_content_char_limit_used: Optional[int] = None
 
         # Retrieve chunks from multiple collections
+        from backend.services.enhanced_rag_pipeline import (
+            _ensure_hybrid_retriever_ready,
+            _get_hybrid_retriever,
+            hybrid_retrieve_chunks,
+        )
         all_chunks = []
         for coll in collections_to_search:
             try:
                 coll_start = time.perf_counter()
-                chunks, score, coll_timings = await retrieve_chunks(
-                    request.question,
-                    top_k=request.top_k or 10,
-                    collection_name=coll,
-                    include_timings=True,
-                )
+                # Hybrid strategy: shared per-collection retrievers (BM25 built once per process)
+                hybrid_retriever = _get_hybrid_retriever(coll) if requested_strategy == "hybrid" else None
+                if hybrid_retriever is not None:
+                    await _ensure_hybrid_retriever_ready(coll)
+                    chunks, _, hybrid_timings = await hybrid_retrieve_chunks(
+                        request.question,
+                        hybrid_retriever,
+                        top_k=request.top_k or 10,
+                        vector_limit=request.vector_limit,
+                        reranker_override=request.reranker,
+                    )
+                    coll_timings = {
+                        **hybrid_timings,
+                        "vector_ms": hybrid_timings["hybrid_search_ms"],
+                        "total_ms": hybrid_timings["total_retrieval_ms"],
+                        "reranker_model_path": hybrid_timings["reranker_model"],
+                    }
+                else:
+                    chunks, score, coll_timings = await retrieve_chunks(
+                        request.question,
+                        top_k=request.top_k or 10,
+                        collection_name=coll,
+                        include_timings=True,
+                    )
                 retrieval_ms += (time.perf_counter() - coll_start) * 1000
 
                 # Aggregate timings across collections
@@ -2367,7 +2357,7 @@ async def submit_feedback(feedback: UserFeedback) -> FeedbackResponse:
         if query_id not in _query_history:
             raise HTTPException(
                 status_code=404,
-                detail=f"Query ID not found. Query may be too old (only last 1000 queries tracked) or invalid."
+                detail=f"Query ID not found. Query may be too old (only recent queries are tracked) or invalid."
             )
 
         query_info = _query_history[query_id]
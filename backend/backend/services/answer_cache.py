@@ -6,21 +6,43 @@ Uses a 3-tier hybrid caching strategy:
 - Layer 2: TF-IDF Keyword Match (fast filtering)
 - Layer 3: Semantic Embedding Match (accurate but slower)
 """
+import asyncio
+import gc
 import hashlib
+import io
 import json
 import re
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 from typing import Dict, Optional, Any, List, Tuple
 from collections import OrderedDict
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import structlog
 
 from backend.models.rag_schemas import RAGResponse
+from backend.services.cache_store import SNAPSHOT_MAX_AGE_S, CacheRecord
+from backend.services.sparse_index import IncrementalTfidfIndex
+from backend.services.vector_index import create_vector_index
 
 logger = structlog.get_logger(__name__)
 
+# Namespace used for persisted answer cache entries
+STORE_NAMESPACE = "answer_cache"
+
+# Re-save the warm-start snapshot when it is older than this, or when more
+# than max(SNAPSHOT_REPLAY_MIN, 10% of entries) writes had to be replayed on top
+SNAPSHOT_REFRESH_S = 3600
+SNAPSHOT_REPLAY_MIN = 1000
+
+# In-memory layer attributes, swapped in together after a warm start
+_LAYER_ATTRS = ("exact_cache", "tfidf_cache", "tfidf_index", "semantic_cache", "semantic_index")
+
+# Arrays of a warm-start snapshot, in the order they are serialized
+_SNAPSHOT_ARRAYS = (
+    "meta", "exact_hashes", "created_at", "expires_at", "has_vector", "vectors",
+    "tfidf_docs", "tfidf_df", "tfidf_ent_slot", "tfidf_ent_term", "tfidf_ent_count",
+)
+
 
 class MultiLayerAnswerCache:
     """
@@ -28,8 +50,8 @@ class MultiLayerAnswerCache:
 
     Architecture:
     - Layer 1 (Exact Hash): O(1) lookup for identical queries
-    - Layer 2 (TF-IDF): O(N) but fast filtering of candidates
-    - Layer 3 (Semantic): O(K) where K << N, accurate similarity matching
+    - Layer 2 (TF-IDF): inverted index, scores only queries sharing a term
+    - Layer 3 (Semantic): one batched top-k over a float32 matrix / ANN index
     """
 
     def __init__(
@@ -37,7 +59,10 @@ class MultiLayerAnswerCache:
         similarity_threshold: float = 0.88,
         tfidf_threshold: float = 0.30,
         max_cache_size: int = 1000,
-        ttl_hours: int = 72
+        ttl_hours: int = 72,
+        index_backend: str = "flat",
+        store=None,
+        sync_interval_s: float = 1.0
     ):
         """
         Initialize multi-layer answer cache.
@@ -47,25 +72,40 @@ class MultiLayerAnswerCache:
             tfidf_threshold: TF-IDF similarity threshold (Layer 2)
             max_cache_size: Maximum cached answers (LRU eviction)
             ttl_hours: Time to live for cached entries
+            index_backend: Layer 3 vector index ("flat" exact or "hnsw" approximate)
+            store: Optional persistent backend from cache_store (shared across workers)
+            sync_interval_s: Minimum seconds between pulls of other workers' writes
         """
         self.similarity_threshold = similarity_threshold
         self.tfidf_threshold = tfidf_threshold
         self.max_cache_size = max_cache_size
         self.ttl = timedelta(hours=ttl_hours)
+        self.index_backend = index_backend
 
         # Layer 1: Exact match cache {normalized_hash: answer}
         self.exact_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
 
-        # Layer 2: TF-IDF index
-        self.tfidf_vectorizer: Optional[TfidfVectorizer] = None
-        self.tfidf_matrix = None
-        self.tfidf_queries: List[str] = []  # Original queries for TF-IDF
+        # Layer 2: TF-IDF index (incremental, no refit on insert/expiry)
+        self.tfidf_index = IncrementalTfidfIndex(ngram_range=(1, 2))
         self.tfidf_cache: Dict[str, Dict[str, Any]] = {}  # {query: answer}
 
         # Layer 3: Semantic embedding cache
-        self.semantic_cache: Dict[str, Dict[str, Any]] = {}  # {query_hash: {embedding, answer}}
+        # Entries live in semantic_cache, vectors + expiry in semantic_index
+        self.semantic_cache: Dict[str, Dict[str, Any]] = {}  # {query_hash: answer}
+        self.semantic_index = create_vector_index(
+            index_backend,
+            initial_capacity=min(max_cache_size + 1, 4096)
+        )
         self._embedder = None
 
+        # Persistent backend (None = process-local only)
+        self._store = store
+        self._store_cursor = 0
+        self._sync_interval_s = sync_interval_s
+        self._last_sync = 0.0
+        self._warming = False
+        self._warm_task: Optional[asyncio.Task] = None
+
         # Statistics
         self.stats = {
             'total_queries': 0,
@@ -137,13 +177,17 @@ class MultiLayerAnswerCache:
             entry = self.exact_cache[query_hash]
 
             # Check TTL
-            if datetime.now() - entry['cached_at'] > self.ttl:
+            if time.time() >= entry['expires_at']:
                 del self.exact_cache[query_hash]
                 return None
 
             # Move to end (LRU - mark as recently used)
             self.exact_cache.move_to_end(query_hash)
 
+            answer = self._entry_answer(entry)
+            if answer is None:
+                return None
+
             elapsed_ms = (time.perf_counter() - start) * 1000
             self.stats['layer1_hits'] += 1
             self._update_avg_time('layer1', elapsed_ms)
@@ -157,7 +201,7 @@ class MultiLayerAnswerCache:
             )
 
             return {
-                'answer': entry['answer'],
+                'answer': answer,
                 'cache_layer': 1,
                 'cache_method': 'Exact Hash Match',
                 'similarity': 1.0,
@@ -166,41 +210,17 @@ class MultiLayerAnswerCache:
 
         return None
 
-    def _rebuild_tfidf_index(self):
-        """
-        Rebuild TF-IDF index for all cached queries.
-
-        Technique: Term Frequency-Inverse Document Frequency
-        Purpose: Fast keyword-based similarity
-        """
-        if not self.tfidf_cache:
-            return
-
-        self.tfidf_queries = list(self.tfidf_cache.keys())
-
-        # Create TF-IDF vectorizer
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=100,  # Limit features for speed
-            ngram_range=(1, 2),  # Unigrams and bigrams
-            stop_words='english'  # Remove common words
-        )
-
-        # Fit and transform
-        self.tfidf_matrix = self.tfidf_vectorizer.fit_transform(self.tfidf_queries)
-
-        logger.debug("TF-IDF index rebuilt", num_queries=len(self.tfidf_queries))
-
     async def _layer2_tfidf_match(self, query: str) -> Optional[Dict[str, Any]]:
         """
         Layer 2: TF-IDF Keyword Match
 
         Technique: TF-IDF vectorization + Cosine similarity
-        Speed: O(N) but fast - ~1-2ms for 1000 queries
+        Speed: O(postings of query terms) - independent of total cache size
         Accuracy: Good for keyword overlap, misses synonyms
 
         Process:
-        1. Convert query to TF-IDF vector
-        2. Compute cosine similarity with all cached queries
+        1. Extract query unigrams/bigrams
+        2. Score cached queries sharing a term via the inverted index
         3. If best match > threshold, return it
 
         Returns:
@@ -209,28 +229,27 @@ class MultiLayerAnswerCache:
         import time
         start = time.perf_counter()
 
-        if not self.tfidf_cache or not self.tfidf_vectorizer:
+        if not self.tfidf_cache:
             return None
 
         try:
-            # Transform query to TF-IDF vector
-            query_vector = self.tfidf_vectorizer.transform([query])
-
-            # Compute cosine similarity with all cached queries
-            similarities = cosine_similarity(query_vector, self.tfidf_matrix)[0]
-
-            # Find best match
-            best_idx = np.argmax(similarities)
-            best_score = similarities[best_idx]
+            # Score only cached queries that share a term with this one
+            matches = self.tfidf_index.search(query, k=1)
+            if not matches:
+                return None
+            best_query, best_score = matches[0]
 
             if best_score >= self.tfidf_threshold:
-                best_query = self.tfidf_queries[best_idx]
                 entry = self.tfidf_cache[best_query]
 
                 # Check TTL
-                if datetime.now() - entry['cached_at'] > self.ttl:
+                if time.time() >= entry['expires_at']:
                     del self.tfidf_cache[best_query]
-                    self._rebuild_tfidf_index()
+                    self.tfidf_index.remove(best_query)
+                    return None
+
+                answer = self._entry_answer(entry)
+                if answer is None:
                     return None
 
                 elapsed_ms = (time.perf_counter() - start) * 1000
@@ -247,7 +266,7 @@ class MultiLayerAnswerCache:
                 )
 
                 return {
-                    'answer': entry['answer'],
+                    'answer': answer,
                     'cache_layer': 2,
                     'cache_method': 'TF-IDF Keyword Match',
                     'similarity': float(best_score),
@@ -279,12 +298,12 @@ class MultiLayerAnswerCache:
         Layer 3: Semantic Embedding Match
 
         Technique: Dense vector embeddings + Cosine similarity
-        Speed: O(K) where K is candidates, ~5-10ms
+        Speed: one batched top-k over the vector index (TTL masked in the same pass)
         Accuracy: Highest - understands synonyms, paraphrases
 
         Process:
         1. Get query embedding (384-dim vector)
-        2. Compute cosine similarity with all cached embeddings
+        2. Top-1 inner product search over unexpired cached embeddings
         3. If best match > threshold, return it
 
         Returns:
@@ -300,26 +319,23 @@ class MultiLayerAnswerCache:
             # Get query embedding
             query_emb = await self._get_query_embedding(query)
 
-            # Find best match
+            # Find best match (expired rows are masked inside the index)
             best_match = None
             best_score = 0.0
             best_query = None
 
-            for query_hash, entry in self.semantic_cache.items():
-                # Check TTL
-                if datetime.now() - entry['cached_at'] > self.ttl:
-                    continue
-
-                # Compute cosine similarity
-                cached_emb = entry['embedding']
-                similarity = float(np.dot(query_emb, cached_emb))
-
-                if similarity > best_score:
-                    best_score = similarity
-                    best_match = entry
-                    best_query = entry['original_query']
+            hits = self.semantic_index.search(query_emb, k=1)
+            if hits:
+                best_hash, best_score = hits[0]
+                best_match = self.semantic_cache.get(best_hash)
+                if best_match:
+                    best_query = best_match['original_query']
 
             if best_match and best_score >= self.similarity_threshold:
+                answer = self._entry_answer(best_match)
+                if answer is None:
+                    return None
+
                 elapsed_ms = (time.perf_counter() - start) * 1000
                 self.stats['layer3_hits'] += 1
                 self._update_avg_time('layer3', elapsed_ms)
@@ -334,7 +350,7 @@ class MultiLayerAnswerCache:
                 )
 
                 return {
-                    'answer': best_match['answer'],
+                    'answer': answer,
                     'cache_layer': 3,
                     'cache_method': 'Semantic Embedding Match',
                     'similarity': float(best_score),
@@ -367,6 +383,7 @@ class MultiLayerAnswerCache:
             }
         """
         self.stats['total_queries'] += 1
+        self._maybe_sync()
 
         # Layer 1: Exact match
         result = await self._layer1_exact_match(query)
@@ -407,35 +424,77 @@ class MultiLayerAnswerCache:
             metadata: Optional metadata
         """
         # Prepare answer entry
+        expires_at = time.time() + self.ttl.total_seconds()
         answer_entry = {
             'original_query': query,
             'answer': rag_response,
-            'cached_at': datetime.now(),
+            'cached_at': time.time(),
+            'expires_at': expires_at,
             'metadata': metadata or {},
             'hits': 0
         }
 
+        query_emb = None
+        try:
+            query_emb = await self._get_query_embedding(query)
+        except Exception as e:
+            logger.warning("Failed to cache in Layer 3 (semantic)", error=str(e))
+        evicted = self._index_entry(query, answer_entry, query_emb, expires_at)
+
+        if self._store is not None:
+            try:
+                payload = json.dumps({
+                    'answer': rag_response.model_dump(mode='json'),
+                    'metadata': metadata or {},
+                }, default=str).encode()
+                self._store.put(
+                    STORE_NAMESPACE, self._hash_query(query), query, payload, query_emb, expires_at,
+                    lookup_keys=self._lookup_keys(query)
+                )
+                for evicted_hash in evicted:
+                    self._store.delete(STORE_NAMESPACE, evicted_hash)
+            except Exception as e:
+                logger.warning("Failed to persist cached answer", error=str(e))
+
+        logger.info(
+            "Answer cached in all 3 layers",
+            query=query[:50],
+            total_cached=len(self.semantic_cache),
+            tokens_saved=rag_response.token_usage.get('total', 0) if rag_response.token_usage else 0
+        )
+
+    def _index_entry(
+        self,
+        query: str,
+        answer_entry: Dict[str, Any],
+        query_emb: Optional[np.ndarray],
+        expires_at: float
+    ) -> List[str]:
+        """
+        Insert an entry into all 3 in-memory layers and enforce max size.
+
+        Returns:
+            Semantic hashes evicted to make room
+        """
         # Layer 1: Add to exact cache
         exact_hash = self._hash_normalized(query)
         self.exact_cache[exact_hash] = answer_entry.copy()
 
         # Layer 2: Add to TF-IDF cache
         self.tfidf_cache[query] = answer_entry.copy()
-        self._rebuild_tfidf_index()  # Rebuild index
+        self.tfidf_index.add(query, query)
 
         # Layer 3: Add to semantic cache with embedding
-        try:
-            query_emb = await self._get_query_embedding(query)
+        if query_emb is not None:
             semantic_hash = self._hash_query(query)
 
-            semantic_entry = answer_entry.copy()
-            semantic_entry['embedding'] = query_emb
-
-            self.semantic_cache[semantic_hash] = semantic_entry
-        except Exception as e:
-            logger.warning("Failed to cache in Layer 3 (semantic)", error=str(e))
+            # Re-insert so dict order stays oldest-first for eviction
+            self.semantic_cache.pop(semantic_hash, None)
+            self.semantic_cache[semantic_hash] = answer_entry.copy()
+            self.semantic_index.add(semantic_hash, query_emb, expires_at=expires_at)
 
         # Enforce max cache size (evict oldest from all layers)
+        evicted = []
         if len(self.semantic_cache) > self.max_cache_size:
             # Remove oldest from exact cache
             if self.exact_cache:
@@ -445,21 +504,378 @@ class MultiLayerAnswerCache:
             if self.tfidf_cache:
                 oldest_query = next(iter(self.tfidf_cache))
                 del self.tfidf_cache[oldest_query]
-                self._rebuild_tfidf_index()
+                self.tfidf_index.remove(oldest_query)
 
             # Remove oldest from semantic cache
             if self.semantic_cache:
                 oldest_hash = next(iter(self.semantic_cache))
                 del self.semantic_cache[oldest_hash]
+                self.semantic_index.remove(oldest_hash)
+                evicted.append(oldest_hash)
 
             self.stats['evictions'] += 1
 
+        return evicted
+
+    def _drop_entry(self, query: str) -> List[str]:
+        """Remove a query from all 3 in-memory layers, returning the layers touched."""
+        removed_layers = []
+
+        # Layer 1: Remove from exact match cache
+        query_hash = self._hash_normalized(query)
+        if query_hash in self.exact_cache:
+            del self.exact_cache[query_hash]
+            removed_layers.append("L1-exact")
+
+        # Layer 2: Remove from TF-IDF cache
+        if query in self.tfidf_cache:
+            del self.tfidf_cache[query]
+            self.tfidf_index.remove(query)
+            removed_layers.append("L2-tfidf")
+
+        # Layer 3: Remove from semantic cache
+        semantic_hash = self._hash_query(query)
+        if semantic_hash in self.semantic_cache:
+            del self.semantic_cache[semantic_hash]
+            self.semantic_index.remove(semantic_hash)
+            removed_layers.append("L3-semantic")
+
+        return removed_layers
+
+    def _lookup_keys(self, query: str) -> str:
+        """Serialize the Layer 1 hash and Layer 2 terms so warm starts skip re-tokenizing."""
+        return self._hash_normalized(query) + "\n" + "\t".join(self.tfidf_index.analyze(query))
+
+    def _entry_answer(self, entry: Dict[str, Any]) -> Optional[RAGResponse]:
+        """
+        Return the entry's RAGResponse, decoding a persisted payload on first use.
+
+        Returns None (and drops the entry) when the payload is gone from the
+        store, i.e. another worker invalidated or evicted it since our last sync.
+        """
+        if entry['answer'] is None:
+            payload = entry.get('payload') or self._store.get_payload(
+                STORE_NAMESPACE, self._hash_query(entry['original_query'])
+            )
+            if payload is None:
+                self._drop_entry(entry['original_query'])
+                return None
+            data = json.loads(payload)
+            entry['answer'] = RAGResponse.model_validate(data['answer'])
+            entry['metadata'] = data.get('metadata', {})
+            entry.pop('payload', None)
+        return entry['answer']
+
+    def _apply_record(self, record: CacheRecord):
+        """Apply one persisted record (insert or tombstone) to the in-memory layers."""
+        if record.payload is None or record.expires_at <= time.time():
+            # Tombstones do not carry the query text, resolve it via the semantic hash
+            entry = self.semantic_cache.get(record.key)
+            if entry is not None:
+                self._drop_entry(entry['original_query'])
+            return
+
+        answer_entry = {
+            'original_query': record.query,
+            'answer': None,  # Decoded lazily on first hit
+            'payload': record.payload,
+            'cached_at': record.created_at,
+            'expires_at': record.expires_at,
+            'metadata': {},
+            'hits': 0
+        }
+        self._index_entry(record.query, answer_entry, record.embedding, record.expires_at)
+
+    def _load_records(self, records: List[CacheRecord]):
+        """Bulk-index records from store.load() (lookup keys avoid re-hashing / re-tokenizing)."""
+        semantic_keys, semantic_vectors, semantic_expiry = [], [], []
+        for record in records:
+            # One shared entry per query; payload is fetched on first hit
+            entry = {
+                'original_query': record.query,
+                'answer': None,
+                'payload': record.payload,
+                'cached_at': record.created_at,
+                'expires_at': record.expires_at,
+                'metadata': {},
+                'hits': 0
+            }
+            if record.lookup_keys is not None:
+                exact_hash, _, terms = record.lookup_keys.partition("\n")
+                self.tfidf_index.add_terms(record.query, terms.split("\t") if terms else [])
+            else:
+                exact_hash = self._hash_normalized(record.query)
+                self.tfidf_index.add(record.query, record.query)
+            self.exact_cache[exact_hash] = entry
+            self.tfidf_cache[record.query] = entry
+            if record.embedding is not None:
+                self.semantic_cache[record.key] = entry
+                semantic_keys.append(record.key)
+                semantic_vectors.append(record.embedding)
+                semantic_expiry.append(record.expires_at)
+
+        if semantic_keys:
+            self.semantic_index.add_batch(
+                semantic_keys, np.stack(semantic_vectors), np.asarray(semantic_expiry)
+            )
+
+    def _snapshot_bytes(self) -> bytes:
+        """
+        Serialize the built layers (no answer payloads) for store.put_snapshot().
+
+        Holds the queries, their Layer 1 hashes, timestamps, the Layer 2
+        postings arrays and the Layer 3 vectors, so restoring needs no
+        tokenizing, hashing or per-entry store reads.
+        """
+        queries = list(self.tfidf_cache)
+        entries = [self.tfidf_cache[query] for query in queries]
+        position = {query: i for i, query in enumerate(queries)}
+
+        # Layer 3 keys are the store keys, mapped back through the shared entry objects
+        key_of = {id(entry): key for key, entry in self.semantic_cache.items()}
+        semantic_keys = [key_of.get(id(entry), "") for entry in entries]
+        has_vector = np.array([bool(key) for key in semantic_keys], dtype=bool)
+        vectors = self.semantic_index.get_vectors([key for key in semantic_keys if key])
+
+        tfidf = self.tfidf_index.state()
+        meta = {
+            'queries': queries,
+            'semantic_keys': semantic_keys,
+            'vocab': tfidf['vocab'],
+        }
+        arrays = dict(
+            meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            exact_hashes=np.array([self._hash_normalized(query) for query in queries], dtype="S32"),
+            created_at=np.array([entry['cached_at'] for entry in entries], dtype=np.float64),
+            expires_at=np.array([entry['expires_at'] for entry in entries], dtype=np.float64),
+            has_vector=has_vector,
+            vectors=vectors,
+            tfidf_docs=np.array([position[key] for key in tfidf['keys']], dtype=np.int64),
+            tfidf_df=tfidf['df'],
+            tfidf_ent_slot=tfidf['ent_slot'],
+            tfidf_ent_term=tfidf['ent_term'],
+            tfidf_ent_count=tfidf['ent_count'],
+        )
+        # .npy records back to back (C order, no pickles): read as views, no zip CRC pass
+        buffer = io.BytesIO()
+        for name in _SNAPSHOT_ARRAYS:
+            np.lib.format.write_array(buffer, np.ascontiguousarray(arrays[name]), allow_pickle=False)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _snapshot_arrays(data: bytes) -> Dict[str, np.ndarray]:
+        """Read-only views of the snapshot's arrays (no copy of the ~150 MB vector block)."""
+        buffer = io.BytesIO(data)
+        arrays = {}
+        for name in _SNAPSHOT_ARRAYS:
+            version = np.lib.format.read_magic(buffer)
+            if version == (1, 0):
+                shape, _, dtype = np.lib.format.read_array_header_1_0(buffer)
+            else:
+                shape, _, dtype = np.lib.format.read_array_header_2_0(buffer)
+            count = int(np.prod(shape))
+            arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=buffer.tell()).reshape(shape)
+            buffer.seek(count * dtype.itemsize, io.SEEK_CUR)
+        return arrays
+
+    def _restore_snapshot(self, data: bytes):
+        """Rebuild the layers from _snapshot_bytes() output, dropping expired entries."""
+        arrays = self._snapshot_arrays(data)
+        meta = json.loads(arrays['meta'].tobytes())
+        queries, semantic_keys = meta['queries'], meta['semantic_keys']
+        exact_hashes = arrays['exact_hashes'].astype(str).tolist()
+        expires_at = arrays['expires_at']
+        has_vector = arrays['has_vector']
+
+        entries = [
+            {
+                'original_query': query,
+                'answer': None,  # Payload fetched from the store on first hit
+                'cached_at': created_at,
+                'expires_at': expiry,
+                'metadata': {},
+                'hits': 0
+            }
+            for query, created_at, expiry in zip(queries, arrays['created_at'].tolist(), expires_at.tolist())
+        ]
+        self.exact_cache.update(zip(exact_hashes, entries))
+        self.tfidf_cache.update(zip(queries, entries))
+        vector_rows = np.flatnonzero(has_vector)
+        self.semantic_cache.update((semantic_keys[i], entries[i]) for i in vector_rows.tolist())
+        if len(vector_rows):
+            self.semantic_index.add_batch(
+                [semantic_keys[i] for i in vector_rows.tolist()], arrays['vectors'], expires_at[vector_rows]
+            )
+        self.tfidf_index.load_state(
+            [queries[i] for i in arrays['tfidf_docs'].tolist()],
+            meta['vocab'],
+            arrays['tfidf_df'],
+            arrays['tfidf_ent_slot'],
+            arrays['tfidf_ent_term'],
+            arrays['tfidf_ent_count'],
+        )
+
+        # Entries that expired since the snapshot, then the size cap (oldest first)
+        expired = expires_at <= time.time()
+        live = np.flatnonzero(~expired)
+        stale = np.concatenate([np.flatnonzero(expired), live[:max(0, len(live) - self.max_cache_size)]])
+        for i in stale.tolist():
+            self._drop_entry(queries[i])
+
+    def _build_warm_state(self) -> Tuple["MultiLayerAnswerCache", int]:
+        """
+        Build the 3 layers from the store into a fresh cache (thread-safe: touches no live state).
+
+        Restores the store's snapshot when there is a usable one and replays
+        the writes made after it; otherwise loads every live record and saves
+        a snapshot for the next start.
+
+        Returns:
+            (cache holding the built layers, store cursor they reflect)
+        """
+        # Nothing allocated here is garbage; collector passes over the growing
+        # heap cost about as much as the rebuild itself
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._build_from_store()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _build_from_store(self) -> Tuple["MultiLayerAnswerCache", int]:
+        staging = self._empty_copy()
+        snapshot, snapshot_age = None, None
+        try:
+            snapshot = self._store.get_snapshot(STORE_NAMESPACE)
+        except Exception as e:
+            logger.warning("Failed to read answer cache snapshot", error=str(e))
+        if snapshot is not None:
+            snapshot_age = time.time() - snapshot.created_at
+            if snapshot_age <= SNAPSHOT_MAX_AGE_S:
+                try:
+                    staging._restore_snapshot(snapshot.data)
+                    cursor = snapshot.cursor
+                except Exception as e:
+                    logger.warning("Ignoring unreadable answer cache snapshot", error=str(e))
+                    staging, snapshot = self._empty_copy(), None
+            else:
+                snapshot = None
+        if snapshot is None:
+            records, cursor = self._store.load(STORE_NAMESPACE)
+            # Only the newest max_cache_size entries survive eviction anyway
+            staging._load_records(records[-self.max_cache_size:])
+
+        # Writes made after the snapshot (or during the load)
+        records, cursor = self._store.changes_since(STORE_NAMESPACE, cursor)
+        for record in records:
+            staging._apply_record(record)
+
+        stale = (
+            snapshot is None
+            or snapshot_age > SNAPSHOT_REFRESH_S
+            or len(records) > max(SNAPSHOT_REPLAY_MIN, len(staging.tfidf_cache) // 10)
+        )
+        if stale and staging.tfidf_cache:
+            try:
+                self._store.put_snapshot(STORE_NAMESPACE, cursor, staging._snapshot_bytes())
+            except Exception as e:
+                logger.warning("Failed to save answer cache snapshot", error=str(e))
+        return staging, cursor
+
+    def _empty_copy(self) -> "MultiLayerAnswerCache":
+        """Store-less cache with the same settings, used to build layers off the live instance."""
+        return MultiLayerAnswerCache(
+            similarity_threshold=self.similarity_threshold,
+            tfidf_threshold=self.tfidf_threshold,
+            max_cache_size=self.max_cache_size,
+            ttl_hours=self.ttl.total_seconds() / 3600,
+            index_backend=self.index_backend
+        )
+
+    def _install(self, staging: "MultiLayerAnswerCache", cursor: int):
+        """Swap in layers built by _build_warm_state()."""
+        for name in _LAYER_ATTRS:
+            setattr(self, name, getattr(staging, name))
+        self._store_cursor = cursor
+        # Pull what this worker (or others) wrote while the layers were being built
+        self._last_sync = 0.0
+
+    def warm_start(self) -> int:
+        """
+        Load all live entries from the persistent store into the 3 layers.
+
+        Answers stay as raw JSON until first hit, so startup only rebuilds
+        the hash, TF-IDF and vector indexes (from the store's snapshot when
+        it has a recent one). Blocks; servers use start_warm_start().
+
+        Returns:
+            Number of entries loaded
+        """
+        if self._store is None:
+            return 0
+
+        start = time.perf_counter()
+        staging, cursor = self._build_warm_state()
+        self._install(staging, cursor)
+
         logger.info(
-            "Answer cached in all 3 layers",
-            query=query[:50],
-            total_cached=len(self.semantic_cache),
-            tokens_saved=rag_response.token_usage.get('total', 0) if rag_response.token_usage else 0
+            "Answer cache warm-started from store",
+            entries=len(self.tfidf_cache),
+            time_ms=f"{(time.perf_counter() - start) * 1000:.1f}"
         )
+        return len(self.tfidf_cache)
+
+    async def _warm_start_in_thread(self) -> int:
+        start = time.perf_counter()
+        self._warming = True
+        try:
+            staging, cursor = await asyncio.to_thread(self._build_warm_state)
+            # Swapped on the event loop, so no lookup sees half-installed layers
+            self._install(staging, cursor)
+        except Exception as e:
+            logger.warning("Answer cache warm start failed", error=str(e))
+            return 0
+        finally:
+            self._warming = False
+
+        logger.info(
+            "Answer cache warm-started from store",
+            entries=len(self.tfidf_cache),
+            time_ms=f"{(time.perf_counter() - start) * 1000:.1f}"
+        )
+        return len(self.tfidf_cache)
+
+    def start_warm_start(self) -> Optional[asyncio.Task]:
+        """
+        Warm-start in a worker thread without blocking the event loop.
+
+        Lookups before it finishes are served from whatever this worker has
+        cached so far (misses, at first); falls back to a blocking
+        warm_start() when there is no running loop.
+        """
+        if self._store is None:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.warm_start()
+            return None
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = loop.create_task(self._warm_start_in_thread())
+        return self._warm_task
+
+    def _maybe_sync(self):
+        """Pull entries written by other workers since the last sync."""
+        if self._store is None or self._warming or time.monotonic() - self._last_sync < self._sync_interval_s:
+            return
+        self._last_sync = time.monotonic()
+        try:
+            records, self._store_cursor = self._store.changes_since(STORE_NAMESPACE, self._store_cursor)
+            for record in records:
+                self._apply_record(record)
+        except Exception as e:
+            logger.warning("Answer cache store sync failed", error=str(e))
 
     def _update_avg_time(self, layer: str, time_ms: float):
         """Update average time for layer"""
@@ -530,32 +946,13 @@ class MultiLayerAnswerCache:
         Args:
             query: The query to invalidate
         """
-        removed_layers = []
+        removed_layers = self._drop_entry(query)
 
-        # Layer 1: Remove from exact match cache
-        normalized = self._normalize_query(query)
-        query_hash = self._hash_normalized(normalized)
-        if query_hash in self.exact_cache:
-            del self.exact_cache[query_hash]
-            removed_layers.append("L1-exact")
-
-        # Layer 2: Remove from TF-IDF cache
-        if query in self.tfidf_cache:
-            del self.tfidf_cache[query]
-            # Remove from TF-IDF index
-            if query in self.tfidf_queries:
-                self.tfidf_queries.remove(query)
-                # Rebuild TF-IDF index
-                self._rebuild_tfidf_index()
-            removed_layers.append("L2-tfidf")
-
-        # Layer 3: Remove from semantic cache
-        # Search for matching semantic cache entry
-        for cached_query_hash, cached_data in list(self.semantic_cache.items()):
-            if cached_data.get("query") == query:
-                del self.semantic_cache[cached_query_hash]
-                removed_layers.append("L3-semantic")
-                break
+        if self._store is not None:
+            try:
+                self._store.delete(STORE_NAMESPACE, self._hash_query(query))
+            except Exception as e:
+                logger.warning("Failed to invalidate persisted answer", error=str(e))
 
         if removed_layers:
             logger.info(
@@ -574,9 +971,13 @@ class MultiLayerAnswerCache:
         self.exact_cache.clear()
         self.tfidf_cache.clear()
         self.semantic_cache.clear()
-        self.tfidf_matrix = None
-        self.tfidf_vectorizer = None
-        self.tfidf_queries = []
+        self.semantic_index.clear()
+        self.tfidf_index.clear()
+        if self._store is not None:
+            try:
+                self._store.clear(STORE_NAMESPACE)
+            except Exception as e:
+                logger.warning("Failed to clear persisted answers", error=str(e))
         logger.info("All cache layers cleared")
 
 
@@ -593,21 +994,33 @@ def initialize_answer_cache(
     similarity_threshold: float = 0.88,
     tfidf_threshold: float = 0.30,
     max_cache_size: int = 1000,
-    ttl_hours: int = 72
+    ttl_hours: int = 72,
+    index_backend: str = "flat",
+    store=None
 ) -> MultiLayerAnswerCache:
-    """Initialize global answer cache"""
+    """
+    Initialize global answer cache.
+
+    With a ``store``, the layers are warm-started from it: in a worker thread
+    when called from a running event loop, otherwise before returning.
+    """
     global answer_cache
     answer_cache = MultiLayerAnswerCache(
         similarity_threshold=similarity_threshold,
         tfidf_threshold=tfidf_threshold,
         max_cache_size=max_cache_size,
-        ttl_hours=ttl_hours
+        ttl_hours=ttl_hours,
+        index_backend=index_backend,
+        store=store
     )
+    # Rebuilding the layers can take a while on large stores: off the event loop
+    answer_cache.start_warm_start()
     logger.info(
         "Multi-layer answer cache initialized",
         semantic_threshold=similarity_threshold,
         tfidf_threshold=tfidf_threshold,
         max_size=max_cache_size,
-        ttl_hours=ttl_hours
+        ttl_hours=ttl_hours,
+        index_backend=index_backend
     )
     return answer_cache
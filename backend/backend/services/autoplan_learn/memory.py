@@ -1,12 +1,31 @@
+"""
+AutoPlan experience memory.
 
+Experiences are kept in an append-only JSONL log that is read once and then
+tailed (appends by this or another process are indexed incrementally).
+Each record's prompt tokens are stored as a unit-length sparse TF vector in
+an inverted index, and records are also grouped by city, so nearest() only
+scores records that share a prompt token or the city. Everything else is
+bounded by _UNINDEXED_MAX_SIM; the full history is scanned only when the
+indexed candidates cannot fill the top k above that bound. The per-cluster
+bandits are rebuilt from the log, so they survive restarts.
+"""
 from __future__ import annotations
 from dataclasses import dataclass, asdict
-from typing import Dict, Any, List, Optional, Tuple
-import json, pathlib, time, os, heapq
+from typing import Dict, Any, List, Optional, Tuple, NamedTuple, FrozenSet
+import json, pathlib, time, os, heapq, math, threading
 
-from .signature import Signature, build_signature, signature_sim
+from .signature import (
+    Signature, build_signature,
+    SIM_W_PROMPT, SIM_W_TOOLS, SIM_W_CITY_DAYS, SIM_W_BUDGET,
+    SIM_CITY_MATCH, SIM_DAYS_MATCH, SIM_BUDGET_SCALE_NZD,
+)
 from .bandit import Bandit
 
+# Upper bound of signature_sim for a record sharing no prompt token (cos = 0) and not
+# the city: full tool overlap + days match + budget closeness
+_UNINDEXED_MAX_SIM = SIM_W_TOOLS + SIM_W_CITY_DAYS * SIM_DAYS_MATCH + SIM_W_BUDGET
+
 @dataclass
 class Experience:
     signature: Dict[str,Any]
@@ -14,67 +33,143 @@ class Experience:
     outcome: Dict[str,Any]
     reward: float
 
+class _Features(NamedTuple):
+    """Signature fields signature_sim() uses, precomputed once per record."""
+    vec: Dict[str,float]        # prompt token -> unit-normalized TF weight
+    tools: FrozenSet[str]
+    city: str                   # lower-cased
+    days: Any
+    budget: Any
+    failure_pattern: str
+    failed: bool
+
+def _features(sig: Signature, failed: bool=False) -> _Features:
+    tf: Dict[str,float] = {}
+    for t in sig._prompt_tokens or []:
+        tf[t] = tf.get(t, 0.0) + 1.0
+    norm = math.sqrt(sum(v*v for v in tf.values())) or 1.0
+    return _Features(
+        vec={t: v/norm for t,v in tf.items()},
+        tools=frozenset(sig.tools or ()),
+        city=(sig.city or "").lower(),
+        days=sig.days,
+        budget=sig.budget_nzd,
+        failure_pattern=sig.failure_pattern or "",
+        failed=failed,
+    )
+
+def _sim(q: _Features, e: _Features, cos: float) -> float:
+    """signature_sim() on precomputed features (cos from the inverted index), with failure downweighting."""
+    tool_overlap = 0.0
+    if q.tools and e.tools:
+        tool_overlap = len(q.tools & e.tools) / max(1, len(q.tools | e.tools))
+
+    city_days = 0.0
+    if q.city and q.city == e.city:
+        city_days += SIM_CITY_MATCH
+    if q.days and e.days and q.days == e.days:
+        city_days += SIM_DAYS_MATCH
+
+    budget_close = 0.0
+    if q.budget and e.budget:
+        diff = abs(q.budget - e.budget)
+        budget_close = max(0.0, 1.0 - min(diff/SIM_BUDGET_SCALE_NZD, 1.0))  # within $500 seen as similar
+
+    sim = (SIM_W_PROMPT*max(0.0, min(1.0, cos)) + SIM_W_TOOLS*tool_overlap
+           + SIM_W_CITY_DAYS*city_days + SIM_W_BUDGET*budget_close)
+
+    # Downweight failed cases with similar failure patterns
+    if e.failed:
+        # If both have failure patterns and they're similar, heavily downweight
+        if q.failure_pattern and e.failure_pattern:
+            # Check if failure patterns overlap (e.g. both have "flights_timeout")
+            overlap = set(q.failure_pattern.split("+")) & set(e.failure_pattern.split("+"))
+            # Similar failure pattern - downweight by 70%, different failure type - by 40%
+            sim *= 0.3 if overlap else 0.6
+        else:
+            # Generic failure without pattern - downweight by 50%
+            sim *= 0.5
+    return sim
+
 class ExperienceMemory:
     def __init__(self, path: str):
         self.path = pathlib.Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.bandits = {}  # cluster_id -> Bandit
+        self._records: List[Dict[str,Any]] = []
+        self._features: List[_Features] = []
+        self._postings: Dict[str,List[Tuple[int,float]]] = {}  # token -> [(record id, weight)]
+        self._by_city: Dict[str,List[int]] = {}
+        self._offset = 0  # bytes of the log already indexed
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
 
     def append(self, exp: Experience):
-        with self.path.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(asdict(exp), ensure_ascii=False) + "\n")
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(asdict(exp), ensure_ascii=False) + "\n")
+            self._refresh()
 
-    def _iter(self):
+    def _refresh(self):
+        """Index records appended to the log since the last read."""
         if not self.path.exists(): return
-        with self.path.open("r", encoding="utf-8") as fh:
-            for line in fh:
-                line=line.strip()
-                if not line: continue
-                try:
-                    yield json.loads(line)
-                except Exception:
-                    continue
-
-    def nearest(self, sig: Signature, k: int=8) -> List[Dict[str,Any]]:
-        """Find k nearest historical experiences, with failure pattern downweighting."""
-        heap = []
-        idx = 0
-        for rec in self._iter() or []:
+        size = self.path.stat().st_size
+        if size < self._offset:
+            # Log was truncated or replaced: rebuild from scratch
+            self.bandits = {}
+            self._records, self._features = [], []
+            self._postings, self._by_city = {}, {}
+            self._offset = 0
+        if size == self._offset: return
+        with self.path.open("rb") as fh:
+            fh.seek(self._offset)
+            data = fh.read(size - self._offset)
+        end = data.rfind(b"\n") + 1  # a partially written last line is read next time
+        self._offset += end
+        for line in data[:end].splitlines():
+            line=line.strip()
+            if not line: continue
             try:
-                ss = Signature.from_dict(rec["signature"])
+                self._index(json.loads(line))
             except Exception:
                 continue
-            sim = signature_sim(sig, ss)
-
-            # Downweight failed cases with similar failure patterns
-            if rec.get("outcome", {}).get("success") == False:
-                # If both have failure patterns and they're similar, heavily downweight
-                sig_pattern = sig.failure_pattern or ""
-                ss_pattern = ss.failure_pattern or ""
-
-                if sig_pattern and ss_pattern:
-                    # Check if failure patterns overlap (e.g. both have "flights_timeout")
-                    sig_errors = set(sig_pattern.split("+"))
-                    ss_errors = set(ss_pattern.split("+"))
-                    overlap = len(sig_errors & ss_errors)
-
-                    if overlap > 0:
-                        # Similar failure pattern - downweight by 70%
-                        sim *= 0.3
-                    else:
-                        # Different failure type - downweight by 40%
-                        sim *= 0.6
-                else:
-                    # Generic failure without pattern - downweight by 50%
-                    sim *= 0.5
-
-            # Add index as tiebreaker to avoid comparing dicts when sim values are equal
-            heapq.heappush(heap, (sim, idx, rec))
-            idx += 1
-            if len(heap)>k:
-                heapq.heappop(heap)
-        out = sorted(heap, key=lambda x:-x[0])
-        return [{"sim":s, **r} for s,i,r in out]
+
+    def _index(self, rec: Dict[str,Any]):
+        ss = Signature.from_dict(rec["signature"])
+        success = rec.get("outcome", {}).get("success")
+        feats = _features(ss, failed=success == False)
+        idx = len(self._records)
+        self._records.append(rec)
+        self._features.append(feats)
+        for t, w in feats.vec.items():
+            self._postings.setdefault(t, []).append((idx, w))
+        if feats.city:
+            self._by_city.setdefault(feats.city, []).append(idx)
+
+        # Replay the outcome into the cluster's bandit (same update as update_outcome)
+        b = self.bandits.setdefault(self._cluster_key(ss), Bandit())
+        b.update(json.dumps(rec.get("strategy"), sort_keys=True), success=bool(success), reward=rec.get("reward"))
+
+    def nearest(self, sig: Signature, k: int=8) -> List[Dict[str,Any]]:
+        """Find k nearest historical experiences, with failure pattern downweighting."""
+        if k <= 0: return []
+        q = _features(sig)
+        with self._lock:
+            self._refresh()
+            dots: Dict[int,float] = {}
+            for t, w in q.vec.items():
+                for idx, w2 in self._postings.get(t, ()):
+                    dots[idx] = dots.get(idx, 0.0) + w*w2
+            candidates = set(dots)
+            if q.city:
+                candidates.update(self._by_city.get(q.city, ()))
+            # Ties go to the most recent experience
+            top = heapq.nlargest(k, ((_sim(q, self._features[i], dots.get(i, 0.0)), i) for i in candidates))
+            if len(candidates) < len(self._records) and (len(top) < k or top[-1][0] <= _UNINDEXED_MAX_SIM):
+                # Unindexed records could still make the top k
+                top = heapq.nlargest(k, ((_sim(q, f, dots.get(i, 0.0)), i) for i, f in enumerate(self._features)))
+            return [{"sim":s, **self._records[i]} for s,i in top]
 
     def choose_strategy(self, sig: Signature, candidate_strategies: List[Dict[str,Any]]) -> Dict[str,Any]:
         # Rank by: (1) best historical success for similar signatures using each strategy key, (2) Thompson sample
@@ -108,9 +203,7 @@ class ExperienceMemory:
 
     def update_outcome(self, sig: Signature, strategy: Dict[str,Any], success: bool, reward: float):
         exp = Experience(signature=sig.to_dict(), strategy=strategy, outcome={"success":success}, reward=reward)
-        self.append(exp)
-        b = self.bandits.setdefault(self._cluster_key(sig), Bandit())
-        b.update(json.dumps(strategy, sort_keys=True), success=success, reward=reward)
+        self.append(exp)  # indexing the appended record also updates the cluster's bandit
 
     def _cluster_key(self, sig: Signature) -> str:
         # cluster key by city + days bucket + budget bucket
@@ -6,6 +6,11 @@ import math, re, json, hashlib, time
 
 _WORD_RE = re.compile(r"[A-Za-z\u4e00-\u9fa5]+")
 
+# signature_sim() weights, shared with memory._sim() (which inlines the same formula)
+SIM_W_PROMPT, SIM_W_TOOLS, SIM_W_CITY_DAYS, SIM_W_BUDGET = 0.6, 0.1, 0.2, 0.1
+SIM_CITY_MATCH, SIM_DAYS_MATCH = 0.6, 0.4
+SIM_BUDGET_SCALE_NZD = 500.0  # budgets within this many NZD count as partly similar
+
 def _tokenize(s: str) -> List[str]:
     if not s: return []
     tokens = _WORD_RE.findall(s.lower())
@@ -83,6 +88,7 @@ def build_signature(prompt: str, constraints: Dict[str,Any], tool_names: List[st
 
 def signature_sim(a: Signature, b: Signature) -> float:
     # hybrid: 0.6 * TF-cosine over prompt+error tokens + 0.1*tool overlap + 0.2*city/days match + 0.1*budget closeness
+    # (memory._sim() mirrors this on precomputed features; keep the two in step)
     ca = _tf(a._prompt_tokens or []); cb = _tf(b._prompt_tokens or [])
     cos = cosine(ca, cb)
 
@@ -92,13 +98,13 @@ def signature_sim(a: Signature, b: Signature) -> float:
 
     city_days = 0.0
     if a.city and b.city and a.city.lower()==b.city.lower():
-        city_days += 0.6
+        city_days += SIM_CITY_MATCH
     if a.days and b.days and a.days==b.days:
-        city_days += 0.4
+        city_days += SIM_DAYS_MATCH
 
     budget_close = 0.0
     if a.budget_nzd and b.budget_nzd:
         diff = abs(a.budget_nzd - b.budget_nzd)
-        budget_close = max(0.0, 1.0 - min(diff/500.0, 1.0))  # within $500 seen as similar
+        budget_close = max(0.0, 1.0 - min(diff/SIM_BUDGET_SCALE_NZD, 1.0))  # within $500 seen as similar
 
-    return 0.6*cos + 0.1*tool_overlap + 0.2*city_days + 0.1*budget_close
+    return SIM_W_PROMPT*cos + SIM_W_TOOLS*tool_overlap + SIM_W_CITY_DAYS*city_days + SIM_W_BUDGET*budget_close
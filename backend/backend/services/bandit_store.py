@@ -0,0 +1,249 @@
+"""
+Write-behind persistence for the Smart RAG Thompson-sampling bandit.
+
+Requests only touch memory: BanditStore.update() bumps the local alpha/beta
+and records the delta. A background task flushes the pending deltas every
+flush_interval_s; the flush takes an exclusive file lock, re-reads the state
+file, adds this process's deltas and atomically replaces the file, so
+several workers sharing one state file merge their updates instead of
+overwriting each other. The merged state is adopted locally, so each worker
+also samples from the others' experience.
+
+FeedbackHistory holds the per-query records awaiting user feedback, bounded
+by count and age.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import structlog
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_ARMS = ("hybrid", "iterative", "graph", "table")
+
+
+class BanditStore:
+    """In-memory bandit parameters with batched, cross-process merged flushing."""
+
+    def __init__(
+        self,
+        state_file: str,
+        default_state_file: Optional[str] = None,
+        flush_interval_s: float = 5.0
+    ):
+        self.state_file = state_file
+        self.default_state_file = default_state_file
+        self.flush_interval_s = flush_interval_s
+        self.cold_start = False
+        # Mutated in place so module-level aliases stay valid across flushes
+        self.arms: Dict[str, Dict[str, float]] = {}
+        self._pending: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {"updates": 0, "flushes": 0, "flush_errors": 0}
+        self.arms.update(self._load())
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _read(path: Optional[str]) -> Optional[Dict[str, Dict[str, float]]]:
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        """Runtime state file, else the pre-warmed default, else uniform priors."""
+        try:
+            state = self._read(self.state_file)
+            if state is not None:
+                logger.info(f"Loaded bandit state from {self.state_file}", state=state)
+                return state
+
+            state = self._read(self.default_state_file)
+            if state is not None:
+                logger.info(f"Loaded default pre-warmed bandit state from {self.default_state_file}", state=state)
+                return state
+        except Exception as e:
+            logger.warning(f"Failed to load bandit state: {e}")
+
+        logger.warning("No bandit state found - starting with cold uniform priors. Consider running warm_smart_bandit.py")
+        self.cold_start = True
+        return {arm: {"alpha": 1.0, "beta": 1.0} for arm in DEFAULT_ARMS}
+
+    # ------------------------------------------------------------------
+    # Request path (memory only)
+    # ------------------------------------------------------------------
+    def update(self, arm: str, reward: float) -> bool:
+        """Apply a reward in [0, 1] to an arm; returns False for unknown arms."""
+        r = max(0.0, min(1.0, reward))
+        with self._lock:
+            params = self.arms.get(arm)
+            if params is None:
+                return False
+            params["alpha"] += r
+            params["beta"] += 1.0 - r
+            delta = self._pending.setdefault(arm, {"alpha": 0.0, "beta": 0.0})
+            delta["alpha"] += r
+            delta["beta"] += 1.0 - r
+            self.stats["updates"] += 1
+        self._ensure_flusher()
+        return True
+
+    @property
+    def pending_updates(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ------------------------------------------------------------------
+    # Write-behind flushing
+    # ------------------------------------------------------------------
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None and not self._flusher.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no event loop (scripts/tests): flush() explicitly
+        self._flusher = loop.create_task(self._run_flusher())
+
+    async def _run_flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            if self._pending:
+                await asyncio.to_thread(self.flush)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(f"{self.state_file}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def flush(self) -> bool:
+        """Merge pending deltas into the state file (blocking). Returns True on success."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                fallback = {arm: dict(params) for arm, params in self.arms.items()}
+
+            try:
+                os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+                with self._file_lock():
+                    merged = self._read(self.state_file)
+                    if merged is None:
+                        # First writer: our in-memory state already includes the deltas
+                        merged = fallback
+                    else:
+                        for arm, delta in pending.items():
+                            params = merged.setdefault(arm, {"alpha": 1.0, "beta": 1.0})
+                            params["alpha"] += delta["alpha"]
+                            params["beta"] += delta["beta"]
+                    tmp = f"{self.state_file}.{os.getpid()}.tmp"
+                    with open(tmp, "w") as f:
+                        json.dump(merged, f, indent=2)
+                    os.replace(tmp, self.state_file)
+            except Exception as e:
+                with self._lock:
+                    for arm, delta in pending.items():
+                        current = self._pending.setdefault(arm, {"alpha": 0.0, "beta": 0.0})
+                        current["alpha"] += delta["alpha"]
+                        current["beta"] += delta["beta"]
+                    self.stats["flush_errors"] += 1
+                logger.warning(f"Failed to save bandit state: {e}")
+                return False
+
+            with self._lock:
+                # Adopt the merged state plus anything recorded while flushing
+                for arm, params in merged.items():
+                    delta = self._pending.get(arm, {"alpha": 0.0, "beta": 0.0})
+                    self.arms[arm] = {
+                        "alpha": params["alpha"] + delta["alpha"],
+                        "beta": params["beta"] + delta["beta"],
+                    }
+                self.stats["flushes"] += 1
+            logger.debug(f"Saved bandit state to {self.state_file}", arms=len(pending))
+            return True
+
+    async def close(self) -> None:
+        """Stop the flusher and write out whatever is pending."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._pending:
+            await asyncio.to_thread(self.flush)
+
+
+class FeedbackHistory:
+    """
+    query_id -> record map bounded by size and age (oldest entries go first).
+
+    Dict-like (get / [] / in / len) so callers written against a plain dict
+    keep working; insertion order is age order, so eviction is O(1).
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_s: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inserted_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            oldest = next(iter(self._entries))
+            if len(self._entries) <= self.max_entries and now - self._inserted_at[oldest] <= self.ttl_s:
+                break
+            self._entries.popitem(last=False)
+            del self._inserted_at[oldest]
+
+    def __setitem__(self, query_id: str, record: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[query_id] = record
+            self._entries.move_to_end(query_id)
+            self._inserted_at[query_id] = now
+            self._expire(now)
+
+    def get(self, query_id: str, default: Any = None) -> Any:
+        with self._lock:
+            self._expire(time.monotonic())
+            return self._entries.get(query_id, default)
+
+    def __getitem__(self, query_id: str) -> Dict[str, Any]:
+        record = self.get(query_id)
+        if record is None:
+            raise KeyError(query_id)
+        return record
+
+    def __contains__(self, query_id: object) -> bool:
+        return self.get(query_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._entries)
@@ -0,0 +1,796 @@
+"""
+Persistent, incrementally updated BM25 inverted index.
+
+On-disk layout ({cache_dir}/{collection}_bm25/):
+- meta.json                      format version, doc count, tokenizer
+- vocab.json / doc_ids.json      term and point-id tables
+- fwd_offsets/terms/tfs.npy      forward index (doc -> terms), canonical form
+- post_offsets/docs/tfs.npy      postings (term -> docs), memory-mapped at load
+- doc_lens.npy                   document lengths
+- delta.log                      JSON lines of add/del/clear ops since the last compaction
+- .lock                          flock held while appending to or compacting delta.log
+
+Ingestion and deletion append to delta.log (and update any live index in
+this process), so a collection never has to be re-scrolled from Qdrant after
+the first build. Other workers pick up appended ops on their next search.
+Scoring follows rank_bm25.BM25Okapi (k1=1.5, b=0.75, epsilon idf floor);
+search() prunes with MaxScore term upper bounds and selects with argpartition.
+"""
+import json
+import math
+import os
+import shutil
+import threading
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = "./cache"
+TOKENIZER_NAME = "lower-whitespace"
+
+# Live indexes in this process, keyed by index directory
+_LIVE_INDEXES: "weakref.WeakValueDictionary[str, BM25Index]" = weakref.WeakValueDictionary()
+_LIVE_LOCK = threading.Lock()
+
+
+@contextmanager
+def _file_lock(index_dir: Path) -> Iterator[None]:
+    """
+    Cross-process lock on an index's delta.log (not re-entrant: flock is per open file).
+
+    Every append holds it, and save() holds it from replaying the log to
+    truncating it, so no worker's ops land in between and get dropped.
+    """
+    if not FCNTL_AVAILABLE:
+        yield
+        return
+    with open(index_dir / ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _append_ops(index_dir: Path, ops: Iterable[Dict]):
+    """Append ops to delta.log for a worker without a live index."""
+    data = b"".join((json.dumps(op) + "\n").encode() for op in ops)
+    with _file_lock(index_dir):
+        with open(index_dir / "delta.log", "ab") as f:
+            f.write(data)
+
+
+def tokenize(text: str) -> List[str]:
+    """Basic whitespace tokenization + lowercase (shared by build and ingestion paths)."""
+    return text.lower().split()
+
+
+def index_dir_for(collection: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Path:
+    """Directory holding the BM25 index files for a collection."""
+    return Path(cache_dir) / f"{collection}_bm25"
+
+
+class BM25Index:
+    """
+    BM25 index with memory-mapped base segment and an in-memory delta segment.
+
+    Doc indices are stable until compaction: base docs are [0, base_n),
+    documents added later get increasing indices; deletions set a tombstone.
+    """
+
+    def __init__(
+        self,
+        index_dir: Optional[Path] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        compact_threshold: int = 10000
+    ):
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.compact_threshold = compact_threshold
+        self.stale = False  # set by invalidate(); owner should rebuild
+        self._lock = threading.RLock()
+        self._log_offset = 0  # bytes of delta.log already applied
+        self._meta_mtime = 0  # meta.json mtime at the last (re)load, changes on compaction
+        self._version = 0
+        self._reset()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _reset(self):
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self.doc_ids: List[str] = []
+        self._id_to_idx: Dict[str, int] = {}
+
+        # Base segment (immutable, usually memory-mapped)
+        empty_i64 = np.zeros(1, dtype=np.int64)
+        self._fwd_offsets = empty_i64
+        self._fwd_terms = np.zeros(0, dtype=np.int32)
+        self._fwd_tfs = np.zeros(0, dtype=np.float32)
+        self._post_offsets = empty_i64
+        self._post_docs = np.zeros(0, dtype=np.int32)
+        self._post_tfs = np.zeros(0, dtype=np.float32)
+        self._base_docs = 0
+        self._base_terms = 0
+
+        # Delta segment (docs added since the last compaction)
+        self._delta_fwd: Dict[int, Dict[int, int]] = {}
+        self._delta_postings: Dict[int, Tuple[List[int], List[float]]] = {}
+        self._delta_arrays: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+        # Growable per-doc / per-term arrays
+        self._doc_lens = np.zeros(0, dtype=np.float32)
+        self._deleted = np.zeros(0, dtype=bool)
+        self._df = np.zeros(0, dtype=np.int64)
+        self._max_tf = np.zeros(0, dtype=np.float32)
+
+        self._num_live = 0
+        self._num_deleted = 0
+        self._total_len = 0.0
+        self._min_doc_len = 0.0  # lower bound over live docs (not raised on delete)
+        self._pending_ops = 0
+        self._idf_cache: Optional[Tuple[int, float]] = None  # (version, average_idf)
+        self._version += 1
+
+    def __len__(self) -> int:
+        return self._num_live
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size (mapped segments counted as fully paged in)."""
+        arrays = (
+            self._fwd_offsets, self._fwd_terms, self._fwd_tfs,
+            self._post_offsets, self._post_docs, self._post_tfs,
+            self._doc_lens, self._deleted, self._df, self._max_tf,
+        )
+        # Rough Python-object cost of the vocab / id tables and delta segment
+        tables = 120 * (len(self._terms) + len(self.doc_ids))
+        delta = 100 * sum(len(terms) for terms in self._delta_fwd.values())
+        return sum(a.nbytes for a in arrays) + tables + delta
+
+    @property
+    def avgdl(self) -> float:
+        return self._total_len / self._num_live if self._num_live else 0.0
+
+    def _grow_docs(self, size: int):
+        if size > len(self._doc_lens):
+            capacity = max(size, len(self._doc_lens) * 2, 1024)
+            self._doc_lens = np.concatenate([self._doc_lens, np.zeros(capacity - len(self._doc_lens), np.float32)])
+            self._deleted = np.concatenate([self._deleted, np.zeros(capacity - len(self._deleted), bool)])
+
+    def _grow_terms(self, size: int):
+        if size > len(self._df):
+            capacity = max(size, len(self._df) * 2, 1024)
+            self._df = np.concatenate([self._df, np.zeros(capacity - len(self._df), np.int64)])
+            self._max_tf = np.concatenate([self._max_tf, np.zeros(capacity - len(self._max_tf), np.float32)])
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._vocab.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._vocab[term] = term_id
+            self._terms.append(term)
+            self._grow_terms(term_id + 1)
+        return term_id
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self, documents: Iterable[Tuple[str, Sequence[str]]]):
+        """Build the base segment from (doc_id, tokens) pairs, replacing all state."""
+        with self._lock:
+            self._reset()
+            offsets = [0]
+            terms: List[int] = []
+            tfs: List[int] = []
+            vocab = self._vocab
+            for doc_id, tokens in documents:
+                doc_id = str(doc_id)
+                if doc_id in self._id_to_idx:
+                    continue
+                self._id_to_idx[doc_id] = len(self.doc_ids)
+                self.doc_ids.append(doc_id)
+                counts = Counter(tokens)
+                # setdefault assigns the next id to unseen terms in one dict op
+                terms.extend([vocab.setdefault(term, len(vocab)) for term in counts])
+                tfs.extend(counts.values())
+                offsets.append(len(terms))
+
+            self._terms = list(vocab)
+
+            self._set_base(
+                np.asarray(offsets, dtype=np.int64),
+                np.asarray(terms, dtype=np.int32),
+                np.asarray(tfs, dtype=np.float32),
+            )
+
+    def _set_base(self, fwd_offsets: np.ndarray, fwd_terms: np.ndarray, fwd_tfs: np.ndarray):
+        """Derive postings and statistics from a forward index (all numpy)."""
+        num_docs = len(fwd_offsets) - 1
+        num_terms = len(self._terms)
+        doc_of_entry = np.repeat(np.arange(num_docs, dtype=np.int32), np.diff(fwd_offsets))
+
+        order = np.argsort(fwd_terms, kind="stable")
+        counts = np.bincount(fwd_terms, minlength=num_terms)
+
+        self._fwd_offsets, self._fwd_terms, self._fwd_tfs = fwd_offsets, fwd_terms, fwd_tfs
+        self._post_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._post_docs = doc_of_entry[order]
+        self._post_tfs = fwd_tfs[order]
+        self._base_docs = num_docs
+        self._base_terms = num_terms
+
+        self._doc_lens = np.bincount(doc_of_entry, weights=fwd_tfs, minlength=num_docs).astype(np.float32)
+        self._deleted = np.zeros(num_docs, dtype=bool)
+        self._df = counts.astype(np.int64)
+        self._max_tf = self._postings_max_tf()
+
+        self._num_live = num_docs
+        self._num_deleted = 0
+        self._total_len = float(self._doc_lens.sum(dtype=np.float64))
+        self._min_doc_len = float(self._doc_lens.min()) if num_docs else 0.0
+        self._delta_fwd.clear()
+        self._delta_postings.clear()
+        self._delta_arrays.clear()
+        self._pending_ops = 0
+        self._version += 1
+
+    def _postings_max_tf(self) -> np.ndarray:
+        """Per-term max tf over the base postings (segment max, no Python loop)."""
+        max_tf = np.zeros(self._base_terms, dtype=np.float32)
+        starts = np.asarray(self._post_offsets[:-1])
+        nonempty = np.diff(np.asarray(self._post_offsets)) > 0
+        if nonempty.any():
+            max_tf[nonempty] = np.maximum.reduceat(np.asarray(self._post_tfs), starts[nonempty])
+        return max_tf
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def add_document(self, doc_id: str, tokens: Sequence[str], log: bool = True):
+        """Add (or replace) one document. O(unique terms)."""
+        self._apply_add(str(doc_id), dict(Counter(tokens)), log=log)
+
+    def remove_document(self, doc_id: str, log: bool = True) -> bool:
+        """Tombstone one document. O(unique terms in the document)."""
+        return self._apply_delete(str(doc_id), log=log)
+
+    def _apply_add(self, doc_id: str, term_counts: Dict[str, int], log: bool):
+        with self._lock:
+            if doc_id in self._id_to_idx:
+                self._apply_delete(doc_id, log=False)
+
+            idx = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+            self._id_to_idx[doc_id] = idx
+            self._grow_docs(idx + 1)
+
+            fwd: Dict[int, int] = {}
+            length = 0
+            for term, tf in term_counts.items():
+                term_id = self._term_id(term)
+                fwd[term_id] = tf
+                length += tf
+                docs, tfs = self._delta_postings.setdefault(term_id, ([], []))
+                docs.append(idx)
+                tfs.append(float(tf))
+                self._delta_arrays.pop(term_id, None)
+                self._df[term_id] += 1
+                if tf > self._max_tf[term_id]:
+                    self._max_tf[term_id] = tf
+            self._delta_fwd[idx] = fwd
+            self._doc_lens[idx] = length
+            self._min_doc_len = length if self._num_live == 0 else min(self._min_doc_len, length)
+            self._num_live += 1
+            self._total_len += length
+            self._version += 1
+
+            if log:
+                self._append_log({"op": "add", "id": doc_id, "tf": term_counts})
+
+    def _apply_delete(self, doc_id: str, log: bool) -> bool:
+        with self._lock:
+            idx = self._id_to_idx.pop(doc_id, None)
+            if idx is None:
+                return False
+
+            if idx < self._base_docs:
+                start, end = self._fwd_offsets[idx], self._fwd_offsets[idx + 1]
+                term_ids = np.asarray(self._fwd_terms[start:end])
+                np.subtract.at(self._df, term_ids, 1)
+            else:
+                for term_id in self._delta_fwd.pop(idx, {}):
+                    self._df[term_id] -= 1
+
+            self._deleted[idx] = True
+            self._num_live -= 1
+            self._num_deleted += 1
+            self._total_len -= float(self._doc_lens[idx])
+            self._version += 1
+
+            if log:
+                self._append_log({"op": "del", "id": doc_id})
+            return True
+
+    def clear(self, log: bool = True):
+        """Drop every document."""
+        with self._lock:
+            self._reset()
+            if log:
+                self._append_log({"op": "clear"})
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _append_log(self, op: Dict):
+        if self.index_dir is None or not (self.index_dir / "meta.json").exists():
+            return
+        line = (json.dumps(op) + "\n").encode()
+        # Held so a concurrent save() cannot truncate the log between its replay and our write
+        with _file_lock(self.index_dir):
+            with open(self.index_dir / "delta.log", "ab") as f:
+                f.write(line)
+                end = f.tell()
+        # If another process appended since our last read, leave the offset so
+        # refresh() replays its ops (and ours again, which is idempotent)
+        if end - len(line) == self._log_offset:
+            self._log_offset = end
+        self._pending_ops += 1
+        if self._pending_ops >= self.compact_threshold:
+            self.save()
+
+    def _apply_log_op(self, op: Dict):
+        if op["op"] == "add":
+            self._apply_add(op["id"], op["tf"], log=False)
+        elif op["op"] == "del":
+            self._apply_delete(op["id"], log=False)
+        elif op["op"] == "clear":
+            self._reset()
+        self._pending_ops += 1
+
+    def save(self):
+        """Compact base + delta into new on-disk arrays and truncate the log."""
+        if self.index_dir is None:
+            raise RuntimeError("BM25Index has no index_dir")
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        # File lock spans replay -> truncate, so ops other workers append meanwhile are not lost
+        with self._lock, _file_lock(self.index_dir):
+            if (self.index_dir / "meta.json").exists():
+                self._replay_log()
+            self._compact_in_memory()
+
+            arrays = {
+                "fwd_offsets": self._fwd_offsets,
+                "fwd_terms": self._fwd_terms,
+                "fwd_tfs": self._fwd_tfs,
+                "post_offsets": self._post_offsets,
+                "post_docs": self._post_docs,
+                "post_tfs": self._post_tfs,
+                "doc_lens": self._doc_lens[:self._base_docs],
+            }
+            for name, array in arrays.items():
+                tmp = self.index_dir / f"{name}.tmp.npy"
+                np.save(tmp, np.ascontiguousarray(array))
+                os.replace(tmp, self.index_dir / f"{name}.npy")
+
+            for name, data in (("vocab", self._terms), ("doc_ids", self.doc_ids)):
+                tmp = self.index_dir / f"{name}.json.tmp"
+                tmp.write_text(json.dumps(data))
+                os.replace(tmp, self.index_dir / f"{name}.json")
+
+            meta_tmp = self.index_dir / "meta.json.tmp"
+            meta_tmp.write_text(json.dumps({
+                "version": FORMAT_VERSION,
+                "num_docs": self._base_docs,
+                "num_terms": self._base_terms,
+                "tokenizer": TOKENIZER_NAME,
+            }))
+            os.replace(meta_tmp, self.index_dir / "meta.json")
+            self._meta_mtime = (self.index_dir / "meta.json").stat().st_mtime_ns
+
+            # Ops are now folded into the base arrays (replaying them again is idempotent)
+            open(self.index_dir / "delta.log", "wb").close()
+            self._log_offset = 0
+            self._pending_ops = 0
+
+            logger.info("BM25 index saved", index_dir=str(self.index_dir), num_docs=self._base_docs)
+
+    def _compact_in_memory(self):
+        """Fold delta docs into the base segment and drop tombstoned docs."""
+        if not self._delta_fwd and not self._num_deleted and self._base_docs == len(self.doc_ids):
+            return
+
+        # Live base docs, sliced out of the forward index without Python loops
+        base_live = ~self._deleted[:self._base_docs]
+        base_lengths = np.diff(self._fwd_offsets)
+        entry_live = np.repeat(base_live, base_lengths)
+        parts_terms = [np.asarray(self._fwd_terms)[entry_live]]
+        parts_tfs = [np.asarray(self._fwd_tfs)[entry_live]]
+        lengths = [base_lengths[base_live]]
+        doc_ids = [d for d, live in zip(self.doc_ids[:self._base_docs], base_live) if live]
+
+        for idx in range(self._base_docs, len(self.doc_ids)):
+            fwd = self._delta_fwd.get(idx)
+            if fwd is None or self._deleted[idx]:
+                continue
+            doc_ids.append(self.doc_ids[idx])
+            parts_terms.append(np.fromiter(fwd.keys(), dtype=np.int32, count=len(fwd)))
+            parts_tfs.append(np.fromiter(fwd.values(), dtype=np.float32, count=len(fwd)))
+            lengths.append(np.array([len(fwd)]))
+
+        fwd_offsets = np.concatenate([[0], np.cumsum(np.concatenate(lengths))]).astype(np.int64)
+        self.doc_ids = doc_ids
+        self._id_to_idx = {doc_id: idx for idx, doc_id in enumerate(doc_ids)}
+        self._set_base(
+            fwd_offsets,
+            np.concatenate(parts_terms).astype(np.int32),
+            np.concatenate(parts_tfs).astype(np.float32),
+        )
+
+    @classmethod
+    def load(cls, index_dir: Path, **kwargs) -> Optional["BM25Index"]:
+        """Load a saved index (postings memory-mapped) and replay its delta log."""
+        index_dir = Path(index_dir)
+        meta_path = index_dir / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") != FORMAT_VERSION or meta.get("tokenizer") != TOKENIZER_NAME:
+            logger.warning("BM25 index format mismatch, ignoring", index_dir=str(index_dir))
+            return None
+
+        index = cls(index_dir=index_dir, **kwargs)
+        index._load_files()
+        return index
+
+    def _load_files(self):
+        with self._lock:
+            self._reset()
+            self._log_offset = 0
+            self._meta_mtime = (self.index_dir / "meta.json").stat().st_mtime_ns
+            mmap = lambda name: np.load(self.index_dir / f"{name}.npy", mmap_mode="r")
+
+            self._terms = json.loads((self.index_dir / "vocab.json").read_text())
+            self._vocab = {term: i for i, term in enumerate(self._terms)}
+            self.doc_ids = json.loads((self.index_dir / "doc_ids.json").read_text())
+            self._id_to_idx = {doc_id: i for i, doc_id in enumerate(self.doc_ids)}
+
+            self._fwd_offsets = mmap("fwd_offsets")
+            self._fwd_terms = mmap("fwd_terms")
+            self._fwd_tfs = mmap("fwd_tfs")
+            self._post_offsets = mmap("post_offsets")
+            self._post_docs = mmap("post_docs")
+            self._post_tfs = mmap("post_tfs")
+            self._base_docs = len(self.doc_ids)
+            self._base_terms = len(self._terms)
+
+            # Small per-doc / per-term arrays live in memory so they can change
+            self._doc_lens = np.array(mmap("doc_lens"), dtype=np.float32)
+            self._deleted = np.zeros(self._base_docs, dtype=bool)
+            self._df = np.diff(np.asarray(self._post_offsets)).astype(np.int64)
+            self._max_tf = self._postings_max_tf()
+
+            self._num_live = self._base_docs
+            self._total_len = float(self._doc_lens.sum(dtype=np.float64))
+            self._min_doc_len = float(self._doc_lens.min()) if self._base_docs else 0.0
+            self._version += 1
+            self._replay_log()
+
+    def _replay_log(self):
+        """Apply delta.log entries written after our last read position."""
+        log_path = self.index_dir / "delta.log"
+        if not log_path.exists():
+            return
+        with open(log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # Only consume complete lines (a writer may be mid-append)
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply_log_op(json.loads(line))
+        self._log_offset += end
+
+    def refresh(self):
+        """Pick up ops appended by other processes (cheap stat when nothing changed)."""
+        if self.index_dir is None:
+            return
+        try:
+            meta_mtime = (self.index_dir / "meta.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            if self._meta_mtime:
+                # Saved files were removed (invalidate() in another process): rebuild
+                self.stale = True
+            return
+        try:
+            size = (self.index_dir / "delta.log").stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if meta_mtime == self._meta_mtime and size == self._log_offset:
+            return
+        with self._lock:
+            if meta_mtime != self._meta_mtime or size < self._log_offset:
+                # Another process compacted: reload the new base files
+                self._load_files()
+            else:
+                self._replay_log()
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _average_idf(self) -> float:
+        if self._idf_cache is None or self._idf_cache[0] != self._version:
+            df = self._df[:len(self._terms)]
+            df = df[df > 0]
+            n = self._num_live
+            average = float(np.mean(np.log(n - df + 0.5) - np.log(df + 0.5))) if len(df) else 0.0
+            self._idf_cache = (self._version, average)
+        return self._idf_cache[1]
+
+    def _idf(self, term_id: int) -> float:
+        df = int(self._df[term_id])
+        n = self._num_live
+        idf = math.log(n - df + 0.5) - math.log(df + 0.5)
+        if idf < 0:
+            idf = self.epsilon * self._average_idf()
+        return idf
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted (doc indices, tfs) for a term across base + delta segments."""
+        parts_docs, parts_tfs = [], []
+        if term_id < self._base_terms:
+            start, end = self._post_offsets[term_id], self._post_offsets[term_id + 1]
+            parts_docs.append(self._post_docs[start:end])
+            parts_tfs.append(self._post_tfs[start:end])
+        if term_id in self._delta_postings:
+            arrays = self._delta_arrays.get(term_id)
+            if arrays is None:
+                docs, tfs = self._delta_postings[term_id]
+                arrays = (np.asarray(docs, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+                self._delta_arrays[term_id] = arrays
+            parts_docs.append(arrays[0])
+            parts_tfs.append(arrays[1])
+        if not parts_docs:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        if len(parts_docs) == 1:
+            return parts_docs[0], parts_tfs[0]
+        return np.concatenate(parts_docs), np.concatenate(parts_tfs)
+
+    def _term_scores(self, docs: np.ndarray, tfs: np.ndarray, weight: float) -> np.ndarray:
+        tfs = tfs.astype(np.float64)
+        norm = self.k1 * (1 - self.b + self.b * self._doc_lens[docs].astype(np.float64) / self.avgdl)
+        return weight * (tfs * (self.k1 + 1) / (tfs + norm))
+
+    def _upper_bound(self, term_id: int, weight: float) -> float:
+        """Max contribution of a term to any doc (max tf, shortest doc)."""
+        max_tf = float(self._max_tf[term_id])
+        norm = self.k1 * (1 - self.b + self.b * self._min_doc_len / self.avgdl)
+        return weight * max_tf * (self.k1 + 1) / (max_tf + norm)
+
+    def _live_postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        docs, tfs = self._postings(term_id)
+        if self._num_deleted:
+            live = ~self._deleted[docs]
+            docs, tfs = docs[live], tfs[live]
+        return docs, tfs
+
+    def search(
+        self,
+        tokens: Sequence[str],
+        top_k: int = 10,
+        prune: bool = True
+    ) -> List[Tuple[str, float]]:
+        """
+        Top-k BM25 search visiting only the postings of the query terms.
+
+        Terms are processed in decreasing order of their score upper bound
+        (MaxScore). Once the k-th best partial score exceeds what the
+        remaining terms could add, no unseen document can reach the top-k,
+        so the remaining terms only look up existing candidates
+        (searchsorted into their doc-sorted postings) instead of scanning.
+
+        Args:
+            tokens: Tokenized query (repeated terms count, as in BM25Okapi)
+            top_k: Number of results
+            prune: Set False to score every posting (exhaustive reference)
+
+        Returns:
+            List of (doc_id, score) with score > 0, best first
+        """
+        with self._lock:
+            if not self._num_live or top_k <= 0:
+                return []
+
+            terms = []  # (upper_bound, term_id, weight)
+            for term, qtf in Counter(tokens).items():
+                term_id = self._vocab.get(term)
+                if term_id is None or self._df[term_id] <= 0:
+                    continue
+                weight = self._idf(term_id) * qtf
+                terms.append((self._upper_bound(term_id, weight), term_id, weight))
+            if not terms:
+                return []
+
+            # Negative idf (epsilon floor) breaks the "partial <= final" bound
+            if not prune or any(weight <= 0 for _, _, weight in terms):
+                cand_docs, cand_scores = self._score_exhaustive(terms)
+            else:
+                cand_docs, cand_scores = self._score_maxscore(terms, top_k)
+
+            return self._top_k(cand_docs, cand_scores, top_k)
+
+    def _score_exhaustive(self, terms) -> Tuple[np.ndarray, np.ndarray]:
+        all_docs, all_scores = [], []
+        for _, term_id, weight in terms:
+            docs, tfs = self._live_postings(term_id)
+            all_docs.append(docs)
+            all_scores.append(self._term_scores(docs, tfs, weight))
+        cand_docs, inverse = np.unique(np.concatenate(all_docs), return_inverse=True)
+        return cand_docs, np.bincount(inverse, weights=np.concatenate(all_scores))
+
+    def _score_maxscore(self, terms, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        terms = sorted(terms, key=lambda item: item[0], reverse=True)
+        remaining = [ub for ub, _, _ in terms]
+        # remaining_ub[i] = max score terms[i:] can still add
+        remaining_ub = np.concatenate([np.cumsum(remaining[::-1])[::-1], [0.0]])
+
+        cand_docs = np.zeros(0, dtype=np.int32)
+        cand_scores = np.zeros(0, dtype=np.float64)
+        threshold = 0.0
+        i = 0
+
+        # Phase 1: full postings traversal while unseen docs can still enter the top-k
+        while i < len(terms) and (len(cand_docs) < top_k or threshold <= remaining_ub[i]):
+            _, term_id, weight = terms[i]
+            docs, tfs = self._live_postings(term_id)
+            scores = self._term_scores(docs, tfs, weight)
+            if len(cand_docs):
+                cand_docs, inverse = np.unique(np.concatenate([cand_docs, docs]), return_inverse=True)
+                cand_scores = np.bincount(inverse, weights=np.concatenate([cand_scores, scores]))
+            else:
+                cand_docs, cand_scores = np.asarray(docs), scores
+            i += 1
+            if len(cand_docs) >= top_k:
+                threshold = np.partition(cand_scores, len(cand_scores) - top_k)[len(cand_scores) - top_k]
+
+        # Phase 2: the remaining terms only refine existing candidates
+        while i < len(terms):
+            keep = cand_scores + remaining_ub[i] >= threshold
+            cand_docs, cand_scores = cand_docs[keep], cand_scores[keep]
+
+            _, term_id, weight = terms[i]
+            docs, tfs = self._postings(term_id)
+            pos = np.searchsorted(docs, cand_docs)
+            pos[pos == len(docs)] = 0
+            hit = np.asarray(docs)[pos] == cand_docs if len(docs) else np.zeros(len(cand_docs), bool)
+            cand_scores[hit] += self._term_scores(cand_docs[hit], np.asarray(tfs)[pos[hit]], weight)
+            i += 1
+
+            threshold = np.partition(cand_scores, len(cand_scores) - top_k)[len(cand_scores) - top_k]
+
+        return cand_docs, cand_scores
+
+    def _top_k(self, cand_docs: np.ndarray, cand_scores: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        """Partition to the top_k, then sort only those"""
+        positive = cand_scores > 0
+        cand_docs, cand_scores = cand_docs[positive], cand_scores[positive]
+        if len(cand_scores) > top_k:
+            kth = np.partition(cand_scores, len(cand_scores) - top_k)[len(cand_scores) - top_k]
+            # Keep every doc tied with the k-th score so ties resolve deterministically below
+            top = np.flatnonzero(cand_scores >= kth)
+            cand_docs, cand_scores = cand_docs[top], cand_scores[top]
+        # Ties broken by doc index, matching a stable sort over all docs
+        order = np.lexsort((cand_docs, -cand_scores))[:top_k]
+        return [(self.doc_ids[cand_docs[i]], float(cand_scores[i])) for i in order]
+
+
+# ----------------------------------------------------------------------
+# Ingestion hooks
+# ----------------------------------------------------------------------
+
+
+def register_live_index(index: BM25Index):
+    """Register an in-process index so ingestion hooks update it directly."""
+    if index.index_dir is not None:
+        with _LIVE_LOCK:
+            _LIVE_INDEXES[str(index.index_dir.resolve())] = index
+
+
+def _live_index(index_dir: Path) -> Optional[BM25Index]:
+    with _LIVE_LOCK:
+        return _LIVE_INDEXES.get(str(index_dir.resolve()))
+
+
+def record_upsert(
+    collection: str,
+    documents: Iterable[Tuple[str, str]],
+    cache_dir: str = DEFAULT_CACHE_DIR
+):
+    """
+    Record newly upserted (point_id, text) pairs in the collection's BM25 index.
+
+    No-op when the collection has no saved index yet (the first build will
+    scroll the collection anyway).
+    """
+    index_dir = index_dir_for(collection, cache_dir)
+    if not (index_dir / "meta.json").exists():
+        return
+    try:
+        index = _live_index(index_dir)
+        if index is not None:
+            index.refresh()
+            for doc_id, text in documents:
+                index.add_document(str(doc_id), tokenize(text))
+            return
+        _append_ops(index_dir, [
+            {"op": "add", "id": str(doc_id), "tf": dict(Counter(tokenize(text)))}
+            for doc_id, text in documents
+        ])
+    except Exception as e:
+        logger.warning("Failed to record BM25 upsert", collection=collection, error=str(e))
+
+
+def record_delete(
+    collection: str,
+    doc_ids: Optional[Iterable[str]] = None,
+    cache_dir: str = DEFAULT_CACHE_DIR
+):
+    """
+    Record deleted points in the collection's BM25 index.
+
+    doc_ids=None means the whole collection was dropped: the index is cleared
+    (and stays persisted, so later ingestion keeps updating it incrementally).
+    """
+    index_dir = index_dir_for(collection, cache_dir)
+    if not (index_dir / "meta.json").exists():
+        return
+    try:
+        index = _live_index(index_dir)
+        if index is not None:
+            index.refresh()
+            if doc_ids is None:
+                index.clear()
+            else:
+                for doc_id in doc_ids:
+                    index.remove_document(str(doc_id))
+            return
+        _append_ops(index_dir, [{"op": "clear"}] if doc_ids is None else [{"op": "del", "id": str(d)} for d in doc_ids])
+    except Exception as e:
+        logger.warning("Failed to record BM25 delete", collection=collection, error=str(e))
+
+
+def invalidate(collection: str, cache_dir: str = DEFAULT_CACHE_DIR):
+    """
+    Drop the saved index for a collection that was bulk-loaded outside the
+    ingestion path (e.g. seeding), so the next initialize() rebuilds it.
+    """
+    index_dir = index_dir_for(collection, cache_dir)
+    index = _live_index(index_dir)
+    if index is not None:
+        index.stale = True
+    shutil.rmtree(index_dir, ignore_errors=True)
@@ -0,0 +1,431 @@
+"""
+Persistent storage backends for the answer / query-strategy caches.
+
+Lets every uvicorn worker share cache hits and survive restarts:
+- SQLiteCacheStore: on-disk, WAL mode, safe for several local processes
+- RedisCacheStore: any Redis-protocol server (or fakeredis for local runs)
+
+Each backend keeps a monotonically increasing sequence number per write so
+caches can cheaply pull only what other workers changed since their last
+sync. Embeddings are stored as raw float32 blobs, and callers may attach
+precomputed ``lookup_keys`` (e.g. hashes / index terms) so a warm start does
+not have to re-tokenize every entry.
+
+A cache may also save one snapshot per namespace (an opaque blob of its
+built indexes, tagged with the sequence number it covers); a warm start then
+restores it and replays only ``changes_since(snapshot cursor)``. Tombstones
+are purged after a day, so snapshots older than that must not be replayed
+from (see SNAPSHOT_MAX_AGE_S).
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# redis is optional - only needed for redis:// store URLs
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+
+# Snapshots older than this may predate purged tombstones (kept for a day)
+SNAPSHOT_MAX_AGE_S = 12 * 3600
+
+
+class CacheSnapshot(NamedTuple):
+    """A saved index snapshot covering every write up to ``cursor``."""
+    cursor: int
+    data: bytes
+    created_at: float
+
+
+class CacheRecord(NamedTuple):
+    """
+    One persisted cache entry.
+
+    ``payload`` is None for deletions and b"" when it was not fetched
+    (bulk loads) - use ``get_payload()`` to read it on demand.
+    """
+    key: str
+    query: str
+    payload: Optional[bytes]
+    embedding: Optional[np.ndarray]
+    created_at: float
+    expires_at: float
+    lookup_keys: Optional[str] = None
+
+
+def _embedding_to_blob(embedding: Optional[np.ndarray]) -> Optional[bytes]:
+    if embedding is None:
+        return None
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def _blob_to_embedding(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    if not blob:
+        return None
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class SQLiteCacheStore:
+    """SQLite-backed cache store (one table, namespaced rows)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                query TEXT NOT NULL,
+                payload BLOB,
+                embedding BLOB,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                lookup_keys TEXT,
+                UNIQUE(namespace, key)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_snapshots (
+                namespace TEXT PRIMARY KEY,
+                cursor INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        query: str,
+        payload: bytes,
+        embedding: Optional[np.ndarray],
+        expires_at: float,
+        lookup_keys: Optional[str] = None
+    ):
+        """Insert or replace an entry (gets a fresh sequence number)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, query, payload, embedding, created_at, expires_at, lookup_keys) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    namespace, key, query, payload, _embedding_to_blob(embedding),
+                    time.time(), expires_at, lookup_keys
+                )
+            )
+            self._conn.commit()
+
+    def get_payload(self, namespace: str, key: str) -> Optional[bytes]:
+        """Fetch a single entry's payload (None if deleted or missing)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, namespace: str, key: str):
+        """Replace an entry with a tombstone so other workers see the delete."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, query, payload, embedding, created_at, expires_at) "
+                "VALUES (?, ?, '', NULL, NULL, ?, 0)",
+                (namespace, key, time.time())
+            )
+            self._conn.commit()
+
+    def clear(self, namespace: str):
+        """Tombstone every live entry in a namespace."""
+        with self._lock:
+            keys = [
+                row[0] for row in self._conn.execute(
+                    "SELECT key FROM cache_entries WHERE namespace = ? AND payload IS NOT NULL",
+                    (namespace,)
+                )
+            ]
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, query, payload, embedding, created_at, expires_at) "
+                "VALUES (?, ?, '', NULL, NULL, ?, 0)",
+                [(namespace, key, now) for key in keys]
+            )
+            self._conn.commit()
+
+    def changes_since(self, namespace: str, cursor: int = 0) -> Tuple[List[CacheRecord], int]:
+        """
+        Return entries written after ``cursor`` (tombstones included).
+
+        Returns:
+            (records ordered by write, new cursor)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, key, query, payload, embedding, created_at, expires_at, lookup_keys "
+                "FROM cache_entries WHERE namespace = ? AND seq > ? ORDER BY seq",
+                (namespace, cursor)
+            ).fetchall()
+
+        records = [
+            CacheRecord(key, query, payload, _blob_to_embedding(embedding), created_at, expires_at, lookup_keys)
+            for _, key, query, payload, embedding, created_at, expires_at, lookup_keys in rows
+        ]
+        new_cursor = rows[-1][0] if rows else cursor
+        return records, new_cursor
+
+    def load(self, namespace: str) -> Tuple[List[CacheRecord], int]:
+        """
+        Return all live, unexpired entries plus a cursor for later syncs.
+
+        Payloads are not read (b"" placeholder) to keep warm starts fast.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM cache_entries WHERE namespace = ?",
+                (namespace,)
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT key, query, embedding, created_at, expires_at, lookup_keys "
+                "FROM cache_entries "
+                "WHERE namespace = ? AND seq <= ? AND payload IS NOT NULL AND expires_at > ? "
+                "ORDER BY seq",
+                (namespace, cursor, time.time())
+            ).fetchall()
+
+        records = [
+            CacheRecord(key, query, b"", _blob_to_embedding(embedding), created_at, expires_at, lookup_keys)
+            for key, query, embedding, created_at, expires_at, lookup_keys in rows
+        ]
+        return records, cursor
+
+    def put_snapshot(self, namespace: str, cursor: int, data: bytes):
+        """Save a snapshot unless a newer one (higher cursor) is already stored."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache_snapshots (namespace, cursor, data, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(namespace) DO UPDATE SET "
+                "cursor = excluded.cursor, data = excluded.data, created_at = excluded.created_at "
+                "WHERE excluded.cursor >= cache_snapshots.cursor",
+                (namespace, cursor, data, time.time())
+            )
+            self._conn.commit()
+
+    def get_snapshot(self, namespace: str) -> Optional[CacheSnapshot]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cursor, data, created_at FROM cache_snapshots WHERE namespace = ?",
+                (namespace,)
+            ).fetchone()
+        return CacheSnapshot(*row) if row else None
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Physically delete expired rows and tombstones older than a day."""
+        now = time.time() if now is None else now
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries "
+                "WHERE (payload IS NOT NULL AND expires_at <= ?) "
+                "OR (payload IS NULL AND created_at <= ?)",
+                (now, now - 86400)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisCacheStore:
+    """
+    Redis-backed cache store.
+
+    Layout per namespace:
+        {prefix}:{ns}:entry:{key}  HASH  query/payload/embedding/created_at/expires_at
+        {prefix}:{ns}:log          ZSET  key -> last write sequence
+        {prefix}:{ns}:seq          INT   sequence counter
+        {prefix}:{ns}:snapshot     HASH  cursor/data/created_at
+
+    Accepts any redis-py compatible client, so fakeredis works for local runs.
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: Optional[str] = None,
+        prefix: str = "ai-louie:cache",
+        tombstone_ttl_s: int = 86400
+    ):
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise RuntimeError("redis package is not installed")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self._redis = client
+        self.prefix = prefix
+        self.tombstone_ttl_s = tombstone_ttl_s
+
+    def _key(self, namespace: str, suffix: str) -> str:
+        return f"{self.prefix}:{namespace}:{suffix}"
+
+    def _write(self, namespace: str, key: str, mapping: dict, ttl_s: Optional[float]):
+        seq = self._redis.incr(self._key(namespace, "seq"))
+        entry_key = self._key(namespace, f"entry:{key}")
+        pipe = self._redis.pipeline()
+        pipe.delete(entry_key)
+        pipe.hset(entry_key, mapping=mapping)
+        if ttl_s is not None:
+            pipe.expire(entry_key, max(1, int(ttl_s)))
+        pipe.zadd(self._key(namespace, "log"), {key: seq})
+        pipe.execute()
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        query: str,
+        payload: bytes,
+        embedding: Optional[np.ndarray],
+        expires_at: float,
+        lookup_keys: Optional[str] = None
+    ):
+        mapping = {
+            "query": query,
+            "payload": payload,
+            "created_at": time.time(),
+            "expires_at": expires_at,
+        }
+        blob = _embedding_to_blob(embedding)
+        if blob is not None:
+            mapping["embedding"] = blob
+        if lookup_keys is not None:
+            mapping["lookup_keys"] = lookup_keys
+        self._write(namespace, key, mapping, ttl_s=expires_at - time.time())
+
+    def get_payload(self, namespace: str, key: str) -> Optional[bytes]:
+        return self._redis.hget(self._key(namespace, f"entry:{key}"), "payload")
+
+    def delete(self, namespace: str, key: str):
+        # Tombstone: entry hash without payload, log entry bumped
+        mapping = {"query": "", "created_at": time.time(), "expires_at": 0}
+        self._write(namespace, key, mapping, ttl_s=self.tombstone_ttl_s)
+
+    def clear(self, namespace: str):
+        for key in self._redis.zrange(self._key(namespace, "log"), 0, -1):
+            self.delete(namespace, key.decode() if isinstance(key, bytes) else key)
+
+    def changes_since(self, namespace: str, cursor: int = 0) -> Tuple[List[CacheRecord], int]:
+        members = self._redis.zrangebyscore(
+            self._key(namespace, "log"), f"({cursor}", "+inf", withscores=True
+        )
+        if not members:
+            return [], cursor
+
+        pipe = self._redis.pipeline()
+        keys = []
+        for member, _ in members:
+            key = member.decode() if isinstance(member, bytes) else member
+            keys.append(key)
+            pipe.hgetall(self._key(namespace, f"entry:{key}"))
+        rows = pipe.execute()
+
+        records = []
+        for key, row in zip(keys, rows):
+            row = {k.decode() if isinstance(k, bytes) else k: v for k, v in row.items()}
+            query = row.get("query", b"")
+            lookup_keys = row.get("lookup_keys")
+            records.append(CacheRecord(
+                key=key,
+                query=query.decode() if isinstance(query, bytes) else query,
+                payload=row.get("payload"),  # Missing (tombstone or expired) -> None
+                embedding=_blob_to_embedding(row.get("embedding")),
+                created_at=float(row.get("created_at", 0)),
+                expires_at=float(row.get("expires_at", 0)),
+                lookup_keys=lookup_keys.decode() if isinstance(lookup_keys, bytes) else lookup_keys,
+            ))
+        return records, int(members[-1][1])
+
+    def load(self, namespace: str) -> Tuple[List[CacheRecord], int]:
+        records, cursor = self.changes_since(namespace, 0)
+        now = time.time()
+        return [r for r in records if r.payload is not None and r.expires_at > now], cursor
+
+    def put_snapshot(self, namespace: str, cursor: int, data: bytes):
+        """Save a snapshot unless a newer one (higher cursor) is already stored."""
+        key = self._key(namespace, "snapshot")
+        # Last writer wins between the check and the write; both snapshots are valid
+        current = self._redis.hget(key, "cursor")
+        if current is not None and int(current) > cursor:
+            return
+        self._redis.hset(key, mapping={"cursor": cursor, "data": data, "created_at": time.time()})
+
+    def get_snapshot(self, namespace: str) -> Optional[CacheSnapshot]:
+        row = self._redis.hgetall(self._key(namespace, "snapshot"))
+        if not row:
+            return None
+        row = {k.decode() if isinstance(k, bytes) else k: v for k, v in row.items()}
+        return CacheSnapshot(int(row["cursor"]), row["data"], float(row["created_at"]))
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop log members whose entry hash (or tombstone) has expired out of Redis."""
+        removed = 0
+        for log_key in self._redis.scan_iter(match=f"{self.prefix}:*:log"):
+            log_key = log_key.decode() if isinstance(log_key, bytes) else log_key
+            namespace = log_key[len(self.prefix) + 1:-len(":log")]
+            members = self._redis.zrange(log_key, 0, -1)
+            pipe = self._redis.pipeline()
+            for member in members:
+                key = member.decode() if isinstance(member, bytes) else member
+                pipe.exists(self._key(namespace, f"entry:{key}"))
+            stale = [m for m, exists in zip(members, pipe.execute()) if not exists]
+            if stale:
+                removed += self._redis.zrem(log_key, *stale)
+        return removed
+
+    def close(self):
+        try:
+            self._redis.close()
+        except Exception:
+            pass
+
+
+def create_cache_store(url: Optional[str]):
+    """
+    Build a cache store from a URL.
+
+    Examples:
+        sqlite:///./data/answer_cache.sqlite3
+        redis://localhost:6379/0
+        "" / None -> no persistence (in-process only)
+    """
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteCacheStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheStore(url=url)
+    raise ValueError(f"Unsupported cache store URL: {url}")
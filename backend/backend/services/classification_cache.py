@@ -3,15 +3,25 @@ Classification Cache: Learn from LLM classifications to reduce future LLM calls
 
 This system caches query classifications and learns patterns to make
 confident predictions without LLM calls.
+
+Persistence is a compact JSON snapshot plus an append-only JSON-lines log
+({cache_file stem}.log) of put/touch/del ops. Changes are buffered and
+appended every few operations (write-behind); the log is folded into a new
+snapshot once it grows past compact_every ops. Loading replays the log over
+the snapshot and indexes the persisted terms without re-tokenizing.
+close() (registered with atexit for the singleton) appends whatever is
+still buffered.
 """
+import atexit
 import json
+import os
 import structlog
+from collections import Counter
 from typing import Optional, Dict, Any, Tuple, List
 from datetime import datetime, timedelta
 from pathlib import Path
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from backend.services.sparse_index import IncrementalTfidfIndex
 
 logger = structlog.get_logger(__name__)
 
@@ -32,7 +42,9 @@ class ClassificationCache:
         semantic_threshold: float = 0.75,
         confidence_threshold: float = 0.70,
         max_cache_size: int = 10000,
-        ttl_days: int = 30
+        ttl_days: int = 30,
+        flush_every: int = 10,
+        compact_every: int = 2000
     ):
         """
         Args:
@@ -41,24 +53,28 @@ class ClassificationCache:
             confidence_threshold: Min confidence to skip LLM (0-1)
             max_cache_size: Maximum cached entries
             ttl_days: Time-to-live for cache entries
+            flush_every: Buffered log ops that trigger an append to disk
+            compact_every: Log ops that trigger rewriting the snapshot
         """
         self.cache_file = Path(cache_file)
+        self.log_file = self.cache_file.with_suffix(".log")
         self.semantic_threshold = semantic_threshold
         self.confidence_threshold = confidence_threshold
         self.max_cache_size = max_cache_size
         self.ttl_days = ttl_days
+        self.flush_every = max(1, flush_every)
+        self.compact_every = max(1, compact_every)
 
         # Cache storage
         self.cache: Dict[str, Dict[str, Any]] = {}
+        self._type_counts: Counter = Counter()
 
-        # TF-IDF for semantic similarity
-        self.vectorizer = TfidfVectorizer(
-            max_features=500,
-            ngram_range=(1, 3),
-            stop_words='english'
-        )
-        self.query_texts: List[str] = []
-        self.query_vectors = None
+        # TF-IDF for semantic similarity (incremental, no refit on insert/evict)
+        self.index = IncrementalTfidfIndex(ngram_range=(1, 3))
+
+        # Write-behind state
+        self._pending_ops: List[Dict[str, Any]] = []
+        self._log_ops = 0
 
         # Statistics
         self.stats = {
@@ -79,37 +95,103 @@ class ClassificationCache:
         )
 
     def _load_cache(self):
-        """Load cache from disk"""
-        if self.cache_file.exists():
-            try:
+        """Load the snapshot, replay the log and index the persisted terms"""
+        terms: Dict[str, List[str]] = {}
+        try:
+            if self.cache_file.exists():
                 with open(self.cache_file, 'r') as f:
                     data = json.load(f)
-                    self.cache = data.get('cache', {})
-                    self.stats = data.get('stats', self.stats)
+                self.cache = data.get('cache', {})
+                self.stats = data.get('stats', self.stats)
+                terms = data.get('terms', {})
+
+            if self.log_file.exists():
+                with open(self.log_file, 'r') as f:
+                    for line in f:
+                        try:
+                            op = json.loads(line)
+                        except ValueError:
+                            continue  # torn final line of an interrupted append
+                        self._apply_log_op(op, terms)
+                        self._log_ops += 1
+        except Exception as e:
+            logger.warning(f"Failed to load cache: {e}")
+            self.cache = {}
+            terms = {}
 
-                # Remove expired entries
-                self._cleanup_expired()
+        for query, entry in self.cache.items():
+            self._type_counts[entry['query_type']] += 1
+            if query in terms:
+                self.index.add_terms(query, terms[query])
+            else:
+                self.index.add(query, query)
+
+        # Remove expired entries
+        self._cleanup_expired()
+
+        if self.cache:
+            logger.info(f"Loaded {len(self.cache)} classifications from cache")
+
+    def _apply_log_op(self, op: Dict[str, Any], terms: Dict[str, List[str]]):
+        query = op.get('q')
+        kind = op.get('op')
+        if kind == 'put':
+            self.cache[query] = op['entry']
+            terms[query] = op['terms']
+        elif kind == 'touch' and query in self.cache:
+            self.cache[query]['uses'] = op['uses']
+            self.cache[query]['last_used'] = op['last_used']
+        elif kind == 'del':
+            self.cache.pop(query, None)
+            terms.pop(query, None)
+        elif kind == 'stats':
+            self.stats = op['stats']
+
+    def _log(self, op: Dict[str, Any]):
+        """Buffer a log op; append the buffer once it reaches flush_every ops"""
+        self._pending_ops.append(op)
+        if len(self._pending_ops) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Append buffered ops (and current stats) to the log, compacting if it is long"""
+        if not self._pending_ops:
+            return
+        ops, self._pending_ops = self._pending_ops, []
+        ops.append({'op': 'stats', 'stats': self.stats})
+        try:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_file, 'a') as f:
+                f.write(''.join(json.dumps(op, separators=(',', ':')) + '\n' for op in ops))
+            self._log_ops += len(ops)
+        except Exception as e:
+            logger.warning(f"Failed to append to cache log: {e}")
+            self._pending_ops = ops[:-1] + self._pending_ops
+            return
 
-                # Rebuild TF-IDF vectors
-                if self.cache:
-                    self.query_texts = list(self.cache.keys())
-                    if len(self.query_texts) > 0:
-                        self.query_vectors = self.vectorizer.fit_transform(self.query_texts)
+        if self._log_ops >= self.compact_every:
+            self._save_cache()
 
-                logger.info(f"Loaded {len(self.cache)} classifications from cache")
-            except Exception as e:
-                logger.warning(f"Failed to load cache: {e}")
-                self.cache = {}
+    def close(self):
+        """Append ops still waiting for flush_every (call on shutdown)"""
+        self.flush()
 
     def _save_cache(self):
-        """Save cache to disk"""
+        """Compact: write a new snapshot atomically and truncate the log"""
         try:
             self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, 'w') as f:
+            tmp = self.cache_file.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
                 json.dump({
                     'cache': self.cache,
+                    'terms': {query: self.index.doc_terms(query) for query in self.cache},
                     'stats': self.stats
-                }, f, indent=2)
+                }, f, separators=(',', ':'))
+            os.replace(tmp, self.cache_file)
+            # Buffered ops are part of the snapshot now
+            open(self.log_file, 'w').close()
+            self._pending_ops = []
+            self._log_ops = 0
         except Exception as e:
             logger.warning(f"Failed to save cache: {e}")
 
@@ -124,7 +206,9 @@ class ClassificationCache:
                 expired_keys.append(query)
 
         for key in expired_keys:
-            del self.cache[key]
+            self._type_counts[self.cache.pop(key)['query_type']] -= 1
+            self.index.remove(key)
+            self._log({'op': 'del', 'q': key})
 
         if expired_keys:
             logger.info(f"Removed {len(expired_keys)} expired cache entries")
@@ -136,20 +220,17 @@ class ClassificationCache:
         Returns:
             Cached classification if similar query found, else None
         """
-        if not self.cache or not self.query_texts:
+        if not self.cache:
             return None
 
         try:
-            # Compute similarity with all cached queries
-            query_vec = self.vectorizer.transform([query])
-            similarities = cosine_similarity(query_vec, self.query_vectors)[0]
-
-            # Find most similar
-            max_idx = int(np.argmax(similarities))
-            max_sim = float(similarities[max_idx])
+            # Only cached queries sharing a term with the query are scored
+            best = self.index.search(query, k=1)
+            if not best:
+                return None
+            similar_query, max_sim = best[0]
 
             if max_sim >= self.semantic_threshold:
-                similar_query = self.query_texts[max_idx]
                 cached = self.cache[similar_query]
 
                 logger.info(
@@ -198,6 +279,10 @@ class ClassificationCache:
                 # Increment use counter
                 cached['uses'] += 1
                 cached['last_used'] = datetime.utcnow().isoformat()
+                self._log({
+                    'op': 'touch', 'q': query,
+                    'uses': cached['uses'], 'last_used': cached['last_used']
+                })
 
                 return cached['query_type'], cached['confidence'], 'exact_cache'
 
@@ -230,6 +315,10 @@ class ClassificationCache:
         confidence = self._calculate_confidence(query, query_type, llm_used)
 
         # Store in cache
+        previous = self.cache.get(query)
+        if previous is not None:
+            self._type_counts[previous['query_type']] -= 1
+        self._type_counts[query_type] += 1
         self.cache[query] = {
             'query_type': query_type,
             'confidence': confidence,
@@ -240,13 +329,12 @@ class ClassificationCache:
             'llm_used': llm_used
         }
 
-        # Update TF-IDF index
-        self.query_texts.append(query)
-        if len(self.query_texts) > 1:
-            try:
-                self.query_vectors = self.vectorizer.fit_transform(self.query_texts)
-            except Exception as e:
-                logger.warning(f"Failed to update TF-IDF vectors: {e}")
+        # Update TF-IDF index (O(terms in the query))
+        self.index.add(query, query)
+        self._log({
+            'op': 'put', 'q': query,
+            'entry': self.cache[query], 'terms': self.index.doc_terms(query)
+        })
 
         # Enforce size limit (LRU eviction)
         if len(self.cache) > self.max_cache_size:
@@ -258,10 +346,6 @@ class ClassificationCache:
         else:
             self.stats['learned_patterns'] += 1
 
-        # Periodic save
-        if self.stats['total_queries'] % 10 == 0:
-            self._save_cache()
-
         logger.debug(
             "Cached classification",
             query=query[:50],
@@ -284,7 +368,7 @@ class ClassificationCache:
             return 0.95
 
         # For learned patterns, confidence based on consistency
-        type_count = sum(1 for entry in self.cache.values() if entry['query_type'] == query_type)
+        type_count = self._type_counts[query_type]
         total_count = len(self.cache) or 1
 
         # Confidence increases with more examples
@@ -301,14 +385,11 @@ class ClassificationCache:
 
         # Remove oldest 10%
         to_remove = max(1, len(sorted_entries) // 10)
-        for query, _ in sorted_entries[:to_remove]:
+        for query, entry in sorted_entries[:to_remove]:
             del self.cache[query]
-            if query in self.query_texts:
-                self.query_texts.remove(query)
-
-        # Rebuild TF-IDF
-        if self.query_texts:
-            self.query_vectors = self.vectorizer.fit_transform(self.query_texts)
+            self._type_counts[entry['query_type']] -= 1
+            self.index.remove(query)
+            self._log({'op': 'del', 'q': query})
 
         logger.info(f"Evicted {to_remove} LRU cache entries")
 
@@ -342,4 +423,5 @@ def get_classification_cache() -> ClassificationCache:
     global _classification_cache
     if _classification_cache is None:
         _classification_cache = ClassificationCache()
+        atexit.register(_classification_cache.close)
     return _classification_cache
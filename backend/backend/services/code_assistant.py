@@ -5,7 +5,6 @@ Self-healing code generation with automated testing.
 import os
 import time
 import tempfile
-import subprocess
 import logging
 import json
 import ast
@@ -22,6 +21,7 @@ from backend.models.code_schemas import (
 from backend.services.token_counter import get_token_counter, TokenUsage
 from backend.utils.openai import sanitize_messages
 from backend.services.unified_llm_metrics import get_unified_metrics
+from backend.services.code_executor import get_code_executor
 
 logger = logging.getLogger(__name__)
 
@@ -684,32 +684,32 @@ Please respond in JSON with the following keys:
             temp_file = f.name
 
         try:
-            # First, run the code directly to capture all print/log output
-            direct_run = subprocess.run(
-                ['python', temp_file],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            direct_output = direct_run.stdout
-
-            # Then run pytest with -s flag to show print output
-            result = subprocess.run(
-                ['python', '-m', 'pytest', temp_file, '-v', '-s'],
-                capture_output=True,
-                text=True,
-                timeout=20
+            # Direct run (captures all print/log output) and pytest -v -s, in one
+            # pre-warmed interpreter from the sandbox pool (never blocks the event loop)
+            run = await get_code_executor().run_python(
+                temp_file,
+                direct_timeout_s=5,
+                test_timeout_s=20,
             )
+            if run.timed_out:
+                return TestResult(
+                    passed=False,
+                    stdout="",
+                    stderr="Test execution timed out (>20s)",
+                    exit_code=124,
+                    execution_time_ms=(time.time() - start_time) * 1000
+                )
 
+            direct_output = run.program_output
             execution_time_ms = (time.time() - start_time) * 1000
 
             # Combine direct output with test output
             combined_stdout = ""
             if direct_output.strip():
                 combined_stdout += "=== Program Output ===\n" + direct_output + "\n\n"
-            combined_stdout += "=== Test Results ===\n" + result.stdout
+            combined_stdout += "=== Test Results ===\n" + run.stdout
             samples = None
-            if include_samples and result.returncode == 0:
+            if include_samples and run.returncode == 0:
                 samples = self._generate_assertion_samples(code)
                 if samples:
                     combined_stdout += "\n=== Sample Evaluations ===\n"
@@ -723,22 +723,14 @@ Please respond in JSON with the following keys:
                         combined_stdout += "\n"
 
             return TestResult(
-                passed=(result.returncode == 0),
+                passed=(run.returncode == 0),
                 stdout=combined_stdout,
-                stderr=result.stderr,
-                exit_code=result.returncode,
+                stderr=run.stderr,
+                exit_code=run.returncode,
                 execution_time_ms=execution_time_ms,
                 samples=samples,
             )
 
-        except subprocess.TimeoutExpired:
-            return TestResult(
-                passed=False,
-                stdout="",
-                stderr="Test execution timed out (>20s)",
-                exit_code=124,
-                execution_time_ms=(time.time() - start_time) * 1000
-            )
         finally:
             # Cleanup
             try:
@@ -925,13 +917,20 @@ edition = "2021"
 
             try:
                 # Run cargo test
-                result = subprocess.run(
+                result = await get_code_executor().run(
                     ['cargo', 'test'],
+                    language="rust",
+                    timeout_s=30,
                     cwd=tmpdir,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
                 )
+                if result.timed_out:
+                    return TestResult(
+                        passed=False,
+                        stdout="",
+                        stderr="Cargo test timed out (>30s)",
+                        exit_code=124,
+                        execution_time_ms=(time.time() - start_time) * 1000
+                    )
 
                 execution_time_ms = (time.time() - start_time) * 1000
 
@@ -943,14 +942,6 @@ edition = "2021"
                     execution_time_ms=execution_time_ms
                 )
 
-            except subprocess.TimeoutExpired:
-                return TestResult(
-                    passed=False,
-                    stdout="",
-                    stderr="Cargo test timed out (>30s)",
-                    exit_code=124,
-                    execution_time_ms=(time.time() - start_time) * 1000
-                )
             except FileNotFoundError:
                 return TestResult(
                     passed=False,
@@ -978,12 +969,19 @@ edition = "2021"
             os.chmod(temp_file, 0o755)
 
             # Run the bash script directly
-            direct_run = subprocess.run(
+            direct_run = await get_code_executor().run(
                 ['bash', temp_file],
-                capture_output=True,
-                text=True,
-                timeout=20
+                language="bash",
+                timeout_s=20,
             )
+            if direct_run.timed_out:
+                return TestResult(
+                    passed=False,
+                    stdout="",
+                    stderr="Bash script timed out (>20s)",
+                    exit_code=124,
+                    execution_time_ms=(time.time() - start_time) * 1000
+                )
 
             execution_time_ms = (time.time() - start_time) * 1000
 
@@ -996,14 +994,6 @@ edition = "2021"
                 execution_time_ms=execution_time_ms
             )
 
-        except subprocess.TimeoutExpired:
-            return TestResult(
-                passed=False,
-                stdout="",
-                stderr="Bash script timed out (>10s)",
-                exit_code=124,
-                execution_time_ms=(time.time() - start_time) * 1000
-            )
         finally:
             # Cleanup
             try:
@@ -0,0 +1,312 @@
+"""
+Non-blocking sandboxed test execution for the code assistant.
+
+Generated code runs in child processes started with asyncio subprocesses, so
+a test run never blocks the event loop. At most max_workers runs execute at
+once; the rest wait in a queue (depth and wait time are exported to
+/metrics).
+
+Python runs use pre-warmed interpreters: a few idle processes have already
+started Python and imported pytest, and block waiting for a job on stdin. A
+job runs the file directly (capturing program output, with its own timeout)
+and then runs pytest on it, all in the same process. Each process handles
+exactly one job and is replaced in the background, so runs stay isolated.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from backend.services.metrics import (
+    code_executor_active_runs_gauge,
+    code_executor_queue_depth_gauge,
+    code_executor_queue_wait_histogram,
+    code_executor_run_duration_histogram,
+)
+
+logger = logging.getLogger(__name__)
+
+# Exit code for a run killed by a timeout (same as coreutils `timeout`)
+TIMEOUT_EXIT_CODE = 124
+
+# Runs inside a pre-warmed interpreter. Reads one job line from stdin:
+# {"path": ..., "marker": ..., "direct_timeout": seconds}
+_PYTHON_RUNNER = r'''
+import json, os, runpy, signal, sys
+import pytest
+
+job = json.loads(sys.stdin.readline())
+devnull = os.open(os.devnull, os.O_RDONLY)
+os.dup2(devnull, 0)
+sys.stdin = open(os.devnull)
+path, marker = job["path"], job["marker"]
+
+
+class _DirectTimeout(BaseException):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise _DirectTimeout()
+
+
+sys.argv = [path]
+sys.path.insert(0, os.path.dirname(path))
+signal.signal(signal.SIGALRM, _on_alarm)
+signal.setitimer(signal.ITIMER_REAL, job["direct_timeout"])
+try:
+    runpy.run_path(path, run_name="__main__")
+except _DirectTimeout:
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(124)
+except BaseException:
+    pass
+finally:
+    signal.setitimer(signal.ITIMER_REAL, 0)
+
+for stream in (sys.stdout, sys.stderr):
+    stream.flush()
+    stream.write(marker + "\n")
+    stream.flush()
+sys.argv = ["pytest"]
+code = pytest.main([path, "-v", "-s"])
+sys.stdout.flush()
+sys.stderr.flush()
+os._exit(int(code))
+'''
+
+
+@dataclass
+class ExecResult:
+    """Outcome of one sandboxed run."""
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool
+    duration_ms: float
+    # Python runs only: output of the direct (non-pytest) execution
+    program_output: str = ""
+
+
+class CodeExecutor:
+    """Bounded pool of sandboxed subprocess runs with pre-warmed Python workers."""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        warm_pool_size: int = 2,
+        python_executable: str = sys.executable
+    ):
+        self.max_workers = max(1, max_workers)
+        self.warm_pool_size = max(0, warm_pool_size)
+        self.python_executable = python_executable
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._idle: List[asyncio.subprocess.Process] = []
+        self._refill_task: Optional[asyncio.Task] = None
+        self._waiting = 0
+        self.stats = {"runs": 0, "timeouts": 0, "warm_hits": 0, "cold_starts": 0}
+
+    # ------------------------------------------------------------------
+    # Pool plumbing
+    # ------------------------------------------------------------------
+    def _bind_loop(self) -> None:
+        """Semaphores and subprocess transports belong to one event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        self._idle = []  # processes of a closed loop cannot be used here
+        self._refill_task = None
+
+    async def _spawn_python_worker(self) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            self.python_executable, "-c", _PYTHON_RUNNER,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+    async def _refill(self) -> None:
+        while len(self._idle) < self.warm_pool_size:
+            try:
+                self._idle.append(await self._spawn_python_worker())
+            except Exception as exc:
+                logger.warning("Failed to pre-warm Python worker: %s", exc)
+                return
+
+    def _schedule_refill(self) -> None:
+        if self.warm_pool_size and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.get_running_loop().create_task(self._refill())
+
+    async def _take_python_worker(self) -> asyncio.subprocess.Process:
+        while self._idle:
+            proc = self._idle.pop(0)
+            if proc.returncode is None:
+                self.stats["warm_hits"] += 1
+                self._schedule_refill()
+                return proc
+        self.stats["cold_starts"] += 1
+        self._schedule_refill()
+        return await self._spawn_python_worker()
+
+    async def warm_up(self) -> None:
+        """Start the pre-warmed Python workers ahead of the first request."""
+        self._bind_loop()
+        await self._refill()
+
+    async def close(self) -> None:
+        """Terminate idle pre-warmed workers."""
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            self._refill_task = None
+        idle, self._idle = self._idle, []
+        for proc in idle:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+    async def _acquire(self) -> float:
+        self._bind_loop()
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        code_executor_queue_depth_gauge.set(self._waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+            code_executor_queue_depth_gauge.set(self._waiting)
+        code_executor_queue_wait_histogram.observe(time.perf_counter() - queued_at)
+        code_executor_active_runs_gauge.inc()
+        return time.perf_counter()
+
+    def _release(self, language: str, started: float, result: Optional[ExecResult]) -> None:
+        self._semaphore.release()
+        code_executor_active_runs_gauge.dec()
+        if result is None:
+            outcome = "error"
+        elif result.timed_out:
+            outcome = "timeout"
+        else:
+            outcome = "passed" if result.returncode == 0 else "failed"
+        code_executor_run_duration_histogram.labels(language=language, outcome=outcome).observe(
+            time.perf_counter() - started
+        )
+        self.stats["runs"] += 1
+        if outcome == "timeout":
+            self.stats["timeouts"] += 1
+
+    @staticmethod
+    async def _communicate(
+        proc: asyncio.subprocess.Process,
+        timeout_s: float,
+        stdin: Optional[bytes] = None
+    ):
+        """Return (returncode, stdout, stderr, timed_out); kills the process on timeout."""
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(stdin), timeout=timeout_s)
+            return proc.returncode, stdout, stderr, False
+        except asyncio.TimeoutError:
+            proc.kill()
+            stdout, stderr = await proc.communicate()
+            return TIMEOUT_EXIT_CODE, stdout, stderr, True
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+    async def run(
+        self,
+        cmd: Sequence[str],
+        *,
+        language: str,
+        timeout_s: float,
+        cwd: Optional[str] = None
+    ) -> ExecResult:
+        """Run a command in a pool slot. FileNotFoundError propagates for missing tools."""
+        started = await self._acquire()
+        result: Optional[ExecResult] = None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            returncode, stdout, stderr, timed_out = await self._communicate(proc, timeout_s)
+            result = ExecResult(
+                returncode=returncode,
+                stdout=stdout.decode(errors="replace"),
+                stderr=stderr.decode(errors="replace"),
+                timed_out=timed_out,
+                duration_ms=(time.perf_counter() - started) * 1000,
+            )
+            return result
+        finally:
+            self._release(language, started, result)
+
+    async def run_python(
+        self,
+        path: str,
+        *,
+        direct_timeout_s: float = 5.0,
+        test_timeout_s: float = 20.0
+    ) -> ExecResult:
+        """
+        Run a Python file directly, then under pytest, in one pre-warmed interpreter.
+
+        stdout/stderr are pytest's; the direct run's stdout is in program_output.
+        A direct run exceeding direct_timeout_s counts as a timeout.
+        """
+        started = await self._acquire()
+        result: Optional[ExecResult] = None
+        try:
+            marker = f"=== code-executor {uuid.uuid4().hex} ==="
+            job = json.dumps({"path": path, "marker": marker, "direct_timeout": direct_timeout_s})
+            proc = await self._take_python_worker()
+            returncode, stdout_b, stderr_b, timed_out = await self._communicate(
+                proc, direct_timeout_s + test_timeout_s, stdin=(job + "\n").encode()
+            )
+            timed_out = timed_out or returncode == TIMEOUT_EXIT_CODE
+
+            stdout = stdout_b.decode(errors="replace")
+            stderr = stderr_b.decode(errors="replace")
+            # Before the marker: direct run; after it: pytest (no marker: died before pytest)
+            program_output, _, test_stdout = stdout.partition(marker + "\n")
+            _, found, test_stderr = stderr.partition(marker + "\n")
+            result = ExecResult(
+                returncode=returncode,
+                stdout=test_stdout,
+                stderr=test_stderr if found else stderr,
+                timed_out=timed_out,
+                duration_ms=(time.perf_counter() - started) * 1000,
+                program_output=program_output,
+            )
+            return result
+        finally:
+            self._release("python", started, result)
+
+
+_code_executor: Optional[CodeExecutor] = None
+
+
+def get_code_executor() -> CodeExecutor:
+    """Get the process-wide sandboxed test executor."""
+    global _code_executor
+    if _code_executor is None:
+        _code_executor = CodeExecutor(
+            max_workers=int(os.getenv("CODE_EXECUTOR_MAX_WORKERS", "4")),
+            warm_pool_size=int(os.getenv("CODE_EXECUTOR_WARM_WORKERS", "2")),
+        )
+    return _code_executor
@@ -1,13 +1,21 @@
 """
 Code Generation Experience Memory
 Stores and retrieves historical code generation experiences
+
+Experiences are kept in an append-only JSONL log that is read once and then
+tailed (appends by this or another process are picked up incrementally).
+Records are indexed in memory by signature: signatures are categorical, so
+records with the same signature and outcome share one similarity
+computation and a lookup costs O(distinct signatures), not O(history).
+The per-cluster bandits are rebuilt from the log, so they survive restarts.
 """
 from __future__ import annotations
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, astuple, field
 from typing import Dict, Any, List, Optional
 import json
 import pathlib
 import heapq
+import threading
 
 from .signature import CodeGenSignature, signature_sim
 from .bandit import Bandit
@@ -21,69 +29,117 @@ class Experience:
     reward: float
 
 
+@dataclass
+class _SignatureGroup:
+    """Records with identical signature and failure flag (oldest first)."""
+    signature: CodeGenSignature
+    failed: bool
+    ids: List[int] = field(default_factory=list)
+
+
 class ExperienceMemory:
     def __init__(self, path: str):
         self.path = pathlib.Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.bandits = {}  # cluster_id -> Bandit
+        self._records: List[Dict[str, Any]] = []
+        self._groups: Dict[tuple, _SignatureGroup] = {}
+        self._offset = 0  # bytes of the log already indexed
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
 
     def append(self, exp: Experience):
-        with self.path.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(asdict(exp), ensure_ascii=False) + "\n")
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(asdict(exp), ensure_ascii=False) + "\n")
+            self._refresh()
 
-    def _iter(self):
+    def _refresh(self):
+        """Index records appended to the log since the last read."""
         if not self.path.exists():
             return
-        with self.path.open("r", encoding="utf-8") as fh:
-            for line in fh:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    yield json.loads(line)
-                except Exception:
-                    continue
-
-    def nearest(self, sig: CodeGenSignature, k: int = 8) -> List[Dict[str, Any]]:
-        """Find k nearest historical experiences, with failure pattern downweighting."""
-        heap = []
-        idx = 0
-        for rec in self._iter() or []:
+        size = self.path.stat().st_size
+        if size < self._offset:
+            # Log was truncated or replaced: rebuild from scratch
+            self.bandits = {}
+            self._records = []
+            self._groups = {}
+            self._offset = 0
+        if size == self._offset:
+            return
+        with self.path.open("rb") as fh:
+            fh.seek(self._offset)
+            data = fh.read(size - self._offset)
+        end = data.rfind(b"\n") + 1  # a partially written last line is read next time
+        self._offset += end
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
             try:
-                ss = CodeGenSignature.from_dict(rec["signature"])
+                self._index(json.loads(line))
             except Exception:
                 continue
-            sim = signature_sim(sig, ss)
-
-            # Downweight failed cases with similar failure patterns
-            if rec.get("outcome", {}).get("success") == False:
-                # If both have failure patterns and they're similar, heavily downweight
-                sig_pattern = sig.failure_pattern or ""
-                ss_pattern = ss.failure_pattern or ""
-
-                if sig_pattern and ss_pattern:
-                    # Check if failure patterns overlap (e.g. both have "syntax_error")
-                    sig_errors = set(sig_pattern.split("+"))
-                    ss_errors = set(ss_pattern.split("+"))
-                    overlap = len(sig_errors & ss_errors)
-
-                    if overlap > 0:
-                        # Similar failure pattern - downweight by 70%
-                        sim *= 0.3
-                    else:
-                        # Different failure type - downweight by 40%
-                        sim *= 0.6
+
+    def _index(self, rec: Dict[str, Any]):
+        ss = CodeGenSignature.from_dict(rec["signature"])
+        failed = rec.get("outcome", {}).get("success") == False
+        key = (astuple(ss), failed)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _SignatureGroup(ss, failed)
+        group.ids.append(len(self._records))
+        self._records.append(rec)
+
+        # Replay the outcome into the cluster's bandit (same update as update_outcome)
+        b = self.bandits.setdefault(self._cluster_key(ss), Bandit())
+        b.update(
+            json.dumps(rec.get("strategy"), sort_keys=True),
+            success=bool(rec.get("outcome", {}).get("success")),
+            reward=rec.get("reward"),
+        )
+
+    def _weighted_sim(self, sig: CodeGenSignature, group: _SignatureGroup) -> float:
+        sim = signature_sim(sig, group.signature)
+
+        # Downweight failed cases with similar failure patterns
+        if group.failed:
+            # If both have failure patterns and they're similar, heavily downweight
+            sig_pattern = sig.failure_pattern or ""
+            ss_pattern = group.signature.failure_pattern or ""
+
+            if sig_pattern and ss_pattern:
+                # Check if failure patterns overlap (e.g. both have "syntax_error")
+                sig_errors = set(sig_pattern.split("+"))
+                ss_errors = set(ss_pattern.split("+"))
+                overlap = len(sig_errors & ss_errors)
+
+                if overlap > 0:
+                    # Similar failure pattern - downweight by 70%
+                    sim *= 0.3
                 else:
-                    # Generic failure without pattern - downweight by 50%
-                    sim *= 0.5
+                    # Different failure type - downweight by 40%
+                    sim *= 0.6
+            else:
+                # Generic failure without pattern - downweight by 50%
+                sim *= 0.5
+        return sim
 
-            # Add index as tiebreaker to avoid comparing dicts when sim values are equal
-            heapq.heappush(heap, (sim, idx, rec))
-            idx += 1
-            if len(heap) > k:
-                heapq.heappop(heap)
-        out = sorted(heap, key=lambda x: -x[0])
-        return [{"sim": s, **r} for s, i, r in out]
+    def nearest(self, sig: CodeGenSignature, k: int = 8) -> List[Dict[str, Any]]:
+        """Find k nearest historical experiences, with failure pattern downweighting."""
+        if k <= 0:
+            return []
+        with self._lock:
+            self._refresh()
+            # One similarity per distinct signature; only the newest k of each group can make the top k
+            candidates = []
+            for group in self._groups.values():
+                sim = self._weighted_sim(sig, group)
+                candidates.extend((sim, idx) for idx in group.ids[-k:])
+            # Ties go to the most recent experience
+            top = heapq.nlargest(k, candidates)
+            return [{"sim": s, **self._records[i]} for s, i in top]
 
     def choose_strategy(self, sig: CodeGenSignature, candidate_strategies: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -127,9 +183,7 @@ class ExperienceMemory:
 
     def update_outcome(self, sig: CodeGenSignature, strategy: Dict[str, Any], success: bool, reward: float):
         exp = Experience(signature=sig.to_dict(), strategy=strategy, outcome={"success": success}, reward=reward)
-        self.append(exp)
-        b = self.bandits.setdefault(self._cluster_key(sig), Bandit())
-        b.update(json.dumps(strategy, sort_keys=True), success=success, reward=reward)
+        self.append(exp)  # indexing the appended record also updates the cluster's bandit
 
     def _cluster_key(self, sig: CodeGenSignature) -> str:
         """
@@ -0,0 +1,127 @@
+"""
+Fixed-capacity, column-wise ring buffer for in-memory metric histories.
+
+Each column is a NumPy array preallocated to the capacity; appending a row
+writes one slot per column and advances the head, overwriting the oldest
+row once the ring is full. Aggregates run directly on the live region of
+each column (order does not matter for sums and means), and chronological
+windows are at most two slices of it, so neither needs a Python object per
+row.
+
+String columns (model names, endpoints) are stored as int32 codes into a
+per-column vocabulary; ``labels()`` maps codes back to strings.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class ColumnRing:
+    """Ring of rows stored as one preallocated NumPy array per column."""
+
+    def __init__(self, capacity: int, columns: Dict[str, Any]):
+        """
+        Args:
+            capacity: Maximum number of rows kept; older rows are overwritten
+            columns: Column name -> NumPy dtype, ``str`` for categorical
+                columns, or ``object`` for references kept alongside the metrics
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._head = 0  # next slot to write
+        self._size = 0
+        self._columns: Dict[str, np.ndarray] = {}
+        self._fill: Dict[str, Any] = {}
+        self._categories: Dict[str, List[str]] = {}
+        self._codes: Dict[str, Dict[str, int]] = {}
+        for name, dtype in columns.items():
+            self.add_column(name, dtype)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def add_column(self, name: str, dtype: Any, fill: Any = None) -> None:
+        """Add a column; rows already in the ring get ``fill`` (NaN/0/None by dtype)."""
+        if name in self._columns:
+            return
+        if dtype is str:
+            self._categories[name] = []
+            self._codes[name] = {}
+            dtype, fill = np.int32, -1
+        elif fill is None:
+            kind = np.dtype(dtype).kind
+            fill = np.nan if kind == "f" else None if kind == "O" else 0
+        self._columns[name] = np.full(self.capacity, fill, dtype=dtype)
+        self._fill[name] = fill
+
+    def append(self, **values: Any) -> None:
+        """Write one row in O(1); columns not given get their fill value."""
+        head = self._head
+        for name, array in self._columns.items():
+            value = values.get(name, self._fill[name])
+            if name in self._codes and value != -1:
+                value = self._code(name, value)
+            array[head] = value
+        self._head = (head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def clear(self) -> None:
+        for array in self._columns.values():
+            if array.dtype == object:
+                array.fill(None)  # drop the references
+        self._head = 0
+        self._size = 0
+
+    def _code(self, name: str, value: str) -> int:
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._categories[name])
+            self._categories[name].append(value)
+        return code
+
+    def code(self, name: str, value: str) -> int:
+        """Code of ``value`` in a categorical column, or -1 if never seen."""
+        return self._codes[name].get(value, -1)
+
+    def labels(self, name: str, codes: np.ndarray) -> np.ndarray:
+        """Object array of the strings for ``codes`` (the vocabulary's own str objects)."""
+        vocabulary = np.array(self._categories[name] + [None], dtype=object)
+        return vocabulary[codes]  # -1 (missing) picks the trailing None
+
+    def column(self, name: str) -> np.ndarray:
+        """Live rows of a column in storage order (a view; use for aggregates)."""
+        return self._columns[name][:self._size]
+
+    def _slices(self, start: int, stop: int) -> List[slice]:
+        # Chronological positions (0 = oldest live row) -> storage slices
+        oldest = self._head if self._size == self.capacity else 0
+        begin, end = oldest + start, oldest + stop
+        if end <= self.capacity:
+            return [slice(begin, end)]
+        if begin >= self.capacity:
+            return [slice(begin - self.capacity, end - self.capacity)]
+        return [slice(begin, self.capacity), slice(0, end - self.capacity)]
+
+    def window(self, name: str, start: Optional[int] = None, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Rows ``[start:stop]`` of a column in chronological order, with list
+        slicing semantics (negative indices count back from the newest row).
+        A view when the window does not wrap around the end of the storage.
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        array = self._columns[name]
+        if stop <= start:
+            return array[:0]
+        parts = [array[s] for s in self._slices(start, stop)]
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
@@ -9,10 +9,13 @@ Tracks data distribution and drift for:
 """
 
 import logging
-from typing import Optional, Dict, List, Any
-from datetime import datetime, timedelta
-from dataclasses import dataclass, field
-import json
+import time
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+import numpy as np
+
+from backend.services.column_ring import ColumnRing
 
 logger = logging.getLogger(__name__)
 
@@ -34,20 +37,20 @@ except ImportError as e:
     pd = None
 
 
-@dataclass
-class InteractionData:
-    """Data for a single interaction (chat, RAG, agent, etc.)"""
-    timestamp: datetime
-    interaction_type: str  # "chat", "rag", "agent", "code"
-    query_length: int
-    response_length: int
-    total_tokens: int
-    prompt_tokens: int
-    completion_tokens: int
-    duration_ms: float
-    success: bool
-    model: str
-    metadata: Dict[str, Any] = field(default_factory=dict)
+# Per-interaction columns; numeric metadata keys become extra float columns
+INTERACTION_COLUMNS = {
+    "timestamp": np.float64,  # epoch seconds (UTC)
+    "query_length": np.int64,
+    "response_length": np.int64,
+    "total_tokens": np.int64,
+    "prompt_tokens": np.int64,
+    "completion_tokens": np.int64,
+    "duration_ms": np.float64,
+    "success": np.bool_,
+    "model": str,
+}
+INTERACTION_TYPES = ("chat", "rag", "agent", "code")
+MAX_METADATA_COLUMNS = 32  # per interaction type; further keys are not tracked
 
 
 class DataMonitor:
@@ -77,11 +80,53 @@ class DataMonitor:
         self.current_window_size = current_window_size
         self.max_history_size = max_history_size
 
-        # Separate histories for different interaction types
-        self.chat_history: List[InteractionData] = []
-        self.rag_history: List[InteractionData] = []
-        self.agent_history: List[InteractionData] = []
-        self.code_history: List[InteractionData] = []
+        # Separate column rings for different interaction types
+        self._histories: Dict[str, ColumnRing] = {
+            interaction_type: ColumnRing(max_history_size, INTERACTION_COLUMNS)
+            for interaction_type in INTERACTION_TYPES
+        }
+        self.chat_history = self._histories["chat"]
+        self.rag_history = self._histories["rag"]
+        self.agent_history = self._histories["agent"]
+        self.code_history = self._histories["code"]
+
+    def _log(
+        self,
+        interaction_type: str,
+        query_length: int,
+        response_length: int,
+        total_tokens: int,
+        prompt_tokens: int,
+        completion_tokens: int,
+        duration_ms: float,
+        success: bool,
+        model: str,
+        metadata: Dict[str, Any],
+    ):
+        """Append one interaction to its ring (O(1); the oldest is overwritten when full)."""
+        history = self._histories[interaction_type]
+        extra = {}
+        for key, value in metadata.items():
+            if not isinstance(value, (int, float, bool)) or key in INTERACTION_COLUMNS:
+                continue
+            if key not in history:
+                if len(history.columns) - len(INTERACTION_COLUMNS) >= MAX_METADATA_COLUMNS:
+                    continue
+                history.add_column(key, np.float64)
+            extra[key] = value
+
+        history.append(
+            timestamp=time.time(),
+            query_length=query_length,
+            response_length=response_length,
+            total_tokens=total_tokens,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            duration_ms=duration_ms,
+            success=success,
+            model=model,
+            **extra,
+        )
 
     def log_chat_interaction(
         self,
@@ -96,9 +141,8 @@ class DataMonitor:
         metadata: Optional[Dict[str, Any]] = None,
     ):
         """Log a chat interaction."""
-        data = InteractionData(
-            timestamp=datetime.utcnow(),
-            interaction_type="chat",
+        self._log(
+            "chat",
             query_length=len(query),
             response_length=len(response),
             total_tokens=total_tokens,
@@ -110,9 +154,6 @@ class DataMonitor:
             metadata=metadata or {},
         )
 
-        self.chat_history.append(data)
-        self._trim_history(self.chat_history)
-
     def log_rag_query(
         self,
         query: str,
@@ -134,9 +175,8 @@ class DataMonitor:
             "avg_retrieval_score": avg_score,
         })
 
-        data = InteractionData(
-            timestamp=datetime.utcnow(),
-            interaction_type="rag",
+        self._log(
+            "rag",
             query_length=len(query),
             response_length=len(answer),
             total_tokens=total_tokens,
@@ -148,9 +188,6 @@ class DataMonitor:
             metadata=metadata,
         )
 
-        self.rag_history.append(data)
-        self._trim_history(self.rag_history)
-
     def log_agent_plan(
         self,
         query: str,
@@ -172,9 +209,8 @@ class DataMonitor:
             "num_tool_calls": num_tool_calls,
         })
 
-        data = InteractionData(
-            timestamp=datetime.utcnow(),
-            interaction_type="agent",
+        self._log(
+            "agent",
             query_length=len(query),
             response_length=len(plan),
             total_tokens=total_tokens,
@@ -186,9 +222,6 @@ class DataMonitor:
             metadata=metadata,
         )
 
-        self.agent_history.append(data)
-        self._trim_history(self.agent_history)
-
     def log_code_generation(
         self,
         prompt: str,
@@ -210,9 +243,8 @@ class DataMonitor:
             "num_retries": num_retries,
         })
 
-        data = InteractionData(
-            timestamp=datetime.utcnow(),
-            interaction_type="code",
+        self._log(
+            "code",
             query_length=len(prompt),
             response_length=len(generated_code),
             total_tokens=total_tokens,
@@ -224,40 +256,32 @@ class DataMonitor:
             metadata=metadata,
         )
 
-        self.code_history.append(data)
-        self._trim_history(self.code_history)
-
-    def _trim_history(self, history: List[InteractionData]):
-        """Keep history size under max limit."""
-        if len(history) > self.max_history_size:
-            history[:] = history[-self.max_history_size:]
-
-    def _to_dataframe(self, history: List[InteractionData]) -> Optional[Any]:
-        """Convert interaction history to pandas DataFrame."""
-        if not EVIDENTLY_AVAILABLE or not history:
+    def _to_dataframe(
+        self,
+        history: ColumnRing,
+        interaction_type: str,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+    ) -> Optional[Any]:
+        """Build a pandas DataFrame for rows [start:stop] of a ring, column by column."""
+        if not EVIDENTLY_AVAILABLE or not len(history):
             return None
 
-        data = []
-        for interaction in history:
-            row = {
-                "timestamp": interaction.timestamp,
-                "interaction_type": interaction.interaction_type,
-                "query_length": interaction.query_length,
-                "response_length": interaction.response_length,
-                "total_tokens": interaction.total_tokens,
-                "prompt_tokens": interaction.prompt_tokens,
-                "completion_tokens": interaction.completion_tokens,
-                "duration_ms": interaction.duration_ms,
-                "success": interaction.success,
-                "model": interaction.model,
-            }
-            # Add metadata fields
-            for key, value in interaction.metadata.items():
-                if isinstance(value, (int, float, bool)):
-                    row[key] = value
-            data.append(row)
-
-        return pd.DataFrame(data)
+        frame = {
+            "timestamp": pd.to_datetime(history.window("timestamp", start, stop), unit="s"),
+            "interaction_type": interaction_type,
+        }
+        for name in history.columns:
+            if name == "timestamp":
+                continue
+            values = history.window(name, start, stop)
+            if name == "model":
+                values = history.labels(name, values)
+            elif name not in INTERACTION_COLUMNS and np.isnan(values).all():
+                continue  # metadata key not seen in this window
+            frame[name] = values
+
+        return pd.DataFrame(frame)
 
     def generate_drift_report(
         self,
@@ -281,16 +305,9 @@ class DataMonitor:
             return None
 
         # Select appropriate history
-        history_map = {
-            "chat": self.chat_history,
-            "rag": self.rag_history,
-            "agent": self.agent_history,
-            "code": self.code_history,
-        }
+        history = self._histories.get(interaction_type, self.chat_history)
 
-        history = history_map.get(interaction_type, self.chat_history)
-
-        if not history:
+        if not len(history):
             logger.warning(f"No history available for {interaction_type}")
             return None
 
@@ -307,12 +324,13 @@ class DataMonitor:
             return None
 
         # Split into reference and current windows
-        reference_data = history[-(reference_window + current_window):-current_window]
-        current_data = history[-current_window:]
+        reference_start, current_start = -(reference_window + current_window), -current_window
+        reference_ts = history.window("timestamp", reference_start, current_start)
+        current_ts = history.window("timestamp", current_start)
 
         # Convert to DataFrames
-        reference_df = self._to_dataframe(reference_data)
-        current_df = self._to_dataframe(current_data)
+        reference_df = self._to_dataframe(history, interaction_type, reference_start, current_start)
+        current_df = self._to_dataframe(history, interaction_type, current_start)
 
         if reference_df is None or current_df is None:
             return None
@@ -336,15 +354,15 @@ class DataMonitor:
             # Add metadata
             report_dict["metadata"] = {
                 "interaction_type": interaction_type,
-                "reference_window_size": len(reference_data),
-                "current_window_size": len(current_data),
+                "reference_window_size": len(reference_ts),
+                "current_window_size": len(current_ts),
                 "reference_period": {
-                    "start": reference_data[0].timestamp.isoformat(),
-                    "end": reference_data[-1].timestamp.isoformat(),
+                    "start": datetime.utcfromtimestamp(reference_ts[0]).isoformat(),
+                    "end": datetime.utcfromtimestamp(reference_ts[-1]).isoformat(),
                 },
                 "current_period": {
-                    "start": current_data[0].timestamp.isoformat(),
-                    "end": current_data[-1].timestamp.isoformat(),
+                    "start": datetime.utcfromtimestamp(current_ts[0]).isoformat(),
+                    "end": datetime.utcfromtimestamp(current_ts[-1]).isoformat(),
                 },
                 "generated_at": datetime.utcnow().isoformat(),
             }
@@ -370,39 +388,41 @@ class DataMonitor:
         Returns:
             Summary statistics dictionary
         """
-        history_map = {
-            "chat": self.chat_history,
-            "rag": self.rag_history,
-            "agent": self.agent_history,
-            "code": self.code_history,
-        }
+        history = self._histories.get(interaction_type, self.chat_history)
 
-        history = history_map.get(interaction_type, self.chat_history)
-
-        if not history:
+        if not len(history):
             return {"total_interactions": 0}
 
-        # Filter by time window
-        filtered_history = history
+        # Aggregate over the live rows in storage order, masked to the time window
+        success = history.column("success")
+        mask = None
         if time_window_hours:
-            cutoff = datetime.utcnow() - timedelta(hours=time_window_hours)
-            filtered_history = [h for h in history if h.timestamp > cutoff]
+            cutoff = time.time() - time_window_hours * 3600
+            mask = history.column("timestamp") > cutoff
+            success = success[mask]
 
-        if not filtered_history:
+        total = len(success)
+        if not total:
             return {"total_interactions": 0}
 
-        total = len(filtered_history)
-        successful = sum(1 for h in filtered_history if h.success)
+        def mean(name: str) -> float:
+            values = history.column(name)
+            return float((values if mask is None else values[mask]).mean())
+
+        models = history.column("model")
+        if mask is not None:
+            models = models[mask]
+        successful = int(np.count_nonzero(success))
 
         return {
             "total_interactions": total,
             "successful_interactions": successful,
             "success_rate": successful / total,
-            "avg_query_length": sum(h.query_length for h in filtered_history) / total,
-            "avg_response_length": sum(h.response_length for h in filtered_history) / total,
-            "avg_total_tokens": sum(h.total_tokens for h in filtered_history) / total,
-            "avg_duration_ms": sum(h.duration_ms for h in filtered_history) / total,
-            "models_used": list(set(h.model for h in filtered_history)),
+            "avg_query_length": mean("query_length"),
+            "avg_response_length": mean("response_length"),
+            "avg_total_tokens": mean("total_tokens"),
+            "avg_duration_ms": mean("duration_ms"),
+            "models_used": history.labels("model", np.unique(models)).tolist(),
             "time_window_hours": time_window_hours or "all",
         }
 
@@ -0,0 +1,142 @@
+"""
+Process-wide LRU cache for query embeddings.
+
+A question is embedded by several components in one request (retrieval,
+answer cache, query-strategy cache, hybrid/graph/table RAG, file-level
+fallback). They all go through EmbeddingCache.embed(), keyed on
+(model, whitespace-normalized text), so each distinct question is embedded
+once per model. Memory is bounded by EMBEDDING_CACHE_MAX_MB.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from backend.services.metrics import (
+    embedding_cache_entries_gauge,
+    embedding_cache_lookups_counter,
+    embedding_cache_saved_seconds_counter,
+)
+
+logger = structlog.get_logger(__name__)
+
+# Approximate per-entry overhead beyond the vector itself (key, dict slot, ndarray header)
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace; case is kept because embedding models are case-sensitive."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of embeddings bounded by approximate bytes."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'saved_ms': 0.0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        key = (model, normalize_text(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                embedding_cache_lookups_counter.labels(result="miss").inc()
+                return None
+            self._entries.move_to_end(key)
+            vector, cost_ms = entry
+            self.stats['hits'] += 1
+            self.stats['saved_ms'] += cost_ms
+        embedding_cache_lookups_counter.labels(result="hit").inc()
+        embedding_cache_saved_seconds_counter.inc(cost_ms / 1000)
+        return vector
+
+    def put(self, model: str, text: str, vector, cost_ms: float = 0.0):
+        """Store a vector; cost_ms is what recomputing it would take (for saved-time stats)."""
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        key = (model, normalize_text(text))
+        size = vector.nbytes + _ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[0].nbytes + _ENTRY_OVERHEAD_BYTES
+            self._entries[key] = (vector, cost_ms)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes + _ENTRY_OVERHEAD_BYTES
+                self.stats['evictions'] += 1
+            entries = len(self._entries)
+        embedding_cache_entries_gauge.set(entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        embedding_cache_entries_gauge.set(0)
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    async def embed(
+        self,
+        model: str,
+        texts: List[str],
+        embed_fn: Callable[[List[str]], Awaitable[List[List[float]]]]
+    ) -> List[List[float]]:
+        """Embed texts, computing only the cache misses (in one embed_fn call)."""
+        results: List[Optional[List[float]]] = []
+        missing: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            cached = self.get(model, text)
+            if cached is None:
+                missing.setdefault(text, []).append(i)
+                results.append(None)
+            else:
+                results.append(cached.tolist())
+
+        if missing:
+            miss_texts = list(missing)
+            start = time.perf_counter()
+            vectors = await embed_fn(miss_texts)
+            cost_ms = (time.perf_counter() - start) * 1000 / len(miss_texts)
+            for text, vector in zip(miss_texts, vectors):
+                self.put(model, text, vector, cost_ms)
+                vector = list(vector) if not isinstance(vector, list) else vector
+                for i in missing[text]:
+                    results[i] = vector
+        return results
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        max_mb = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "64"))
+        _embedding_cache = EmbeddingCache(max_bytes=int(max_mb * 1024 * 1024))
+        logger.info("Embedding cache initialized", max_mb=max_mb)
+    return _embedding_cache
@@ -16,11 +16,11 @@ from backend.services.rag_pipeline import (
     _generate_answer_with_llm,
     RetrievedChunk,
 )
-from backend.services.hybrid_retriever import HybridRetriever
+from backend.services.hybrid_retriever import HybridRetriever, get_hybrid_retriever_registry
 from backend.services.query_cache import QueryStrategyCache, get_query_cache, initialize_query_cache
 from backend.services.query_classifier import QueryClassifier, get_query_classifier
-from backend.services.qdrant_client import get_qdrant_client
 from backend.services.answer_cache import MultiLayerAnswerCache, initialize_answer_cache
+from backend.services.cache_store import create_cache_store
 from backend.services.file_level_fallback import (
     FileLevelFallbackRetriever,
     get_file_level_retriever,
@@ -29,46 +29,118 @@ from backend.services.file_level_fallback import (
 logger = structlog.get_logger(__name__)
 
 # Global instances
-_hybrid_retriever: Optional[HybridRetriever] = None
 _query_cache: Optional[QueryStrategyCache] = None
 _query_classifier: Optional[QueryClassifier] = None
 _answer_cache: Optional[MultiLayerAnswerCache] = None
 _file_level_retriever: Optional[FileLevelFallbackRetriever] = None
+_cache_store = None
+_cache_store_initialized = False
 
 
-def _get_hybrid_retriever() -> Optional[HybridRetriever]:
-    """Get or create hybrid retriever instance"""
-    global _hybrid_retriever
+def _get_cache_store():
+    """Get the shared persistent cache store (None when CACHE_STORE_URL is unset)"""
+    global _cache_store, _cache_store_initialized
 
+    if not _cache_store_initialized:
+        _cache_store_initialized = True
+        url = os.getenv("CACHE_STORE_URL", "")
+        try:
+            _cache_store = create_cache_store(url)
+            if _cache_store is not None:
+                logger.info("Persistent cache store enabled", backend=type(_cache_store).__name__)
+        except Exception as e:
+            logger.error("Failed to initialize cache store, using in-process caches", error=str(e))
+            _cache_store = None
+
+    return _cache_store
+
+
+def _get_hybrid_retriever(collection_name: Optional[str] = None) -> Optional[HybridRetriever]:
+    """Get the shared hybrid retriever for a collection (built lazily, see registry)"""
     # Check if hybrid search is enabled
     if not os.getenv("ENABLE_HYBRID_SEARCH", "true").lower() == "true":
         return None
 
-    if _hybrid_retriever is None:
-        try:
-            qdrant_client = get_qdrant_client()
-            collection_name = settings.QDRANT_COLLECTION
-            alpha = float(os.getenv("HYBRID_ALPHA", "0.7"))
-
-            _hybrid_retriever = HybridRetriever(
-                qdrant_client=qdrant_client,
-                collection_name=collection_name,
-                alpha=alpha
-            )
+    try:
+        return get_hybrid_retriever_registry().retriever(collection_name or settings.QDRANT_COLLECTION)
+    except Exception as e:
+        logger.error("Failed to initialize hybrid retriever", error=str(e))
+        return None
 
-            logger.info("Hybrid retriever initialized", alpha=alpha)
-        except Exception as e:
-            logger.error("Failed to initialize hybrid retriever", error=str(e))
-            return None
 
-    return _hybrid_retriever
+async def _ensure_hybrid_retriever_ready(collection_name: Optional[str] = None):
+    """Ensure hybrid retriever is initialized"""
+    if _get_hybrid_retriever(collection_name) is not None:
+        await get_hybrid_retriever_registry().acquire(collection_name or settings.QDRANT_COLLECTION)
+
 
+async def hybrid_retrieve_chunks(
+    question: str,
+    hybrid_retriever: HybridRetriever,
+    *,
+    top_k: int,
+    vector_limit: Optional[int] = None,
+    reranker_override: Optional[str] = None
+) -> Tuple[List[RetrievedChunk], float, Dict[str, Any]]:
+    """
+    Hybrid (BM25 + vector) retrieval followed by cross-encoder reranking.
 
-async def _ensure_hybrid_retriever_ready():
-    """Ensure hybrid retriever is initialized"""
-    retriever = _get_hybrid_retriever()
-    if retriever and not retriever._initialized:
-        await retriever.initialize()
+    Returns:
+        (top_k reranked chunks, retrieval_ms, timings)
+    """
+    # Get query embedding first
+    from backend.services.rag_pipeline import _embed_query, _rerank
+    query_embedding = await _embed_query(question)
+
+    # Hybrid search
+    hybrid_start = time.perf_counter()
+    hybrid_results = await hybrid_retriever.hybrid_search(
+        query=question,
+        query_embedding=query_embedding,
+        top_k=vector_limit or 20
+    )
+    hybrid_ms = (time.perf_counter() - hybrid_start) * 1000
+
+    # Convert hybrid results to RetrievedChunk format
+    chunks_for_rerank = []
+    for result in hybrid_results:
+        payload = result.get('payload', {})
+        chunks_for_rerank.append(
+            RetrievedChunk(
+                content=payload.get('content', payload.get('text', '')),
+                source=payload.get('source', payload.get('title', 'Unknown')),
+                score=result['score'],
+                metadata={**payload.get('metadata', {}), 'point_id': result['id']}
+            )
+        )
+
+    # Rerank the hybrid results
+    rerank_start = time.perf_counter()
+    rerank_stage_timings: Dict[str, Any] = {}
+    reranked_chunks, rerank_ms, reranker_model, reranker_mode = await _rerank(
+        question=question,
+        chunks=chunks_for_rerank,
+        override_choice=reranker_override,
+        stage_timings=rerank_stage_timings
+    )
+    rerank_total_ms = (time.perf_counter() - rerank_start) * 1000
+
+    retrieval_ms = hybrid_ms + rerank_total_ms
+    timings = {
+        "hybrid_search_ms": hybrid_ms,
+        "rerank_ms": rerank_ms,
+        **rerank_stage_timings,
+        "total_retrieval_ms": retrieval_ms,
+        "reranker_model": reranker_model,
+        "reranker_mode": reranker_mode,
+        "vector_limit_used": vector_limit,
+        "hybrid_fusion": "enabled",
+        "bm25_weight": 1 - hybrid_retriever.alpha,
+        "vector_weight": hybrid_retriever.alpha
+    }
+
+    # Take top_k after reranking
+    return reranked_chunks[:top_k], retrieval_ms, timings
 
 
 def _get_query_cache() -> Optional[QueryStrategyCache]:
@@ -87,15 +159,13 @@ def _get_query_cache() -> Optional[QueryStrategyCache]:
             _query_cache = initialize_query_cache(
                 similarity_threshold=threshold,
                 max_cache_size=max_size,
-                ttl_hours=ttl_hours
+                ttl_hours=ttl_hours,
+                store=_get_cache_store()
             )
 
-            # Set embedder (use the same embedding function as RAG)
-            from backend.services.rag_pipeline import _embed_texts
-            async def embed_single(text: str) -> List[float]:
-                return (await _embed_texts([text]))[0]
-
-            _query_cache.set_embedder(embed_single)
+            # Set embedder (same cached query embedding as RAG)
+            from backend.services.rag_pipeline import _embed_query
+            _query_cache.set_embedder(_embed_query)
 
             logger.info("Query cache initialized", max_size=max_size, threshold=threshold)
         except Exception as e:
@@ -132,22 +202,20 @@ def _get_answer_cache() -> Optional[MultiLayerAnswerCache]:
             tfidf_threshold = float(os.getenv("ANSWER_CACHE_TFIDF_THRESHOLD", "0.30"))
             max_size = int(os.getenv("ANSWER_CACHE_MAX_SIZE", "1000"))
             ttl_hours = int(os.getenv("ANSWER_CACHE_TTL_HOURS", "72"))
+            index_backend = os.getenv("ANSWER_CACHE_INDEX_BACKEND", "flat")
 
             _answer_cache = initialize_answer_cache(
                 similarity_threshold=threshold,
                 tfidf_threshold=tfidf_threshold,
                 max_cache_size=max_size,
-                ttl_hours=ttl_hours
+                ttl_hours=ttl_hours,
+                index_backend=index_backend,
+                store=_get_cache_store()
             )
 
-            # Inject existing MiniLM embedding function (reuse current model)
-            from backend.services.rag_pipeline import _embed_texts
-
-            async def embed_single(text: str) -> List[float]:
-                """Wrapper to convert batch embedding to single"""
-                return (await _embed_texts([text]))[0]
-
-            _answer_cache.set_embedder(embed_single)
+            # Inject existing MiniLM embedding function (reuse current model and cache)
+            from backend.services.rag_pipeline import _embed_query
+            _answer_cache.set_embedder(_embed_query)
 
             logger.info(
                 "Answer cache initialized with MiniLM-L6",
@@ -400,58 +468,13 @@ async def answer_question_hybrid(
     if not file_level_retriever and hybrid_retriever:
         # Use hybrid retrieval
         try:
-            # Get query embedding first
-            from backend.services.rag_pipeline import _embed_texts
-            query_embedding = (await _embed_texts([question]))[0]
-
-            # Hybrid search
-            hybrid_start = time.perf_counter()
-            hybrid_results = await hybrid_retriever.hybrid_search(
-                query=question,
-                query_embedding=query_embedding,
-                top_k=vector_limit or 20
-            )
-            hybrid_ms = (time.perf_counter() - hybrid_start) * 1000
-
-            # Convert hybrid results to RetrievedChunk format
-            from backend.services.rag_pipeline import _rerank
-            chunks_for_rerank = []
-            for result in hybrid_results:
-                payload = result.get('payload', {})
-                chunks_for_rerank.append(
-                    RetrievedChunk(
-                        content=payload.get('content', payload.get('text', '')),
-                        source=payload.get('source', payload.get('title', 'Unknown')),
-                        score=result['score'],
-                        metadata=payload.get('metadata', {})
-                    )
-                )
-
-            # Rerank the hybrid results
-            rerank_start = time.perf_counter()
-            reranked_chunks, rerank_ms, reranker_model, reranker_mode = await _rerank(
-                question=question,
-                chunks=chunks_for_rerank,
-                override_choice=reranker_override
+            chunks, retrieval_ms, timings = await hybrid_retrieve_chunks(
+                question,
+                hybrid_retriever,
+                top_k=top_k,
+                vector_limit=vector_limit,
+                reranker_override=reranker_override
             )
-            rerank_total_ms = (time.perf_counter() - rerank_start) * 1000
-
-            # Take top_k after reranking
-            chunks = reranked_chunks[:top_k]
-
-            retrieval_ms = hybrid_ms + rerank_total_ms
-
-            timings = {
-                "hybrid_search_ms": hybrid_ms,
-                "rerank_ms": rerank_ms,
-                "total_retrieval_ms": retrieval_ms,
-                "reranker_model": reranker_model,
-                "reranker_mode": reranker_mode,
-                "vector_limit_used": vector_limit,
-                "hybrid_fusion": "enabled",
-                "bm25_weight": 1 - hybrid_retriever.alpha,
-                "vector_weight": hybrid_retriever.alpha
-            }
 
             logger.info(
                 "Hybrid retrieval completed",
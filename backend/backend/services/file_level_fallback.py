@@ -12,27 +12,36 @@ Strategy:
 
 This approach treats MiniLM as "file finder" (keyword search)
 and BGE as "precise chunk locator" (semantic search within file).
+
+BGE chunk embeddings are cached on disk per file content hash
+(FILE_FALLBACK_CACHE_DIR), so repeat fallbacks on the same file cost one
+query embedding, a matrix product and one batched rerank. The content hash
+itself is remembered per (path, size, mtime_ns), so unchanged files are
+not re-read to find their cache entry.
 """
 import asyncio
-import logging
+import hashlib
+import json
 import os
 import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
+import structlog
 
 from backend.config.settings import settings
+from backend.services.embedding_cache import get_embedding_cache
 from backend.services.onnx_inference import (
     get_embedding_model,
     get_reranker_model,
-    set_embedding_model_path,
-    get_current_embed_path,
 )
-from backend.services.qdrant_client import get_qdrant_client
+from backend.services.qdrant_client import get_async_qdrant
 from backend.utils.text_splitter import split_text
 
-logger = logging.getLogger(__name__)
+logger = structlog.get_logger(__name__)
+
+RERANK_CANDIDATES = 20
 
 
 @dataclass
@@ -72,8 +81,11 @@ class FileLevelFallbackRetriever:
         self.confidence_threshold = confidence_threshold
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.qdrant = get_qdrant_client()
+        self.qdrant = get_async_qdrant()
         self.collection = settings.QDRANT_COLLECTION
+        self.cache_dir = Path(os.getenv("FILE_FALLBACK_CACHE_DIR", "./cache/file_fallback"))
+        # Resolved path -> ((size, mtime_ns), cache key) of the last hashed version
+        self._file_keys: Dict[str, Tuple[Tuple[int, int], str]] = {}
 
         # Model paths
         self.minilm_path = settings.ONNX_EMBED_MODEL_PATH
@@ -227,6 +239,19 @@ class FileLevelFallbackRetriever:
             for idx, chunk in enumerate(file_chunks[:top_k])
         ]
 
+    def _encode_with(self, model_path: str, texts: List[str]) -> np.ndarray:
+        """Blocking encode with a specific (registry-resident) model."""
+        return np.asarray(get_embedding_model(model_path).encode(texts), dtype=np.float32)
+
+    async def _embed_query(self, query: str, model_path: str) -> np.ndarray:
+        """Embed a query, keyed on model_path in the shared embedding cache."""
+        async def _encode(texts: List[str]) -> List[List[float]]:
+            vectors = await asyncio.to_thread(self._encode_with, model_path, texts)
+            return vectors.tolist()
+
+        vector = (await get_embedding_cache().embed(model_path, [query], _encode))[0]
+        return np.asarray(vector, dtype=np.float32)
+
     async def _minilm_retrieve(
         self,
         query: str,
@@ -242,18 +267,12 @@ class FileLevelFallbackRetriever:
         Returns:
             List of dicts with 'id', 'score', 'payload'
         """
-        # Ensure MiniLM is active
-        current_embed = get_current_embed_path()
-        if current_embed != self.minilm_path:
-            set_embedding_model_path(self.minilm_path)
-
-        # Get MiniLM embedding
-        embed_model = get_embedding_model()
-        query_embedding = embed_model.encode(query)
+        # Get MiniLM embedding (shared with the main RAG path via the embedding cache)
+        query_embedding = await self._embed_query(query, self.minilm_path)
 
         # Search Qdrant
         try:
-            search_results = self.qdrant.search(
+            search_results = await self.qdrant.search(
                 collection_name=self.collection,
                 query_vector=query_embedding.tolist(),
                 limit=top_k,
@@ -285,9 +304,9 @@ class FileLevelFallbackRetriever:
         Steps:
         1. Load file content
         2. Re-chunk with specified chunk_size/overlap
-        3. Embed all chunks with BGE
-        4. Calculate similarity with BGE query embedding
-        5. Rerank chunks with BGE reranker
+        3. Embed all chunks with BGE in one batched call (cached per content hash)
+        4. Score chunks against the BGE query embedding (one matrix product)
+        5. Rerank the top chunks with one batched reranker call
         6. Return top chunks sorted by score
 
         Args:
@@ -297,89 +316,50 @@ class FileLevelFallbackRetriever:
         Returns:
             List of dicts with 'text', 'score'
         """
-        # Step 1: Load file content
-        logger.info("Loading file content", file_path=file_path)
-
-        try:
-            # Try to load from filesystem
-            full_path = Path(file_path)
-            if not full_path.exists():
-                # Try relative to data directory
-                data_dir = Path(settings.DATA_DIR) if hasattr(settings, 'DATA_DIR') else Path('./data')
-                full_path = data_dir / file_path
-
-            if not full_path.exists():
-                raise FileNotFoundError(f"File not found: {file_path}")
-
-            # Load content based on file extension
-            if full_path.suffix.lower() == '.txt':
-                content = full_path.read_text(encoding='utf-8')
-            else:
-                # Use file_loader utility for other formats
-                from backend.utils.file_loader import load_file_content
-                content = load_file_content(str(full_path))
-
-            logger.info("File loaded", file_path=file_path, content_length=len(content))
-
-        except Exception as e:
-            logger.error("Failed to load file", file_path=file_path, error=str(e))
-            raise
+        # Step 1: Locate file
+        full_path = Path(file_path)
+        if not full_path.exists():
+            # Try relative to data directory
+            data_dir = Path(settings.DATA_DIR) if hasattr(settings, 'DATA_DIR') else Path('./data')
+            full_path = data_dir / file_path
 
-        # Step 2: Re-chunk with BGE parameters
-        chunks = split_text(
-            content,
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-        )
+        if not full_path.exists():
+            logger.error("Failed to load file", file_path=file_path, error="not found")
+            raise FileNotFoundError(f"File not found: {file_path}")
 
-        logger.info("File re-chunked", num_chunks=len(chunks))
+        # Steps 2-3: chunks + BGE embeddings, from cache or computed once
+        chunks, chunk_embeddings = await asyncio.to_thread(self._load_or_embed_file, full_path)
 
-        # Step 3: Switch to BGE and embed
-        logger.info("Switching to BGE for embedding")
-        set_embedding_model_path(self.bge_path)
+        # Embed query (shared embedding cache; BGE runs only on a miss)
+        query_embedding = await self._embed_query(query, self.bge_path)
 
-        bge_embed_model = get_embedding_model()
+        if not chunks:
+            return []
 
-        # Embed query
-        query_embedding = bge_embed_model.encode(query)
+        # Step 4: Cosine similarity for all chunks at once
+        query_norm = np.linalg.norm(query_embedding)
+        scores = chunk_embeddings @ (query_embedding / query_norm if query_norm > 0 else query_embedding)
 
-        # Embed all chunks
-        chunk_embeddings = [bge_embed_model.encode(chunk) for chunk in chunks]
+        num_candidates = min(RERANK_CANDIDATES, len(chunks))
+        top = np.argpartition(-scores, num_candidates - 1)[:num_candidates]
+        top = top[np.argsort(-scores[top], kind="stable")]
 
-        logger.info("All chunks embedded with BGE", num_chunks=len(chunk_embeddings))
+        logger.info("Chunks scored", num_chunks=len(chunks), top_score=float(scores[top[0]]))
 
-        # Step 4: Calculate cosine similarity
-        def cosine_similarity(a, b):
-            return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+        # Step 5: Rerank top chunks with BGE reranker in one batch
+        candidate_texts = [chunks[idx] for idx in top]
+        reranker = get_reranker_model()
+        rerank_scores = await asyncio.to_thread(reranker.score, query, candidate_texts)
 
-        chunk_scores = [
+        reranked_chunks = [
             {
-                'text': chunks[idx],
-                'score': cosine_similarity(query_embedding, chunk_embeddings[idx]),
-                'index': idx,
+                'text': text,
+                'score': float(rerank_score),
+                'embedding_score': float(scores[idx]),
             }
-            for idx in range(len(chunks))
+            for text, rerank_score, idx in zip(candidate_texts, rerank_scores, top)
         ]
 
-        # Sort by score
-        chunk_scores.sort(key=lambda x: x['score'], reverse=True)
-
-        logger.info("Chunks scored and sorted", top_score=chunk_scores[0]['score'] if chunk_scores else 0.0)
-
-        # Step 5: Rerank top chunks with BGE reranker
-        top_candidates = chunk_scores[:20]  # Rerank top 20
-
-        reranker = get_reranker_model()
-
-        reranked_chunks = []
-        for candidate in top_candidates:
-            rerank_score = reranker.compute_score([[query, candidate['text']]])[0]
-            reranked_chunks.append({
-                'text': candidate['text'],
-                'score': rerank_score,
-                'embedding_score': candidate['score'],
-            })
-
         # Sort by rerank score
         reranked_chunks.sort(key=lambda x: x['score'], reverse=True)
 
@@ -388,11 +368,86 @@ class FileLevelFallbackRetriever:
             top_rerank_score=reranked_chunks[0]['score'] if reranked_chunks else 0.0,
         )
 
-        # Switch back to MiniLM
-        set_embedding_model_path(self.minilm_path)
-
         return reranked_chunks
 
+    def _cache_key(self, raw: bytes) -> str:
+        """Key chunk embeddings by file content, chunking parameters and BGE model."""
+        digest = hashlib.sha256(raw)
+        digest.update(f"|{self.bge_path}|{self.chunk_size}|{self.chunk_overlap}".encode())
+        return digest.hexdigest()
+
+    def _file_cache_key(self, full_path: Path) -> str:
+        """Cache key for a file, re-hashing its content only when size or mtime changed."""
+        stat = full_path.stat()
+        signature = (stat.st_size, stat.st_mtime_ns)
+        path = str(full_path.resolve())
+        known = self._file_keys.get(path)
+        if known is not None and known[0] == signature:
+            return known[1]
+        key = self._cache_key(full_path.read_bytes())
+        self._file_keys[path] = (signature, key)
+        return key
+
+    def _load_or_embed_file(self, full_path: Path) -> Tuple[List[str], np.ndarray]:
+        """
+        Return (chunks, L2-normalized BGE chunk embeddings) for a file (blocking).
+
+        Cache hits skip parsing, chunking and the BGE model entirely.
+        """
+        key = self._file_cache_key(full_path)
+        emb_path = self.cache_dir / f"{key}.npy"
+        chunks_path = self.cache_dir / f"{key}.json"
+
+        if emb_path.exists() and chunks_path.exists():
+            try:
+                chunks = json.loads(chunks_path.read_text(encoding='utf-8'))
+                embeddings = np.load(emb_path, mmap_mode="r")
+                if len(chunks) == len(embeddings):
+                    logger.info("BGE chunk embeddings loaded from cache", file_path=str(full_path), num_chunks=len(chunks))
+                    return chunks, embeddings
+            except Exception as e:
+                logger.warning("Failed to read chunk embedding cache, re-embedding", file_path=str(full_path), error=str(e))
+
+        # Load content based on file extension
+        if full_path.suffix.lower() == '.txt':
+            content = full_path.read_text(encoding='utf-8')
+        else:
+            # Use file_loader utility for other formats
+            from backend.utils.file_loader import load_file_content
+            content = load_file_content(str(full_path))
+
+        logger.info("File loaded", file_path=str(full_path), content_length=len(content))
+
+        # Re-chunk with BGE parameters
+        chunks = split_text(
+            content,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+        )
+
+        # Embed all chunks with BGE in one call (the model batches by length internally)
+        if chunks:
+            embeddings = self._encode_with(self.bge_path, chunks)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+        else:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+
+        logger.info("All chunks embedded with BGE", num_chunks=len(chunks))
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_emb = emb_path.with_suffix(f".{os.getpid()}.tmp.npy")
+            np.save(tmp_emb, embeddings.astype(np.float32))
+            os.replace(tmp_emb, emb_path)
+            tmp_chunks = chunks_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_chunks.write_text(json.dumps(chunks), encoding='utf-8')
+            os.replace(tmp_chunks, chunks_path)
+        except Exception as e:
+            logger.warning("Failed to cache chunk embeddings", file_path=str(full_path), error=str(e))
+
+        return chunks, embeddings
+
     async def _rerank_results(
         self,
         query: str,
@@ -415,15 +470,13 @@ class FileLevelFallbackRetriever:
 
         reranker = get_reranker_model()
 
-        # Prepare pairs for reranking
-        pairs = [[query, r['payload'].get('text', '')] for r in results]
-
-        # Compute rerank scores
-        rerank_scores = reranker.compute_score(pairs)
+        # Compute rerank scores in one batch
+        docs = [r['payload'].get('text', '') for r in results]
+        rerank_scores = await asyncio.to_thread(reranker.score, query, docs)
 
         # Attach rerank scores
         for idx, result in enumerate(results):
-            result['rerank_score'] = rerank_scores[idx]
+            result['rerank_score'] = float(rerank_scores[idx])
 
         # Sort by rerank score
         reranked = sorted(results, key=lambda x: x.get('rerank_score', 0.0), reverse=True)
@@ -8,10 +8,23 @@ Implements lightweight governance tracking for AI-Louie operations:
 - Compliance status tracking
 
 Inspired by Air NZ AI Governance Framework.
+
+Contexts live in a ContextStore bounded by size and age, and leave it on
+complete_operation(), so abandoned or finished operations cannot pile up.
+Prometheus updates are aggregated in memory (per label set) and applied by a
+background task every GOVERNANCE_METRICS_FLUSH_INTERVAL_S seconds instead of
+on the request path.
 """
 
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
 from enum import Enum
-from typing import Dict, List, Optional, Set
+from types import MappingProxyType
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import uuid
@@ -32,6 +45,13 @@ except ImportError:
     METRICS_AVAILABLE = False
     logger.warning("Prometheus metrics not available for governance tracking")
 
+MAX_CONTEXTS = int(os.getenv("GOVERNANCE_MAX_CONTEXTS", "10000"))  # In-flight operations tracked
+CONTEXT_TTL_S = float(os.getenv("GOVERNANCE_CONTEXT_TTL_S", "600"))  # Operations never completed are dropped after this
+METRICS_FLUSH_INTERVAL_S = float(os.getenv("GOVERNANCE_METRICS_FLUSH_INTERVAL_S", "5"))
+
+# Shared by checkpoints recorded without metadata
+_NO_METADATA = MappingProxyType({})
+
 
 class RiskTier(Enum):
     """Risk tier classification for AI use cases"""
@@ -57,7 +77,7 @@ class GovernanceCriteria(Enum):
     G12_DASHBOARD = "g12_dashboard"
 
 
-@dataclass
+@dataclass(slots=True)
 class GovernanceCheckpoint:
     """Represents a governance checkpoint during execution"""
     checkpoint_id: str
@@ -68,7 +88,7 @@ class GovernanceCheckpoint:
     metadata: Dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class GovernanceContext:
     """Governance context for an AI operation"""
     trace_id: str
@@ -82,26 +102,19 @@ class GovernanceContext:
 
     def add_checkpoint(self, criteria: GovernanceCriteria, status: str, message: str, metadata: Dict = None):
         """Add a governance checkpoint"""
+        status = sys.intern(status)  # a handful of distinct values, shared by every checkpoint
         checkpoint = GovernanceCheckpoint(
             checkpoint_id=f"{self.trace_id}_{len(self.checkpoints)}",
             criteria=criteria,
             status=status,
             message=message,
-            metadata=metadata or {}
+            metadata=metadata or _NO_METADATA
         )
         self.checkpoints.append(checkpoint)
         logger.info(f"Governance checkpoint: {criteria.value} - {status} - {message}")
 
-        # Export to Prometheus metrics
-        if METRICS_AVAILABLE:
-            try:
-                governance_checkpoint_counter.labels(
-                    criteria=criteria.value,
-                    status=status,
-                    risk_tier=self.risk_tier.value
-                ).inc()
-            except Exception as e:
-                logger.warning(f"Failed to export governance checkpoint metric: {e}")
+        # Counted in memory; exported to Prometheus by the metrics flusher
+        _metrics.checkpoint(criteria.value, status, self.risk_tier.value)
 
     def complete(self):
         """Mark governance context as complete"""
@@ -131,6 +144,145 @@ class GovernanceContext:
         }
 
 
+class ContextStore:
+    """
+    trace_id -> GovernanceContext bounded by size and age (oldest entries go first).
+
+    Dict-like (get / [] / in / len) so callers written against a plain dict
+    keep working; insertion order is age order, so eviction is O(1).
+    """
+
+    def __init__(self, max_entries: int = MAX_CONTEXTS, ttl_s: float = CONTEXT_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, Tuple[float, GovernanceContext]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            inserted_at, _ = next(iter(self._entries.values()))
+            if len(self._entries) <= self.max_entries and now - inserted_at <= self.ttl_s:
+                break
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __setitem__(self, trace_id: str, context: GovernanceContext) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries.pop(trace_id, None)
+            self._entries[trace_id] = (now, context)
+            self._expire(now)
+
+    def get(self, trace_id: str, default=None) -> Optional[GovernanceContext]:
+        with self._lock:
+            entry = self._entries.get(trace_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_s:
+            return default
+        return entry[1]
+
+    def __getitem__(self, trace_id: str) -> GovernanceContext:
+        context = self.get(trace_id)
+        if context is None:
+            raise KeyError(trace_id)
+        return context
+
+    def pop(self, trace_id: str, default=None) -> Optional[GovernanceContext]:
+        with self._lock:
+            entry = self._entries.pop(trace_id, None)
+        return default if entry is None else entry[1]
+
+    def __contains__(self, trace_id: str) -> bool:
+        return self.get(trace_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._entries)
+
+
+class _MetricsBuffer:
+    """
+    Governance metric updates aggregated per label set and applied to
+    Prometheus by a background task (or flush()), not on the request path.
+    """
+
+    # Pending latency observations that force an inline flush when no event loop runs the flusher
+    MAX_PENDING_LATENCIES = 1024
+
+    def __init__(self, flush_interval_s: float = METRICS_FLUSH_INTERVAL_S):
+        self.flush_interval_s = flush_interval_s
+        self._lock = threading.Lock()
+        self._checkpoints: Counter = Counter()  # (criteria, status, risk_tier) -> count
+        self._operations: Counter = Counter()  # (operation_type, risk_tier) -> count
+        self._compliance: Dict[Tuple[str, str], List[int]] = {}  # (criteria, risk_tier) -> [passed, total]
+        self._latencies: List[Tuple[str, str, float]] = []
+        self._flusher: Optional[asyncio.Task] = None
+
+    def checkpoint(self, criteria: str, status: str, risk_tier: str) -> None:
+        with self._lock:
+            self._checkpoints[(criteria, status, risk_tier)] += 1
+        self._ensure_flusher()
+
+    def operation(self, operation_type: str, risk_tier: str) -> None:
+        with self._lock:
+            self._operations[(operation_type, risk_tier)] += 1
+        self._ensure_flusher()
+
+    def completed(self, context: "GovernanceContext", duration_seconds: float) -> None:
+        risk_tier = context.risk_tier.value
+        with self._lock:
+            self._latencies.append((context.operation_type, risk_tier, duration_seconds))
+            for checkpoint in context.checkpoints:
+                counts = self._compliance.setdefault((checkpoint.criteria.value, risk_tier), [0, 0])
+                counts[0] += checkpoint.status == "passed"
+                counts[1] += 1
+            overflow = len(self._latencies) >= self.MAX_PENDING_LATENCIES
+        if not self._ensure_flusher() and overflow:
+            self.flush()
+
+    def _ensure_flusher(self) -> bool:
+        """Start the flusher on the running loop; False if there is none (flush() explicitly)."""
+        if self._flusher is not None and not self._flusher.done():
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._flusher = loop.create_task(self._run_flusher())
+        return True
+
+    async def _run_flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            self.flush()
+
+    def flush(self) -> None:
+        """Apply pending updates to Prometheus."""
+        with self._lock:
+            checkpoints, self._checkpoints = self._checkpoints, Counter()
+            operations, self._operations = self._operations, Counter()
+            compliance, self._compliance = self._compliance, {}
+            latencies, self._latencies = self._latencies, []
+        if not METRICS_AVAILABLE:
+            return
+        try:
+            for (criteria, status, risk_tier), count in checkpoints.items():
+                governance_checkpoint_counter.labels(criteria=criteria, status=status, risk_tier=risk_tier).inc(count)
+            for (operation_type, risk_tier), count in operations.items():
+                governance_operation_counter.labels(operation_type=operation_type, risk_tier=risk_tier).inc(count)
+            for operation_type, risk_tier, seconds in latencies:
+                governance_latency_histogram.labels(operation_type=operation_type, risk_tier=risk_tier).observe(seconds)
+            # Compliance rate of each criteria over the operations completed since the last flush
+            for (criteria, risk_tier), (passed, total) in compliance.items():
+                governance_compliance_gauge.labels(criteria=criteria, risk_tier=risk_tier).set(passed / total)
+        except Exception as e:
+            logger.warning(f"Failed to export governance metrics: {e}")
+
+
+_metrics = _MetricsBuffer()
+
+
 class GovernanceTracker:
     """
     Tracks governance compliance for AI-Louie operations.
@@ -214,8 +366,9 @@ class GovernanceTracker:
         RiskTier.R3: "docs/governance/diagrams/flow_r3_maintenance_automation.png",
     }
 
-    def __init__(self):
-        self.active_contexts: Dict[str, GovernanceContext] = {}
+    def __init__(self, max_contexts: int = MAX_CONTEXTS, context_ttl_s: float = CONTEXT_TTL_S):
+        # Operations in flight; completed ones are removed, abandoned ones age out
+        self.active_contexts = ContextStore(max_entries=max_contexts, ttl_s=context_ttl_s)
 
     def start_operation(self, operation_type: str, metadata: Dict = None) -> GovernanceContext:
         """
@@ -242,15 +395,7 @@ class GovernanceTracker:
 
         self.active_contexts[trace_id] = context
 
-        # Export operation start to Prometheus
-        if METRICS_AVAILABLE:
-            try:
-                governance_operation_counter.labels(
-                    operation_type=operation_type,
-                    risk_tier=risk_tier.value
-                ).inc()
-            except Exception as e:
-                logger.warning(f"Failed to export governance operation metric: {e}")
+        _metrics.operation(operation_type, risk_tier.value)
 
         # Initial checkpoints
         context.add_checkpoint(
@@ -495,48 +640,26 @@ class GovernanceTracker:
         """
         Complete governance tracking for an operation.
 
+        The context leaves the tracker; callers keep the returned object.
+
         Args:
             trace_id: Trace ID of the operation
 
         Returns:
             Completed GovernanceContext or None
         """
-        context = self.active_contexts.get(trace_id)
+        context = self.active_contexts.pop(trace_id)
         if not context:
             return None
 
         context.complete()
-
-        # Export latency to Prometheus histogram
-        if METRICS_AVAILABLE and context.end_time:
-            try:
-                duration_seconds = (context.end_time - context.start_time).total_seconds()
-                governance_latency_histogram.labels(
-                    operation_type=context.operation_type,
-                    risk_tier=context.risk_tier.value
-                ).observe(duration_seconds)
-
-                # Calculate compliance rate for this operation
-                passed = len([c for c in context.checkpoints if c.status == "passed"])
-                total = len(context.checkpoints)
-                compliance_rate = passed / total if total > 0 else 1.0
-
-                # Update compliance gauge for each criteria
-                for checkpoint in context.checkpoints:
-                    gauge_value = 1.0 if checkpoint.status == "passed" else 0.0
-                    governance_compliance_gauge.labels(
-                        criteria=checkpoint.criteria.value,
-                        risk_tier=context.risk_tier.value
-                    ).set(gauge_value)
-
-            except Exception as e:
-                logger.warning(f"Failed to export governance completion metrics: {e}")
+        _metrics.completed(context, (context.end_time - context.start_time).total_seconds())
 
         logger.info(f"Completed governance tracking: {trace_id} - {len(context.checkpoints)} checkpoints")
         return context
 
     def get_context(self, trace_id: str) -> Optional[GovernanceContext]:
-        """Get governance context by trace ID"""
+        """Get the context of an operation in flight by trace ID"""
         return self.active_contexts.get(trace_id)
 
     def get_flowchart_path(self, risk_tier: RiskTier) -> str:
@@ -555,3 +678,8 @@ _governance_tracker = GovernanceTracker()
 def get_governance_tracker() -> GovernanceTracker:
     """Get global governance tracker instance"""
     return _governance_tracker
+
+
+def flush_governance_metrics() -> None:
+    """Apply pending governance metric updates now (the background flusher does this periodically)."""
+    _metrics.flush()
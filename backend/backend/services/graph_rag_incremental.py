@@ -27,6 +27,7 @@ import os
 
 from openai import AsyncOpenAI
 from qdrant_client import QdrantClient
+from backend.services.qdrant_client import AsyncQdrant
 from backend.services.unified_llm_metrics import get_unified_metrics
 
 logger = logging.getLogger(__name__)
@@ -94,6 +95,7 @@ class IncrementalGraphRAG:
     ):
         self.openai_client = openai_client
         self.qdrant_client = qdrant_client
+        self._async_qdrant = AsyncQdrant(qdrant_client)
         self.collection_name = collection_name
         self.extraction_model = extraction_model
         self.generation_model = generation_model
@@ -477,11 +479,11 @@ Keep it concise - maximum 5 entities.
 
         try:
             # Generate embedding for search query
-            from backend.services.rag_pipeline import _embed_texts
-            query_embedding = (await _embed_texts([search_query]))[0]
+            from backend.services.rag_pipeline import _embed_query
+            query_embedding = await _embed_query(search_query)
 
             # Retrieve chunks from Qdrant
-            search_results = self.qdrant_client.search(
+            search_results = await self._async_qdrant.search(
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
                 limit=self.max_jit_chunks,
@@ -1089,10 +1091,10 @@ Limit: max 10 entities, max 15 relationships.
         """
         try:
             # Generate embedding for query
-            from backend.services.rag_pipeline import _embed_texts
-            query_embedding = (await _embed_texts([question]))[0]
+            from backend.services.rag_pipeline import _embed_query
+            query_embedding = await _embed_query(question)
 
-            search_results = self.qdrant_client.search(
+            search_results = await self._async_qdrant.search(
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
                 limit=top_k,
@@ -2,15 +2,23 @@
 Hybrid Retriever combining BM25 keyword search with dense vector retrieval
 """
 import asyncio
-import pickle
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-from rank_bm25 import BM25Okapi
-import numpy as np
+from typing import List, Dict, Any, Optional, Tuple, Iterable
 from qdrant_client import QdrantClient
 from qdrant_client.models import ScoredPoint
 import structlog
 
+from backend.services.bm25_index import (
+    TOKENIZER_NAME,
+    BM25Index,
+    index_dir_for,
+    register_live_index,
+    tokenize,
+)
+from backend.services.qdrant_client import AsyncQdrant, get_qdrant_client
+
 logger = structlog.get_logger(__name__)
 
 
@@ -38,18 +46,23 @@ class HybridRetriever:
             alpha: Weight for vector search (0-1). 1-alpha will be BM25 weight.
         """
         self.qdrant = qdrant_client
+        self.async_qdrant = AsyncQdrant(qdrant_client)
         self.collection = collection_name
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         self.alpha = alpha
 
-        # BM25 components
-        self.bm25_index: Optional[BM25Okapi] = None
-        self.doc_corpus: List[str] = []
-        self.doc_ids: List[str] = []  # Maps corpus index to Qdrant point ID
-        self.id_to_corpus_idx: Dict[str, int] = {}  # Reverse mapping
+        # BM25 components (postings memory-mapped from cache_dir/{collection}_bm25/)
+        self.bm25_index: Optional[BM25Index] = None
 
         self._initialized = False
+        # One rebuild at a time when concurrent searches all find the index stale
+        self._rebuild_lock = asyncio.Lock()
+
+    @property
+    def doc_ids(self) -> List[str]:
+        """Qdrant point IDs in BM25 index order"""
+        return self.bm25_index.doc_ids if self.bm25_index else []
 
     async def initialize(self, force_rebuild: bool = False):
         """
@@ -62,43 +75,34 @@ class HybridRetriever:
             logger.info("HybridRetriever already initialized")
             return
 
-        cache_file = self.cache_dir / f"{self.collection}_bm25.pkl"
+        index_dir = index_dir_for(self.collection, str(self.cache_dir))
 
-        if cache_file.exists() and not force_rebuild:
-            logger.info("Loading BM25 index from cache", cache_file=str(cache_file))
+        if not force_rebuild:
             try:
-                with open(cache_file, 'rb') as f:
-                    cache_data = pickle.load(f)
-                    self.bm25_index = cache_data['bm25_index']
-                    self.doc_corpus = cache_data['doc_corpus']
-                    self.doc_ids = cache_data['doc_ids']
-                    self.id_to_corpus_idx = cache_data['id_to_corpus_idx']
+                self.bm25_index = BM25Index.load(index_dir)
+                if self.bm25_index is not None:
+                    register_live_index(self.bm25_index)
                     self._initialized = True
-                    logger.info("BM25 index loaded from cache", num_docs=len(self.doc_corpus))
+                    logger.info("BM25 index loaded from cache", index_dir=str(index_dir), num_docs=len(self.bm25_index))
                     return
             except Exception as e:
                 logger.warning("Failed to load BM25 cache, rebuilding", error=str(e))
 
-        # Build BM25 index from Qdrant
+        # Build BM25 index from Qdrant (only on first start or force_rebuild)
         logger.info("Building BM25 index from Qdrant collection", collection=self.collection)
-        await self._build_bm25_index()
+        await self._build_bm25_index(index_dir)
 
-        # Cache the index
+        # Cache the index; later ingestion/deletion updates it incrementally
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump({
-                    'bm25_index': self.bm25_index,
-                    'doc_corpus': self.doc_corpus,
-                    'doc_ids': self.doc_ids,
-                    'id_to_corpus_idx': self.id_to_corpus_idx
-                }, f)
-            logger.info("BM25 index cached", cache_file=str(cache_file))
+            self.bm25_index.save()
+            register_live_index(self.bm25_index)
+            logger.info("BM25 index cached", index_dir=str(index_dir))
         except Exception as e:
             logger.warning("Failed to cache BM25 index", error=str(e))
 
         self._initialized = True
 
-    async def _build_bm25_index(self):
+    async def _build_bm25_index(self, index_dir: Path):
         """Build BM25 index by fetching all documents from Qdrant"""
         # Fetch all points from Qdrant (scroll API for large collections)
         offset = None
@@ -106,7 +110,7 @@ class HybridRetriever:
 
         while True:
             try:
-                result = self.qdrant.scroll(
+                result = await self.async_qdrant.scroll(
                     collection_name=self.collection,
                     limit=100,
                     offset=offset,
@@ -129,43 +133,50 @@ class HybridRetriever:
 
         logger.info("Fetched points from Qdrant", num_points=len(all_points))
 
-        # Extract text content and build corpus
-        self.doc_corpus = []
-        self.doc_ids = []
-
+        # Tokenize payload text and build the index (raw text is not kept in memory)
+        documents = []
         for point in all_points:
-            doc_id = str(point.id)
-            payload = point.payload or {}
-
-            # Get text content from payload (adjust field name if different)
-            text = payload.get('text', payload.get('content', ''))
-            if not text:
-                # Try to find any text field
-                for key, value in payload.items():
-                    if isinstance(value, str) and len(value) > 10:
-                        text = value
-                        break
-
+            text = self._payload_text(point.payload or {})
             if text:
-                self.doc_corpus.append(text)
-                self.doc_ids.append(doc_id)
-
-        # Build reverse mapping
-        self.id_to_corpus_idx = {doc_id: idx for idx, doc_id in enumerate(self.doc_ids)}
-
-        # Tokenize corpus and build BM25 index
-        tokenized_corpus = [self._tokenize(doc) for doc in self.doc_corpus]
-        self.bm25_index = BM25Okapi(tokenized_corpus)
-
-        logger.info("BM25 index built", num_docs=len(self.doc_corpus))
+                documents.append((str(point.id), self._tokenize(text)))
+
+        self.bm25_index = BM25Index(index_dir=index_dir)
+        await asyncio.to_thread(self.bm25_index.build, documents)
+
+        logger.info("BM25 index built", num_docs=len(self.bm25_index))
+
+    @staticmethod
+    def _payload_text(payload: Dict[str, Any]) -> str:
+        """Get text content from payload (adjust field name if different)"""
+        text = payload.get('text', payload.get('content', ''))
+        if not text:
+            # Try to find any text field
+            for key, value in payload.items():
+                if isinstance(value, str) and len(value) > 10:
+                    text = value
+                    break
+        return text
 
     def _tokenize(self, text: str) -> List[str]:
         """
         Simple tokenization for BM25.
         Can be enhanced with stemming, stopword removal, etc.
         """
-        # Basic whitespace tokenization + lowercase
-        return text.lower().split()
+        return tokenize(text)
+
+    def add_documents(self, documents: Iterable[Tuple[str, str]]):
+        """Index newly upserted (point_id, text) pairs without re-scrolling Qdrant"""
+        if self.bm25_index is None:
+            return
+        for doc_id, text in documents:
+            self.bm25_index.add_document(str(doc_id), self._tokenize(text))
+
+    def remove_documents(self, doc_ids: Iterable[str]):
+        """Drop deleted points from the BM25 index"""
+        if self.bm25_index is None:
+            return
+        for doc_id in doc_ids:
+            self.bm25_index.remove_document(str(doc_id))
 
     async def hybrid_search(
         self,
@@ -173,7 +184,8 @@ class HybridRetriever:
         query_embedding: List[float],
         top_k: int = 50,
         bm25_top_k: Optional[int] = None,
-        vector_top_k: Optional[int] = None
+        vector_top_k: Optional[int] = None,
+        alpha: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Perform hybrid retrieval combining BM25 and vector search.
@@ -184,6 +196,7 @@ class HybridRetriever:
             top_k: Final number of results to return
             bm25_top_k: Number of BM25 candidates (default: top_k * 2)
             vector_top_k: Number of vector candidates (default: top_k * 2)
+            alpha: Vector weight for this call only (default: self.alpha)
 
         Returns:
             List of dicts with 'id', 'score', 'payload', 'bm25_score', 'vector_score'
@@ -201,7 +214,7 @@ class HybridRetriever:
         bm25_results, vector_results = await asyncio.gather(bm25_task, vector_task)
 
         # Fuse scores using weighted combination
-        fused_results = self._fuse_scores(bm25_results, vector_results, top_k)
+        fused_results = await self._fuse_scores(bm25_results, vector_results, top_k, alpha)
 
         return fused_results
 
@@ -212,21 +225,18 @@ class HybridRetriever:
         Returns:
             List of (doc_id, bm25_score) tuples
         """
+        if self.bm25_index is not None:
+            # Pick up ingestion/deletion done by other workers (or invalidation by seeding)
+            await asyncio.to_thread(self.bm25_index.refresh)
+            if self.bm25_index.stale:
+                async with self._rebuild_lock:
+                    # Another search may have rebuilt it while we waited
+                    if self.bm25_index.stale:
+                        await self.initialize(force_rebuild=True)
         if self.bm25_index is None:
             return []
 
-        tokenized_query = self._tokenize(query)
-        scores = self.bm25_index.get_scores(tokenized_query)
-
-        # Get top-k indices
-        top_indices = np.argsort(scores)[-top_k:][::-1]
-
-        results = []
-        for idx in top_indices:
-            if idx < len(self.doc_ids):
-                doc_id = self.doc_ids[idx]
-                score = float(scores[idx])
-                results.append((doc_id, score))
+        results = self.bm25_index.search(self._tokenize(query), top_k)
 
         logger.debug("BM25 search completed", num_results=len(results), top_score=results[0][1] if results else 0)
         return results
@@ -239,7 +249,7 @@ class HybridRetriever:
             List of ScoredPoint objects from Qdrant
         """
         try:
-            results = self.qdrant.search(
+            results = await self.async_qdrant.search(
                 collection_name=self.collection,
                 query_vector=query_embedding,
                 limit=top_k
@@ -250,11 +260,12 @@ class HybridRetriever:
             logger.error("Vector search failed", error=str(e))
             return []
 
-    def _fuse_scores(
+    async def _fuse_scores(
         self,
         bm25_results: List[Tuple[str, float]],
         vector_results: List[ScoredPoint],
-        top_k: int
+        top_k: int,
+        alpha: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Fuse BM25 and vector scores using weighted combination.
@@ -281,6 +292,8 @@ class HybridRetriever:
         # Vector scores are already normalized (cosine similarity 0-1)
         vector_normalized = {str(point.id): point.score for point in vector_results}
 
+        alpha = self.alpha if alpha is None else alpha
+
         # Collect all unique document IDs
         all_doc_ids = set(bm25_normalized.keys()) | set(vector_normalized.keys())
 
@@ -291,7 +304,7 @@ class HybridRetriever:
             vector_score = vector_normalized.get(doc_id, 0.0)
 
             # Weighted combination
-            fused_score = self.alpha * vector_score + (1 - self.alpha) * bm25_score
+            fused_score = alpha * vector_score + (1 - alpha) * bm25_score
 
             fused_scores.append({
                 'id': doc_id,
@@ -303,40 +316,47 @@ class HybridRetriever:
         # Sort by fused score
         fused_scores.sort(key=lambda x: x['fused_score'], reverse=True)
 
-        # Retrieve full payloads from Qdrant for top-k results
-        top_results = []
-        for item in fused_scores[:top_k]:
-            try:
+        # Retrieve full payloads from Qdrant for top-k results (one round trip)
+        top_items = fused_scores[:top_k]
+        payloads: Dict[str, Any] = {}
+        if top_items:
+            point_ids = []
+            for item in top_items:
                 # Convert string ID back to int if it's a numeric ID
                 point_id = item['id']
                 try:
                     point_id = int(point_id)
                 except (ValueError, TypeError):
                     pass  # Keep as string if not convertible
-
-                point = self.qdrant.retrieve(
+                point_ids.append(point_id)
+            try:
+                points = await self.async_qdrant.retrieve(
                     collection_name=self.collection,
-                    ids=[point_id],
+                    ids=point_ids,
                     with_payload=True
                 )
-
-                if point:
-                    top_results.append({
-                        'id': item['id'],
-                        'score': item['fused_score'],
-                        'bm25_score': item['bm25_score'],
-                        'vector_score': item['vector_score'],
-                        'payload': point[0].payload
-                    })
+                payloads = {str(point.id): point.payload for point in points}
             except Exception as e:
-                logger.warning("Failed to retrieve point payload", doc_id=item['id'], error=str(e))
+                logger.warning("Failed to retrieve point payloads", num_points=len(point_ids), error=str(e))
+
+        top_results = [
+            {
+                'id': item['id'],
+                'score': item['fused_score'],
+                'bm25_score': item['bm25_score'],
+                'vector_score': item['vector_score'],
+                'payload': payloads[item['id']]
+            }
+            for item in top_items
+            if item['id'] in payloads
+        ]
 
         logger.info(
             "Hybrid search completed",
             total_candidates=len(all_doc_ids),
             returned=len(top_results),
             top_fused_score=top_results[0]['score'] if top_results else 0,
-            alpha=self.alpha
+            alpha=alpha
         )
 
         return top_results
@@ -347,3 +367,96 @@ class HybridRetriever:
             raise ValueError("alpha must be between 0 and 1")
         self.alpha = alpha
         logger.info("Updated alpha", alpha=alpha)
+
+
+class HybridRetrieverRegistry:
+    """
+    Process-wide, long-lived HybridRetrievers keyed by (collection, tokenizer).
+
+    Retrievers are built lazily on first use (loading the saved BM25 index, or
+    scrolling Qdrant once) and then shared, so per-request callers only pay for
+    search. Ingestion/deletion reach them through the BM25 index hooks; an index
+    invalidated by seeding is rebuilt on its next search. When the BM25 indexes
+    exceed the memory budget, the least recently used retrievers are dropped.
+    """
+
+    def __init__(
+        self,
+        qdrant_client: Optional[QdrantClient] = None,
+        cache_dir: str = "./cache",
+        memory_budget_bytes: int = 512 * 1024 * 1024,
+        alpha: float = 0.7
+    ):
+        self._qdrant = qdrant_client
+        self.cache_dir = cache_dir
+        self.memory_budget_bytes = memory_budget_bytes
+        self.alpha = alpha
+        self._retrievers: "OrderedDict[Tuple[str, str], HybridRetriever]" = OrderedDict()
+        self._build_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    def __contains__(self, collection: str) -> bool:
+        return (collection, TOKENIZER_NAME) in self._retrievers
+
+    def retriever(self, collection: str) -> HybridRetriever:
+        """Get (or create, without building) the shared retriever for a collection."""
+        key = (collection, TOKENIZER_NAME)
+        retriever = self._retrievers.get(key)
+        if retriever is None:
+            retriever = HybridRetriever(
+                qdrant_client=self._qdrant or get_qdrant_client(),
+                collection_name=collection,
+                cache_dir=self.cache_dir,
+                alpha=self.alpha
+            )
+            self._retrievers[key] = retriever
+            self._build_locks[key] = asyncio.Lock()
+        self._retrievers.move_to_end(key)
+        return retriever
+
+    async def acquire(self, collection: str) -> HybridRetriever:
+        """Get the shared retriever for a collection, building its BM25 index if needed."""
+        key = (collection, TOKENIZER_NAME)
+        retriever = self.retriever(collection)
+        if not retriever._initialized:
+            # Concurrent first requests wait for a single build
+            async with self._build_locks[key]:
+                if not retriever._initialized:
+                    await retriever.initialize()
+            self._enforce_budget(keep=key)
+        return retriever
+
+    def memory_bytes(self) -> int:
+        return sum(
+            retriever.bm25_index.memory_bytes()
+            for retriever in self._retrievers.values()
+            if retriever.bm25_index is not None
+        )
+
+    def _enforce_budget(self, keep: Tuple[str, str]):
+        while self.memory_bytes() > self.memory_budget_bytes and len(self._retrievers) > 1:
+            key = next(k for k in self._retrievers if k != keep)
+            self._retrievers.pop(key)
+            self._build_locks.pop(key, None)
+            logger.info("Evicted hybrid retriever over memory budget", collection=key[0])
+
+    def evict(self, collection: str):
+        """Drop a collection's retriever (rebuilt lazily on next use)."""
+        key = (collection, TOKENIZER_NAME)
+        self._retrievers.pop(key, None)
+        self._build_locks.pop(key, None)
+
+
+_registry: Optional[HybridRetrieverRegistry] = None
+
+
+def get_hybrid_retriever_registry() -> HybridRetrieverRegistry:
+    """Get the process-wide hybrid retriever registry."""
+    global _registry
+    if _registry is None:
+        budget_mb = float(os.getenv("HYBRID_RETRIEVER_MEMORY_MB", "512"))
+        _registry = HybridRetrieverRegistry(
+            memory_budget_bytes=int(budget_mb * 1024 * 1024),
+            alpha=float(os.getenv("HYBRID_ALPHA", "0.7"))
+        )
+        logger.info("Hybrid retriever registry initialized", memory_budget_mb=budget_mb)
+    return _registry
@@ -0,0 +1,189 @@
+"""
+Request-coalescing scheduler for the /embed endpoint.
+
+Concurrent requests are queued and merged into one padded batch (up to
+max_batch_size texts, or whatever arrived within max_wait_ms of the first
+queued request), encoded with a single model call, and the rows are split
+back out to each caller. While one batch runs, the next one fills up.
+
+Also holds the length-bucketing helpers /rerank uses to batch (query, doc)
+pairs of similar length.
+"""
+import asyncio
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+
+class EmbedBatcher:
+    """Coalesce concurrent embedding requests into shared model calls."""
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        batch_size_histogram=None,
+        requests_per_batch_histogram=None,
+        queue_wait_histogram=None
+    ):
+        """
+        Args:
+            encode_fn: Blocking function mapping texts -> (n, dim) array
+            max_batch_size: Max texts per merged batch
+            max_wait_ms: Max time the first queued request waits for company
+            batch_size_histogram: Optional Histogram observing texts per batch
+            requests_per_batch_histogram: Optional Histogram observing requests per batch
+            queue_wait_histogram: Optional Histogram observing queue wait (seconds)
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max_wait_ms / 1000
+        self._batch_size_histogram = batch_size_histogram
+        self._requests_per_batch_histogram = requests_per_batch_histogram
+        self._queue_wait_histogram = queue_wait_histogram
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Request that did not fit in the previous batch, leads the next one
+        self._carry: Optional[Tuple[List[str], asyncio.Future, float]] = None
+
+    async def submit(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, sharing the model call with concurrent requests."""
+        if len(texts) >= self.max_batch_size:
+            # Already a full batch on its own
+            return await run_in_threadpool(self.encode_fn, texts)
+
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future, time.perf_counter()))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[List[str], asyncio.Future, float]]:
+        first = self._carry or await self._queue.get()
+        self._carry = None
+        batch = [first]
+        size = len(first[0])
+        deadline = first[2] + self.max_wait_s
+
+        while size < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if size + len(item[0]) > self.max_batch_size:
+                self._carry = item
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            started = time.perf_counter()
+            texts = [text for item_texts, _, _ in batch for text in item_texts]
+
+            if self._batch_size_histogram is not None:
+                self._batch_size_histogram.observe(len(texts))
+            if self._requests_per_batch_histogram is not None:
+                self._requests_per_batch_histogram.observe(len(batch))
+            if self._queue_wait_histogram is not None:
+                for _, _, enqueued_at in batch:
+                    self._queue_wait_histogram.observe(started - enqueued_at)
+
+            try:
+                embeddings = await run_in_threadpool(self.encode_fn, texts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for item_texts, future, _ in batch:
+                if not future.done():  # caller may have been cancelled
+                    future.set_result(embeddings[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    async def close(self):
+        """Stop the worker task (pending requests are cancelled)."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        pending = [self._carry] if self._carry else []
+        self._carry = None
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            future.cancel()
+
+
+def length_batches(
+    order: np.ndarray, lengths: np.ndarray, max_batch_size: int, max_batch_tokens: int
+) -> List[np.ndarray]:
+    """
+    Split indices (sorted by ascending length) into batches whose padded size
+    (rows x longest row) stays within max_batch_tokens.
+    """
+    batches: List[np.ndarray] = []
+    start = 0
+    for end in range(1, len(order) + 1):
+        rows = end - start
+        if end < len(order):
+            next_width = int(lengths[order[end]])
+            if rows < max_batch_size and (rows + 1) * next_width <= max_batch_tokens:
+                continue
+        batches.append(order[start:end])
+        start = end
+    return batches
+
+
+def pad_rows(rows: List[List[int]], width: int, pad_value: int) -> np.ndarray:
+    """Right-pad token id lists into an int64 (len(rows), width) array."""
+    padded = np.full((len(rows), width), pad_value, dtype=np.int64)
+    for i, row in enumerate(rows):
+        padded[i, : len(row)] = row
+    return padded
+
+
+def truncate_pair(first: List[int], second: List[int], budget: int) -> Tuple[List[int], List[int]]:
+    """
+    Fit a (query, document) id pair into budget tokens like the fast
+    tokenizers' longest_first strategy: trim the longer side down to the
+    shorter one, then split what is left (the side that was longer keeps
+    the odd token; the document on a tie).
+    """
+    excess = len(first) + len(second) - budget
+    if excess <= 0:
+        return first, second
+    keep_first, keep_second = len(first), len(second)
+    diff = min(abs(keep_first - keep_second), excess)
+    if keep_first > keep_second:
+        keep_first -= diff
+    else:
+        keep_second -= diff
+    excess -= diff
+    if len(first) > len(second):
+        keep_first -= excess // 2
+        keep_second -= excess - excess // 2
+    else:
+        keep_second -= excess // 2
+        keep_first -= excess - excess // 2
+    return first[:max(keep_first, 0)], second[:max(keep_second, 0)]
@@ -18,8 +18,14 @@ class InferenceServiceConfig:
 
     # === Performance tuning ===
     MAX_BATCH_SIZE: int = int(os.getenv("MAX_BATCH_SIZE", "32"))
-    DYNAMIC_BATCHING: bool = os.getenv("DYNAMIC_BATCHING", "false").lower() == "true"
+    # Coalesce concurrent /embed requests into batches of up to MAX_BATCH_SIZE texts,
+    # waiting at most MAX_WAIT_MS for the batch to fill
+    DYNAMIC_BATCHING: bool = os.getenv("DYNAMIC_BATCHING", "true").lower() == "true"
     MAX_WAIT_MS: int = int(os.getenv("MAX_WAIT_MS", "10"))
+    # /rerank: pair length (capped by the tokenizer's model_max_length) and the
+    # padded-token budget of one length-bucketed batch
+    RERANK_MAX_LENGTH: int = int(os.getenv("RERANK_MAX_LENGTH", "512"))
+    RERANK_MAX_BATCH_TOKENS: int = int(os.getenv("RERANK_MAX_BATCH_TOKENS", "1024"))
 
     # === Service options ===
     HOST: str = os.getenv("INFERENCE_HOST", "0.0.0.0")
@@ -38,6 +44,8 @@ class InferenceServiceConfig:
             "device": cls.DEVICE,
             "max_batch_size": cls.MAX_BATCH_SIZE,
             "dynamic_batching": cls.DYNAMIC_BATCHING,
+            "max_wait_ms": cls.MAX_WAIT_MS,
+            "rerank_max_length": cls.RERANK_MAX_LENGTH,
         }
 
 
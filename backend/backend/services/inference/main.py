@@ -13,11 +13,13 @@ from pydantic import BaseModel, Field
 import uvicorn
 from prometheus_client import Counter, Histogram, make_asgi_app
 
+from inference_service.batching import EmbedBatcher
 from inference_service.config import config
 
 # Global model instances loaded at startup
 embedding_model = None
 rerank_model = None
+embed_batcher: Optional[EmbedBatcher] = None
 
 # Prometheus metrics
 REQUEST_COUNT = Counter(
@@ -30,6 +32,32 @@ REQUEST_DURATION = Histogram(
     'Request duration in seconds',
     ['endpoint']
 )
+EMBED_BATCH_SIZE = Histogram(
+    'inference_embed_batch_size',
+    'Texts per coalesced embedding batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+EMBED_BATCH_REQUESTS = Histogram(
+    'inference_embed_batch_requests',
+    'Requests merged into one embedding batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+EMBED_QUEUE_WAIT = Histogram(
+    'inference_embed_queue_wait_seconds',
+    'Time an /embed request waits before its batch starts',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+
+def _dense_embeddings(texts: List[str], batch_size: int):
+    """Encode with BGE-M3 and return the dense vectors as an array."""
+    import numpy as np
+
+    embeddings = embedding_model.encode(texts, batch_size=batch_size, max_length=8192)
+    # BGE-M3 returns dictionaries; extract dense embeddings
+    if isinstance(embeddings, dict):
+        embeddings = embeddings['dense_vecs']
+    return np.asarray(embeddings)
 
 
 # === Pydantic Models ===
@@ -82,7 +110,7 @@ startup_time = time.time()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle management."""
-    global embedding_model, rerank_model
+    global embedding_model, rerank_model, embed_batcher
 
     print("=" * 60)
     print("🚀 Starting Inference Service")
@@ -151,6 +179,17 @@ async def lifespan(app: FastAPI):
         embedding_model = None
         rerank_model = None
 
+    if embedding_model is not None and config.DYNAMIC_BATCHING:
+        embed_batcher = EmbedBatcher(
+            lambda texts: _dense_embeddings(texts, config.MAX_BATCH_SIZE),
+            max_batch_size=config.MAX_BATCH_SIZE,
+            max_wait_ms=config.MAX_WAIT_MS,
+            batch_size_histogram=EMBED_BATCH_SIZE,
+            requests_per_batch_histogram=EMBED_BATCH_REQUESTS,
+            queue_wait_histogram=EMBED_QUEUE_WAIT,
+        )
+        print(f"🧺 Dynamic batching: max {config.MAX_BATCH_SIZE} texts, {config.MAX_WAIT_MS} ms wait")
+
     print("\n" + "=" * 60)
     print("✅ Inference Service Ready!")
     print("=" * 60)
@@ -159,6 +198,8 @@ async def lifespan(app: FastAPI):
 
     # Teardown
     print("\n🧹 Shutting down...")
+    if embed_batcher is not None:
+        await embed_batcher.close()
     if embedding_model is not None:
         del embedding_model
     if rerank_model is not None:
@@ -268,27 +309,19 @@ async def embed_texts(request: EmbedRequest):
     start_time = time.perf_counter()
 
     try:
-        # 🚀 Use thread pool to offload blocking work
-        from starlette.concurrency import run_in_threadpool
-
-        def _encode():
-            return embedding_model.encode(
+        coalesced = embed_batcher is not None and request.batch_size is None
+        if coalesced:
+            # Merged with concurrent requests into one padded batch
+            embeddings = (await embed_batcher.submit(request.texts)).tolist()
+        else:
+            # 🚀 Use thread pool to offload blocking work
+            from starlette.concurrency import run_in_threadpool
+
+            embeddings = (await run_in_threadpool(
+                _dense_embeddings,
                 request.texts,
-                batch_size=request.batch_size or config.MAX_BATCH_SIZE,
-                max_length=8192
-            )
-
-        embeddings = await run_in_threadpool(_encode)
-
-        # BGE-M3 returns dictionaries; extract dense embeddings
-        if isinstance(embeddings, dict):
-            embeddings = embeddings['dense_vecs']
-
-        # Convert numpy arrays into plain lists
-        if hasattr(embeddings, 'tolist'):
-            embeddings = embeddings.tolist()
-        elif isinstance(embeddings, list) and hasattr(embeddings[0], 'tolist'):
-            embeddings = [e.tolist() for e in embeddings]
+                request.batch_size or config.MAX_BATCH_SIZE
+            )).tolist()
 
         # L2-normalise when requested
         if request.normalize:
@@ -311,7 +344,8 @@ async def embed_texts(request: EmbedRequest):
             batch_info={
                 "total_texts": len(request.texts),
                 "batch_size": request.batch_size or config.MAX_BATCH_SIZE,
-                "num_batches": (len(request.texts) + (request.batch_size or config.MAX_BATCH_SIZE) - 1) // (request.batch_size or config.MAX_BATCH_SIZE)
+                "num_batches": (len(request.texts) + (request.batch_size or config.MAX_BATCH_SIZE) - 1) // (request.batch_size or config.MAX_BATCH_SIZE),
+                "coalesced": coalesced
             }
         )
 
@@ -16,11 +16,13 @@ from pydantic import BaseModel, Field
 import uvicorn
 from prometheus_client import Counter, Histogram, make_asgi_app
 
+from inference_service.batching import EmbedBatcher, length_batches, pad_rows, truncate_pair
 from inference_service.config import config
 
 # Global ONNX sessions
 embedding_session = None
 rerank_session = None
+embed_batcher: Optional[EmbedBatcher] = None
 
 # Prometheus metrics - use separate registry to avoid conflicts
 from prometheus_client import CollectorRegistry, REGISTRY
@@ -38,6 +40,24 @@ REQUEST_DURATION = Histogram(
     ['endpoint'],
     registry=inference_registry
 )
+EMBED_BATCH_SIZE = Histogram(
+    'inference_embed_batch_size',
+    'Texts per coalesced embedding batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+    registry=inference_registry
+)
+EMBED_BATCH_REQUESTS = Histogram(
+    'inference_embed_batch_requests',
+    'Requests merged into one embedding batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+    registry=inference_registry
+)
+EMBED_QUEUE_WAIT = Histogram(
+    'inference_embed_queue_wait_seconds',
+    'Time an /embed request waits before its batch starts',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    registry=inference_registry
+)
 
 
 # === Pydantic Models (same as before) ===
@@ -194,50 +214,76 @@ class ONNXRerankerModel:
         onnx_file = os.path.join(model_path, "model.onnx") if os.path.isdir(model_path) else model_path
         self.session = ort.InferenceSession(onnx_file, sess_options=sess_options, providers=providers)
 
+        # Pair length: RERANK_MAX_LENGTH, capped by what the model supports
+        self.max_length = config.RERANK_MAX_LENGTH
+        model_max = getattr(self.tokenizer, "model_max_length", None)
+        if isinstance(model_max, int) and 0 < model_max < 100_000:
+            self.max_length = min(self.max_length, model_max)
+        input_names = {node.name for node in self.session.get_inputs()}
+        self.uses_token_types = (
+            "token_type_ids" in input_names and "token_type_ids" in self.tokenizer.model_input_names
+        )
+
         print(f"✅ ONNX reranker loaded: {onnx_file}")
         print(f"   Providers: {self.session.get_providers()}")
-        print(f"   CPU Threads: {num_threads}")
-
-    def compute_score(self, pairs: List[List[str]], batch_size: int = 64):
-        """Compute rerank scores using ONNX Runtime"""
-        all_scores = []
-
-        for i in range(0, len(pairs), batch_size):
-            batch_pairs = pairs[i:i + batch_size]
-
-            # Tokenize pairs
-            encoded = self.tokenizer(
-                batch_pairs,
-                padding=True,
-                truncation=True,
-                max_length=512,
-                return_tensors="np"
-            )
-
-            # Run ONNX inference
+        print(f"   CPU Threads: {num_threads}, max length: {self.max_length}")
+
+    def score(self, query: str, documents: List[str], batch_size: int = 64, max_batch_tokens: Optional[int] = None):
+        """
+        Compute rerank scores of documents against one query.
+
+        The query is tokenized once and its ids reused for every pair. Pairs
+        are sorted by length and packed into batches of similar length, so
+        short candidates are not padded to the longest one. Scores come back
+        in input order.
+        """
+        if not documents:
+            return np.zeros(0, dtype=np.float32)
+        max_batch_tokens = max_batch_tokens or config.RERANK_MAX_BATCH_TOKENS
+        tokenizer = self.tokenizer
+        budget = self.max_length - tokenizer.num_special_tokens_to_add(pair=True)
+
+        query_ids = tokenizer([query], add_special_tokens=False)["input_ids"][0]
+        # Cut documents to budget + query length only: longer ones truncate identically,
+        # but a shorter cut would change truncate_pair's longest_first tie-break
+        doc_ids = tokenizer(
+            list(documents), add_special_tokens=False, truncation=True, max_length=budget + len(query_ids)
+        )["input_ids"]
+        rows, type_rows = [], []
+        for ids in doc_ids:
+            first, second = truncate_pair(query_ids, ids, budget)
+            rows.append(tokenizer.build_inputs_with_special_tokens(first, second))
+            if self.uses_token_types:
+                type_rows.append(tokenizer.create_token_type_ids_from_sequences(first, second))
+
+        lengths = np.array([len(row) for row in rows], dtype=np.int64)
+        order = np.argsort(lengths, kind="stable")
+        scores = np.empty(len(rows), dtype=np.float32)
+        for batch in length_batches(order, lengths, batch_size, max_batch_tokens):
+            width = int(lengths[batch[-1]])
             ort_inputs = {
-                "input_ids": encoded["input_ids"].astype(np.int64),
-                "attention_mask": encoded["attention_mask"].astype(np.int64)
+                "input_ids": pad_rows([rows[i] for i in batch], width, tokenizer.pad_token_id or 0),
+                "attention_mask": (np.arange(width) < lengths[batch][:, None]).astype(np.int64),
             }
+            if self.uses_token_types:
+                ort_inputs["token_type_ids"] = pad_rows([type_rows[i] for i in batch], width, 0)
 
-            if "token_type_ids" in encoded:
-                ort_inputs["token_type_ids"] = encoded["token_type_ids"].astype(np.int64)
-
-            outputs = self.session.run(None, ort_inputs)
-
-            # Extract scores from logits
             # Output shape: (batch_size, 1) for classification model
-            logits = outputs[0]
-
-            # Squeeze to get (batch_size,)
-            if len(logits.shape) > 1 and logits.shape[-1] == 1:
-                scores = logits.squeeze(-1)  # (batch_size, 1) -> (batch_size,)
-            else:
-                scores = logits.flatten()  # Ensure 1D array
-
-            # Convert to list
-            all_scores.extend(scores.tolist())
+            logits = self.session.run(None, ort_inputs)[0]
+            scores[batch] = np.asarray(logits, dtype=np.float32).reshape(len(batch), -1)[:, 0]
+        return scores
 
+    def compute_score(self, pairs: List[List[str]], batch_size: int = 64):
+        """Compute rerank scores for (query, document) pairs, grouped by query"""
+        by_query = {}
+        for i, (query, doc) in enumerate(pairs):
+            by_query.setdefault(query, []).append((i, doc))
+
+        all_scores = [0.0] * len(pairs)
+        for query, items in by_query.items():
+            scores = self.score(query, [doc for _, doc in items], batch_size=batch_size)
+            for (i, _), score in zip(items, scores.tolist()):
+                all_scores[i] = score
         return all_scores
 
 
@@ -248,7 +294,7 @@ startup_time = time.time()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle management."""
-    global embedding_session, rerank_session
+    global embedding_session, rerank_session, embed_batcher
 
     print("=" * 60)
     print("🚀 Starting ONNX Inference Service")
@@ -305,6 +351,17 @@ async def lifespan(app: FastAPI):
         except:
             pass
 
+    if embedding_session is not None and config.DYNAMIC_BATCHING:
+        embed_batcher = EmbedBatcher(
+            lambda texts: embedding_session.encode(texts, batch_size=config.MAX_BATCH_SIZE),
+            max_batch_size=config.MAX_BATCH_SIZE,
+            max_wait_ms=config.MAX_WAIT_MS,
+            batch_size_histogram=EMBED_BATCH_SIZE,
+            requests_per_batch_histogram=EMBED_BATCH_REQUESTS,
+            queue_wait_histogram=EMBED_QUEUE_WAIT,
+        )
+        print(f"🧺 Dynamic batching: max {config.MAX_BATCH_SIZE} texts, {config.MAX_WAIT_MS} ms wait")
+
     print("\n" + "=" * 60)
     print("✅ Inference Service Ready!")
     print("=" * 60)
@@ -313,6 +370,8 @@ async def lifespan(app: FastAPI):
 
     # Teardown
     print("\n🧹 Shutting down...")
+    if embed_batcher is not None:
+        await embed_batcher.close()
 
 
 # === FastAPI App ===
@@ -357,10 +416,14 @@ async def embed_texts_api(request: EmbedRequest):
     start_time = time.perf_counter()
 
     try:
-        embeddings = embedding_session.encode(
-            request.texts,
-            batch_size=request.batch_size or config.MAX_BATCH_SIZE
-        )
+        if embed_batcher is not None and request.batch_size is None:
+            # Merged with concurrent requests into one padded batch
+            embeddings = await embed_batcher.submit(request.texts)
+        else:
+            embeddings = embedding_session.encode(
+                request.texts,
+                batch_size=request.batch_size or config.MAX_BATCH_SIZE
+            )
 
         # Normalize if requested
         if request.normalize:
@@ -380,7 +443,8 @@ async def embed_texts_api(request: EmbedRequest):
             processing_time_ms=round(duration * 1000, 2),
             batch_info={
                 "total_texts": len(request.texts),
-                "batch_size": request.batch_size or config.MAX_BATCH_SIZE
+                "batch_size": request.batch_size or config.MAX_BATCH_SIZE,
+                "coalesced": embed_batcher is not None and request.batch_size is None
             }
         )
 
@@ -403,8 +467,11 @@ async def rerank_documents_api(request: RerankRequest):
     start_time = time.perf_counter()
 
     try:
-        pairs = [[request.query, doc] for doc in request.documents]
-        scores = rerank_session.compute_score(pairs, batch_size=64)
+        if isinstance(rerank_session, ONNXRerankerModel):
+            scores = rerank_session.score(request.query, request.documents, batch_size=64).tolist()
+        else:
+            pairs = [[request.query, doc] for doc in request.documents]
+            scores = rerank_session.compute_score(pairs, batch_size=64)
 
         # Sort scores and keep top-k
         scored_docs = list(enumerate(scores))
@@ -0,0 +1,250 @@
+"""
+Streaming ingestion: chunk -> dedup -> batched embed -> batched async upsert.
+
+The stages run concurrently and are connected by bounded queues, so a
+large upload never holds more than a few batches of chunks, vectors and
+points in memory, and a slow stage (usually embedding) applies backpressure
+to the ones before it instead of letting work pile up.
+
+Point ids are derived from a hash of the chunk content. Chunks that are
+already in the collection (or repeated within the run) are neither embedded
+nor upserted again, so re-uploading a file is cheap and idempotent.
+"""
+import asyncio
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+import structlog
+from qdrant_client.http import models as qdrant_models
+
+from backend.services.qdrant_client import AsyncQdrant
+from backend.utils.text_splitter import TokenCounter, iter_spans
+
+logger = structlog.get_logger(__name__)
+
+_DONE = object()
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a chunk's whitespace-normalized text."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def point_id_for(chunk_hash: str) -> str:
+    """Deterministic Qdrant point id (UUID) for a content hash."""
+    return str(uuid.UUID(hex=chunk_hash[:32]))
+
+
+@dataclass
+class IngestDocument:
+    title: str
+    content: str
+    source: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    document_id: Optional[int] = None
+
+
+@dataclass
+class IngestStats:
+    """Per-document outcome."""
+    document_id: int
+    title: str
+    num_chunks: int = 0
+    duplicates: int = 0
+    embedding_time_ms: float = 0.0
+
+
+@dataclass
+class _Chunk:
+    doc_index: int
+    chunk_index: int
+    text: str
+    hash: str
+
+
+class IngestionPipeline:
+    """Bounded-queue ingestion pipeline for one target collection."""
+
+    def __init__(
+        self,
+        collection: str,
+        embed_fn: Callable[[List[str]], Awaitable[List[List[float]]]],
+        *,
+        qdrant: Optional[AsyncQdrant] = None,
+        chunk_size: int = 512,
+        chunk_overlap: int = 50,
+        count_tokens: Optional[TokenCounter] = None,
+        embed_batch_size: int = 64,
+        upsert_batch_size: int = 256,
+        queue_batches: int = 4,
+        upsert_concurrency: int = 2,
+        on_upsert: Optional[Callable[[List[qdrant_models.PointStruct]], None]] = None
+    ):
+        """
+        Args:
+            collection: Target Qdrant collection
+            embed_fn: Async texts -> vectors (one model call per batch)
+            qdrant: Async Qdrant facade (default: shared client)
+            chunk_size/chunk_overlap: Chunk budget (characters, or tokens with count_tokens)
+            count_tokens: Batch token counter of the embedding tokenizer (see text_splitter)
+            embed_batch_size: Chunks per embedding call
+            upsert_batch_size: Points per upsert request
+            queue_batches: Batches buffered between stages (backpressure bound)
+            upsert_concurrency: Upsert requests in flight
+            on_upsert: Called with each upserted batch (e.g. BM25/title index updates),
+                in a worker thread since it does file I/O
+        """
+        self.collection = collection
+        self.embed_fn = embed_fn
+        self.qdrant = qdrant or AsyncQdrant()
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.count_tokens = count_tokens
+        self.embed_batch_size = max(1, embed_batch_size)
+        self.upsert_batch_size = max(1, upsert_batch_size)
+        self.queue_batches = max(1, queue_batches)
+        self.upsert_concurrency = max(1, upsert_concurrency)
+        self.on_upsert = on_upsert
+
+    async def run(self, documents: Iterable[IngestDocument]) -> List[IngestStats]:
+        documents = list(documents)
+        base_id = int(time.time() * 1000)
+        stats = [
+            IngestStats(document_id=doc.document_id or base_id + i, title=doc.title)
+            for i, doc in enumerate(documents)
+        ]
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_batches)
+        fresh_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_batches)
+        point_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_batches)
+
+        stages = [
+            asyncio.create_task(self._chunk_stage(documents, stats, chunk_queue)),
+            asyncio.create_task(self._dedup_stage(stats, chunk_queue, fresh_queue)),
+            asyncio.create_task(self._embed_stage(documents, stats, fresh_queue, point_queue)),
+        ] + [
+            asyncio.create_task(self._upsert_stage(point_queue))
+            for _ in range(self.upsert_concurrency)
+        ]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            for task in stages:
+                task.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+        return stats
+
+    async def _chunk_stage(self, documents, stats, out: asyncio.Queue):
+        batch: List[_Chunk] = []
+        seen: Set[str] = set()
+        for doc_index, doc in enumerate(documents):
+            spans = iter_spans(
+                doc.content,
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                count_tokens=self.count_tokens,
+            )
+            chunk_index = 0
+            while True:
+                # Sentence splitting and token counting run off the event loop
+                window = await asyncio.to_thread(list, islice(spans, self.embed_batch_size))
+                if not window:
+                    break
+                for span in window:
+                    text = doc.content[span.start:span.end]
+                    stats[doc_index].num_chunks += 1
+                    chunk_hash = content_hash(text)
+                    if chunk_hash in seen:
+                        stats[doc_index].duplicates += 1
+                    else:
+                        seen.add(chunk_hash)
+                        batch.append(_Chunk(doc_index, chunk_index, text, chunk_hash))
+                    chunk_index += 1
+                    if len(batch) >= self.embed_batch_size:
+                        await out.put(batch)  # blocks while the embedder is behind
+                        batch = []
+        if batch:
+            await out.put(batch)
+        await out.put(_DONE)
+
+    async def _existing_ids(self, ids: List[str]) -> Set[str]:
+        try:
+            points = await self.qdrant.retrieve(
+                collection_name=self.collection,
+                ids=ids,
+                with_payload=False,
+                with_vectors=False,
+            )
+        except Exception as exc:
+            logger.warning("Dedup lookup failed, embedding batch anyway", error=str(exc))
+            return set()
+        return {str(point.id) for point in points}
+
+    async def _dedup_stage(self, stats, inp: asyncio.Queue, out: asyncio.Queue):
+        """Drop chunks already stored (lookups overlap with embedding of the previous batch)."""
+        while True:
+            batch = await inp.get()
+            if batch is _DONE:
+                break
+            existing = await self._existing_ids([point_id_for(c.hash) for c in batch])
+            fresh: List[_Chunk] = []
+            for chunk in batch:
+                if point_id_for(chunk.hash) in existing:
+                    stats[chunk.doc_index].duplicates += 1
+                else:
+                    fresh.append(chunk)
+            if fresh:
+                await out.put(fresh)
+        await out.put(_DONE)
+
+    async def _embed_stage(self, documents, stats, inp: asyncio.Queue, out: asyncio.Queue):
+        pending: List[qdrant_models.PointStruct] = []
+        while True:
+            fresh = await inp.get()
+            if fresh is _DONE:
+                break
+
+            tic = time.perf_counter()
+            vectors = await self.embed_fn([c.text for c in fresh])
+            per_chunk_ms = (time.perf_counter() - tic) * 1000 / len(fresh)
+
+            for chunk, vector in zip(fresh, vectors):
+                doc = documents[chunk.doc_index]
+                doc_stats = stats[chunk.doc_index]
+                doc_stats.embedding_time_ms += per_chunk_ms
+                pending.append(
+                    qdrant_models.PointStruct(
+                        id=point_id_for(chunk.hash),
+                        vector=vector,
+                        payload={
+                            "document_id": doc_stats.document_id,
+                            "chunk_index": chunk.chunk_index,
+                            "content": chunk.text,
+                            "content_hash": chunk.hash,
+                            "title": doc.title,
+                            "source": doc.source,
+                            "metadata": doc.metadata,
+                        },
+                    )
+                )
+            while len(pending) >= self.upsert_batch_size:
+                await out.put(pending[:self.upsert_batch_size])
+                pending = pending[self.upsert_batch_size:]
+
+        if pending:
+            await out.put(pending)
+        for _ in range(self.upsert_concurrency):
+            await out.put(_DONE)
+
+    async def _upsert_stage(self, inp: asyncio.Queue):
+        while True:
+            points = await inp.get()
+            if points is _DONE:
+                return
+            await self.qdrant.upsert(collection_name=self.collection, points=points)
+            if self.on_upsert is not None:
+                await asyncio.to_thread(self.on_upsert, points)
@@ -2,15 +2,23 @@
 Knowledge Cold/Hot Tier Management Service
 
 Handles automatic archival of cold data and lazy rehydration of accessed cold documents.
+
+Retrieval only records accesses in memory (AccessTracker.record). A
+background task flushes them every ACCESS_FLUSH_INTERVAL_S seconds as one
+multi-row UPDATE per table and one commit, then queues any cold documents
+among them for rehydration; a single worker rehydrates them one at a time,
+each document at most once while it is queued.
 """
 
+import asyncio
 import os
 import logging
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Iterable, Optional, Set
 
-from sqlalchemy import select, update, func, and_, or_, Integer
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, and_, or_, case, Integer
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from models import KnowledgeDocument, KnowledgeChunk
 from services.metrics import (
@@ -27,6 +35,7 @@ logger = logging.getLogger(__name__)
 COLD_THRESHOLD_DAYS = int(os.getenv("KNOWLEDGE_COLD_THRESHOLD_DAYS", "30"))  # Days of inactivity before archival
 ARCHIVE_BATCH_SIZE = int(os.getenv("KNOWLEDGE_ARCHIVE_BATCH_SIZE", "100"))  # Batch size for archival
 REHYDRATE_BATCH_SIZE = int(os.getenv("KNOWLEDGE_REHYDRATE_BATCH_SIZE", "50"))  # Batch size for rehydration
+ACCESS_FLUSH_INTERVAL_S = float(os.getenv("KNOWLEDGE_ACCESS_FLUSH_INTERVAL_S", "5"))  # Access-tracking write-behind interval
 
 
 async def track_document_access(
@@ -74,6 +83,178 @@ async def track_chunk_usage(
         await db.rollback()
 
 
+class AccessTracker:
+    """
+    Write-behind access tracking for documents and chunks.
+
+    record() only updates in-memory counters; flush() writes them with one
+    UPDATE per table (per-document increments via CASE) and a single
+    commit, and enqueues the cold documents it touched for rehydration.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        flush_interval_s: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval_s = flush_interval_s or ACCESS_FLUSH_INTERVAL_S
+        self._doc_counts: Counter = Counter()
+        self._chunk_ids: Set[int] = set()
+        self._rehydrate_queue: Optional[asyncio.Queue] = None
+        self._rehydrate_pending: Set[int] = set()  # queued or in progress
+        self._flusher: Optional[asyncio.Task] = None
+        self._rehydrator: Optional[asyncio.Task] = None
+        self.stats = {"flushes": 0, "flush_errors": 0, "rehydrations_queued": 0}
+
+    # ------------------------------------------------------------------
+    # Request path (memory only)
+    # ------------------------------------------------------------------
+    def record(self, document_ids: Iterable[int], chunk_ids: Iterable[int]) -> None:
+        """Count one access per document and mark chunks as used."""
+        self._doc_counts.update(document_ids)
+        self._chunk_ids.update(chunk_ids)
+        self._ensure_tasks()
+
+    @property
+    def pending(self) -> int:
+        return len(self._doc_counts) + len(self._chunk_ids)
+
+    # ------------------------------------------------------------------
+    # Write-behind flushing
+    # ------------------------------------------------------------------
+    def _ensure_tasks(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # no event loop (scripts/tests): flush() explicitly
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._run_flusher())
+        if self._rehydrator is None or self._rehydrator.done():
+            self._rehydrate_queue = asyncio.Queue()
+            for document_id in self._rehydrate_pending:
+                self._rehydrate_queue.put_nowait(document_id)
+            self._rehydrator = loop.create_task(self._run_rehydrator())
+
+    async def _run_flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            if self.pending:
+                await self.flush()
+
+    async def flush(self) -> bool:
+        """Write pending accesses and queue cold documents for rehydration. Returns True on success."""
+        doc_counts, self._doc_counts = self._doc_counts, Counter()
+        chunk_ids, self._chunk_ids = self._chunk_ids, set()
+        if not doc_counts and not chunk_ids:
+            return True
+
+        cold_ids: list = []
+        try:
+            async with self.session_factory() as db:
+                if doc_counts:
+                    # Sorted ids: concurrent flushes from several workers lock rows in the same order
+                    ids = sorted(doc_counts)
+                    await db.execute(
+                        update(KnowledgeDocument)
+                        .where(KnowledgeDocument.id.in_(ids))
+                        .values(
+                            access_count=KnowledgeDocument.access_count
+                            + case(doc_counts, value=KnowledgeDocument.id, else_=0),
+                            last_access_at=func.now(),
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                if chunk_ids:
+                    await db.execute(
+                        update(KnowledgeChunk)
+                        .where(KnowledgeChunk.id.in_(sorted(chunk_ids)))
+                        .values(last_used_at=func.now())
+                        .execution_options(synchronize_session=False)
+                    )
+                await db.commit()
+
+                if doc_counts:
+                    result = await db.execute(
+                        select(KnowledgeDocument.id).where(
+                            KnowledgeDocument.id.in_(list(doc_counts)),
+                            KnowledgeDocument.is_cold == True,  # noqa: E712
+                        )
+                    )
+                    cold_ids = list(result.scalars().all())
+        except Exception as e:
+            # Keep the accesses for the next flush
+            self._doc_counts.update(doc_counts)
+            self._chunk_ids.update(chunk_ids)
+            self.stats["flush_errors"] += 1
+            logger.error(f"Failed to flush knowledge access tracking: {e}")
+            return False
+
+        self.stats["flushes"] += 1
+        for document_id in cold_ids:
+            self.enqueue_rehydration(document_id)
+        return True
+
+    # ------------------------------------------------------------------
+    # Background rehydration
+    # ------------------------------------------------------------------
+    def enqueue_rehydration(self, document_id: int) -> bool:
+        """Queue a cold document for rehydration; False if it is already queued."""
+        if document_id in self._rehydrate_pending:
+            return False
+        # Before marking it pending: a (re)started rehydrator re-queues everything pending
+        self._ensure_tasks()
+        self._rehydrate_pending.add(document_id)
+        self.stats["rehydrations_queued"] += 1
+        if self._rehydrate_queue is not None:
+            self._rehydrate_queue.put_nowait(document_id)
+        return True
+
+    async def _run_rehydrator(self) -> None:
+        queue = self._rehydrate_queue
+        while True:
+            document_id = await queue.get()
+            try:
+                async with self.session_factory() as db:
+                    await rehydrate_document(db, document_id)
+            except Exception as e:
+                logger.warning(f"Failed to rehydrate cold document {document_id}: {e}")
+            finally:
+                self._rehydrate_pending.discard(document_id)
+
+    async def close(self) -> None:
+        """Stop the background tasks and write out pending accesses."""
+        for task in (self._flusher, self._rehydrator):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._flusher = self._rehydrator = None
+        if self.pending:
+            await self.flush()
+
+
+_access_tracker: Optional[AccessTracker] = None
+
+
+def get_access_tracker(db: AsyncSession) -> AccessTracker:
+    """Process-wide tracker; its sessions use the engine of the first request session seen."""
+    global _access_tracker
+    if _access_tracker is None:
+        _access_tracker = AccessTracker(async_sessionmaker(db.bind, expire_on_commit=False))
+    return _access_tracker
+
+
+async def close_access_tracker() -> None:
+    """Flush pending access counts and stop the tracker's tasks (application shutdown)."""
+    global _access_tracker
+    tracker, _access_tracker = _access_tracker, None
+    if tracker is not None:
+        await tracker.close()
+
+
 async def archive_cold_documents(
     db: AsyncSession,
     cold_threshold_days: Optional[int] = None,
@@ -224,7 +405,7 @@ async def rehydrate_document(
 
         # Regenerate embeddings
         texts = [chunk.content for chunk in chunks]
-        embeddings = embed_texts(texts)
+        embeddings = await embed_texts(texts)
 
         rehydrated_count = 0
         for chunk, embedding in zip(chunks, embeddings):
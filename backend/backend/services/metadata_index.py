@@ -1,24 +1,83 @@
 """
 Utilities to build lightweight metadata indexes for author/title lookups.
+
+Titles are matched through a character-trigram inverted index: a query only
+touches the postings of its own trigrams, and candidates are scored by the
+Dice coefficient of their trigram sets (substring matches score 1.0). The
+index is persisted as a JSON snapshot under METADATA_INDEX_CACHE_DIR, so a
+restart loads it instead of scrolling the whole collection again.
+
+Ingestion and deletion append add/del/clear ops to {collection}_titles.delta
+(under an flock, so workers never overwrite each other) and every worker
+replays new ops on its next lookup. The snapshot is only rewritten once the
+delta outgrows it, which keeps the I/O per ingested chunk constant.
 """
 from __future__ import annotations
 
+import json
+import os
 import re
-from dataclasses import dataclass
-from difflib import SequenceMatcher
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from functools import lru_cache
-from typing import Dict, Iterable, List, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+    FCNTL_AVAILABLE = False
 
 from backend.config.settings import settings
 from backend.services.qdrant_client import get_qdrant_client
 
+logger = structlog.get_logger(__name__)
+
 _TOKEN_PATTERN = re.compile(r"[^a-z0-9]+")
 
+SNAPSHOT_VERSION = 1
+DEFAULT_CACHE_DIR = os.getenv("METADATA_INDEX_CACHE_DIR", "./cache")
+# Chunks kept per title; lookups return at most METADATA_TITLE_MATCH_LIMIT of them
+MAX_ENTRIES_PER_TITLE = int(os.getenv("METADATA_ENTRIES_PER_TITLE", "16"))
+MIN_TITLE_SCORE = 0.2
+# Delta bytes tolerated before the snapshot is rewritten (or the snapshot size, if larger)
+MIN_COMPACT_BYTES = 1 << 20
+
 
 def _normalize(text: str) -> str:
     return _TOKEN_PATTERN.sub(" ", text.lower()).strip()
 
 
+def _trigrams(normalized: str) -> set:
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _delta_path(path: Path) -> Path:
+    return path.with_suffix(".delta")
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Cross-process lock on a snapshot's delta (not re-entrant: flock is per open file)."""
+    if not FCNTL_AVAILABLE:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 @dataclass(frozen=True)
 class MetadataEntry:
     point_id: str
@@ -33,6 +92,283 @@ class MetadataEntry:
         return _normalize(self.title or "")
 
 
+class TitleIndex:
+    """Trigram inverted index over normalized titles."""
+
+    def __init__(self, max_entries_per_title: int = MAX_ENTRIES_PER_TITLE):
+        self.max_entries_per_title = max_entries_per_title
+        self.titles: List[str] = []
+        self.entries: List[List[MetadataEntry]] = []
+        self._title_ids: Dict[str, int] = {}
+        self._trigram_counts: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        # numpy views of _postings / _trigram_counts, rebuilt lazily after additions
+        self._posting_arrays: Dict[str, np.ndarray] = {}
+        self._count_array: Optional[np.ndarray] = None
+        self._point_titles: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        # Snapshot this index follows (set by load()/save()) and how much of its delta is applied
+        self.path: Optional[Path] = None
+        self._snapshot_mtime = 0
+        self._delta_offset = 0
+
+    def __len__(self) -> int:
+        return len(self._title_ids)
+
+    def add(self, entries: Iterable[MetadataEntry]) -> int:
+        """Index entries; returns how many were stored (new titles or chunks)."""
+        with self._lock:
+            return self._add(entries)
+
+    def remove(self, point_ids: Iterable[str]) -> int:
+        """Drop the entries of deleted points; returns how many were indexed."""
+        with self._lock:
+            return self._remove(point_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _add(self, entries: Iterable[MetadataEntry]) -> int:
+        added = 0
+        for entry in entries:
+            key = entry.normalized_title
+            if not key:
+                continue
+            if entry.point_id in self._point_titles:
+                self._remove([entry.point_id])  # re-upserted point: replace it
+            title_id = self._title_ids.get(key)
+            if title_id is None:
+                title_id = len(self.titles)
+                self._title_ids[key] = title_id
+                self.titles.append(key)
+                self.entries.append([])
+                grams = _trigrams(key)
+                self._trigram_counts.append(len(grams))
+                self._count_array = None
+                for gram in grams:
+                    self._postings.setdefault(gram, []).append(title_id)
+                    self._posting_arrays.pop(gram, None)
+            if len(self.entries[title_id]) < self.max_entries_per_title:
+                self.entries[title_id].append(entry)
+                self._point_titles[entry.point_id] = title_id
+                added += 1
+        return added
+
+    def _remove(self, point_ids: Iterable[str]) -> int:
+        removed = 0
+        for point_id in point_ids:
+            title_id = self._point_titles.pop(str(point_id), None)
+            if title_id is None:
+                continue
+            title_entries = self.entries[title_id]
+            title_entries[:] = [e for e in title_entries if e.point_id != str(point_id)]
+            removed += 1
+            if not title_entries:
+                # Unlist the emptied title so every match still holds an entry;
+                # its id stays allocated (a re-added title gets a new one)
+                key = self.titles[title_id]
+                del self._title_ids[key]
+                for gram in _trigrams(key):
+                    self._postings[gram].remove(title_id)
+                    self._posting_arrays.pop(gram, None)
+        return removed
+
+    def _clear(self) -> None:
+        # Fresh containers: a search() past its locked section keeps the old titles list
+        self.titles = []
+        self.entries = []
+        self._title_ids = {}
+        self._trigram_counts = []
+        self._postings = {}
+        self._posting_arrays = {}
+        self._count_array = None
+        self._point_titles = {}
+
+    def _apply_ops(self, ops: Iterable[Dict]) -> None:
+        for op in ops:
+            if op["op"] == "add":
+                self._add([MetadataEntry(**op["entry"])])
+            elif op["op"] == "del":
+                self._remove([op["id"]])
+            elif op["op"] == "clear":
+                self._clear()
+
+    def _posting_array(self, gram: str) -> Optional[np.ndarray]:
+        array = self._posting_arrays.get(gram)
+        if array is None:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return None
+            array = np.asarray(posting, dtype=np.int32)
+            self._posting_arrays[gram] = array
+        return array
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        min_score: float = MIN_TITLE_SCORE
+    ) -> List[Tuple[int, float]]:
+        """Return up to limit (title id, similarity) pairs scoring above min_score, best first."""
+        normalized_query = _normalize(query)
+        if not normalized_query:
+            return []
+        query_grams = _trigrams(normalized_query)
+
+        with self._lock:
+            arrays = [a for a in (self._posting_array(g) for g in query_grams) if a is not None]
+            if not arrays:
+                return []
+            # bincount over postings only; the per-title zero fill is a memset
+            counts = np.bincount(np.concatenate(arrays), minlength=len(self.titles))
+            title_ids = np.flatnonzero(counts)
+            overlaps = counts[title_ids]
+            if self._count_array is None:
+                self._count_array = np.asarray(self._trigram_counts, dtype=np.int32)
+            title_counts = self._count_array[title_ids]
+            titles = self.titles
+
+        scores = 2.0 * overlaps / (len(query_grams) + title_counts)
+        # Every trigram of the shorter string is shared: check for a substring match
+        contained = (overlaps == len(query_grams)) | (overlaps == title_counts)
+        for i in np.flatnonzero(contained):
+            title_key = titles[title_ids[i]]
+            if normalized_query in title_key or title_key in normalized_query:
+                scores[i] = 1.0
+
+        keep = scores > min_score
+        title_ids, scores = title_ids[keep], scores[keep]
+        if limit is not None and limit < len(scores):
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            title_ids, scores = title_ids[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(title_ids[i]), float(scores[i])) for i in order]
+
+    def matches(self, query: str, limit: Optional[int] = None) -> List[Tuple[MetadataEntry, float]]:
+        """search() resolved to entries, consistent with concurrent deletes."""
+        with self._lock:
+            return [
+                (entry, score)
+                for title_id, score in self.search(query, limit=limit)
+                for entry in self.entries[title_id]
+            ]
+
+    def _write_snapshot(self, path: Path, collection: str) -> None:
+        """Replace the snapshot with this index and empty its delta (caller holds the file lock)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "collection": collection,
+            "entries": [asdict(entry) for title_entries in self.entries for entry in title_entries],
+        }
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(snapshot))
+        os.replace(tmp, path)
+        _delta_path(path).write_bytes(b"")
+        self.path = path
+        self._snapshot_mtime = path.stat().st_mtime_ns
+        self._delta_offset = 0
+
+    def save(self, path: Path, collection: str) -> None:
+        """Write a fresh snapshot of this index, discarding any delta."""
+        with _file_lock(path), self._lock:
+            self._write_snapshot(path, collection)
+
+    def compact(self, collection: str) -> None:
+        """Fold the delta (including other workers' unread ops) into the snapshot."""
+        if self.path is None:
+            return
+        with _file_lock(self.path), self._lock:
+            self._replay_delta()
+            self._write_snapshot(self.path, collection)
+
+    @classmethod
+    def load(cls, path: Path, collection: str) -> Optional["TitleIndex"]:
+        """Load a snapshot and replay its delta; None when missing, unreadable or for another format/collection."""
+        index = cls()
+        with index._lock:
+            if not index._load_files(path, collection):
+                return None
+        return index
+
+    def _load_files(self, path: Path, collection: str) -> bool:
+        try:
+            mtime = path.stat().st_mtime_ns
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return False
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("collection") != collection:
+            return False
+        self._clear()
+        self._add(MetadataEntry(**entry) for entry in snapshot.get("entries", []))
+        self.path = path
+        self._snapshot_mtime = mtime
+        self._delta_offset = 0
+        self._replay_delta()
+        return True
+
+    def _replay_delta(self) -> None:
+        """Apply whole lines appended to the delta since the last replay."""
+        try:
+            with open(_delta_path(self.path), "rb") as f:
+                f.seek(self._delta_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1  # a partial trailing line is still being written
+        if end:
+            self._apply_ops(json.loads(line) for line in data[:end].splitlines() if line)
+            self._delta_offset += end
+
+    def refresh(self, collection: str) -> None:
+        """Pick up ops appended (or a compaction done) by other workers; a stat when nothing changed."""
+        if self.path is None:
+            return
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return  # invalidated: keep serving until this process rebuilds
+        try:
+            size = _delta_path(self.path).stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if mtime == self._snapshot_mtime and size == self._delta_offset:
+            return
+        with self._lock:
+            if mtime != self._snapshot_mtime or size < self._delta_offset:
+                self._load_files(self.path, collection)
+            else:
+                self._replay_delta()
+
+    @property
+    def delta_bytes(self) -> int:
+        return self._delta_offset
+
+
+def snapshot_path_for(collection: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Path:
+    return Path(cache_dir) / f"{collection}_titles.json"
+
+
+def _entry_from_payload(point_id, payload: Dict) -> Optional[MetadataEntry]:
+    metadata = payload.get("metadata") or {}
+    content = (
+        payload.get("text")
+        or payload.get("content")
+        or metadata.get("content")
+        or ""
+    )
+    if not content:
+        return None
+    return MetadataEntry(
+        point_id=str(point_id),
+        content=content,
+        source=payload.get("source") or metadata.get("source") or "",
+        authors=payload.get("authors") or metadata.get("authors"),
+        title=payload.get("title") or metadata.get("title"),
+    )
+
+
 def _build_metadata_entries() -> List[MetadataEntry]:
     client = get_qdrant_client()
     entries: List[MetadataEntry] = []
@@ -54,25 +390,9 @@ def _build_metadata_entries() -> List[MetadataEntry]:
         )
 
         for point in points:
-            payload = point.payload or {}
-            metadata = payload.get("metadata") or {}
-            content = (
-                payload.get("text")
-                or payload.get("content")
-                or metadata.get("content")
-                or ""
-            )
-            if not content:
-                continue
-
-            entry = MetadataEntry(
-                point_id=str(point.id),
-                content=content,
-                source=payload.get("source") or metadata.get("source") or "",
-                authors=payload.get("authors") or metadata.get("authors"),
-                title=payload.get("title") or metadata.get("title"),
-            )
-            entries.append(entry)
+            entry = _entry_from_payload(point.id, point.payload or {})
+            if entry is not None:
+                entries.append(entry)
 
         if offset is None:
             break
@@ -81,47 +401,87 @@ def _build_metadata_entries() -> List[MetadataEntry]:
 
 
 @lru_cache(maxsize=1)
-def _title_index() -> Dict[str, List[MetadataEntry]]:
-    index: Dict[str, List[MetadataEntry]] = {}
-    for entry in _build_metadata_entries():
-        key = entry.normalized_title
-        if not key:
-            continue
-        index.setdefault(key, []).append(entry)
-    return index
+def _title_index() -> TitleIndex:
+    collection = settings.QDRANT_COLLECTION
+    path = snapshot_path_for(collection)
+    index = TitleIndex.load(path, collection)
+    if index is not None:
+        logger.info("Loaded title index snapshot", collection=collection, titles=len(index))
+        return index
 
+    index = TitleIndex()
+    index.add(_build_metadata_entries())
+    try:
+        index.save(path, collection)
+    except OSError as e:
+        logger.warning("Failed to save title index snapshot", collection=collection, error=str(e))
+    logger.info("Built title index", collection=collection, titles=len(index))
+    return index
 
-def _title_candidates(query: str) -> Iterable[Tuple[MetadataEntry, float]]:
-    normalized_query = _normalize(query)
-    if not normalized_query:
-        return []
 
+def _title_candidates(query: str, limit: Optional[int] = None) -> Iterable[Tuple[MetadataEntry, float]]:
     index = _title_index()
-    scored: List[Tuple[MetadataEntry, float]] = []
+    index.refresh(settings.QDRANT_COLLECTION)
+    return index.matches(query, limit=limit)
 
-    for title_key, entries in index.items():
-        if not title_key:
-            continue
 
-        if normalized_query in title_key or title_key in normalized_query:
-            score = 1.0
-        else:
-            score = SequenceMatcher(None, normalized_query, title_key).ratio()
+def search_by_title(query: str, limit: int = 5) -> List[MetadataEntry]:
+    results: List[MetadataEntry] = []
+    # Every matched title holds at least one entry, so `limit` titles are enough
+    for entry, _ in _title_candidates(query, limit=limit):
+        if len(results) >= limit:
+            break
+        results.append(entry)
+    return results
 
-        if score <= 0.2:
-            continue
 
-        for entry in entries:
-            scored.append((entry, score))
+def title_index_ready() -> bool:
+    """True once the index is in memory, i.e. search_by_title will not block on a build."""
+    return _title_index.cache_info().currsize > 0
 
-    scored.sort(key=lambda item: item[1], reverse=True)
-    return scored
 
+def warm_metadata_index() -> None:
+    _ = _title_index()
 
-def search_by_title(query: str, limit: int = 5) -> List[MetadataEntry]:
-    candidates = _title_candidates(query)
-    return [entry for entry, _ in candidates][:limit]
 
+def _append_ops(collection: str, ops: List[Dict]) -> None:
+    """Append ops to a collection's delta and apply them to the live index, if any."""
+    path = snapshot_path_for(collection)
+    if not ops or not path.exists():
+        return  # not built yet: the first build scrolls the collection anyway
+    data = b"".join((json.dumps(op) + "\n").encode() for op in ops)
+    try:
+        with _file_lock(path):
+            with open(_delta_path(path), "ab") as f:
+                f.write(data)
+        if collection != settings.QDRANT_COLLECTION or not title_index_ready():
+            return
+        index = _title_index()
+        index.refresh(collection)
+        if index.delta_bytes > max(MIN_COMPACT_BYTES, path.stat().st_size):
+            index.compact(collection)
+    except OSError as e:
+        logger.warning("Failed to record title index update", collection=collection, error=str(e))
 
-def warm_metadata_index() -> None:
-    _ = _title_index()
+
+def record_upsert(collection: str, points: Iterable[Tuple[str, Dict]]) -> None:
+    """Record newly ingested (point_id, payload) pairs in the collection's title index."""
+    entries = (_entry_from_payload(pid, payload) for pid, payload in points)
+    _append_ops(collection, [{"op": "add", "entry": asdict(e)} for e in entries if e is not None and e.title])
+
+
+def record_delete(collection: str, point_ids: Optional[Iterable[str]] = None) -> None:
+    """Record deleted points; point_ids=None means the whole collection was dropped."""
+    if point_ids is None:
+        _append_ops(collection, [{"op": "clear"}])
+    else:
+        _append_ops(collection, [{"op": "del", "id": str(pid)} for pid in point_ids])
+
+
+def invalidate(collection: str, cache_dir: str = DEFAULT_CACHE_DIR) -> None:
+    """Drop the snapshot (and live index) of a collection that was bulk-reloaded."""
+    path = snapshot_path_for(collection, cache_dir)
+    path.unlink(missing_ok=True)
+    _delta_path(path).unlink(missing_ok=True)
+    if collection == settings.QDRANT_COLLECTION:
+        _title_index.cache_clear()
@@ -236,6 +236,23 @@ embedding_tokens_histogram = Histogram(
     buckets=[10, 50, 100, 200, 500, 1000, 2000, 5000]
 )
 
+# Shared query-embedding cache
+embedding_cache_lookups_counter = Counter(
+    "embedding_cache_lookups_total",
+    "Query-embedding cache lookups",
+    ["result"]  # result: hit|miss
+)
+
+embedding_cache_saved_seconds_counter = Counter(
+    "embedding_cache_saved_seconds_total",
+    "Embedding compute time avoided by cache hits (seconds)",
+)
+
+embedding_cache_entries_gauge = Gauge(
+    "embedding_cache_entries",
+    "Number of embeddings held in the query-embedding cache",
+)
+
 # Reranking performance
 rerank_duration_histogram = Histogram(
     "rerank_duration_seconds",
@@ -257,6 +274,12 @@ rerank_score_distribution_histogram = Histogram(
     buckets=[-1.0, -0.5, 0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
 )
 
+rerank_cache_lookups_counter = Counter(
+    "rerank_cache_lookups_total",
+    "Reranker score cache lookups (one per candidate chunk)",
+    ["result"]  # result: hit|miss
+)
+
 # End-to-end RAG request performance
 rag_request_duration_histogram = Histogram(
     "rag_request_duration_seconds",
@@ -282,10 +305,40 @@ model_info_gauge = Gauge(
     ["model_type", "model_name", "model_version", "model_hash"]  # model_type: embedding|reranker
 )
 
+# Code assistant sandboxed test execution
+code_executor_queue_depth_gauge = Gauge(
+    "code_executor_queue_depth",
+    "Test runs waiting for a free sandbox worker",
+)
+
+code_executor_active_runs_gauge = Gauge(
+    "code_executor_active_runs",
+    "Test runs currently executing",
+)
+
+code_executor_run_duration_histogram = Histogram(
+    "code_executor_run_duration_seconds",
+    "Sandboxed test run duration (excluding queue wait)",
+    ["language", "outcome"],  # outcome: passed|failed|timeout|error
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0]
+)
+
+code_executor_queue_wait_histogram = Histogram(
+    "code_executor_queue_wait_seconds",
+    "Time a test run waited for a sandbox worker",
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0]
+)
+
 # Initialize circuit-breaker state gauges
 circuit_breaker_state_gauge.labels(service="embedding").set(0)
 circuit_breaker_state_gauge.labels(service="rerank").set(0)
 
+# Initialize embedding cache lookup series (hit rate = hit / (hit + miss))
+embedding_cache_lookups_counter.labels(result="hit")
+embedding_cache_lookups_counter.labels(result="miss")
+rerank_cache_lookups_counter.labels(result="hit")
+rerank_cache_lookups_counter.labels(result="miss")
+
 __all__ = [
     # AI Governance metrics
     "governance_checkpoint_counter",
@@ -321,10 +374,18 @@ __all__ = [
     "embedding_duration_histogram",
     "embedding_counter",
     "embedding_tokens_histogram",
+    "embedding_cache_lookups_counter",
+    "embedding_cache_saved_seconds_counter",
+    "embedding_cache_entries_gauge",
     "rerank_duration_histogram",
     "rerank_counter",
     "rerank_score_distribution_histogram",
+    "rerank_cache_lookups_counter",
     "rag_request_duration_histogram",
     "rag_request_counter",
     "model_info_gauge",
+    "code_executor_queue_depth_gauge",
+    "code_executor_active_runs_gauge",
+    "code_executor_run_duration_histogram",
+    "code_executor_queue_wait_histogram",
 ]
@@ -7,10 +7,11 @@ import os
 import logging
 import subprocess
 import urllib.request
+from collections import OrderedDict
 from functools import lru_cache
 from pathlib import Path
 from threading import Lock
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import onnxruntime as ort
@@ -158,6 +159,72 @@ def _resolve_model_file(model_path: str, prefer_int8: bool = True) -> str:
     raise FileNotFoundError(f"ONNX model file not found for path: {model_path}")
 
 
+def _length_batches(
+    order: np.ndarray, lengths: np.ndarray, max_batch_size: int, max_batch_tokens: int
+) -> List[np.ndarray]:
+    """
+    Split indices (sorted by ascending length) into batches whose padded size
+    (rows x longest row) stays within max_batch_tokens.
+    """
+    batches: List[np.ndarray] = []
+    start = 0
+    for end in range(1, len(order) + 1):
+        rows = end - start
+        if end < len(order):
+            next_width = int(lengths[order[end]])
+            if rows < max_batch_size and (rows + 1) * next_width <= max_batch_tokens:
+                continue
+        batches.append(order[start:end])
+        start = end
+    return batches
+
+
+def _pad_rows(rows: List[List[int]], width: int, pad_value: int) -> np.ndarray:
+    """Right-pad token id lists into an int64 (len(rows), width) array."""
+    padded = np.full((len(rows), width), pad_value, dtype=np.int64)
+    for i, row in enumerate(rows):
+        padded[i, : len(row)] = row
+    return padded
+
+
+def _truncate_pair(first: List[int], second: List[int], budget: int) -> Tuple[List[int], List[int]]:
+    """
+    Fit a (query, document) id pair into budget tokens like the tokenizers'
+    longest_first strategy: trim the longer side down to the shorter one,
+    then split what is left (the document gives up the odd token).
+    """
+    excess = len(first) + len(second) - budget
+    if excess <= 0:
+        return first, second
+    keep_first, keep_second = len(first), len(second)
+    diff = min(abs(keep_first - keep_second), excess)
+    if keep_first > keep_second:
+        keep_first -= diff
+    else:
+        keep_second -= diff
+    excess -= diff
+    keep_first -= excess // 2
+    keep_second -= excess - excess // 2
+    return first[:max(keep_first, 0)], second[:max(keep_second, 0)]
+
+
+def _rerank_max_length(model_path: str, tokenizer) -> int:
+    """Pair length for a reranker: RERANK_MAX_LENGTH_OVERRIDES entry for its directory, else RERANK_MAX_LENGTH."""
+    name = Path(model_path).name if os.path.isdir(model_path) else Path(model_path).parent.name
+    max_length = settings.RERANK_MAX_LENGTH
+    for entry in settings.RERANK_MAX_LENGTH_OVERRIDES.split(","):
+        key, _, value = entry.partition("=")
+        if key.strip() and key.strip() in (name, model_path) and value.strip():
+            try:
+                max_length = int(value)
+            except ValueError:
+                logger.warning("Ignoring invalid RERANK_MAX_LENGTH_OVERRIDES entry: %r", entry)
+    model_max = getattr(tokenizer, "model_max_length", None)
+    if isinstance(model_max, int) and 0 < model_max < 100_000:
+        max_length = min(max_length, model_max)
+    return max_length
+
+
 class ONNXEmbeddingModel:
     """Wrapper around ONNX Runtime for embedding generation."""
 
@@ -192,32 +259,53 @@ class ONNXEmbeddingModel:
         self.session = ort.InferenceSession(resolved, sess_options=sess_options, providers=providers)
         self.vector_size = self.session.get_outputs()[0].shape[2]
 
-    def encode(self, texts: List[str], *, batch_size: int = 32, max_length: int = 512) -> np.ndarray:
-        """Generate embeddings for a batch of texts."""
-        embeddings: list[np.ndarray] = []
-        for start in range(0, len(texts), batch_size):
-            batch = texts[start : start + batch_size]
-            encoded = self.tokenizer(
-                batch,
-                padding=True,
-                truncation=True,
-                max_length=max_length,
-                return_tensors="np",
-            )
+    def encode(
+        self,
+        texts: List[str],
+        *,
+        batch_size: int = 32,
+        max_length: int = 512,
+        max_batch_tokens: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Generate embeddings for a batch of texts.
+
+        Texts are tokenized once, sorted by token length and packed into
+        batches of similar length (at most ``batch_size`` texts and
+        ``max_batch_tokens`` padded tokens each), so short chunks are not
+        padded to the longest text in the input. Rows come back in input order.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts:
+            return np.zeros((0, self.vector_size), dtype=np.float32)
+        max_batch_tokens = max_batch_tokens or settings.EMBED_MAX_BATCH_TOKENS
+
+        # Tokenize once without padding; batches are padded per bucket below
+        encoded = self.tokenizer(list(texts), padding=False, truncation=True, max_length=max_length)
+        features = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in encoded]
+        lengths = np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+        order = np.argsort(lengths, kind="stable")
+
+        embeddings: Optional[np.ndarray] = None
+        for batch in _length_batches(order, lengths, batch_size, max_batch_tokens):
+            width = int(lengths[batch[-1]])  # sorted ascending: last is longest
             ort_inputs = {
-                "input_ids": encoded["input_ids"].astype(np.int64),
-                "attention_mask": encoded["attention_mask"].astype(np.int64),
+                name: _pad_rows([encoded[name][i] for i in batch], width, self._pad_value(name))
+                for name in features
             }
-            if "token_type_ids" in encoded:
-                ort_inputs["token_type_ids"] = encoded["token_type_ids"].astype(np.int64)
-
             outputs = self.session.run(None, ort_inputs)
-            last_hidden = outputs[0]  # (batch, seq, hidden)
-            mask = encoded["attention_mask"]
-            pooled = self._mean_pool(last_hidden, mask)
+            pooled = self._mean_pool(outputs[0], ort_inputs["attention_mask"])
             normalized = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-9, None)
-            embeddings.append(normalized)
-        return np.vstack(embeddings)
+            if embeddings is None:
+                embeddings = np.empty((len(texts), normalized.shape[1]), dtype=normalized.dtype)
+            embeddings[batch] = normalized
+        return embeddings
+
+    def _pad_value(self, feature: str) -> int:
+        if feature == "input_ids":
+            return self.tokenizer.pad_token_id or 0
+        return 0
 
     @staticmethod
     def _mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
@@ -261,30 +349,60 @@ class ONNXRerankerModel:
 
         self.session = ort.InferenceSession(resolved, sess_options=sess_options, providers=providers)
         self.providers = self.session.get_providers()
+        self.max_length = _rerank_max_length(model_path, self.tokenizer)
+        input_names = {node.name for node in self.session.get_inputs()}
+        self._uses_token_types = (
+            "token_type_ids" in input_names and "token_type_ids" in self.tokenizer.model_input_names
+        )
 
-    def score(self, query: str, documents: List[str], *, batch_size: int = 64) -> np.ndarray:
-        """Compute relevance scores between query and documents."""
-        scores: list[np.ndarray] = []
-        for start in range(0, len(documents), batch_size):
-            batch_docs = documents[start : start + batch_size]
-            pairs = [[query, doc] for doc in batch_docs]
-            encoded = self.tokenizer(
-                pairs,
-                padding=True,
-                truncation=True,
-                max_length=512,
-                return_tensors="np",
-            )
+    def score(
+        self,
+        query: str,
+        documents: List[str],
+        *,
+        batch_size: int = 64,
+        max_batch_tokens: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Compute relevance scores between query and documents.
+
+        The query is tokenized once and its ids are reused for every pair;
+        each pair is truncated to the model's max_length. Pairs are sorted by
+        length and packed into batches of similar length (at most
+        ``batch_size`` pairs and ``max_batch_tokens`` padded tokens), so short
+        candidates are not padded to the longest one. Scores come back in
+        input order.
+        """
+        if not documents:
+            return np.zeros(0, dtype=np.float32)
+        max_batch_tokens = max_batch_tokens or settings.RERANK_MAX_BATCH_TOKENS
+        tokenizer = self.tokenizer
+        budget = self.max_length - tokenizer.num_special_tokens_to_add(pair=True)
+
+        query_ids = tokenizer([query], add_special_tokens=False)["input_ids"][0]
+        doc_ids = tokenizer(list(documents), add_special_tokens=False, truncation=True, max_length=budget)["input_ids"]
+        rows: List[List[int]] = []
+        type_rows: List[List[int]] = []
+        for ids in doc_ids:
+            first, second = _truncate_pair(query_ids, ids, budget)
+            rows.append(tokenizer.build_inputs_with_special_tokens(first, second))
+            if self._uses_token_types:
+                type_rows.append(tokenizer.create_token_type_ids_from_sequences(first, second))
+
+        lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        order = np.argsort(lengths, kind="stable")
+        scores = np.empty(len(rows), dtype=np.float32)
+        for batch in _length_batches(order, lengths, batch_size, max_batch_tokens):
+            width = int(lengths[batch[-1]])  # sorted ascending: last is longest
             ort_inputs = {
-                "input_ids": encoded["input_ids"].astype(np.int64),
-                "attention_mask": encoded["attention_mask"].astype(np.int64),
+                "input_ids": _pad_rows([rows[i] for i in batch], width, tokenizer.pad_token_id or 0),
+                "attention_mask": (np.arange(width) < lengths[batch][:, None]).astype(np.int64),
             }
-            if "token_type_ids" in encoded:
-                ort_inputs["token_type_ids"] = encoded["token_type_ids"].astype(np.int64)
-            outputs = self.session.run(None, ort_inputs)
-            logits = outputs[0].astype(np.float32).squeeze(-1)
-            scores.append(logits)
-        return np.concatenate(scores)
+            if self._uses_token_types:
+                ort_inputs["token_type_ids"] = _pad_rows([type_rows[i] for i in batch], width, 0)
+            logits = self.session.run(None, ort_inputs)[0]
+            scores[batch] = np.asarray(logits, dtype=np.float32).reshape(len(batch), -1)[:, 0]
+        return scores
 
     def is_cpu_only(self) -> bool:
         """Return True if model runs solely on CPU."""
@@ -292,38 +410,122 @@ class ONNXRerankerModel:
         return not any("cuda" in provider or "tensorrt" in provider or "rocm" in provider for provider in normalized)
 
 
-_embed_lock = Lock()
-_embed_model: Optional[ONNXEmbeddingModel] = None
-_embed_model_path: Optional[str] = settings.ONNX_EMBED_MODEL_PATH
+class ModelRegistry:
+    """
+    Resident ONNX sessions keyed by (kind, model path).
 
+    Several embedding and reranker models stay loaded at once so requests can
+    name the model they need instead of swapping a process-wide one. When the
+    summed model file sizes exceed the memory budget, the least recently used
+    models are unloaded (callers still holding one keep it alive until done).
+    """
 
-def get_embedding_model() -> ONNXEmbeddingModel:
-    """Return the active embedding model instance."""
-    global _embed_model
-    if _embed_model is None:
-        with _embed_lock:
-            if _embed_model is None:
-                if not _embed_model_path:
-                    raise RuntimeError("ONNX_EMBED_MODEL_PATH is not configured.")
-                _embed_model = ONNXEmbeddingModel(_embed_model_path)
-    return _embed_model
+    _FACTORIES = {
+        "embed": ONNXEmbeddingModel,
+        "rerank": ONNXRerankerModel,
+    }
+
+    def __init__(self, memory_budget_bytes: int) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        self._models: "OrderedDict[Tuple[str, str], object]" = OrderedDict()
+        self._sizes: Dict[Tuple[str, str], int] = {}
+        self._lock = Lock()
+        self._load_locks: Dict[Tuple[str, str], Lock] = {}
+        self.stats = {"hits": 0, "loads": 0, "unloads": 0}
+
+    def get(self, kind: str, model_path: str):
+        """Return the resident model, loading it once even under concurrent callers."""
+        key = (kind, model_path)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.stats["hits"] += 1
+                return model
+            load_lock = self._load_locks.setdefault(key, Lock())
+
+        # Different models load in parallel; the same model loads once
+        with load_lock:
+            with self._lock:
+                model = self._models.get(key)
+                if model is not None:
+                    self._models.move_to_end(key)
+                    return model
+            model = self._FACTORIES[kind](model_path)
+            size = _model_bytes(model)
+            with self._lock:
+                self._models[key] = model
+                self._sizes[key] = size
+                self.stats["loads"] += 1
+                self._evict(keep=key)
+            logger.info("Loaded %s model %s (%.0f MB resident)", kind, model_path, self.resident_bytes() / 2**20)
+        return model
+
+    def _evict(self, keep: Tuple[str, str]) -> None:
+        while self.resident_bytes() > self.memory_budget_bytes and len(self._models) > 1:
+            key = next(k for k in self._models if k != keep)
+            self._models.pop(key)
+            self._sizes.pop(key, None)
+            self.stats["unloads"] += 1
+            logger.info("Unloaded %s model %s (memory budget)", key[0], key[1])
+
+    def resident_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def resident(self) -> List[Dict[str, object]]:
+        with self._lock:
+            return [
+                {"kind": kind, "model_path": path, "bytes": self._sizes.get((kind, path), 0)}
+                for kind, path in self._models
+            ]
+
+    def unload(self, kind: str, model_path: str) -> bool:
+        with self._lock:
+            self._sizes.pop((kind, model_path), None)
+            return self._models.pop((kind, model_path), None) is not None
+
+
+def _model_bytes(model) -> int:
+    """Approximate resident size of a session by its model file (+ external weights)."""
+    path = getattr(model, "resolved_model_path", None)
+    if not path or not os.path.exists(path):
+        return 0
+    size = os.path.getsize(path)
+    external = f"{path}.data"
+    if os.path.exists(external):
+        size += os.path.getsize(external)
+    return size
+
+
+_model_registry = ModelRegistry(
+    memory_budget_bytes=int(float(os.getenv("ONNX_MODEL_MEMORY_MB", "4096")) * 2**20)
+)
+
+
+def get_model_registry() -> ModelRegistry:
+    return _model_registry
+
+
+# Default models for callers that do not name one. Changing a default only
+# repoints it; sessions stay resident, so in-flight requests are unaffected.
+_embed_model_path: Optional[str] = settings.ONNX_EMBED_MODEL_PATH
+_reranker_model_path: Optional[str] = settings.ONNX_RERANK_MODEL_PATH
 
 
-_reranker_lock = Lock()
-_reranker_model: Optional[ONNXRerankerModel] = None
-_reranker_model_path: Optional[str] = settings.ONNX_RERANK_MODEL_PATH
+def get_embedding_model(model_id: Optional[str] = None) -> ONNXEmbeddingModel:
+    """Return the embedding model for model_id (a model path), or the default one."""
+    model_path = model_id or _embed_model_path
+    if not model_path:
+        raise RuntimeError("ONNX_EMBED_MODEL_PATH is not configured.")
+    return _model_registry.get("embed", model_path)
 
 
-def get_reranker_model() -> ONNXRerankerModel:
-    """Return the active reranker model instance."""
-    global _reranker_model
-    if _reranker_model is None:
-        with _reranker_lock:
-            if _reranker_model is None:
-                if not _reranker_model_path:
-                    raise RuntimeError("ONNX_RERANK_MODEL_PATH is not configured.")
-                _reranker_model = ONNXRerankerModel(_reranker_model_path)
-    return _reranker_model
+def get_reranker_model(model_id: Optional[str] = None) -> ONNXRerankerModel:
+    """Return the reranker model for model_id (a model path), or the default one."""
+    model_path = model_id or _reranker_model_path
+    if not model_path:
+        raise RuntimeError("ONNX_RERANK_MODEL_PATH is not configured.")
+    return _model_registry.get("rerank", model_path)
 
 
 def reranker_is_cpu_only() -> bool:
@@ -331,77 +533,67 @@ def reranker_is_cpu_only() -> bool:
 
 
 def switch_to_fallback_reranker() -> bool:
-    """Switch to fallback reranker model if configured."""
+    """Make the fallback reranker the default, if configured."""
+    global _reranker_model_path
     fallback_path = settings.RERANK_FALLBACK_MODEL_PATH
-    if not fallback_path:
+    if not fallback_path or _reranker_model_path == fallback_path:
         return False
-
-    global _reranker_model_path, _reranker_model
-    if _reranker_model_path == fallback_path:
-        return False
-
-    with _reranker_lock:
-        _reranker_model = ONNXRerankerModel(fallback_path)
-        _reranker_model_path = fallback_path
+    get_reranker_model(fallback_path)
+    _reranker_model_path = fallback_path
     return True
 
 
 def set_reranker_model_path(model_path: str) -> None:
-    """Force reload of reranker model from a specific path."""
-    global _reranker_model_path, _reranker_model
-    with _reranker_lock:
-        _reranker_model = ONNXRerankerModel(model_path)
-        _reranker_model_path = model_path
+    """Make model_path the default reranker (loaded now so bad paths fail here)."""
+    global _reranker_model_path
+    get_reranker_model(model_path)
+    _reranker_model_path = model_path
 
 
 def get_current_reranker_path() -> Optional[str]:
-    """Return the configured reranker model path."""
+    """Return the default reranker model path."""
     return _reranker_model_path
 
 
+def get_cascade_reranker_model() -> Optional[ONNXRerankerModel]:
+    """Return the first-stage (cheap) reranker used by the rerank cascade, if configured."""
+    if not settings.RERANK_CASCADE_MODEL_PATH:
+        return None
+    return get_reranker_model(settings.RERANK_CASCADE_MODEL_PATH)
+
+
 def switch_to_fallback_embed() -> bool:
-    """Switch to fallback embedding model if configured."""
+    """Make the fallback embedding model the default, if configured."""
+    global _embed_model_path
     fallback_path = settings.EMBED_FALLBACK_MODEL_PATH
-    if not fallback_path:
-        return False
-
-    global _embed_model_path, _embed_model
-    if _embed_model_path == fallback_path:
+    if not fallback_path or _embed_model_path == fallback_path:
         return False
-
-    with _embed_lock:
-        _embed_model = ONNXEmbeddingModel(fallback_path)
-        _embed_model_path = fallback_path
+    get_embedding_model(fallback_path)
+    _embed_model_path = fallback_path
     return True
 
 
 def switch_to_primary_embed() -> bool:
-    """Switch back to primary embedding model."""
+    """Make the primary embedding model the default again."""
+    global _embed_model_path
     primary_path = settings.ONNX_EMBED_MODEL_PATH
-    if not primary_path:
+    if not primary_path or _embed_model_path == primary_path:
         return False
-
-    global _embed_model_path, _embed_model
-    if _embed_model_path == primary_path:
-        return False
-
-    with _embed_lock:
-        _embed_model = ONNXEmbeddingModel(primary_path)
-        _embed_model_path = primary_path
+    get_embedding_model(primary_path)
+    _embed_model_path = primary_path
     return True
 
 
 def get_current_embed_path() -> Optional[str]:
-    """Return the configured embedding model path."""
+    """Return the default embedding model path."""
     return _embed_model_path
 
 
 def set_embedding_model_path(model_path: str) -> None:
-    """Force reload of embedding model from a specific path."""
-    global _embed_model_path, _embed_model
-    with _embed_lock:
-        _embed_model = ONNXEmbeddingModel(model_path)
-        _embed_model_path = model_path
+    """Make model_path the default embedding model (loaded now so bad paths fail here)."""
+    global _embed_model_path
+    get_embedding_model(model_path)
+    _embed_model_path = model_path
 
 
 def switch_to_fallback_mode() -> bool:
@@ -5,12 +5,13 @@ Autonomous agent with multi-tool orchestration for trip planning.
 import os
 import time
 import json
+import asyncio
 import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 from openai import AsyncOpenAI
 
-from backend.config.settings import settings, OPENAI_CONFIG
+from backend.config.settings import settings, OPENAI_CONFIG, AGENT_CONFIG
 from backend.models.agent_schemas import (
     PlanRequest, PlanResponse, TripItinerary, ReasoningStep, ToolCall,
     FlightInfo, WeatherInfo, AttractionInfo
@@ -153,6 +154,18 @@ class PlanningAgent:
         )
         self.tools = get_agent_tools()
 
+        # Per-tool timeouts (seconds): AGENT_TOOL_TIMEOUT, overridden per tool name
+        self.default_tool_timeout = float(AGENT_CONFIG["tool_timeout"])
+        self.tool_timeouts: Dict[str, float] = {}
+        for entry in AGENT_CONFIG["tool_timeout_overrides"].split(","):
+            name, _, value = entry.partition("=")
+            if not (name.strip() and value.strip()):
+                continue
+            try:
+                self.tool_timeouts[name.strip()] = float(value)
+            except ValueError:
+                logger.warning("Ignoring invalid AGENT_TOOL_TIMEOUT_OVERRIDES entry: %r", entry)
+
         # Initialize learning system
         self.enable_learning = enable_learning
         self.learner = None
@@ -182,6 +195,9 @@ class PlanningAgent:
         tool_calls_made: List[ToolCall] = []
         iterations = 0
         tool_errors_count = 0
+        tool_time_ms = 0.0  # summed over tool calls
+        tool_wall_time_ms = 0.0  # waited for tools (calls in one step overlap)
+        tool_cache: Dict[str, asyncio.Task] = {}  # per request, by normalized arguments
         total_prompt_tokens = 0
         total_completion_tokens = 0
         llm_total_cost_usd = 0.0
@@ -354,27 +370,33 @@ class PlanningAgent:
 
                 # Check if agent wants to call tools
                 if hasattr(assistant_message, 'tool_calls') and assistant_message.tool_calls:
-                    # Execute each tool call
-                    for tool_call in assistant_message.tool_calls:
-                        tool_name = tool_call.function.name
-                        tool_args = json.loads(tool_call.function.arguments)
-
-                        logger.info(f"🔧 Calling tool: {tool_name} with args: {tool_args}")
-
-                        # Execute tool
-                        tool_result = await self._execute_tool(tool_name, tool_args)
+                    # Execute the tool calls concurrently; results come back in tool_call order
+                    parsed_calls = [
+                        (tool_call, tool_call.function.name, json.loads(tool_call.function.arguments))
+                        for tool_call in assistant_message.tool_calls
+                    ]
+                    batch_start = time.perf_counter()
+                    results = await self._execute_tools(
+                        [(tool_name, tool_args) for _, tool_name, tool_args in parsed_calls],
+                        tool_cache,
+                    )
+                    tool_wall_time_ms += (time.perf_counter() - batch_start) * 1000
 
+                    for (tool_call, tool_name, tool_args), (tool_result, cached) in zip(parsed_calls, results):
                         # Track tool errors for learning
                         if not tool_result.get("success"):
                             tool_errors_count += 1
 
-                        # Track tool call
+                        # Track tool call (a cached result cost no tool time)
+                        execution_time_ms = 0.0 if cached else tool_result.get("execution_time_ms", 0)
+                        tool_time_ms += execution_time_ms
                         tool_calls_made.append(ToolCall(
                             tool_name=tool_name,
                             arguments=tool_args,
                             result=tool_result if tool_result.get("success") else None,
                             error=tool_result.get("error"),
-                            execution_time_ms=tool_result.get("execution_time_ms", 0)
+                            execution_time_ms=execution_time_ms,
+                            cached=cached,
                         ))
 
                         # Add tool result to conversation
@@ -420,7 +442,10 @@ class PlanningAgent:
 
             planning_time_ms = (time.time() - start_time) * 1000
 
-            logger.info(f"✅ Planning completed in {planning_time_ms:.1f}ms with {len(tool_calls_made)} tool calls")
+            logger.info(
+                f"✅ Planning completed in {planning_time_ms:.1f}ms with {len(tool_calls_made)} tool calls "
+                f"(tools: {tool_time_ms:.1f}ms summed, {tool_wall_time_ms:.1f}ms wall-clock)"
+            )
 
             llm_token_usage_dict = None
             if total_prompt_tokens or total_completion_tokens:
@@ -478,6 +503,8 @@ class PlanningAgent:
                 constraint_violations=violations,
                 constraint_satisfaction=constraint_satisfaction_score,
                 tool_errors_count=tool_errors_count,
+                tool_time_ms=tool_time_ms,
+                tool_wall_time_ms=tool_wall_time_ms,
                 strategy_used=strategy,
                 llm_token_usage=llm_token_usage_dict,
                 llm_cost_usd=llm_total_cost_usd if llm_token_usage_dict else 0.0,
@@ -784,6 +811,65 @@ IMPORTANT RULES:
             }
         ]
 
+    async def _execute_tools(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        cache: Dict[str, asyncio.Task],
+    ) -> List[Tuple[Dict[str, Any], bool]]:
+        """
+        Execute one step's tool calls concurrently, each under its own timeout.
+
+        A call with the same tool and normalized arguments as an earlier one in
+        this request (or in the same step) shares that call's result instead of
+        running again; failed results are not reused.
+
+        Returns:
+            (result, cached) per call, in the order of ``calls``
+        """
+        tasks: List[asyncio.Task] = []
+        cached: List[bool] = []
+        keys = [self._tool_cache_key(tool_name, tool_args) for tool_name, tool_args in calls]
+        for (tool_name, tool_args), key in zip(calls, keys):
+            task = cache.get(key)
+            cached.append(task is not None)
+            if task is None:
+                logger.info(f"🔧 Calling tool: {tool_name} with args: {tool_args}")
+                task = cache[key] = asyncio.ensure_future(self._execute_tool_with_timeout(tool_name, tool_args))
+            else:
+                logger.info(f"🔧 Reusing result for tool: {tool_name} with args: {tool_args}")
+            tasks.append(task)
+
+        results = await asyncio.gather(*tasks)
+        for key, result in zip(keys, results):
+            if not result.get("success"):
+                cache.pop(key, None)
+        return list(zip(results, cached))
+
+    @staticmethod
+    def _tool_cache_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Tool name plus arguments with key order, case, surrounding whitespace and None values ignored."""
+        normalized = {
+            key: value.strip().casefold() if isinstance(value, str) else value
+            for key, value in arguments.items()
+            if value is not None
+        }
+        return f"{tool_name}:{json.dumps(normalized, sort_keys=True, separators=(',', ':'), default=str)}"
+
+    async def _execute_tool_with_timeout(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a tool call, giving up after its timeout"""
+        timeout = self.tool_timeouts.get(tool_name, self.default_tool_timeout)
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._execute_tool(tool_name, arguments), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {tool_name} timed out after {timeout:g}s")
+            result = {
+                "success": False,
+                "error": f"Tool {tool_name} timed out after {timeout:g}s",
+            }
+        result.setdefault("execution_time_ms", (time.perf_counter() - start) * 1000)
+        return result
+
     async def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a tool call"""
         try:
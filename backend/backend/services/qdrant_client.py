@@ -1,8 +1,11 @@
 """
 Utilities for working with Qdrant vector store.
 """
+import asyncio
+import math
+import weakref
 from functools import lru_cache
-from typing import Optional
+from typing import Any, Optional
 
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
@@ -10,6 +13,17 @@ from qdrant_client.http.exceptions import UnexpectedResponse
 
 from backend.config.settings import settings
 
+try:
+    import httpx
+    from qdrant_client import AsyncQdrantClient
+    ASYNC_QDRANT_AVAILABLE = True
+except ImportError:
+    ASYNC_QDRANT_AVAILABLE = False
+
+# httpx connection pools are bound to the event loop that opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
 @lru_cache(maxsize=1)
 def get_qdrant_client() -> QdrantClient:
     """Instantiate a Qdrant client with settings from configuration."""
@@ -19,6 +33,79 @@ def get_qdrant_client() -> QdrantClient:
     )
 
 
+def get_async_qdrant_client() -> Optional["AsyncQdrantClient"]:
+    """Pooled AsyncQdrantClient for the running event loop (None if unavailable)."""
+    if not ASYNC_QDRANT_AVAILABLE:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncQdrantClient(
+            host=settings.QDRANT_HOST,
+            port=settings.QDRANT_PORT,
+            timeout=math.ceil(settings.QDRANT_TIMEOUT_S),
+            limits=httpx.Limits(
+                max_connections=settings.QDRANT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.QDRANT_MAX_CONNECTIONS,
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+class AsyncQdrant:
+    """
+    Awaitable Qdrant access for retrieval and ingestion paths.
+
+    Calls go through an AsyncQdrantClient (the pooled one when this wraps the
+    shared client or nothing); any other sync client (tests, embedded mode)
+    runs in worker threads. Either way the event loop is never blocked, and
+    every call is bounded by a per-call timeout.
+    """
+
+    def __init__(
+        self,
+        sync_client: Optional[QdrantClient] = None,
+        timeout_s: Optional[float] = None,
+        async_client: Optional["AsyncQdrantClient"] = None
+    ):
+        self._sync_client = sync_client
+        self._async_client = async_client
+        self.timeout_s = timeout_s if timeout_s is not None else settings.QDRANT_TIMEOUT_S
+
+    def _uses_shared_client(self) -> bool:
+        return self._sync_client is None or self._sync_client is get_qdrant_client()
+
+    async def _call(self, method: str, timeout_s: Optional[float] = None, **kwargs):
+        native = self._async_client
+        if native is None and self._uses_shared_client():
+            native = get_async_qdrant_client()
+        if native is not None:
+            call = getattr(native, method)(**kwargs)
+        else:
+            client = self._sync_client or get_qdrant_client()
+            call = asyncio.to_thread(getattr(client, method), **kwargs)
+        return await asyncio.wait_for(call, timeout=timeout_s or self.timeout_s)
+
+    async def search(self, timeout_s: Optional[float] = None, **kwargs):
+        return await self._call("search", timeout_s, **kwargs)
+
+    async def scroll(self, timeout_s: Optional[float] = None, **kwargs):
+        return await self._call("scroll", timeout_s, **kwargs)
+
+    async def retrieve(self, timeout_s: Optional[float] = None, **kwargs):
+        return await self._call("retrieve", timeout_s, **kwargs)
+
+    async def upsert(self, timeout_s: Optional[float] = None, **kwargs):
+        return await self._call("upsert", timeout_s, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def get_async_qdrant() -> AsyncQdrant:
+    """Shared AsyncQdrant facade over the configured Qdrant instance."""
+    return AsyncQdrant()
+
+
 def ensure_collection(vector_size: int, collection: Optional[str] = None) -> None:
     """Ensure the target collection exists with the expected schema."""
     client = get_qdrant_client()
@@ -51,3 +138,8 @@ def ensure_collection(vector_size: int, collection: Optional[str] = None) -> Non
     except UnexpectedResponse as exc:
         if getattr(exc, "status_code", None) != 409:
             raise
+
+
+async def ensure_collection_async(vector_size: int, collection: Optional[str] = None) -> None:
+    """ensure_collection() without blocking the event loop."""
+    await asyncio.to_thread(ensure_collection, vector_size, collection)
@@ -19,6 +19,7 @@ from typing import Dict, Iterable, List, Optional
 import requests
 
 from backend.config.settings import settings
+from backend.services import bm25_index, metadata_index
 
 logger = logging.getLogger(__name__)
 
@@ -232,6 +233,8 @@ def ensure_seed_collection(
                 target_count,
             )
             _delete_collection(collection_name)
+            bm25_index.invalidate(collection_name)
+            metadata_index.invalidate(collection_name)
 
         # Count total seed vectors for progress reporting
         logger.info("Counting vectors in seed file %s (this may take 10-15 seconds)...", seed_path)
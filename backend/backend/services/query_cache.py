@@ -5,14 +5,20 @@ Caches successful retrieval strategies for similar queries to reduce token usage
 """
 import hashlib
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Any, List
 from collections import OrderedDict
 import numpy as np
 import structlog
 
+from backend.services.cache_store import CacheRecord
+
 logger = structlog.get_logger(__name__)
 
+# Namespace used for persisted strategy entries
+STORE_NAMESPACE = "query_cache"
+
 
 class QueryStrategyCache:
     """
@@ -25,7 +31,9 @@ class QueryStrategyCache:
         self,
         similarity_threshold: float = 0.85,
         max_cache_size: int = 1000,
-        ttl_hours: int = 24
+        ttl_hours: int = 24,
+        store=None,
+        sync_interval_s: float = 1.0
     ):
         """
         Initialize query strategy cache.
@@ -34,6 +42,8 @@ class QueryStrategyCache:
             similarity_threshold: Minimum cosine similarity to consider queries similar (0-1)
             max_cache_size: Maximum number of cached queries (LRU eviction)
             ttl_hours: Time to live for cached entries in hours
+            store: Optional persistent backend from cache_store (shared across workers)
+            sync_interval_s: Minimum seconds between pulls of other workers' writes
         """
         self.similarity_threshold = similarity_threshold
         self.max_cache_size = max_cache_size
@@ -48,6 +58,12 @@ class QueryStrategyCache:
         # Embedder will be injected (to avoid circular dependencies)
         self._embedder = None
 
+        # Persistent backend (None = process-local only)
+        self._store = store
+        self._store_cursor = 0
+        self._sync_interval_s = sync_interval_s
+        self._last_sync = 0.0
+
         # Statistics
         self.stats = {
             'hits': 0,
@@ -80,7 +96,7 @@ class QueryStrategyCache:
 
         query_hash = self._hash_query(query)
 
-        # Check if we already have this embedding
+        # Cached strategies keep their embedding; other queries hit the shared embedding cache
         if query_hash in self.embeddings:
             return self.embeddings[query_hash]
 
@@ -93,7 +109,6 @@ class QueryStrategyCache:
         if norm > 0:
             embedding_array = embedding_array / norm
 
-        self.embeddings[query_hash] = embedding_array
         return embedding_array
 
     def _hash_query(self, query: str) -> str:
@@ -122,6 +137,7 @@ class QueryStrategyCache:
             }
         """
         self.stats['total_queries'] += 1
+        self._maybe_sync()
 
         if not self.cache:
             self.stats['misses'] += 1
@@ -225,6 +241,7 @@ class QueryStrategyCache:
             self.cache[query_hash]['usage_count'] += 1
             self.cache[query_hash]['timestamp'] = datetime.now()
             self.cache.move_to_end(query_hash)
+            self._persist(query_hash)
             logger.debug("Updated cached strategy", query=query[:50])
             return
 
@@ -240,14 +257,16 @@ class QueryStrategyCache:
         }
 
         self.cache[query_hash] = cache_entry
+        self.embeddings[query_hash] = query_emb
+        self._persist(query_hash)
 
         # Enforce max cache size (LRU eviction)
-        if len(self.cache) > self.max_cache_size:
-            # Remove oldest entry
-            oldest_hash, _ = self.cache.popitem(last=False)
-            if oldest_hash in self.embeddings:
-                del self.embeddings[oldest_hash]
-            self.stats['evictions'] += 1
+        for oldest_hash in self._evict_overflow():
+            if self._store is not None:
+                try:
+                    self._store.delete(STORE_NAMESPACE, oldest_hash)
+                except Exception as e:
+                    logger.warning("Failed to delete evicted strategy from store", error=str(e))
 
         logger.info(
             "Cached new strategy",
@@ -256,6 +275,87 @@ class QueryStrategyCache:
             cache_size=len(self.cache)
         )
 
+    def _evict_overflow(self) -> List[str]:
+        """Evict least recently used entries beyond max_cache_size."""
+        evicted = []
+        while len(self.cache) > self.max_cache_size:
+            oldest_hash, _ = self.cache.popitem(last=False)
+            if oldest_hash in self.embeddings:
+                del self.embeddings[oldest_hash]
+            self.stats['evictions'] += 1
+            evicted.append(oldest_hash)
+        return evicted
+
+    def _persist(self, query_hash: str):
+        """Write one entry through to the persistent store (if configured)."""
+        if self._store is None:
+            return
+        entry = self.cache[query_hash]
+        try:
+            payload = json.dumps({
+                'strategy': entry['strategy'],
+                'success_score': entry['success_score'],
+                'usage_count': entry['usage_count'],
+                'metadata': entry['metadata'],
+            }, default=str).encode()
+            expires_at = entry['timestamp'].timestamp() + self.ttl.total_seconds()
+            self._store.put(
+                STORE_NAMESPACE, query_hash, entry['query'], payload, entry['embedding'], expires_at
+            )
+        except Exception as e:
+            logger.warning("Failed to persist cached strategy", error=str(e))
+
+    def _apply_record(self, record: CacheRecord):
+        """Apply one persisted record (insert or tombstone) to the in-memory cache."""
+        if record.payload is None or record.embedding is None or record.expires_at <= time.time():
+            self.cache.pop(record.key, None)
+            self.embeddings.pop(record.key, None)
+            return
+
+        data = json.loads(record.payload)
+        self.cache.pop(record.key, None)
+        self.cache[record.key] = {
+            'query': record.query,
+            'embedding': record.embedding,
+            'strategy': data['strategy'],
+            'success_score': data['success_score'],
+            'timestamp': datetime.fromtimestamp(record.created_at),
+            'usage_count': data.get('usage_count', 0),
+            'metadata': data.get('metadata', {})
+        }
+        self.embeddings[record.key] = record.embedding
+        self._evict_overflow()
+
+    def warm_start(self) -> int:
+        """
+        Load all live entries from the persistent store.
+
+        Returns:
+            Number of entries loaded
+        """
+        if self._store is None:
+            return 0
+
+        # Strategy payloads are small, so read them eagerly (tombstones included)
+        records, self._store_cursor = self._store.changes_since(STORE_NAMESPACE, 0)
+        for record in records:
+            self._apply_record(record)
+        self._last_sync = time.monotonic()
+        logger.info("Query cache warm-started from store", entries=len(self.cache))
+        return len(self.cache)
+
+    def _maybe_sync(self):
+        """Pull entries written by other workers since the last sync."""
+        if self._store is None or time.monotonic() - self._last_sync < self._sync_interval_s:
+            return
+        self._last_sync = time.monotonic()
+        try:
+            records, self._store_cursor = self._store.changes_since(STORE_NAMESPACE, self._store_cursor)
+            for record in records:
+                self._apply_record(record)
+        except Exception as e:
+            logger.warning("Query cache store sync failed", error=str(e))
+
     def _get_hit_rate(self) -> float:
         """Calculate cache hit rate"""
         total = self.stats['hits'] + self.stats['misses']
@@ -277,6 +377,11 @@ class QueryStrategyCache:
         """Clear all cached entries"""
         self.cache.clear()
         self.embeddings.clear()
+        if self._store is not None:
+            try:
+                self._store.clear(STORE_NAMESPACE)
+            except Exception as e:
+                logger.warning("Failed to clear persisted strategies", error=str(e))
         logger.info("Cache cleared")
 
     def remove_expired(self):
@@ -356,14 +461,17 @@ def get_query_cache() -> Optional[QueryStrategyCache]:
 def initialize_query_cache(
     similarity_threshold: float = 0.85,
     max_cache_size: int = 1000,
-    ttl_hours: int = 24
+    ttl_hours: int = 24,
+    store=None
 ) -> QueryStrategyCache:
-    """Initialize global query cache"""
+    """Initialize global query cache (warm-started from ``store`` when given)"""
     global query_cache
     query_cache = QueryStrategyCache(
         similarity_threshold=similarity_threshold,
         max_cache_size=max_cache_size,
-        ttl_hours=ttl_hours
+        ttl_hours=ttl_hours,
+        store=store
     )
+    query_cache.warm_start()
     logger.info("Query cache initialized", max_size=max_cache_size, threshold=similarity_threshold)
     return query_cache
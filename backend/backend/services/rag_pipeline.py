@@ -9,7 +9,7 @@ import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Tuple, Union, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union, Optional
 from pathlib import Path
 
 from fastapi.concurrency import run_in_threadpool
@@ -18,25 +18,26 @@ from qdrant_client.http import models as qdrant_models
 
 from backend.config.settings import settings, OPENAI_CONFIG
 from backend.models.rag_schemas import Citation, DocumentResponse, RAGResponse
-from backend.services.metadata_index import search_by_title
+from backend.services.metadata_index import search_by_title, title_index_ready, warm_metadata_index
+from backend.services import bm25_index, metadata_index
 from backend.config.knowledge_config.inference_config import inference_config
 from backend.services.inference_client import get_embedding_client, get_rerank_client
 from backend.services.onnx_inference import (
     get_embedding_model,
     get_reranker_model,
     reranker_is_cpu_only,
-    switch_to_fallback_reranker,
-    set_reranker_model_path,
-    set_embedding_model_path,
     get_current_reranker_path,
     get_current_embed_path,
     _has_cuda_available,
 )
+from backend.services.embedding_cache import get_embedding_cache
+from backend.services.ingestion_pipeline import IngestDocument, IngestionPipeline
+from backend.services.rerank_cache import get_rerank_cache
+from backend.utils.text_splitter import TokenCounter, tokenizer_counter
 from backend.services.query_classifier import get_query_classifier, QueryDifficulty
-from backend.services.qdrant_client import ensure_collection, get_qdrant_client
+from backend.services.qdrant_client import ensure_collection_async, get_async_qdrant
 from backend.services.token_counter import get_token_counter, TokenUsage
 from backend.services.unified_llm_metrics import get_unified_metrics
-from backend.utils.text_splitter import split_text
 from backend.utils.openai import sanitize_messages
 from backend.services.metrics import (
     llm_request_counter,
@@ -125,30 +126,8 @@ def _select_adaptive_models(question: str) -> Dict[str, Any]:
     reranker_path = recommended['reranker']
     selection_reason = recommended['reason']
 
-    # Switch models if needed
-    current_embed = get_current_embed_path()
-    current_rerank = get_current_reranker_path()
-
-    if current_embed != embedding_path:
-        logger.info(
-            f"Switching embedding model",
-            from_model=current_embed,
-            to_model=embedding_path,
-            difficulty=difficulty,
-            reason=selection_reason
-        )
-        set_embedding_model_path(embedding_path)
-
-    if current_rerank != reranker_path:
-        logger.info(
-            f"Switching reranker model",
-            from_model=current_rerank,
-            to_model=reranker_path,
-            difficulty=difficulty,
-            reason=selection_reason
-        )
-        set_reranker_model_path(reranker_path)
-
+    # Models are passed explicitly per request (resident in the model registry),
+    # so concurrent requests with different difficulties never swap each other's model
     return {
         'difficulty': difficulty,
         'difficulty_reason': difficulty_reason,
@@ -185,28 +164,48 @@ class RetrievedChunk:
     metadata: Dict[str, Any]
 
 
-async def _embed_texts(texts: List[str]) -> List[List[float]]:
-    """Generate embeddings using ONNX runtime in a worker thread."""
+async def _embed_texts(texts: List[str], model_id: Optional[str] = None) -> List[List[float]]:
+    """Generate embeddings using ONNX runtime in a worker thread (model_id: default model)."""
     if inference_config.ENABLE_REMOTE_INFERENCE:
         client = get_embedding_client()
         return await client.embed(texts, normalize=True)
 
     def _encode() -> List[List[float]]:
-        model = get_embedding_model()
+        model = get_embedding_model(model_id)
         vectors = model.encode(texts)
         return vectors.astype("float32").tolist()
 
     return await run_in_threadpool(_encode)
 
 
-def _get_vector_size() -> int:
+def _embedding_model_key(model_id: Optional[str] = None) -> str:
+    """Identify the embedding model (cache entries are per model)."""
+    if inference_config.ENABLE_REMOTE_INFERENCE:
+        return inference_config.EMBEDDING_SERVICE_URL or "remote"
+    return model_id or get_current_embed_path() or settings.ONNX_EMBED_MODEL_PATH
+
+
+async def _embed_query(text: str, model_id: Optional[str] = None) -> List[float]:
+    """Embed a single query through the process-wide embedding cache."""
+    cache = get_embedding_cache()
+    # Resolve the default once so the cache key and the model that runs agree
+    model_key = _embedding_model_key(model_id)
+    local_model = None if inference_config.ENABLE_REMOTE_INFERENCE else model_key
+
+    async def _embed(texts: List[str]) -> List[List[float]]:
+        return await _embed_texts(texts, local_model)
+
+    return (await cache.embed(model_key, [text], _embed))[0]
+
+
+def _get_vector_size(model_id: Optional[str] = None) -> int:
     """Return the expected embedding vector size for the active pipeline."""
     if inference_config.ENABLE_REMOTE_INFERENCE:
         return settings.RAG_VECTOR_SIZE
 
     from backend.services.onnx_inference import get_embedding_model
 
-    return get_embedding_model().vector_size
+    return get_embedding_model(model_id).vector_size
 
 
 def _should_use_excel_tool(question: str, chunks: List["RetrievedChunk"]) -> bool:
@@ -317,62 +316,113 @@ def _should_switch_reranker(latency_ms: float) -> bool:
     return latency_ms >= settings.RERANK_CPU_SWITCH_THRESHOLD_MS
 
 
-def _apply_reranker_override(choice: Optional[str]) -> str:
-    """Apply manual reranker override if requested."""
+def _apply_reranker_override(choice: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Resolve a manual reranker override to (mode, model path) for this request."""
     global _reranker_switch_locked
 
     if inference_config.ENABLE_REMOTE_INFERENCE:
-        return "remote"
+        return "remote", None
 
     if not choice:
         choice = "auto"
     choice_normalized = choice.strip().lower()
 
-    def _maybe_switch(target_path: Optional[str]) -> bool:
+    def _available(target_path: Optional[str]) -> bool:
         if not target_path:
             return False
-        current = get_current_reranker_path()
-        if current == target_path:
-            return True
         try:
-            set_reranker_model_path(target_path)
+            get_reranker_model(target_path)
             return True
         except Exception as exc:
-            logger.warning("Failed to switch reranker to %s: %s", target_path, exc)
+            logger.warning("Failed to load reranker %s: %s", target_path, exc)
             return False
 
     if choice_normalized in ("auto", ""):
         _reranker_switch_locked = False
-        _maybe_switch(settings.ONNX_RERANK_MODEL_PATH)
-        return "auto"
+        if _available(settings.ONNX_RERANK_MODEL_PATH):
+            return "auto", settings.ONNX_RERANK_MODEL_PATH
+        return "auto", get_current_reranker_path()
 
     if choice_normalized == "primary":
-        if _maybe_switch(settings.ONNX_RERANK_MODEL_PATH):
+        if _available(settings.ONNX_RERANK_MODEL_PATH):
             _reranker_switch_locked = True
-            return "primary"
-        return "auto"
+            return "primary", settings.ONNX_RERANK_MODEL_PATH
+        return "auto", get_current_reranker_path()
 
     if choice_normalized == "fallback":
-        if _maybe_switch(settings.RERANK_FALLBACK_MODEL_PATH):
+        if _available(settings.RERANK_FALLBACK_MODEL_PATH):
             _reranker_switch_locked = True
-            return "fallback"
+            return "fallback", settings.RERANK_FALLBACK_MODEL_PATH
         logger.warning("Fallback reranker requested but not configured.")
-        return "auto"
+        return "auto", get_current_reranker_path()
 
     resolved = choice.strip()
     if resolved:
-        if _maybe_switch(resolved):
+        if _available(resolved):
             _reranker_switch_locked = True
-            return "custom"
-    return "auto"
+            return "custom", resolved
+    return "auto", get_current_reranker_path()
+
+
+async def _scores_with_cache(
+    model_key: str,
+    question: str,
+    chunks: List[RetrievedChunk],
+    score_fn: Callable[[List[str]], Awaitable[List[float]]],
+) -> Tuple[List[float], int]:
+    """Score chunks, sending only reranker-cache misses to score_fn.
+
+    Returns (scores, number of chunks actually scored).
+    """
+    cache = get_rerank_cache()
+    keys = [
+        cache.make_key(model_key, question, chunk.metadata["point_id"], chunk.content)
+        if chunk.metadata.get("point_id") is not None else None
+        for chunk in chunks
+    ]
+    scores = cache.get_many(keys)
+    missing = [idx for idx, score in enumerate(scores) if score is None]
+    if missing:
+        computed = await score_fn([chunks[idx].content for idx in missing])
+        for idx, score in zip(missing, computed):
+            scores[idx] = float(score)
+        cache.put_many([(keys[idx], scores[idx]) for idx in missing])
+    return scores, len(missing)
+
+
+async def _cascade_prune(
+    question: str,
+    chunks: List[RetrievedChunk],
+    full_model_path: Optional[str],
+    keep: int,
+) -> List[RetrievedChunk]:
+    """First cascade stage: keep the top `keep` chunks by the cheap cross-encoder."""
+    from backend.services.onnx_inference import get_cascade_reranker_model
+
+    cheap_model = get_cascade_reranker_model()
+    if cheap_model is None or cheap_model.configured_path == full_model_path:
+        return chunks
+
+    async def _score(docs: List[str]) -> List[float]:
+        return list(await run_in_threadpool(cheap_model.score, question, docs))
+
+    scores, _ = await _scores_with_cache(cheap_model.resolved_model_path, question, chunks, _score)
+    order = sorted(range(len(chunks)), key=lambda idx: scores[idx], reverse=True)[:keep]
+    return [chunks[idx] for idx in sorted(order)]
 
 
 async def _rerank(
     question: str,
     chunks: List[RetrievedChunk],
     override_choice: Optional[str] = None,
+    stage_timings: Optional[Dict[str, Any]] = None,
 ) -> Tuple[List[RetrievedChunk], float, str, str]:
-    """Apply ONNX reranker to refine relevance ordering."""
+    """Apply ONNX reranker to refine relevance ordering.
+
+    Local scores are cached per (model, question, point_id). With RERANK_CASCADE_ENABLED
+    a cheap cross-encoder first prunes the candidates to RERANK_CASCADE_KEEP.
+    Per-stage latency and cache counts are written to stage_timings if given.
+    """
     if not chunks:
         mode = "remote" if inference_config.ENABLE_REMOTE_INFERENCE else "auto"
         return [], 0.0, "", mode
@@ -382,36 +432,53 @@ async def _rerank(
     # Use document content for reranking
     # Keep it simple - let the reranker work with natural content
     # The LLM will receive metadata separately in the answer generation phase
-    docs = [chunk.content for chunk in chunks]
+    total_start = time.perf_counter()
+    cascade_ms = 0.0
+    candidate_count = len(chunks)
 
     if inference_config.ENABLE_REMOTE_INFERENCE:
+        # Not cached: the client substitutes placeholder scores when the service is down
         client = get_rerank_client()
         start = time.perf_counter()
-        scores = await client.rerank(question, docs, top_k=len(docs))
+        scores = await client.rerank(question, [chunk.content for chunk in chunks], top_k=len(chunks))
         duration_ms = (time.perf_counter() - start) * 1000
+        scored = len(chunks)
         model_name = "remote"
         reranker_mode = "remote"
     else:
-        reranker_mode = _apply_reranker_override(override_choice)
+        reranker_mode, model_path = _apply_reranker_override(override_choice)
+        model = get_reranker_model(model_path)
+
+        if settings.RERANK_CASCADE_ENABLED and len(chunks) > settings.RERANK_CASCADE_KEEP:
+            cascade_start = time.perf_counter()
+            try:
+                chunks = await _cascade_prune(
+                    question, chunks, getattr(model, "configured_path", None), settings.RERANK_CASCADE_KEEP
+                )
+            except Exception as exc:
+                logger.warning("Rerank cascade first stage failed, scoring all candidates: %s", exc)
+            cascade_ms = (time.perf_counter() - cascade_start) * 1000
 
-        def _score(model) -> List[float]:
-            scores_local = model.score(question, docs)
-            return scores_local.tolist()
+        def _scorer(model):
+            async def _score(docs: List[str]) -> List[float]:
+                return (await run_in_threadpool(model.score, question, docs)).tolist()
+            return _score
 
-        model = get_reranker_model()
+        model_name = getattr(model, "resolved_model_path", getattr(model, "model_path", ""))
         start = time.perf_counter()
-        scores = await run_in_threadpool(lambda: _score(model))
+        scores, scored = await _scores_with_cache(model_name, question, chunks, _scorer(model))
         duration_ms = (time.perf_counter() - start) * 1000
-        model_name = getattr(model, "resolved_model_path", getattr(model, "model_path", ""))
 
-        if _should_switch_reranker(duration_ms):
-            if switch_to_fallback_reranker():
+        # Latency of cache hits says nothing about the model, only judge real scoring
+        if scored and _should_switch_reranker(duration_ms):
+            fallback_path = settings.RERANK_FALLBACK_MODEL_PATH
+            if fallback_path and fallback_path != model_path:
                 _reranker_switch_locked = True
-                model = get_reranker_model()
+                model = get_reranker_model(fallback_path)
+                model_name = getattr(model, "resolved_model_path", getattr(model, "model_path", ""))
                 start = time.perf_counter()
-                scores = await run_in_threadpool(lambda: _score(model))
+                scores, scored = await _scores_with_cache(model_name, question, chunks, _scorer(model))
                 duration_ms = (time.perf_counter() - start) * 1000
-                model_name = getattr(model, "resolved_model_path", getattr(model, "model_path", ""))
                 logger.info(
                     "Switched to fallback reranker model '%s' after CPU latency %.1f ms.",
                     model_name or "<unknown>",
@@ -420,6 +487,15 @@ async def _rerank(
             else:
                 _reranker_switch_locked = True
 
+    if stage_timings is not None:
+        stage_timings.update({
+            "rerank_cascade_ms": cascade_ms,
+            "rerank_full_ms": duration_ms,
+            "rerank_candidates": candidate_count,
+            "rerank_scored": len(chunks),
+            "rerank_cache_hits": len(chunks) - scored,
+        })
+
     reranked: List[RetrievedChunk] = []
     for chunk, score in zip(chunks, scores):
         reranked.append(
@@ -435,7 +511,66 @@ async def _rerank(
         rerank_score_distribution_histogram.labels(model=model_label).observe(float(score))
 
     reranked.sort(key=lambda item: item.score, reverse=True)
-    return reranked, duration_ms, model_name, reranker_mode
+    return reranked, (time.perf_counter() - total_start) * 1000, model_name, reranker_mode
+
+
+def _chunk_token_counter() -> Optional[TokenCounter]:
+    """Token counter of the local embedding tokenizer, or None for character budgets."""
+    if settings.CHUNK_TOKENS <= 0 or inference_config.ENABLE_REMOTE_INFERENCE:
+        return None
+    tokenizer = getattr(get_embedding_model(), "tokenizer", None)
+    return tokenizer_counter(tokenizer) if tokenizer is not None else None
+
+
+def _record_ingested(collection: str) -> Callable[[List[qdrant_models.PointStruct]], None]:
+    def _record(points: List[qdrant_models.PointStruct]) -> None:
+        # Keep the on-disk BM25 index in step so hybrid search never re-scrolls the collection
+        bm25_index.record_upsert(collection, ((p.id, p.payload["content"]) for p in points))
+        metadata_index.record_upsert(collection, ((p.id, p.payload) for p in points))
+    return _record
+
+
+async def ingest_documents(
+    documents: List[IngestDocument],
+    *,
+    collection_name: str | None = None,
+) -> List[DocumentResponse]:
+    """
+    Stream documents through chunking, batched embedding and batched async upserts.
+
+    Chunks already stored in the collection (same content hash) are skipped.
+    """
+    target_collection = collection_name or COLLECTION_NAME
+
+    vector_size = await run_in_threadpool(_get_vector_size)
+    await ensure_collection_async(vector_size, collection=target_collection)
+
+    count_tokens = await run_in_threadpool(_chunk_token_counter)
+    pipeline = IngestionPipeline(
+        target_collection,
+        _embed_texts,
+        qdrant=get_async_qdrant(),
+        chunk_size=settings.CHUNK_TOKENS if count_tokens else settings.CHUNK_SIZE,
+        chunk_overlap=settings.CHUNK_TOKEN_OVERLAP if count_tokens else settings.CHUNK_OVERLAP,
+        count_tokens=count_tokens,
+        embed_batch_size=settings.INGEST_EMBED_BATCH_SIZE,
+        upsert_batch_size=settings.INGEST_UPSERT_BATCH_SIZE,
+        queue_batches=settings.INGEST_QUEUE_BATCHES,
+        on_upsert=_record_ingested(target_collection),
+    )
+    stats = await pipeline.run(documents)
+
+    return [
+        DocumentResponse(
+            document_id=doc_stats.document_id,
+            title=doc_stats.title,
+            num_chunks=doc_stats.num_chunks,
+            embedding_time_ms=doc_stats.embedding_time_ms,
+            duplicate_chunks=doc_stats.duplicates,
+            collection=target_collection,
+        )
+        for doc_stats in stats
+    ]
 
 
 async def ingest_document(
@@ -447,53 +582,8 @@ async def ingest_document(
     collection_name: str | None = None,
 ) -> DocumentResponse:
     """Chunk a document, embed and upsert into Qdrant."""
-    # Use specified collection or default collection
-    target_collection = collection_name or COLLECTION_NAME
-
-    vector_size = _get_vector_size()
-    ensure_collection(vector_size, collection=target_collection)
-    client = get_qdrant_client()
-
-    document_id = int(time.time() * 1000)
-    metadata = metadata or {}
-
-    chunks = split_text(
-        content,
-        chunk_size=settings.CHUNK_SIZE,
-        chunk_overlap=settings.CHUNK_OVERLAP,
-    )
-
-    tic = time.perf_counter()
-    embeddings = await _embed_texts(chunks)
-    embed_duration_ms = (time.perf_counter() - tic) * 1000
-
-    points = []
-    for idx, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)):
-        point_id = uuid.uuid4().hex
-        points.append(
-            qdrant_models.PointStruct(
-                id=point_id,
-                vector=embedding,
-                payload={
-                    "document_id": document_id,
-                    "chunk_index": idx,
-                    "content": chunk_text,
-                    "title": title,
-                    "source": source,
-                    "metadata": metadata,
-                },
-            )
-        )
-
-    client.upsert(collection_name=target_collection, points=points)
-
-    return DocumentResponse(
-        document_id=document_id,
-        title=title,
-        num_chunks=len(points),
-        embedding_time_ms=embed_duration_ms,
-        collection=target_collection,
-    )
+    document = IngestDocument(title=title, content=content, source=source, metadata=metadata or {})
+    return (await ingest_documents([document], collection_name=collection_name))[0]
 
 
 def _is_author_question(question: str) -> bool:
@@ -506,6 +596,17 @@ def _extract_title_from_question(question: str) -> str:
     return cleaned
 
 
+_title_index_warming: Optional[asyncio.Future] = None
+
+
+def _warm_title_index_in_background() -> None:
+    """Load (or build) the title index off the request path, once."""
+    global _title_index_warming
+    if _title_index_warming is not None and not _title_index_warming.done():
+        return
+    _title_index_warming = asyncio.get_running_loop().run_in_executor(None, warm_metadata_index)
+
+
 async def retrieve_chunks(
     question: str,
     *,
@@ -527,10 +628,13 @@ async def retrieve_chunks(
     logger.info("Adaptive model selection %s", model_selection)
 
     target_collection = collection_name or COLLECTION_NAME
+    embed_model_id = None
+    if not inference_config.ENABLE_REMOTE_INFERENCE:
+        embed_model_id = model_selection['embedding_path']
 
-    vector_size = _get_vector_size()
-    ensure_collection(vector_size, collection=target_collection)
-    client = get_qdrant_client()
+    vector_size = _get_vector_size(embed_model_id)
+    await ensure_collection_async(vector_size, collection=target_collection)
+    client = get_async_qdrant()
 
     tic_total = time.perf_counter()
     candidate_limit = max(top_k, search_limit)
@@ -540,7 +644,7 @@ async def retrieve_chunks(
     if inference_config.ENABLE_REMOTE_INFERENCE:
         embed_model_path = inference_config.EMBEDDING_SERVICE_URL or "remote"
     else:
-        embedding_model = get_embedding_model()
+        embedding_model = get_embedding_model(embed_model_id)
         embed_model_path = getattr(
             embedding_model,
             "resolved_model_path",
@@ -575,12 +679,12 @@ async def retrieve_chunks(
         char_limit_applied = DEFAULT_CONTENT_CHAR_LIMIT
 
     embed_start = time.perf_counter()
-    query_embedding = (await _embed_texts([question]))[0]
+    query_embedding = await _embed_query(question, embed_model_id)
     embed_ms = (time.perf_counter() - embed_start) * 1000
     logger.info(f"⏱️ Embedding Time: {embed_ms:.2f}ms")
 
     vector_start = time.perf_counter()
-    base_results = client.search(
+    base_results = await client.search(
         collection_name=target_collection,
         query_vector=query_embedding,
         limit=vector_limit,
@@ -621,28 +725,35 @@ async def retrieve_chunks(
         )
         candidates[retrieved.metadata.get("point_id") or uuid.uuid4().hex] = retrieved
 
-    # Disabled author question optimization - it adds 300ms latency
-    # if _is_author_question(question):
-    #     title_query = _extract_title_from_question(question)
-    #     metadata_entries = search_by_title(
-    #         title_query,
-    #         limit=settings.METADATA_TITLE_MATCH_LIMIT,
-    #     )
-    #     for entry in metadata_entries:
-    #         key = entry.point_id
-    #         if key in candidates:
-    #             continue
-    #         candidates[key] = RetrievedChunk(
-    #             content=entry.content,
-    #             source=entry.source or entry.title or "Unknown",
-    #             score=1.0,
-    #             metadata={
-    #                 "title": entry.title,
-    #                 "authors": entry.authors,
-    #                 "retrieval_source": "metadata",
-    #                 "point_id": entry.point_id,
-    #             },
-    #         )
+    # Author questions: add chunks of the best-matching titles (trigram index, ~ms).
+    # The index is built in the background on first use instead of on the request path.
+    metadata_ms = 0.0
+    if settings.METADATA_TITLE_BOOST_ENABLED and _is_author_question(question):
+        metadata_start = time.perf_counter()
+        if title_index_ready():
+            title_query = _extract_title_from_question(question)
+            metadata_entries = search_by_title(
+                title_query,
+                limit=settings.METADATA_TITLE_MATCH_LIMIT,
+            )
+            for entry in metadata_entries:
+                key = entry.point_id
+                if key in candidates:
+                    continue
+                candidates[key] = RetrievedChunk(
+                    content=entry.content,
+                    source=entry.source or entry.title or "Unknown",
+                    score=1.0,
+                    metadata={
+                        "title": entry.title,
+                        "authors": entry.authors,
+                        "retrieval_source": "metadata",
+                        "point_id": entry.point_id,
+                    },
+                )
+        else:
+            _warm_title_index_in_background()
+        metadata_ms = (time.perf_counter() - metadata_start) * 1000
 
     candidate_list = list(candidates.values())[:candidate_limit]
     candidate_prep_ms = (time.perf_counter() - candidate_start) * 1000
@@ -651,10 +762,12 @@ async def retrieve_chunks(
     pre_rerank_ms = (time.perf_counter() - tic_total) * 1000
 
     rerank_start = time.perf_counter()
+    rerank_stage_timings: Dict[str, Any] = {}
     reranked, rerank_ms, reranker_model_path, reranker_mode = await _rerank(
         question,
         candidate_list,
         override_choice=reranker_override,
+        stage_timings=rerank_stage_timings,
     )
     logger.info(f"⏱️ Reranking Time: {rerank_ms:.2f}ms (mode: {reranker_mode})")
 
@@ -684,8 +797,10 @@ async def retrieve_chunks(
             "embed_ms": embed_ms,
             "vector_ms": vector_ms,
             "candidate_prep_ms": candidate_prep_ms,
+            "metadata_ms": metadata_ms,
             "pre_rerank_ms": pre_rerank_ms,
             "rerank_ms": rerank_ms,
+            **rerank_stage_timings,
             "filter_ms": filter_ms,
             "total_ms": total_ms,
             "reranker_model_path": reranker_model_path,
@@ -1294,9 +1409,8 @@ async def answer_question(
 
 
 async def ingest_documents_batch(documents: List[Tuple[str, str, str]]) -> List[DocumentResponse]:
-    """Helper to ingest multiple documents concurrently."""
-    tasks = [
-        ingest_document(title=title, content=content, source=source)
+    """Helper to ingest multiple documents through one shared pipeline (batches span documents)."""
+    return await ingest_documents([
+        IngestDocument(title=title, content=content, source=source)
         for title, content, source in documents
-    ]
-    return await asyncio.gather(*tasks)
+    ])
@@ -0,0 +1,90 @@
+"""
+Bounded LRU cache for cross-encoder scores.
+
+Popular chunks are re-scored against the same question on every request;
+_rerank looks scores up by (reranker model, normalized question, point id)
+and only sends the misses to the model. Chunk content length is part of the
+key because retrieval can truncate content per request (content_char_limit).
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import structlog
+
+from backend.services.embedding_cache import normalize_text
+from backend.services.metrics import rerank_cache_lookups_counter
+
+logger = structlog.get_logger(__name__)
+
+
+class RerankScoreCache:
+    """Thread-safe LRU of (model, question, point) -> score."""
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._scores: "OrderedDict[Tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    @staticmethod
+    def make_key(model: str, question: str, point_id: Hashable, content: str) -> Tuple:
+        return (model, normalize_text(question), str(point_id), len(content))
+
+    def get_many(self, keys: List[Optional[Tuple]]) -> List[Optional[float]]:
+        """Look up scores; None keys (chunks without a point id) always miss."""
+        results: List[Optional[float]] = []
+        hits = 0
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key) if key is not None else None
+                if score is not None:
+                    self._scores.move_to_end(key)
+                    hits += 1
+                results.append(score)
+            self.stats['hits'] += hits
+            self.stats['misses'] += len(keys) - hits
+        rerank_cache_lookups_counter.labels(result="hit").inc(hits)
+        rerank_cache_lookups_counter.labels(result="miss").inc(len(keys) - hits)
+        return results
+
+    def put_many(self, items: List[Tuple[Optional[Tuple], float]]):
+        with self._lock:
+            for key, score in items:
+                if key is None:
+                    continue
+                self._scores[key] = float(score)
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._scores.clear()
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'entries': len(self._scores),
+            'max_entries': self.max_entries,
+        }
+
+
+_rerank_cache: Optional[RerankScoreCache] = None
+
+
+def get_rerank_cache() -> RerankScoreCache:
+    """Get the process-wide reranker score cache."""
+    global _rerank_cache
+    if _rerank_cache is None:
+        max_entries = int(os.getenv("RERANK_SCORE_CACHE_SIZE", "20000"))
+        _rerank_cache = RerankScoreCache(max_entries=max_entries)
+        logger.info("Rerank score cache initialized", max_entries=max_entries)
+    return _rerank_cache
@@ -0,0 +1,387 @@
+"""
+Incremental TF-IDF index over short texts (cached queries).
+
+Replaces "refit TfidfVectorizer on every insert" with running statistics:
+- add/remove are O(terms in the text), document frequencies are kept running
+- search only scores documents sharing at least one term with the query, found
+  through postings over flat numpy (doc, term, count) entry arrays
+- document norms are kept up to date on add/remove instead of recomputed
+- scoring matches sklearn's TfidfVectorizer defaults (smooth idf, l2 norm)
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+_TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def extract_terms(
+    text: str,
+    ngram_range: Tuple[int, int] = (1, 2),
+    stop_words: Optional[Iterable[str]] = ENGLISH_STOP_WORDS
+) -> Counter:
+    """Tokenize like sklearn's word analyzer and return n-gram term counts."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if stop_words:
+        tokens = [t for t in tokens if t not in stop_words]
+
+    min_n, max_n = ngram_range
+    terms = Counter()
+    if min_n <= 1:
+        terms.update(tokens)
+    for n in range(max(2, min_n), max_n + 1):
+        terms.update(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return terms
+
+
+class IncrementalTfidfIndex:
+    """
+    Inverted TF-IDF index with running document frequencies.
+
+    Each document's term counts are appended to flat entry arrays; removal
+    tombstones the document and the arrays are compacted once half of them
+    are dead. Postings (term -> entry indices) are a term-sorted base
+    segment, rebuilt with one argsort on load and compaction, plus per-term
+    delta arrays for entries added since.
+
+    Norms depend on the changing idf. With L = ln(1 + N) + 1 and
+    g = ln(1 + df), idf = L - g, so a document's squared norm is
+    L^2 * A - 2L * B + C over its sums A = sum(c^2), B = sum(c^2 g) and
+    C = sum(c^2 g^2). A change of N only moves L; a change of df for a term
+    updates B and C of the documents in that term's postings, batched per
+    term on the next search (or done in one pass after bulk changes).
+    """
+
+    def __init__(
+        self,
+        ngram_range: Tuple[int, int] = (1, 2),
+        stop_words: Optional[Iterable[str]] = ENGLISH_STOP_WORDS
+    ):
+        self.ngram_range = ngram_range
+        self.stop_words = frozenset(stop_words) if stop_words else None
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    def _terms(self, text: str) -> Counter:
+        return extract_terms(text, self.ngram_range, self.stop_words)
+
+    def analyze(self, text: str) -> List[str]:
+        """Return the index terms for ``text`` (repeated per occurrence)."""
+        return list(self._terms(text).elements())
+
+    def doc_terms(self, key: str) -> List[str]:
+        """Return the indexed terms of ``key`` in analyze() form (for persistence)."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return []
+        start, end = self._spans[slot]
+        return [
+            self._vocab[term_id]
+            for term_id, count in zip(self._ent_term[start:end], self._ent_count[start:end])
+            for _ in range(int(count))
+        ]
+
+    def add(self, key: str, text: str):
+        """Index ``text`` under ``key`` (replacing any previous text)."""
+        self.add_terms(key, self._terms(text).elements())
+
+    def add_terms(self, key: str, terms: Iterable[str]):
+        """Index pre-analyzed terms (see analyze()) under ``key``."""
+        if key in self._slots:
+            self.remove(key)
+        counts: Dict[int, int] = {}
+        term_ids = self._term_ids
+        for term in terms:
+            term_id = term_ids.get(term)
+            if term_id is None:
+                term_id = term_ids[term] = len(self._vocab)
+                self._vocab.append(term)
+            counts[term_id] = counts.get(term_id, 0) + 1
+
+        num_terms = len(counts)
+        slot = len(self._spans)
+        start = self._num_entries
+        end = start + num_terms
+        self._reserve(end, len(self._vocab), slot + 1)
+        ids = np.fromiter(counts.keys(), dtype=np.int32, count=num_terms)
+        tfs = np.fromiter(counts.values(), dtype=np.float64, count=num_terms)
+        self._df[ids] += 1
+        self._dirty_terms.update(counts)
+        self._ent_term[start:end] = ids
+        self._ent_count[start:end] = tfs
+        self._ent_slot[start:end] = slot
+        self._num_entries = end
+        for entry, term_id in enumerate(counts, start):
+            self._append_posting(term_id, entry)
+        if self._delta_entries > max(1024, end // 2):
+            self._rebuild_postings()
+
+        g = self._g[ids]  # as of the last norm update, like every other document
+        squares = tfs * tfs
+        self._norm_a[slot] = squares.sum()
+        self._norm_b[slot] = np.dot(squares, g)
+        self._norm_c[slot] = np.dot(squares, g * g)
+        self._live[slot] = True
+        self._slots[key] = slot
+        self._slot_keys.append(key)
+        self._spans.append((start, end))
+
+    def remove(self, key: str) -> bool:
+        """Remove a document. O(terms in the document)."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+        start, end = self._spans[slot]
+        self._live[slot] = False
+        terms = self._ent_term[start:end]
+        self._df[terms] -= 1
+        self._dirty_terms.update(terms.tolist())
+        self._slot_keys[slot] = None
+        self._dead_slots.append(slot)
+        self._dead_entries += end - start
+        if self._dead_entries > max(1024, self._num_entries // 2):
+            self._compact()
+        return True
+
+    def search(self, text: str, k: int = 1) -> List[Tuple[str, float]]:
+        """
+        Return the top-k documents by TF-IDF cosine similarity.
+
+        Only documents sharing a term with the query are scored.
+        """
+        query_ids = {}
+        for term, count in self._terms(text).items():
+            term_id = self._term_ids.get(term)
+            if term_id is not None and self._df[term_id] > 0:
+                query_ids[term_id] = count
+        if not query_ids:
+            return []
+
+        self._update_norms()
+        level = math.log(1 + len(self._slots)) + 1.0
+        postings, query_weights, query_norm = [], [], 0.0
+        for term_id, count in query_ids.items():
+            idf = level - math.log1p(self._df[term_id])
+            postings.append(self._posting(term_id))
+            # entry weight tf * idf times the query weight count * idf
+            query_weights.append(np.full(len(postings[-1]), count * idf * idf))
+            query_norm += (count * idf) ** 2
+        query_norm = math.sqrt(query_norm)
+
+        entries = np.concatenate(postings)
+        slots, inverse = np.unique(self._ent_slot[entries], return_inverse=True)
+        dots = np.bincount(inverse, weights=self._ent_count[entries] * np.concatenate(query_weights))
+        norms = np.sqrt(np.maximum(
+            level * level * self._norm_a[slots] - 2 * level * self._norm_b[slots] + self._norm_c[slots], 0.0
+        ))
+        keep = self._live[slots] & (dots > 0) & (norms > 0)
+        slots = slots[keep]
+        scores = dots[keep] / (norms[keep] * query_norm)
+
+        if len(slots) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            slots, scores = slots[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(self._slot_keys[slots[i]], float(scores[i])) for i in order]
+
+    def state(self) -> Dict[str, object]:
+        """
+        Export the index as flat arrays (for persistence, see load_state()).
+
+        Removed documents are compacted away first, so the result only
+        describes live documents, in slot order.
+        """
+        if self._dead_slots:
+            self._compact()
+        n = self._num_entries
+        return {
+            "keys": list(self._slot_keys),
+            "vocab": list(self._vocab),
+            "df": self._df[:len(self._vocab)].copy(),
+            "ent_slot": self._ent_slot[:n].copy(),
+            "ent_term": self._ent_term[:n].copy(),
+            "ent_count": self._ent_count[:n].copy(),
+        }
+
+    def load_state(
+        self,
+        keys: List[str],
+        vocab: List[str],
+        df: np.ndarray,
+        ent_slot: np.ndarray,
+        ent_term: np.ndarray,
+        ent_count: np.ndarray
+    ):
+        """Replace the index contents with arrays from state() without re-tokenizing."""
+        self.clear()
+        self._vocab = list(vocab)
+        self._term_ids = dict(zip(self._vocab, range(len(self._vocab))))
+        self._df = np.asarray(df, dtype=np.int64).copy()
+        self._ent_slot = np.asarray(ent_slot, dtype=np.int32).copy()
+        self._ent_term = np.asarray(ent_term, dtype=np.int32).copy()
+        self._ent_count = np.asarray(ent_count, dtype=np.float64).copy()
+        self._num_entries = len(self._ent_term)
+
+        # Entries are grouped by slot in ascending order, so spans are boundaries
+        slots = np.arange(len(keys))
+        starts = np.searchsorted(self._ent_slot, slots, side="left").tolist()
+        ends = np.searchsorted(self._ent_slot, slots, side="right").tolist()
+        self._spans = list(zip(starts, ends))
+        self._slot_keys = list(keys)
+        self._slots = dict(zip(self._slot_keys, range(len(self._slot_keys))))
+        self._rebuild_postings()
+
+        self._norm_a = np.bincount(self._ent_slot, weights=self._ent_count ** 2, minlength=len(keys))
+        self._norm_b = np.zeros(len(keys))
+        self._norm_c = np.zeros(len(keys))
+        self._live = np.ones(len(keys), dtype=bool)
+        self._g = np.zeros(len(self._df))
+        self._recompute_norms()
+
+    def clear(self):
+        self._term_ids: Dict[str, int] = {}
+        self._vocab: List[str] = []
+        self._df = np.zeros(0, dtype=np.int64)
+        self._slots: Dict[str, int] = {}
+        self._slot_keys: List[Optional[str]] = []  # None for removed documents
+        self._dead_slots: List[int] = []
+        self._spans: List[Tuple[int, int]] = []
+        self._ent_slot = np.zeros(0, dtype=np.int32)
+        self._ent_term = np.zeros(0, dtype=np.int32)
+        self._ent_count = np.zeros(0, dtype=np.float64)
+        self._num_entries = 0
+        self._dead_entries = 0
+        # Per-slot norm sums (see class docstring) and liveness
+        self._norm_a = np.zeros(0, dtype=np.float64)
+        self._norm_b = np.zeros(0, dtype=np.float64)
+        self._norm_c = np.zeros(0, dtype=np.float64)
+        self._live = np.zeros(0, dtype=bool)
+        # Per-term g = ln(1 + df) that B and C currently reflect, and terms whose df moved since
+        self._g = np.zeros(0, dtype=np.float64)
+        self._dirty_terms: Set[int] = set()
+        # Base postings: entry indices sorted by term, term t at [offsets[t], offsets[t + 1])
+        self._base_offsets = np.zeros(1, dtype=np.int64)
+        self._base_entries = np.zeros(0, dtype=np.int32)
+        # Delta postings: term -> (entry index buffer, used length)
+        self._delta_postings: Dict[int, Tuple[np.ndarray, int]] = {}
+        self._delta_entries = 0
+
+    # ------------------------------------------------------------------
+    # Array plumbing
+    # ------------------------------------------------------------------
+    def _reserve(self, num_entries: int, num_terms: int, num_slots: int):
+        if num_entries > len(self._ent_term):
+            capacity = max(num_entries, 2 * len(self._ent_term), 256)
+            for name in ("_ent_slot", "_ent_term", "_ent_count"):
+                old = getattr(self, name)
+                grown = np.zeros(capacity, dtype=old.dtype)
+                grown[:self._num_entries] = old[:self._num_entries]
+                setattr(self, name, grown)
+        if num_terms > len(self._df):
+            capacity = max(num_terms, 2 * len(self._df), 256)
+            for name in ("_df", "_g"):
+                old = getattr(self, name)
+                grown = np.zeros(capacity, dtype=old.dtype)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+        if num_slots > len(self._live):
+            capacity = max(num_slots, 2 * len(self._live), 256)
+            used = len(self._spans)
+            for name in ("_norm_a", "_norm_b", "_norm_c", "_live"):
+                old = getattr(self, name)
+                grown = np.zeros(capacity, dtype=old.dtype)
+                grown[:used] = old[:used]
+                setattr(self, name, grown)
+
+    def _posting(self, term_id: int) -> np.ndarray:
+        """Entry indices of a term across base + delta (including removed documents)."""
+        parts = []
+        if term_id + 1 < len(self._base_offsets):
+            parts.append(self._base_entries[self._base_offsets[term_id]:self._base_offsets[term_id + 1]])
+        delta = self._delta_postings.get(term_id)
+        if delta is not None:
+            parts.append(delta[0][:delta[1]])
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32)
+
+    def _append_posting(self, term_id: int, entry: int):
+        buffer, used = self._delta_postings.get(term_id, (None, 0))
+        if buffer is None or used == len(buffer):
+            grown = np.empty(max(4, 2 * used), dtype=np.int32)
+            if buffer is not None:
+                grown[:used] = buffer
+            buffer = grown
+        buffer[used] = entry
+        self._delta_postings[term_id] = (buffer, used + 1)
+        self._delta_entries += 1
+
+    def _rebuild_postings(self):
+        """Fold the delta postings into a new term-sorted base segment."""
+        n = self._num_entries
+        self._base_entries = np.argsort(self._ent_term[:n]).astype(np.int32)  # order within a term is irrelevant
+        counts = np.bincount(self._ent_term[:n], minlength=len(self._vocab))
+        self._base_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._base_offsets[1:])
+        self._delta_postings = {}
+        self._delta_entries = 0
+
+    def _update_norms(self):
+        """Apply df changes since the last search to B and C."""
+        if not self._dirty_terms:
+            return
+        term_ids = np.fromiter(self._dirty_terms, dtype=np.int64, count=len(self._dirty_terms))
+        if len(term_ids) > 1024 or 4 * self._df[term_ids].sum() > self._num_entries:
+            self._recompute_norms()
+            return
+        self._dirty_terms = set()
+        g_new = np.log1p(self._df[term_ids])
+        g_old = self._g[term_ids]
+        self._g[term_ids] = g_new
+        postings = [self._posting(term_id) for term_id in term_ids.tolist()]
+        entries = np.concatenate(postings)
+        lengths = [len(posting) for posting in postings]
+        slots = self._ent_slot[entries]
+        squares = self._ent_count[entries] ** 2
+        used = len(self._spans)
+        self._norm_b[:used] += np.bincount(slots, weights=squares * np.repeat(g_new - g_old, lengths), minlength=used)
+        self._norm_c[:used] += np.bincount(
+            slots, weights=squares * np.repeat(g_new * g_new - g_old * g_old, lengths), minlength=used
+        )
+
+    def _recompute_norms(self):
+        """Rebuild B and C from all entries (after loading or bulk changes)."""
+        n = self._num_entries
+        used = len(self._spans)
+        self._g[:len(self._vocab)] = np.log1p(self._df[:len(self._vocab)])
+        squares = self._ent_count[:n] ** 2
+        g = self._g[self._ent_term[:n]]
+        self._norm_b[:used] = np.bincount(self._ent_slot[:n], weights=squares * g, minlength=used)
+        self._norm_c[:used] = np.bincount(self._ent_slot[:n], weights=squares * g * g, minlength=used)
+        self._dirty_terms = set()
+
+    def _compact(self):
+        """Drop removed documents' entries and terms no live document uses."""
+        n = self._num_entries
+        live_slots = self._live[:len(self._spans)]
+        live_entries = live_slots[self._ent_slot[:n]]
+        slot_map = np.cumsum(live_slots) - 1
+        used_terms = self._df[:len(self._vocab)] > 0
+        term_map = np.cumsum(used_terms) - 1
+        self.load_state(
+            [key for key in self._slot_keys if key is not None],
+            [term for term, used in zip(self._vocab, used_terms.tolist()) if used],
+            self._df[:len(self._vocab)][used_terms],
+            slot_map[self._ent_slot[:n][live_entries]],
+            term_map[self._ent_term[:n][live_entries]],
+            self._ent_count[:n][live_entries],
+        )
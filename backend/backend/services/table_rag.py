@@ -378,26 +378,21 @@ Respond in JSON:
         chunks = []
 
         try:
-            # Use HybridRetriever class directly
-            from backend.services.hybrid_retriever import HybridRetriever
-            from backend.services.inference.embeddings import get_embedding
+            # Shared retriever: BM25 is built once per collection, not per question
+            from backend.services.hybrid_retriever import get_hybrid_retriever_registry
+            from backend.services.rag_pipeline import _embed_query
 
             # Get query embedding first
-            query_embedding = await get_embedding(question)
+            query_embedding = await _embed_query(question)
 
-            # Initialize hybrid retriever
-            hybrid_retriever = HybridRetriever(
-                qdrant_client=self.qdrant_client,
-                collection_name=self.collection_name,
-                alpha=hybrid_alpha
-            )
-            await hybrid_retriever.initialize()
+            hybrid_retriever = await get_hybrid_retriever_registry().acquire(self.collection_name)
 
             # Perform hybrid search
             raw_results = await hybrid_retriever.hybrid_search(
                 query=question,
                 query_embedding=query_embedding,
-                top_k=top_k
+                top_k=top_k,
+                alpha=hybrid_alpha
             )
 
             # Convert to chunks format
@@ -18,6 +18,9 @@ from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 
+import numpy as np
+
+from backend.services.column_ring import ColumnRing
 from backend.services.token_counter import get_token_counter, TokenUsage
 from backend.services.llm_tracker import get_llm_tracker
 from backend.services.metrics import (
@@ -36,6 +39,21 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Per-call columns for summaries; "call" keeps the LLMCallMetrics for get_recent_calls
+CALL_COLUMNS = {
+    "timestamp": np.float64,  # epoch seconds
+    "model": str,
+    "endpoint": str,
+    "duration": np.float64,
+    "prompt_tokens": np.int64,
+    "completion_tokens": np.int64,
+    "total_tokens": np.int64,
+    "cost": np.float64,
+    "success": np.bool_,
+    "retry_count": np.int64,
+    "call": object,
+}
+
 
 @dataclass
 class LLMCallMetrics:
@@ -85,8 +103,8 @@ class UnifiedLLMMetrics:
         self.token_counter = get_token_counter()
         self.llm_tracker = get_llm_tracker()
         self.tracer = trace.get_tracer(__name__) if OTEL_AVAILABLE else None
-        self.call_history: List[LLMCallMetrics] = []
         self.max_history = 1000  # Keep last 1000 calls in memory
+        self.call_history = ColumnRing(self.max_history, CALL_COLUMNS)
 
     async def track_chat_completion(
         self,
@@ -153,10 +171,20 @@ class UnifiedLLMMetrics:
             span_id=span_id,
         )
 
-        # Store in history (rolling window)
-        self.call_history.append(metrics)
-        if len(self.call_history) > self.max_history:
-            self.call_history.pop(0)
+        # Store in history (rolling window, oldest overwritten)
+        self.call_history.append(
+            timestamp=metrics.timestamp.timestamp(),
+            model=model,
+            endpoint=endpoint,
+            duration=duration,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+            cost=cost,
+            success=success,
+            retry_count=retry_count,
+            call=metrics,
+        )
 
         return metrics
 
@@ -313,21 +341,15 @@ class UnifiedLLMMetrics:
         Returns:
             Summary statistics dictionary
         """
-        filtered_calls = self.call_history
-
-        # Apply filters
-        if model:
-            filtered_calls = [c for c in filtered_calls if c.model == model]
-        if endpoint:
-            filtered_calls = [c for c in filtered_calls if c.endpoint == endpoint]
+        history = self.call_history
+        mask = self._filter_mask(history.column, model, endpoint)
         if time_window_minutes:
+            # timestamps are naive UTC datetimes, so compare in the same frame
             cutoff = datetime.utcnow().timestamp() - (time_window_minutes * 60)
-            filtered_calls = [
-                c for c in filtered_calls
-                if c.timestamp.timestamp() > cutoff
-            ]
+            mask &= history.column("timestamp") > cutoff
 
-        if not filtered_calls:
+        total_calls = int(np.count_nonzero(mask))
+        if not total_calls:
             return {
                 "total_calls": 0,
                 "success_rate": 0.0,
@@ -337,12 +359,14 @@ class UnifiedLLMMetrics:
                 "avg_tokens_per_call": 0.0,
             }
 
-        total_calls = len(filtered_calls)
-        successful_calls = sum(1 for c in filtered_calls if c.success)
-        total_tokens = sum(c.usage.total_tokens for c in filtered_calls)
-        total_cost = sum(c.cost for c in filtered_calls)
-        total_duration = sum(c.duration for c in filtered_calls)
-        total_retries = sum(c.retry_count for c in filtered_calls)
+        def total(name: str):
+            return history.column(name)[mask].sum().item()
+
+        successful_calls = int(np.count_nonzero(history.column("success")[mask]))
+        total_tokens = total("total_tokens")
+        total_cost = total("cost")
+        total_duration = total("duration")
+        total_retries = total("retry_count")
 
         return {
             "total_calls": total_calls,
@@ -350,18 +374,27 @@ class UnifiedLLMMetrics:
             "failed_calls": total_calls - successful_calls,
             "success_rate": successful_calls / total_calls,
             "total_tokens": total_tokens,
-            "total_prompt_tokens": sum(c.usage.prompt_tokens for c in filtered_calls),
-            "total_completion_tokens": sum(c.usage.completion_tokens for c in filtered_calls),
+            "total_prompt_tokens": total("prompt_tokens"),
+            "total_completion_tokens": total("completion_tokens"),
             "total_cost": total_cost,
             "avg_duration": total_duration / total_calls,
             "avg_tokens_per_call": total_tokens / total_calls,
             "avg_cost_per_call": total_cost / total_calls,
             "total_retries": total_retries,
             "avg_retries_per_call": total_retries / total_calls,
-            "models": list(set(c.model for c in filtered_calls)),
-            "endpoints": list(set(c.endpoint for c in filtered_calls)),
+            "models": history.labels("model", np.unique(history.column("model")[mask])).tolist(),
+            "endpoints": history.labels("endpoint", np.unique(history.column("endpoint")[mask])).tolist(),
         }
 
+    def _filter_mask(self, column, model: Optional[str], endpoint: Optional[str]) -> np.ndarray:
+        """Boolean mask over ``column(name)`` arrays selecting the given model/endpoint."""
+        mask = np.ones(len(column("model")), dtype=bool)
+        if model:
+            mask &= column("model") == self.call_history.code("model", model)
+        if endpoint:
+            mask &= column("endpoint") == self.call_history.code("endpoint", endpoint)
+        return mask
+
     def get_recent_calls(
         self,
         limit: int = 10,
@@ -379,16 +412,13 @@ class UnifiedLLMMetrics:
         Returns:
             List of call metadata dictionaries
         """
-        filtered_calls = self.call_history
-
-        if model:
-            filtered_calls = [c for c in filtered_calls if c.model == model]
-        if endpoint:
-            filtered_calls = [c for c in filtered_calls if c.endpoint == endpoint]
+        history = self.call_history
+        matches = np.flatnonzero(self._filter_mask(history.window, model, endpoint))
 
-        # Return most recent calls
-        recent = filtered_calls[-limit:] if len(filtered_calls) > limit else filtered_calls
-        return [call.to_dict() for call in reversed(recent)]
+        # Return most recent calls (only these are turned back into dicts)
+        recent = matches[-limit:] if len(matches) > limit else matches
+        calls = history.window("call")
+        return [calls[i].to_dict() for i in reversed(recent)]
 
 
 # Global singleton
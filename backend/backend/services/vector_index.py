@@ -0,0 +1,349 @@
+"""
+In-process vector indexes for semantic cache layers.
+
+Backends:
+- FlatVectorIndex: contiguous float32 matrix, one batched matmul per lookup (exact)
+- HNSWVectorIndex: hnswlib graph index (approximate, optional dependency)
+
+Both keep a parallel expiry array so TTL filtering happens inside the same
+vectorized lookup instead of a per-entry Python loop.
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# hnswlib is optional - fall back to the flat index when missing
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+
+class FlatVectorIndex:
+    """
+    Exact inner-product index backed by a growable float32 matrix.
+
+    Vectors are expected to be L2-normalized, so inner product == cosine.
+    Rows freed by remove() are recycled by later add() calls.
+    """
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 1024):
+        self.dim = dim
+        self._capacity = 0
+        self._initial_capacity = max(1, initial_capacity)
+        self._size = 0  # High-water mark of used rows
+        self._vectors: Optional[np.ndarray] = None
+        self._expires_at = np.empty(0, dtype=np.float64)  # -inf marks a free row
+        self._keys: List[Optional[str]] = []
+        self._key_to_row: Dict[str, int] = {}
+        self._free_rows: List[int] = []
+        if dim is not None:
+            self._allocate(dim, self._initial_capacity)
+
+    def _allocate(self, dim: int, capacity: int):
+        """Allocate (or grow) the backing arrays, preserving existing rows."""
+        vectors = np.zeros((capacity, dim), dtype=np.float32)
+        expires_at = np.full(capacity, -np.inf, dtype=np.float64)
+        if self._vectors is not None and self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+            expires_at[:self._size] = self._expires_at[:self._size]
+        self.dim = dim
+        self._vectors = vectors
+        self._expires_at = expires_at
+        self._keys.extend([None] * (capacity - len(self._keys)))
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self._key_to_row)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_to_row
+
+    def add(self, key: str, vector: np.ndarray, expires_at: float = np.inf):
+        """Insert or overwrite a vector. O(dim) amortized."""
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if self._vectors is None:
+            self._allocate(vector.shape[0], self._initial_capacity)
+        elif vector.shape[0] != self.dim:
+            raise ValueError(f"Vector dim {vector.shape[0]} does not match index dim {self.dim}")
+
+        row = self._key_to_row.get(key)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                if self._size >= self._capacity:
+                    self._allocate(self.dim, self._capacity * 2)
+                row = self._size
+                self._size += 1
+            self._key_to_row[key] = row
+            self._keys[row] = key
+
+        self._vectors[row] = vector
+        self._expires_at[row] = expires_at
+
+    def add_batch(self, keys: List[str], vectors: np.ndarray, expires_at: np.ndarray):
+        """Bulk insert (used for warm starts). Existing keys are overwritten."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(keys):
+            return
+        if any(key in self._key_to_row for key in keys):
+            for key, vector, expiry in zip(keys, vectors, expires_at):
+                self.add(key, vector, float(expiry))
+            return
+
+        if self._vectors is None:
+            self._allocate(vectors.shape[1], max(self._initial_capacity, len(keys)))
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Vector dim {vectors.shape[1]} does not match index dim {self.dim}")
+        needed = self._size + len(keys)
+        if needed > self._capacity:
+            capacity = self._capacity
+            while capacity < needed:
+                capacity *= 2
+            self._allocate(self.dim, capacity)
+
+        start, end = self._size, self._size + len(keys)
+        self._vectors[start:end] = vectors
+        self._expires_at[start:end] = expires_at
+        self._keys[start:end] = keys
+        self._key_to_row.update(zip(keys, range(start, end)))
+        self._size = end
+
+    def get_vectors(self, keys: List[str]) -> np.ndarray:
+        """Return the stored vectors for ``keys`` (one row each, in order)."""
+        rows = [self._key_to_row[key] for key in keys]
+        return self._vectors[rows] if rows else np.zeros((0, self.dim or 0), dtype=np.float32)
+
+    def remove(self, key: str) -> bool:
+        """Remove a vector by key. O(1)."""
+        row = self._key_to_row.pop(key, None)
+        if row is None:
+            return False
+        self._keys[row] = None
+        self._expires_at[row] = -np.inf
+        self._free_rows.append(row)
+        return True
+
+    def expired_keys(self, now: Optional[float] = None) -> List[str]:
+        """Return keys whose expiry is at or before ``now``."""
+        if not self._size:
+            return []
+        now = time.time() if now is None else now
+        expires = self._expires_at[:self._size]
+        rows = np.nonzero((expires <= now) & np.isfinite(expires))[0]
+        return [self._keys[r] for r in rows if self._keys[r] is not None]
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 1,
+        now: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Batched top-k inner-product search over live, unexpired rows.
+
+        Returns:
+            List of (key, score) sorted by descending score
+        """
+        if not self._key_to_row:
+            return []
+        now = time.time() if now is None else now
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+
+        scores = self._vectors[:self._size] @ query
+        scores[self._expires_at[:self._size] <= now] = -np.inf
+
+        k = min(k, self._size)
+        if k == 1:
+            top_rows = np.array([int(np.argmax(scores))])
+        else:
+            top_rows = np.argpartition(-scores, k - 1)[:k]
+            top_rows = top_rows[np.argsort(-scores[top_rows])]
+
+        return [
+            (self._keys[r], float(scores[r]))
+            for r in top_rows
+            if np.isfinite(scores[r])
+        ]
+
+    def clear(self):
+        """Drop all vectors (keeps dimensionality)."""
+        dim = self.dim
+        self._vectors = None
+        self._expires_at = np.empty(0, dtype=np.float64)
+        self._keys = []
+        self._key_to_row.clear()
+        self._free_rows = []
+        self._size = 0
+        self._capacity = 0
+        if dim is not None:
+            self._allocate(dim, self._initial_capacity)
+
+
+class HNSWVectorIndex:
+    """
+    Approximate inner-product index backed by hnswlib.
+
+    Deleted labels are soft-deleted in the graph and their slots reused,
+    expiry is tracked in a parallel array and filtered after the graph lookup.
+    """
+
+    def __init__(
+        self,
+        dim: Optional[int] = None,
+        initial_capacity: int = 1024,
+        ef_construction: int = 200,
+        m: int = 16,
+        ef_search: int = 64
+    ):
+        if not HNSWLIB_AVAILABLE:
+            raise RuntimeError("hnswlib is not installed")
+        self.dim = dim
+        self._initial_capacity = max(1, initial_capacity)
+        self._ef_construction = ef_construction
+        self._m = m
+        self._ef_search = ef_search
+        self._index = None
+        self._capacity = 0
+        self._next_label = 0
+        self._expires_at = np.empty(0, dtype=np.float64)
+        self._labels: Dict[str, int] = {}
+        self._keys: Dict[int, str] = {}
+        self._free_labels: List[int] = []
+        if dim is not None:
+            self._allocate(dim)
+
+    def _allocate(self, dim: int):
+        self.dim = dim
+        self._capacity = self._initial_capacity
+        self._index = hnswlib.Index(space='ip', dim=dim)
+        self._index.init_index(
+            max_elements=self._capacity,
+            ef_construction=self._ef_construction,
+            M=self._m,
+            allow_replace_deleted=True
+        )
+        self._index.set_ef(self._ef_search)
+        self._expires_at = np.full(self._capacity, -np.inf, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._labels
+
+    def add(self, key: str, vector: np.ndarray, expires_at: float = np.inf):
+        vector = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        if self._index is None:
+            self._allocate(vector.shape[1])
+
+        label = self._labels.get(key)
+        if label is not None:
+            # hnswlib updates an existing label in place
+            self._index.add_items(vector, [label])
+        else:
+            if self._free_labels:
+                label = self._free_labels.pop()
+                self._index.add_items(vector, [label], replace_deleted=True)
+            else:
+                if self._next_label >= self._capacity:
+                    self._capacity *= 2
+                    self._index.resize_index(self._capacity)
+                    grown = np.full(self._capacity, -np.inf, dtype=np.float64)
+                    grown[:len(self._expires_at)] = self._expires_at
+                    self._expires_at = grown
+                label = self._next_label
+                self._next_label += 1
+                self._index.add_items(vector, [label])
+            self._labels[key] = label
+            self._keys[label] = key
+
+        self._expires_at[label] = expires_at
+
+    def add_batch(self, keys: List[str], vectors: np.ndarray, expires_at: np.ndarray):
+        for key, vector, expiry in zip(keys, vectors, expires_at):
+            self.add(key, vector, float(expiry))
+
+    def get_vectors(self, keys: List[str]) -> np.ndarray:
+        if not keys:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self._index.get_items([self._labels[key] for key in keys]), dtype=np.float32)
+
+    def remove(self, key: str) -> bool:
+        label = self._labels.pop(key, None)
+        if label is None:
+            return False
+        del self._keys[label]
+        self._index.mark_deleted(label)
+        self._expires_at[label] = -np.inf
+        self._free_labels.append(label)
+        return True
+
+    def expired_keys(self, now: Optional[float] = None) -> List[str]:
+        if not self._labels:
+            return []
+        now = time.time() if now is None else now
+        expires = self._expires_at[:self._next_label]
+        labels = np.nonzero((expires <= now) & np.isfinite(expires))[0]
+        return [self._keys[int(l)] for l in labels if int(l) in self._keys]
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 1,
+        now: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        if not self._labels:
+            return []
+        now = time.time() if now is None else now
+        query = np.asarray(query, dtype=np.float32).reshape(1, -1)
+
+        # Over-fetch a little so expired neighbours can be filtered out
+        fetch = min(len(self._labels), max(k * 4, k + 8))
+        labels, distances = self._index.knn_query(query, k=fetch)
+
+        results = []
+        for label, distance in zip(labels[0], distances[0]):
+            label = int(label)
+            if self._expires_at[label] <= now or label not in self._keys:
+                continue
+            # hnswlib 'ip' space returns 1 - inner_product
+            results.append((self._keys[label], float(1.0 - distance)))
+            if len(results) >= k:
+                break
+        return results
+
+    def clear(self):
+        dim = self.dim
+        self._index = None
+        self._labels.clear()
+        self._keys.clear()
+        self._free_labels = []
+        self._next_label = 0
+        if dim is not None:
+            self._allocate(dim)
+
+
+def create_vector_index(backend: str = "flat", dim: Optional[int] = None, **kwargs):
+    """
+    Create a vector index by backend name.
+
+    Args:
+        backend: "flat" (exact) or "hnsw" (approximate, needs hnswlib)
+        dim: Vector dimensionality (inferred from the first add() when None)
+    """
+    backend = (backend or "flat").lower()
+    if backend == "hnsw":
+        if HNSWLIB_AVAILABLE:
+            return HNSWVectorIndex(dim=dim, **kwargs)
+        logger.warning("hnswlib not installed, falling back to flat vector index")
+    elif backend != "flat":
+        logger.warning("Unknown vector index backend, using flat", backend=backend)
+    return FlatVectorIndex(dim=dim, initial_capacity=kwargs.get("initial_capacity", 1024))
@@ -30,6 +30,11 @@ except ImportError:  # pragma: no cover - fallback to local stubs
         track_embedding_tokens,
     )
 
+try:
+    from utils.text_splitter import split_text  # type: ignore
+except ImportError:  # pragma: no cover - package layout
+    from backend.utils.text_splitter import split_text  # type: ignore
+
 try:
     from pgvector.sqlalchemy import Vector as PgVectorType  # type: ignore
 except ImportError:  # pragma: no cover - pgvector optional
@@ -503,60 +508,21 @@ async def _rerank(
 
 async def _track_retrieval_access(db: AsyncSession, results: List[Dict[str, Any]]) -> None:
     """
-    Track document and chunk access for cold/hot tier management.
-    Also triggers automatic rehydration for cold documents.
+    Record document and chunk access for cold/hot tier management.
+
+    Only updates in-memory counters; the knowledge_tier AccessTracker flushes
+    them in bulk and rehydrates cold documents in the background.
     """
     if not results:
         return
 
     try:
-        from services.knowledge_tier import track_document_access, track_chunk_usage, rehydrate_document
-        from models import KnowledgeDocument
-        from sqlalchemy import select
-
-        # Collect unique document IDs and chunk IDs
-        document_ids = set()
-        chunk_ids = set()
-
-        for result in results:
-            if "document_id" in result:
-                document_ids.add(result["document_id"])
-            if "id" in result:
-                chunk_ids.add(result["id"])
-
-        # Check for cold documents and rehydrate if needed
-        if document_ids:
-            stmt = select(KnowledgeDocument).where(
-                KnowledgeDocument.id.in_(document_ids),
-                KnowledgeDocument.is_cold == True  # noqa: E712
-            )
-            result = await db.execute(stmt)
-            cold_docs = result.scalars().all()
-
-            # Rehydrate cold documents asynchronously (fire and forget)
-            for doc in cold_docs:
-                try:
-                    await rehydrate_document(db, doc.id)
-                except Exception as e:
-                    # Log but don't fail the retrieval
-                    import logging
-                    logging.getLogger(__name__).warning(
-                        f"Failed to rehydrate cold document {doc.id}: {e}"
-                    )
-
-        # Track access for all documents
-        for doc_id in document_ids:
-            try:
-                await track_document_access(db, doc_id)
-            except Exception:
-                pass  # Don't fail retrieval if tracking fails
+        from services.knowledge_tier import get_access_tracker
 
-        # Track usage for all chunks
-        for chunk_id in chunk_ids:
-            try:
-                await track_chunk_usage(db, chunk_id)
-            except Exception:
-                pass  # Don't fail retrieval if tracking fails
+        get_access_tracker(db).record(
+            {result["document_id"] for result in results if "document_id" in result},
+            {result["id"] for result in results if "id" in result},
+        )
 
     except ImportError:
         # knowledge_tier module not available, skip tracking
@@ -615,33 +581,11 @@ def _split_text(
     chunk_overlap: int = 100,
 ) -> List[str]:
     """
-    Simple splitter that works on sentence-like boundaries to avoid cutting words abruptly.
+    Split on sentence (including 。！？) and paragraph boundaries; see utils.text_splitter.
     """
     if chunk_size <= chunk_overlap:
         raise ValueError("chunk_size must be greater than chunk_overlap")
-
-    paragraphs = [p.strip() for p in text_value.split("\n\n") if p.strip()]
-    chunks: List[str] = []
-    buffer: List[str] = []
-    current_len = 0
-    for para in paragraphs:
-        sentences = [s.strip() for s in para.replace("\n", " ").split("。") if s.strip()]
-        for sent in sentences:
-            token_estimate = len(sent)
-            if current_len + token_estimate > chunk_size and buffer:
-                chunks.append("".join(buffer).strip())
-                overlap_text = "".join(buffer)[-chunk_overlap:] if chunk_overlap > 0 else ""
-                buffer = [overlap_text] if overlap_text else []
-                current_len = len(overlap_text)
-            buffer.append(sent + "。")
-            current_len += token_estimate
-        if buffer and buffer[-1].endswith("。"):
-            buffer[-1] = buffer[-1]  # keep punctuation
-
-    if buffer:
-        chunks.append("".join(buffer).strip())
-
-    return [chunk for chunk in chunks if chunk]
+    return split_text(text_value, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
 
 async def ingest_document(
@@ -1,33 +1,247 @@
 """
-Simple text splitter used for RAG ingestion.
+Sentence-aware text splitter used for RAG ingestion.
+
+Chunks are packed from whole sentences up to a budget, preferring to end at
+a paragraph break once half full. The budget is in characters by default,
+or in tokens when a batch token counter is given (see tokenizer_counter(); pass
+the embedding model's own tokenizer so chunks are never truncated by it).
+Sentences longer than the budget are cut at whitespace.
+
+iter_spans() streams (start, end) offsets into the original string without
+copying text; only sentences sent to the token counter are sliced.
 """
-from typing import List
+import re
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# Batch token counter: texts -> token counts (without special tokens)
+TokenCounter = Callable[[Sequence[str]], List[int]]
+
+# Sentence end (followed by whitespace or end of text), CJK sentence end, or paragraph break
+_BOUNDARY = re.compile(r"[.!?]+[\"'”’)\]]*(?=\s|$)|[。！？]+|\n[ \t]*\n")
 
 
-def split_text(text: str, *, chunk_size: int, chunk_overlap: int) -> List[str]:
+class TextSpan(NamedTuple):
+    """A chunk as offsets into the source text; num_tokens is in budget units."""
+    start: int
+    end: int
+    num_tokens: int
+
+
+def tokenizer_counter(tokenizer) -> TokenCounter:
     """
-    Split text into overlapping chunks based on character count.
+    Batch token counter for a Hugging Face tokenizer (special tokens excluded).
+
+    Counting a large document with a slow (pure Python) tokenizer takes
+    seconds per MB, so one is replaced by the Rust tokenizer built from the
+    tokenizer.json next to it when that file exists (same vocabulary, same
+    counts).
+    """
+    rust = None if getattr(tokenizer, "is_fast", False) else _rust_tokenizer(tokenizer)
+    if rust is not None:
+        def count_rust(texts: Sequence[str]) -> List[int]:
+            return [len(encoding.ids) for encoding in rust.encode_batch(list(texts), add_special_tokens=False)]
+        return count_rust
+
+    def count(texts: Sequence[str]) -> List[int]:
+        encoded = tokenizer(
+            list(texts),
+            add_special_tokens=False,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+            verbose=False,
+        )
+        return [len(ids) for ids in encoded["input_ids"]]
+    return count
+
+
+def _rust_tokenizer(tokenizer):
+    path = Path(getattr(tokenizer, "name_or_path", "") or ".") / "tokenizer.json"
+    if not path.is_file():
+        return None
+    try:
+        from tokenizers import Tokenizer
+        rust = Tokenizer.from_file(str(path))
+    except Exception:
+        return None
+    rust.no_truncation()
+    rust.no_padding()
+    return rust
+
+
+def _trim(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def iter_sentence_spans(text: str) -> Iterator[Tuple[int, int, bool]]:
+    """Yield (start, end, ends_paragraph) for each sentence, whitespace trimmed."""
+    pending: Optional[List] = None
+    pos = 0
+    for match in _BOUNDARY.finditer(text):
+        paragraph = match.group().startswith("\n")
+        start, end = _trim(text, pos, match.start() if paragraph else match.end())
+        pos = match.end()
+        if start < end:
+            if pending is not None:
+                yield tuple(pending)
+            pending = [start, end, paragraph]
+        elif paragraph and pending is not None:
+            pending[2] = True
+    start, end = _trim(text, pos, len(text))
+    if start < end:
+        if pending is not None:
+            yield tuple(pending)
+        pending = [start, end, True]
+    if pending is not None:
+        pending[2] = True
+        yield tuple(pending)
+
+
+def _split_oversized(
+    text: str,
+    start: int,
+    end: int,
+    size: int,
+    limit: int,
+    count: Optional[TokenCounter]
+) -> List[Tuple[int, int, int]]:
+    """Cut one over-budget sentence into pieces at whitespace (hard cut if there is none)."""
+    # Characters per piece, scaled from the sentence's chars/token ratio with some headroom
+    target = limit if count is None else max(1, int((end - start) * limit / size * 0.9))
+    bounds = []
+    pos = start
+    while pos < end:
+        cut = min(pos + target, end)
+        if cut < end:
+            space = max(text.rfind(" ", pos + 1, cut + 1), text.rfind("\n", pos + 1, cut + 1))
+            if space > pos:
+                cut = space
+        piece_start, piece_end = _trim(text, pos, cut)
+        if piece_start < piece_end:
+            bounds.append((piece_start, piece_end))
+        pos = cut
+
+    if count is None:
+        return [(s, e, e - s) for s, e in bounds]
+    pieces = []
+    for (s, e), n in zip(bounds, count([text[s:e] for s, e in bounds])):
+        if n > limit and e - s > 1:
+            pieces.extend(_split_oversized(text, s, e, n, limit, count))
+        else:
+            pieces.append((s, e, n))
+    return pieces
+
+
+def _iter_units(
+    text: str,
+    limit: int,
+    count: Optional[TokenCounter],
+    batch_size: int
+) -> Iterator[Tuple[int, int, int, bool]]:
+    """Yield (start, end, size, ends_paragraph) sentences no larger than limit."""
+    sentences = iter_sentence_spans(text)
+    while True:
+        batch = []
+        for sentence in sentences:
+            batch.append(sentence)
+            if len(batch) >= batch_size:
+                break
+        if not batch:
+            return
+        if count is None:
+            sizes = [end - start for start, end, _ in batch]
+        else:
+            sizes = count([text[start:end] for start, end, _ in batch])
+        for (start, end, paragraph), size in zip(batch, sizes):
+            if size <= limit:
+                yield start, end, size, paragraph
+                continue
+            pieces = _split_oversized(text, start, end, size, limit, count)
+            for i, (s, e, n) in enumerate(pieces):
+                yield s, e, n, paragraph and i == len(pieces) - 1
+
+
+def iter_spans(
+    text: str,
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    count_tokens: Optional[TokenCounter] = None,
+    batch_size: int = 256
+) -> Iterator[TextSpan]:
+    """
+    Yield chunk offsets packed from whole sentences.
+
+    Args:
+        chunk_size: Budget per chunk (characters, or tokens with count_tokens)
+        chunk_overlap: Budget of trailing whole sentences repeated in the next chunk
+        count_tokens: Batch token counter; None counts characters
+        batch_size: Sentences per token-counter call
     """
     if chunk_size <= 0:
         raise ValueError("chunk_size must be positive")
     if chunk_overlap >= chunk_size:
         chunk_overlap = max(chunk_size // 4, 0)
+    chars = count_tokens is None
 
-    cleaned = text.strip()
-    if not cleaned:
-        return []
+    window: deque = deque()  # (start, end, size) of the sentences in the current chunk
+    total = 0
+    after_paragraph = False
+    for start, end, size, paragraph in _iter_units(text, chunk_size, count_tokens, max(1, batch_size)):
+        # In character mode the budget covers the whitespace between sentences too
+        cost = size + (start - window[-1][1] if chars and window else 0)
+        if window and (total + cost > chunk_size or (after_paragraph and total >= chunk_size // 2)):
+            yield TextSpan(window[0][0], window[-1][1], total)
+            carried: deque = deque()
+            carried_total = 0
+            # Overlap repeats trailing sentences, but never across a paragraph break
+            for unit in (() if after_paragraph else reversed(window)):
+                unit_cost = (carried[0][0] - unit[0]) if chars and carried else unit[2]
+                if carried_total + unit_cost > chunk_overlap:
+                    break
+                carried.appendleft(unit)
+                carried_total += unit_cost
+            gap = start - carried[-1][1] if chars and carried else 0
+            if carried_total + gap + size > chunk_size:
+                carried.clear()
+                carried_total = 0
+            window = carried
+            total = carried_total
+            cost = size + (start - window[-1][1] if chars and window else 0)
+        window.append((start, end, size))
+        total += cost
+        after_paragraph = paragraph
+    if window:
+        yield TextSpan(window[0][0], window[-1][1], total)
 
-    chunks: List[str] = []
-    start = 0
-    text_length = len(cleaned)
 
-    while start < text_length:
-        end = min(start + chunk_size, text_length)
-        chunk = cleaned[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        if end == text_length:
-            break
-        start = end - chunk_overlap
+def iter_chunks(
+    text: str,
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    count_tokens: Optional[TokenCounter] = None
+) -> Iterator[str]:
+    """
+    Yield chunk texts lazily (see iter_spans()).
+    """
+    for span in iter_spans(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap, count_tokens=count_tokens):
+        yield text[span.start:span.end]
 
-    return chunks
+
+def split_text(
+    text: str,
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    count_tokens: Optional[TokenCounter] = None
+) -> List[str]:
+    """
+    Split text into sentence-aligned, overlapping chunks.
+    """
+    return list(iter_chunks(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap, count_tokens=count_tokens))
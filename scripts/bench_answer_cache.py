@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark Layer 3 (semantic) lookup latency of the answer cache.
+
+Compares the legacy per-entry Python loop against the vectorized
+FlatVectorIndex (and HNSWVectorIndex when hnswlib is installed)
+at 1k, 10k and 100k cached answers.
+
+Usage:
+    python scripts/bench_answer_cache.py [--dim 384] [--queries 200]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.vector_index import FlatVectorIndex, HNSWLIB_AVAILABLE, create_vector_index
+
+
+def _random_unit(rng, n, dim):
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _legacy_lookup(entries, query_emb, ttl):
+    """The pre-index implementation: one np.dot + datetime.now() per entry."""
+    best_score, best = 0.0, None
+    for key, entry in entries.items():
+        if datetime.now() - entry['cached_at'] > ttl:
+            continue
+        similarity = float(np.dot(query_emb, entry['embedding']))
+        if similarity > best_score:
+            best_score, best = similarity, key
+    return best, best_score
+
+
+def _percentiles(samples_ms):
+    arr = np.asarray(samples_ms)
+    return np.percentile(arr, 50), np.percentile(arr, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    ttl = timedelta(hours=72)
+    expires_at = time.time() + ttl.total_seconds()
+
+    print(f"{'size':>8} {'backend':>8} {'p50 ms':>10} {'p99 ms':>10} {'recall@1':>9}")
+    print("=" * 50)
+
+    for size in args.sizes:
+        vectors = _random_unit(rng, size, args.dim)
+        # Queries are noisy copies of cached vectors so there is a true nearest neighbour
+        targets = rng.integers(0, size, args.queries)
+        queries = vectors[targets] + 0.05 * _random_unit(rng, args.queries, args.dim)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        backends = {"flat": FlatVectorIndex(dim=args.dim, initial_capacity=size)}
+        if HNSWLIB_AVAILABLE:
+            backends["hnsw"] = create_vector_index("hnsw", dim=args.dim, initial_capacity=size)
+        for index in backends.values():
+            for i, vec in enumerate(vectors):
+                index.add(str(i), vec, expires_at=expires_at)
+
+        # Legacy loop is slow, so sample fewer queries at large sizes
+        legacy_queries = queries[: max(5, args.queries * 1000 // size)]
+        entries = {
+            str(i): {'embedding': vec, 'cached_at': datetime.now()}
+            for i, vec in enumerate(vectors)
+        }
+        timings, correct = [], 0
+        for q, target in zip(legacy_queries, targets):
+            start = time.perf_counter()
+            best, _ = _legacy_lookup(entries, q, ttl)
+            timings.append((time.perf_counter() - start) * 1000)
+            correct += best == str(target)
+        p50, p99 = _percentiles(timings)
+        print(f"{size:>8} {'legacy':>8} {p50:>10.3f} {p99:>10.3f} {correct / len(legacy_queries):>9.2f}")
+
+        for name, index in backends.items():
+            timings, correct = [], 0
+            for q, target in zip(queries, targets):
+                start = time.perf_counter()
+                hits = index.search(q, k=1)
+                timings.append((time.perf_counter() - start) * 1000)
+                correct += bool(hits) and hits[0][0] == str(target)
+            p50, p99 = _percentiles(timings)
+            print(f"{size:>8} {name:>8} {p50:>10.3f} {p99:>10.3f} {correct / len(queries):>9.2f}")
+
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark BM25 top-k search: BM25Index (MaxScore + partition) vs BM25Okapi.
+
+Builds both over the same synthetic Zipf-distributed corpus, checks that
+the top-k results agree, and reports p50/p99 latency. The baseline is what
+HybridRetriever used to do: get_scores() over every document + full argsort.
+
+Usage:
+    python scripts/bench_bm25_search.py [--docs 200000] [--queries 200] [--top-k 100]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.bm25_index import BM25Index
+
+
+def _corpus(num_docs: int, vocab_size: int, rng):
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    weights = 1.0 / np.arange(1, vocab_size + 1) ** 1.1
+    weights /= weights.sum()
+    lengths = rng.integers(40, 200, num_docs)
+    flat = rng.choice(vocab_size, int(lengths.sum()), p=weights)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return vocab, [vocab[flat[bounds[i]:bounds[i + 1]]].tolist() for i in range(num_docs)]
+
+
+def _baseline_search(bm25: BM25Okapi, doc_ids, tokens, top_k):
+    scores = bm25.get_scores(tokens)
+    top_indices = np.argsort(scores)[-top_k:][::-1]
+    return [(doc_ids[i], float(scores[i])) for i in top_indices]
+
+
+def _same_results(expected, actual, top_k) -> bool:
+    """Positive-score top-k must match; ids may differ only within exact-score ties."""
+    expected = [(doc_id, score) for doc_id, score in expected if score > 0][:top_k]
+    if len(expected) != len(actual):
+        return False
+    if not np.allclose([s for _, s in expected], [s for _, s in actual], rtol=1e-9, atol=1e-9):
+        return False
+    if not expected:
+        return True
+    cutoff = expected[-1][1]
+    strict = lambda results: {doc_id for doc_id, score in results if score > cutoff + 1e-9}
+    return strict(expected) == strict(actual)
+
+
+def _percentiles(samples_ms):
+    return np.percentile(samples_ms, 50), np.percentile(samples_ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    vocab, docs = _corpus(args.docs, args.vocab, rng)
+    doc_ids = [str(i) for i in range(args.docs)]
+
+    start = time.perf_counter()
+    bm25 = BM25Okapi(docs)
+    print(f"BM25Okapi build: {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    index = BM25Index()
+    index.build(zip(doc_ids, docs))
+    print(f"BM25Index build: {time.perf_counter() - start:.1f}s")
+
+    # Mix of frequent, mid-frequency and rare terms, 2-6 per query
+    queries = [
+        vocab[rng.integers(0, args.vocab // (10 ** rng.integers(0, 3)), rng.integers(2, 7))].tolist()
+        for _ in range(args.queries)
+    ]
+
+    baseline_ms, indexed_ms, mismatches = [], [], 0
+    for tokens in queries:
+        start = time.perf_counter()
+        expected = _baseline_search(bm25, doc_ids, tokens, args.top_k)
+        baseline_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        actual = index.search(tokens, top_k=args.top_k)
+        indexed_ms.append((time.perf_counter() - start) * 1000)
+
+        mismatches += not _same_results(expected, actual, args.top_k)
+
+    print("=" * 60)
+    print(f"{args.docs} docs, {args.queries} queries, top_k={args.top_k}")
+    for name, samples in (("BM25Okapi + argsort", baseline_ms), ("BM25Index MaxScore", indexed_ms)):
+        p50, p99 = _percentiles(samples)
+        print(f"  {name:<22} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+    print(f"  result mismatches: {mismatches}/{args.queries}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
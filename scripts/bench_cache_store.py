@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark answer cache warm-start from the persistent cache store.
+
+Writes N synthetic answers into a SQLite (or fakeredis) store, then times
+how long a fresh MultiLayerAnswerCache takes to rebuild the exact, TF-IDF
+and semantic layers from it: first from the records (which also saves the
+snapshot), then from the snapshot as every later start does.
+
+Usage:
+    python scripts/bench_cache_store.py [--entries 100000] [--backend sqlite|fakeredis]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.models.rag_schemas import RAGResponse
+from backend.services.answer_cache import STORE_NAMESPACE, MultiLayerAnswerCache
+from backend.services.cache_store import RedisCacheStore, SQLiteCacheStore
+
+WORDS = (
+    "who wrote pride prejudice sherlock holmes author novel chapter character "
+    "ending theme setting london war peace whale captain ship letter love"
+).split()
+
+
+def _populate(store, entries: int, dim: int):
+    rng = np.random.default_rng(7)
+    payload = json.dumps({
+        'answer': RAGResponse(
+            answer="A cached answer " * 20,
+            retrieval_time_ms=10.0,
+            confidence=0.9,
+            num_chunks_retrieved=5,
+        ).model_dump(mode='json'),
+        'metadata': {},
+    }).encode()
+    expires_at = time.time() + 3600
+    vectors = rng.standard_normal((entries, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Same lookup keys cache_answer() writes (Layer 1 hash + Layer 2 terms)
+    keys_for = MultiLayerAnswerCache()._lookup_keys
+
+    if isinstance(store, SQLiteCacheStore):
+        # Bulk insert directly, the per-put commit path is not what we measure here
+        rows = []
+        for i in range(entries):
+            query = " ".join(rng.choice(WORDS, 6)) + f" {i}"
+            rows.append((
+                STORE_NAMESPACE, f"k{i}", query, payload, vectors[i].tobytes(),
+                time.time(), expires_at, keys_for(query)
+            ))
+        store._conn.executemany(
+            "INSERT OR REPLACE INTO cache_entries "
+            "(namespace, key, query, payload, embedding, created_at, expires_at, lookup_keys) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        store._conn.commit()
+    else:
+        for i in range(entries):
+            query = " ".join(rng.choice(WORDS, 6)) + f" {i}"
+            store.put(STORE_NAMESPACE, f"k{i}", query, payload, vectors[i], expires_at, keys_for(query))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--backend", choices=["sqlite", "fakeredis"], default="sqlite")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.backend == "sqlite":
+            store = SQLiteCacheStore(str(Path(tmp) / "answer_cache.sqlite3"))
+        else:
+            import fakeredis
+            store = RedisCacheStore(client=fakeredis.FakeRedis())
+
+        start = time.perf_counter()
+        _populate(store, args.entries, args.dim)
+        print(f"Populated {args.entries} entries in {time.perf_counter() - start:.2f}s ({args.backend})")
+
+        print("=" * 60)
+        for label in ("records + save snapshot", "from snapshot"):
+            cache = MultiLayerAnswerCache(max_cache_size=args.entries, store=store)
+            start = time.perf_counter()
+            loaded = cache.warm_start()
+            elapsed = time.perf_counter() - start
+
+            print(f"Warm start ({label}): {loaded} entries in {elapsed * 1000:.0f} ms")
+            print(f"  layer1 exact:    {len(cache.exact_cache)}")
+            print(f"  layer2 tfidf:    {len(cache.tfidf_index)}")
+            print(f"  layer3 semantic: {len(cache.semantic_index)}")
+        print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-question hybrid retrieval cost: per-request HybridRetriever vs registry.
+
+- per-request (scroll): new HybridRetriever + initialize() with no saved index,
+                        i.e. re-scroll Qdrant and rebuild BM25 on every question
+                        (what TableRAG.hybrid_retrieve did without a BM25 cache)
+- per-request (load):   new HybridRetriever + initialize() from the saved index
+- registry:             shared retriever from HybridRetrieverRegistry (search only)
+
+Qdrant is an in-process stand-in (no network latency), so the numbers are a
+lower bound for the per-request modes.
+
+Usage:
+    python scripts/bench_hybrid_registry.py [--docs 50000] [--queries 20]
+"""
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.bm25_index import index_dir_for
+from backend.services.hybrid_retriever import HybridRetriever, HybridRetrieverRegistry
+
+COLLECTION = "bench_docs"
+
+
+class QdrantStandIn:
+    """Sync client with the scroll/search/retrieve calls HybridRetriever makes."""
+
+    def __init__(self, points):
+        self.points = points
+        self.by_id = {point.id: point for point in points}
+
+    def scroll(self, collection_name, limit, offset, with_payload, with_vectors):
+        start = offset or 0
+        next_offset = start + limit if start + limit < len(self.points) else None
+        return self.points[start:start + limit], next_offset
+
+    def search(self, collection_name, query_vector, limit, **kwargs):
+        return [SimpleNamespace(id=point.id, score=0.5) for point in self.points[:limit]]
+
+    def retrieve(self, collection_name, ids, with_payload=True):
+        return [self.by_id[i] for i in ids if i in self.by_id]
+
+
+def _points(num_docs: int, rng):
+    vocab = np.array([f"w{i}" for i in range(20000)])
+    weights = 1.0 / np.arange(1, len(vocab) + 1)
+    weights /= weights.sum()
+    return [
+        SimpleNamespace(id=i, payload={"content": " ".join(rng.choice(vocab, 80, p=weights))})
+        for i in range(num_docs)
+    ]
+
+
+async def _time_queries(make_retriever, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        retriever = await make_retriever()
+        await retriever.hybrid_search(query, [0.0] * 8, top_k=10)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main_async(args):
+    rng = np.random.default_rng(5)
+    qdrant = QdrantStandIn(_points(args.docs, rng))
+    queries = [f"w{rng.integers(0, 2000)} w{rng.integers(0, 2000)} w{rng.integers(0, 20000)}" for _ in range(args.queries)]
+    cache_dir = tempfile.mkdtemp(prefix="bench_hybrid_")
+
+    async def per_request_scroll():
+        shutil.rmtree(index_dir_for(COLLECTION, cache_dir), ignore_errors=True)
+        retriever = HybridRetriever(qdrant, COLLECTION, cache_dir=cache_dir)
+        await retriever.initialize()
+        return retriever
+
+    async def per_request_load():
+        retriever = HybridRetriever(qdrant, COLLECTION, cache_dir=cache_dir)
+        await retriever.initialize()
+        return retriever
+
+    registry = HybridRetrieverRegistry(qdrant, cache_dir=cache_dir)
+
+    async def shared():
+        return await registry.acquire(COLLECTION)
+
+    try:
+        modes = {
+            "per-request (scroll)": await _time_queries(per_request_scroll, queries),
+            "per-request (load)": await _time_queries(per_request_load, queries),
+        }
+        await shared()  # first build happens once per process
+        modes["registry"] = await _time_queries(shared, queries)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print("=" * 60)
+    print(f"{args.docs} docs, {args.queries} questions (ms per question)")
+    for name, samples in modes.items():
+        print(f"  {name:<22} p50 {np.percentile(samples, 50):9.2f}   p99 {np.percentile(samples, 99):9.2f}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingestion throughput (chunks/sec) on a synthetic corpus.
+
+- per-document: what ingest_document / ingest_documents_batch did before the
+                streaming pipeline: split each whole document, embed all its
+                chunks in one call, then one blocking upsert; documents gathered
+- streaming:    IngestionPipeline (bounded queues, batched embed, batched async
+                upserts); also re-run on the same corpus to show dedup
+
+Embedding and Qdrant are stand-ins with fixed costs (embedding runs in a
+worker thread like ONNX; upsert latency = per-request + per-point), so the
+numbers show pipeline overlap and batching, not model speed. The embedding
+stand-in is serialized (one shared ONNX session), so throughput is bounded by
+the model either way. Peak chunks in flight is a proxy for memory; max loop
+stall is the longest the event loop was blocked (other requests wait that long).
+
+Usage:
+    python scripts/bench_ingestion.py [--docs 40] [--doc-kb 200]
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.ingestion_pipeline import IngestDocument, IngestionPipeline
+from backend.utils.text_splitter import split_text
+
+CHUNK_SIZE, CHUNK_OVERLAP = 512, 50
+EMBED_CALL_S, EMBED_TEXT_S = 0.005, 0.0008
+UPSERT_CALL_S, UPSERT_POINT_S = 0.004, 0.00002
+
+
+class Tracker:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    def add(self, n):
+        self.in_flight += n
+        self.peak = max(self.peak, self.in_flight)
+
+
+_model_lock = threading.Lock()
+
+
+def _embed_blocking(texts):
+    with _model_lock:  # one ONNX session using all cores: calls do not overlap
+        time.sleep(EMBED_CALL_S + EMBED_TEXT_S * len(texts))
+    return np.zeros((len(texts), 8), dtype=np.float32).tolist()
+
+
+class QdrantStandIn:
+    def __init__(self, tracker):
+        self.ids = set()
+        self.tracker = tracker
+
+    async def retrieve(self, collection_name, ids, **kwargs):
+        await asyncio.sleep(UPSERT_CALL_S)
+        return [type("P", (), {"id": i}) for i in ids if i in self.ids]
+
+    async def upsert(self, collection_name, points):
+        await asyncio.sleep(UPSERT_CALL_S + UPSERT_POINT_S * len(points))
+        self.ids.update(p.id for p in points)
+        self.tracker.add(-len(points))
+
+
+def _corpus(num_docs, doc_kb, rng):
+    words = np.array([f"w{i}" for i in range(5000)])
+    n_words = doc_kb * 1024 // 6
+    return [
+        IngestDocument(title=f"doc {d}", content=" ".join(rng.choice(words, n_words)), source=f"doc{d}.txt")
+        for d in range(num_docs)
+    ]
+
+
+async def per_document(docs):
+    tracker = Tracker()
+
+    async def ingest(doc):
+        chunks = split_text(doc.content, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+        tracker.add(len(chunks))
+        await run_in_threadpool(_embed_blocking, chunks)
+        time.sleep(UPSERT_CALL_S + UPSERT_POINT_S * len(chunks))  # sync client.upsert on the loop
+        tracker.add(-len(chunks))
+        return len(chunks)
+
+    start = time.perf_counter()
+    total = sum(await asyncio.gather(*(ingest(doc) for doc in docs)))
+    return total, time.perf_counter() - start, tracker.peak
+
+
+async def streaming(docs, qdrant=None):
+    tracker = Tracker()
+    qdrant = qdrant or QdrantStandIn(tracker)
+    qdrant.tracker = tracker
+
+    async def embed(texts):
+        tracker.add(len(texts))
+        return await run_in_threadpool(_embed_blocking, texts)
+
+    pipeline = IngestionPipeline("bench", embed, qdrant=qdrant, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    start = time.perf_counter()
+    stats = await pipeline.run(docs)
+    return sum(s.num_chunks for s in stats), time.perf_counter() - start, tracker.peak, qdrant
+
+
+async def _with_stall_probe(coro):
+    """Run coro while a 1 ms ticker measures the longest event-loop stall (ms)."""
+    worst = 0.0
+
+    async def probe():
+        nonlocal worst
+        while True:
+            tic = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, time.perf_counter() - tic - 0.001)
+
+    task = asyncio.create_task(probe())
+    try:
+        return await coro, worst * 1000
+    finally:
+        task.cancel()
+
+
+async def main_async(args):
+    docs = _corpus(args.docs, args.doc_kb, np.random.default_rng(3))
+    rows = []
+    (total, elapsed, peak), stall = await _with_stall_probe(per_document(docs))
+    rows.append(("per-document", total, elapsed, peak, stall))
+    (total, elapsed, peak, qdrant), stall = await _with_stall_probe(streaming(docs))
+    rows.append(("streaming", total, elapsed, peak, stall))
+    (total, elapsed, peak, _), stall = await _with_stall_probe(streaming(docs, qdrant))
+    rows.append(("streaming (re-upload)", total, elapsed, peak, stall))
+
+    print("=" * 88)
+    print(f"{args.docs} docs x {args.doc_kb} KB")
+    print(f"  {'mode':<22}{'chunks':>8}{'seconds':>10}{'chunks/s':>11}{'peak in flight':>17}{'max stall ms':>15}")
+    for name, total, elapsed, peak, stall in rows:
+        print(f"  {name:<22}{total:>8}{elapsed:>10.2f}{total / elapsed:>11.0f}{peak:>17}{stall:>15.1f}")
+    print("=" * 88)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--doc-kb", type=int, default=200)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory monitoring histories.
+
+- legacy: list of per-call objects, trimmed with pop(0) / slicing, summaries
+          by list comprehension (what UnifiedLLMMetrics and DataMonitor did)
+- ring:   ColumnRing (preallocated NumPy column per metric)
+
+Reports the append cost at a full history and the cost of a filtered,
+time-windowed summary over it.
+
+Usage:
+    python scripts/bench_monitoring_history.py [--size 10000] [--summaries 200]
+"""
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.column_ring import ColumnRing
+
+COLUMNS = {"timestamp": np.float64, "model": str, "total_tokens": np.int64,
+           "duration": np.float64, "success": np.bool_}
+MODELS = ["gpt-4o-mini", "gpt-4o", "gpt-4"]
+
+
+@dataclass
+class Call:
+    timestamp: float
+    model: str
+    total_tokens: int
+    duration: float
+    success: bool
+
+
+def legacy_summary(calls, model, cutoff):
+    kept = [c for c in calls if c.model == model]
+    kept = [c for c in kept if c.timestamp > cutoff]
+    total = len(kept)
+    return (total, sum(1 for c in kept if c.success), sum(c.total_tokens for c in kept),
+            sum(c.duration for c in kept) / total)
+
+
+def ring_summary(ring, model, cutoff):
+    mask = (ring.column("model") == ring.code("model", model)) & (ring.column("timestamp") > cutoff)
+    total = int(np.count_nonzero(mask))
+    return (total, int(np.count_nonzero(ring.column("success")[mask])),
+            int(ring.column("total_tokens")[mask].sum()), float(ring.column("duration")[mask].mean()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--summaries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = time.time()
+    rows = [Call(now - (args.size * 2 - i), rng.choice(MODELS), rng.randint(10, 2000), rng.random(), rng.random() < 0.95)
+            for i in range(args.size * 2)]
+
+    calls, ring = [], ColumnRing(args.size, COLUMNS)
+    tic = time.perf_counter()
+    for row in rows:
+        calls.append(row)
+        if len(calls) > args.size:
+            calls.pop(0)
+    legacy_append = (time.perf_counter() - tic) / len(rows)
+    tic = time.perf_counter()
+    for row in rows:
+        ring.append(timestamp=row.timestamp, model=row.model, total_tokens=row.total_tokens,
+                    duration=row.duration, success=row.success)
+    ring_append = (time.perf_counter() - tic) / len(rows)
+
+    cutoff = now - args.size / 2
+    assert legacy_summary(calls, "gpt-4o", cutoff)[:3] == ring_summary(ring, "gpt-4o", cutoff)[:3]
+    timings = {}
+    for label, fn, history in (("legacy", legacy_summary, calls), ("ring", ring_summary, ring)):
+        tic = time.perf_counter()
+        for i in range(args.summaries):
+            fn(history, MODELS[i % 3], cutoff)
+        timings[label] = (time.perf_counter() - tic) / args.summaries
+
+    print("=" * 60)
+    print(f"history of {args.size} calls")
+    print(f"  {'':8}{'append us':>12}{'summary ms':>13}")
+    print(f"  {'legacy':8}{legacy_append * 1e6:>12.2f}{timings['legacy'] * 1e3:>13.3f}")
+    print(f"  {'ring':8}{ring_append * 1e6:>12.2f}{timings['ring'] * 1e3:>13.3f}")
+    print(f"  summary speedup {timings['legacy'] / timings['ring']:.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark retrieval throughput under concurrent requests against Qdrant.
+
+Uses an in-process Qdrant stand-in with a fixed per-search latency:
+- blocking:  sync QdrantClient.search() called inside the coroutine
+             (what retrieve_chunks / HybridRetriever used to do)
+- threaded:  AsyncQdrant over the same sync client (worker threads)
+- native:    AsyncQdrant over a real AsyncQdrantClient whose HTTP transport
+             is served in-process (httpx.MockTransport)
+
+Usage:
+    python scripts/bench_qdrant_concurrency.py [--latency-ms 20] [--requests 256]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.qdrant_client import ASYNC_QDRANT_AVAILABLE, AsyncQdrant
+
+HITS = [{"id": i, "version": 0, "score": 1.0 - i / 100, "payload": {"text": f"chunk {i}"}} for i in range(10)]
+
+
+class BlockingQdrantStandIn:
+    """Sync client whose search blocks the calling thread like a network round trip."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def search(self, **kwargs):
+        time.sleep(self.latency_s)
+        return [SimpleNamespace(**hit) for hit in HITS]
+
+
+def _native_client(latency_s: float):
+    import httpx
+    from qdrant_client import AsyncQdrantClient
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency_s)
+        return httpx.Response(200, json={"result": HITS, "status": "ok", "time": latency_s})
+
+    return AsyncQdrantClient(
+        url="http://qdrant-stand-in:6333",
+        check_compatibility=False,
+        transport=httpx.MockTransport(handler),
+    )
+
+
+async def _run(search, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await search(collection_name="bench", query_vector=[0.0] * 8, limit=10)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main_async(args):
+    latency_s = args.latency_ms / 1000
+    blocking_client = BlockingQdrantStandIn(latency_s)
+
+    async def blocking_search(**kwargs):
+        return blocking_client.search(**kwargs)
+
+    modes = {
+        "blocking": blocking_search,
+        "threaded": AsyncQdrant(blocking_client).search,
+    }
+    if ASYNC_QDRANT_AVAILABLE:
+        modes["native"] = AsyncQdrant(async_client=_native_client(latency_s)).search
+
+    print("=" * 60)
+    print(f"Search latency {args.latency_ms:.0f} ms, {args.requests} requests (req/s)")
+    print(f"{'concurrency':>12}" + "".join(f"{name:>12}" for name in modes))
+    for concurrency in (1, 4, 16, 64):
+        row = [await _run(search, args.requests, concurrency) for search in modes.values()]
+        print(f"{concurrency:>12}" + "".join(f"{rps:>12.0f}" for rps in row))
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--requests", type=int, default=256)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark reranking latency (p50/p95) for 10, 20 and 50 candidates.
+
+- legacy:   what ONNXRerankerModel.score did before: tokenize every
+            (query, doc) pair with padding to the longest pair in each batch
+            of 64, truncation at 512
+- bucketed: ONNXRerankerModel.score (query tokenized once, pairs sorted
+            into length buckets, per-model max length)
+
+Candidates are chunks of varying length (mostly short, a long tail up to
+a few hundred tokens), like hybrid-search results.
+
+Without --model, a stand-in cross-encoder is generated with onnx.helper
+(MiniLM-sized: 6 layers, hidden 384, random weights) next to the
+tokenizer files of models/minilm-reranker-onnx, since the checked-in ONNX
+files are LFS pointers. Its scores are meaningless but its cost scales with
+padded sequence length like the real model's.
+
+Usage:
+    python scripts/bench_rerank.py [--model ./models/minilm-reranker-onnx] [--runs 20]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# One session thread per core (the service default of 8 oversubscribes small machines)
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count() or 1))
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.onnx_inference import ONNXRerankerModel
+
+ROOT = Path(__file__).resolve().parents[1]
+TOKENIZER_DIR = ROOT / "models" / "minilm-reranker-onnx"
+
+
+def build_stand_in(out_dir: Path, vocab_size: int, hidden=384, layers=6, ffn=1536, max_positions=512, seed=0):
+    """Write a BERT-shaped single-head cross-encoder to out_dir/model.onnx."""
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(seed)
+    inits, nodes = [], []
+
+    def weight(name, *shape):
+        inits.append(numpy_helper.from_array((rng.standard_normal(shape) * 0.02).astype(np.float32), name))
+        return name
+
+    def const(name, value, dtype=np.int64):
+        inits.append(numpy_helper.from_array(np.asarray(value, dtype=dtype), name))
+        return name
+
+    def node(op, inputs, name, **attrs):
+        nodes.append(helper.make_node(op, inputs, [name], name=name, **attrs))
+        return name
+
+    const("zero", [0])
+    const("one", [1])
+    const("two", [2])
+    const("scale", 1.0 / np.sqrt(hidden), np.float32)
+    const("neg", -1e4, np.float32)
+    const("fone", 1.0, np.float32)
+    const("ln_g", np.ones(hidden), np.float32)
+    const("ln_b", np.zeros(hidden), np.float32)
+
+    # Embeddings: word + segment + position (sliced to the batch width)
+    width = node("Slice", [node("Shape", ["input_ids"], "ids_shape"), "one", "two"], "width")
+    positions = node("Slice", [weight("pos_emb", max_positions, hidden), "zero", "width", "zero"], "positions")
+    x = node("Add", [node("Gather", [weight("word_emb", vocab_size, hidden), "input_ids"], "words"),
+                     node("Gather", [weight("type_emb", 2, hidden), "token_type_ids"], "types")], "emb_sum")
+    x = node("Add", [x, positions], "emb")
+    x = node("LayerNormalization", [x, "ln_g", "ln_b"], "emb_ln", axis=-1)
+
+    # Additive attention mask: 0 for tokens, -1e4 for padding, shape (B, 1, T)
+    mask = node("Cast", ["attention_mask"], "mask_f", to=TensorProto.FLOAT)
+    bias = node("Mul", [node("Sub", ["fone", mask], "mask_inv"), "neg"], "mask_bias")
+    bias = node("Unsqueeze", [bias, "one"], "mask_bias3")
+
+    for i in range(layers):
+        q = node("MatMul", [x, weight(f"wq{i}", hidden, hidden)], f"q{i}")
+        k = node("MatMul", [x, weight(f"wk{i}", hidden, hidden)], f"k{i}")
+        v = node("MatMul", [x, weight(f"wv{i}", hidden, hidden)], f"v{i}")
+        att = node("MatMul", [q, node("Transpose", [k], f"kt{i}", perm=[0, 2, 1])], f"att{i}")
+        att = node("Add", [node("Mul", [att, "scale"], f"att_s{i}"), bias], f"att_m{i}")
+        ctx = node("MatMul", [node("Softmax", [att], f"p{i}", axis=-1), v], f"ctx{i}")
+        x = node("Add", [x, node("MatMul", [ctx, weight(f"wo{i}", hidden, hidden)], f"o{i}")], f"res_a{i}")
+        x = node("LayerNormalization", [x, "ln_g", "ln_b"], f"ln_a{i}", axis=-1)
+        h = node("Relu", [node("MatMul", [x, weight(f"w1{i}", hidden, ffn)], f"h{i}")], f"hr{i}")
+        x = node("Add", [x, node("MatMul", [h, weight(f"w2{i}", ffn, hidden)], f"f{i}")], f"res_f{i}")
+        x = node("LayerNormalization", [x, "ln_g", "ln_b"], f"ln_f{i}", axis=-1)
+
+    cls = node("Gather", [x, const("cls_index", 0)], "cls", axis=1)
+    nodes.append(helper.make_node("MatMul", [cls, weight("classifier", hidden, 1)], ["logits"], name="logits"))
+
+    seq = ["batch", "seq"]
+    graph = helper.make_graph(
+        nodes,
+        "stand_in_cross_encoder",
+        [helper.make_tensor_value_info(name, TensorProto.INT64, seq)
+         for name in ("input_ids", "attention_mask", "token_type_ids")],
+        [helper.make_tensor_value_info("logits", TensorProto.FLOAT, ["batch", 1])],
+        inits,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    onnx.save(model, str(out_dir / "model.onnx"))
+
+
+def legacy_score(model: ONNXRerankerModel, query, documents, batch_size=64):
+    """The scoring loop ONNXRerankerModel used before (for comparison)."""
+    scores = []
+    for start in range(0, len(documents), batch_size):
+        pairs = [[query, doc] for doc in documents[start:start + batch_size]]
+        encoded = model.tokenizer(pairs, padding=True, truncation=True, max_length=512, return_tensors="np")
+        ort_inputs = {
+            "input_ids": encoded["input_ids"].astype(np.int64),
+            "attention_mask": encoded["attention_mask"].astype(np.int64),
+        }
+        if "token_type_ids" in encoded:
+            ort_inputs["token_type_ids"] = encoded["token_type_ids"].astype(np.int64)
+        scores.append(model.session.run(None, ort_inputs)[0].astype(np.float32).squeeze(-1))
+    return np.concatenate(scores)
+
+
+def candidates(rng, words, n):
+    # Mostly chunk-sized passages with a long tail, as hybrid search returns them
+    return [" ".join(rng.choice(words) for _ in range(min(450, int(rng.paretovariate(1.6) * 25))))
+            for _ in range(n)]
+
+
+def percentiles(samples):
+    return np.percentile(samples, 50) * 1000, np.percentile(samples, 95) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", help="reranker directory with model.onnx and tokenizer files")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--sizes", default="10,20,50")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.model:
+        model_dir, label = args.model, Path(args.model).name
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        for path in TOKENIZER_DIR.iterdir():
+            if path.suffix != ".onnx":
+                shutil.copy(path, tmp.name)
+        vocab_size = sum(1 for _ in open(TOKENIZER_DIR / "vocab.txt", encoding="utf-8"))
+        build_stand_in(Path(tmp.name), vocab_size)
+        model_dir, label = tmp.name, "stand-in 6x384 cross-encoder (random weights)"
+
+    from transformers.utils import logging as hf_logging
+    hf_logging.set_verbosity_error()  # per-call truncation notices from the legacy path
+
+    model = ONNXRerankerModel(model_dir)
+    rng = random.Random(3)
+    words = [w for w in Path(__file__).read_text().split() if w.isalpha()] or ["word"]
+    query = "how does length bucketing reduce padding in reranking"
+
+    print("=" * 84)
+    print(f"{label}, max_length {model.max_length}, {args.runs} runs per size")
+    print(f"  {'candidates':>10}{'legacy p50 ms':>15}{'p95 ms':>9}{'bucketed p50 ms':>17}{'p95 ms':>9}"
+          f"{'speedup':>9}{'max |diff|':>12}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        timings = {"legacy": [], "bucketed": []}
+        max_diff = 0.0
+        for run in range(args.runs + 2):
+            docs = candidates(rng, words, n)
+            tic = time.perf_counter()
+            before = legacy_score(model, query, docs)
+            legacy_s = time.perf_counter() - tic
+            tic = time.perf_counter()
+            after = model.score(query, docs)
+            bucketed_s = time.perf_counter() - tic
+            if run >= 2:  # warm-up
+                timings["legacy"].append(legacy_s)
+                timings["bucketed"].append(bucketed_s)
+            max_diff = max(max_diff, float(np.abs(before - after).max()))
+        legacy_p50, legacy_p95 = percentiles(timings["legacy"])
+        bucketed_p50, bucketed_p95 = percentiles(timings["bucketed"])
+        print(f"  {n:>10}{legacy_p50:>15.1f}{legacy_p95:>9.1f}{bucketed_p50:>17.1f}{bucketed_p95:>9.1f}"
+              f"{legacy_p50 / bucketed_p50:>8.2f}x{max_diff:>12.2e}")
+    print("=" * 84)
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
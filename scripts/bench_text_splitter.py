@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark the sentence-aware splitter on a multi-megabyte book.
+
+- legacy:           the old character splitter (fixed offsets, strip() copies)
+- sentence (chars): split_text() with the same character budget
+- sentence (tokens): iter_spans() with a token budget counted by the
+                    embedding model's tokenizer (as ingestion uses it)
+
+Reports throughput, how many chunks end mid-sentence, tokens per chunk and
+how many tokens the embedder would drop to truncation (--max-length), plus
+peak memory of materializing every chunk vs streaming offsets.
+
+The book is the largest file in data/gutenberg_corpus (see
+scripts/download_gutenberg_batch.py) unless --file is given; without either,
+a synthetic book of --synthetic-mb MB is generated.
+
+Usage:
+    python scripts/bench_text_splitter.py [--file book.txt] [--tokenizer ./models/minilm-embed-int8]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.utils.text_splitter import iter_spans, split_text, tokenizer_counter
+
+ROOT = Path(__file__).resolve().parents[1]
+SENTENCE_END = tuple(".!?\"'”’)]。！？")
+
+
+def legacy_split(text, *, chunk_size, chunk_overlap):
+    """The character splitter ingestion used before (for comparison)."""
+    cleaned = text.strip()
+    chunks = []
+    start = 0
+    while start < len(cleaned):
+        end = min(start + chunk_size, len(cleaned))
+        chunk = cleaned[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end == len(cleaned):
+            break
+        start = end - chunk_overlap
+    return chunks
+
+
+def synthetic_book(megabytes, seed=7):
+    rng = random.Random(seed)
+    words = [w for w in Path(__file__).read_text().split() if w.isalpha()] or ["word"]
+    words += [f"name{i}" for i in range(2000)]
+    out, size = [], 0
+    while size < megabytes * 1024 * 1024:
+        paragraph = []
+        for _ in range(rng.randint(1, 8)):
+            sentence = " ".join(rng.choice(words) for _ in range(min(60, int(rng.paretovariate(1.5) * 6))))
+            paragraph.append(sentence.capitalize() + rng.choice([".", ".", ".", "?", "!"]))
+        # Hard-wrap at ~70 columns like Gutenberg plain text
+        text = " ".join(paragraph)
+        lines, line = [], []
+        for word in text.split():
+            line.append(word)
+            if sum(len(w) + 1 for w in line) > 70:
+                lines.append(" ".join(line))
+                line = []
+        lines.append(" ".join(line))
+        out.append("\n".join(lines))
+        size += len(out[-1]) + 2
+    return "\n\n".join(out)
+
+
+def load_book(args):
+    if args.file:
+        return Path(args.file).read_text(errors="replace"), args.file
+    corpus = ROOT / "data" / "gutenberg_corpus"
+    books = sorted(corpus.glob("*.txt"), key=lambda p: p.stat().st_size) if corpus.exists() else []
+    if books:
+        return books[-1].read_text(errors="replace"), str(books[-1])
+    return synthetic_book(args.synthetic_mb), f"synthetic book ({args.synthetic_mb} MB, no Gutenberg corpus found)"
+
+
+def measure(text, chunks, count, max_length, sample):
+    mid_sentence = sum(1 for c in chunks if not c.endswith(SENTENCE_END))
+    step = max(1, len(chunks) // sample)
+    sampled = chunks[::step]
+    tokens = count(sampled)
+    truncated = sum(max(0, n + 2 - max_length) for n in tokens)  # +2: [CLS]/[SEP]
+    return {
+        "mid_sentence_pct": 100.0 * mid_sentence / max(1, len(chunks)),
+        "mean_tokens": sum(tokens) / max(1, len(tokens)),
+        "truncated_pct": 100.0 * truncated / max(1, sum(tokens)),
+    }
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file")
+    parser.add_argument("--synthetic-mb", type=float, default=5.0)
+    parser.add_argument("--tokenizer", default=str(ROOT / "models" / "minilm-embed-int8"))
+    parser.add_argument("--chunk-chars", type=int, default=512)
+    parser.add_argument("--overlap-chars", type=int, default=50)
+    parser.add_argument("--chunk-tokens", type=int, default=256)
+    parser.add_argument("--overlap-tokens", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=256, help="embedder truncation length")
+    parser.add_argument("--sample", type=int, default=2000, help="chunks tokenized for the quality columns")
+    args = parser.parse_args()
+
+    from transformers import AutoTokenizer
+
+    # Same tokenizer ONNXEmbeddingModel loads
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer, use_fast=False)
+    count = tokenizer_counter(tokenizer)
+    text, source = load_book(args)
+
+    modes = {
+        "legacy": lambda: legacy_split(text, chunk_size=args.chunk_chars, chunk_overlap=args.overlap_chars),
+        "sentence (chars)": lambda: split_text(
+            text, chunk_size=args.chunk_chars, chunk_overlap=args.overlap_chars
+        ),
+        "sentence (tokens)": lambda: [
+            text[s.start:s.end]
+            for s in iter_spans(
+                text, chunk_size=args.chunk_tokens, chunk_overlap=args.overlap_tokens, count_tokens=count
+            )
+        ],
+    }
+
+    print("=" * 96)
+    print(f"{source}: {len(text) / 1e6:.1f} MB, tokenizer {Path(args.tokenizer).name}, max_length {args.max_length}")
+    print(f"  {'mode':<20}{'seconds':>9}{'MB/s':>8}{'chunks':>9}{'mid-sentence':>14}"
+          f"{'tokens/chunk':>14}{'truncated':>11}")
+    for name, split in modes.items():
+        start = time.perf_counter()
+        chunks = split()
+        elapsed = time.perf_counter() - start
+        quality = measure(text, chunks, count, args.max_length, args.sample)
+        print(f"  {name:<20}{elapsed:>9.2f}{len(text) / 1e6 / elapsed:>8.2f}{len(chunks):>9}"
+              f"{quality['mid_sentence_pct']:>13.1f}%{quality['mean_tokens']:>14.1f}"
+              f"{quality['truncated_pct']:>10.1f}%")
+
+    legacy_peak = peak_mb(lambda: legacy_split(text, chunk_size=args.chunk_chars, chunk_overlap=args.overlap_chars))
+    stream_peak = peak_mb(lambda: sum(
+        1 for _ in iter_spans(text, chunk_size=args.chunk_chars, chunk_overlap=args.overlap_chars)
+    ))
+    print(f"  peak memory: legacy chunk list {legacy_peak:.1f} MB, streamed offsets {stream_peak:.2f} MB")
+    print("=" * 96)
+
+
+if __name__ == "__main__":
+    main()
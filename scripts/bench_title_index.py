@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark title lookup for author questions: SequenceMatcher scan vs trigram index.
+
+- scan:    SequenceMatcher.ratio() against every distinct title
+           (what metadata_index._title_candidates did before the trigram index)
+- trigram: TitleIndex.search(limit=5) over the same titles
+
+Usage:
+    python scripts/bench_title_index.py [--titles 20000] [--queries 50]
+"""
+import argparse
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.metadata_index import MetadataEntry, TitleIndex, _normalize
+
+
+def _titles(num_titles: int, rng):
+    vocab = np.array([f"{w}{i}" for i, w in enumerate(["the", "of", "and", "house", "night", "river"] * 500)])
+    return [" ".join(rng.choice(vocab, rng.integers(2, 7))) for _ in range(num_titles)]
+
+
+def _scan(titles, query):
+    normalized_query = _normalize(query)
+    scored = []
+    for title in titles:
+        if normalized_query in title or title in normalized_query:
+            score = 1.0
+        else:
+            score = SequenceMatcher(None, normalized_query, title).ratio()
+        if score > 0.2:
+            scored.append((title, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored
+
+
+def _time(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    titles = _titles(args.titles, rng)
+    index = TitleIndex()
+    index.add(MetadataEntry(str(i), "text", "", None, title) for i, title in enumerate(titles))
+    normalized = index.titles
+    # Questions name a (slightly misspelled) title from the corpus
+    queries = [titles[i][:-1] for i in rng.integers(0, len(titles), args.queries)]
+
+    modes = {
+        "scan": _time(lambda q: _scan(normalized, q), queries),
+        "trigram": _time(lambda q: index.search(q, limit=5), queries),
+    }
+
+    print("=" * 60)
+    print(f"{len(index)} distinct titles, {args.queries} queries (ms per query)")
+    for name, samples in modes.items():
+        print(f"  {name:<10} p50 {np.percentile(samples, 50):9.2f}   p99 {np.percentile(samples, 99):9.2f}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Soak test: GovernanceTracker memory over a million operations.
+
+Each operation runs the checkpoints a RAG request records (policy gate,
+permission, privacy, retrieval, evidence, generation, quality, audit,
+reliability) and completes; every tenth one is abandoned (never completed,
+like a request that raised before complete_operation). Resident memory
+and the number of tracked contexts are printed every --report operations,
+with the pending metrics flushed as the background task would.
+
+--legacy keeps every context in a plain dict, as the tracker did before,
+for comparison (use a smaller --ops).
+
+Usage:
+    python scripts/soak_governance.py [--ops 1000000] [--report 100000] [--legacy]
+"""
+import argparse
+import logging
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from backend.services.governance_tracker import GovernanceTracker, flush_governance_metrics
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_operation(tracker: GovernanceTracker, i: int) -> None:
+    context = tracker.start_operation("rag", {"question": f"question {i}"})
+    trace_id = context.trace_id
+    tracker.checkpoint_policy_gate(trace_id, True, "allowed")
+    tracker.checkpoint_permission(trace_id)
+    tracker.checkpoint_privacy(trace_id)
+    tracker.checkpoint_retrieval(trace_id, 5, ["assessment_docs_minilm"])
+    tracker.checkpoint_evidence(trace_id, 3)
+    tracker.checkpoint_generation(trace_id, "gpt-4o-mini")
+    tracker.checkpoint_quality(trace_id, 850.0 + i % 400)
+    tracker.checkpoint_audit(trace_id)
+    tracker.checkpoint_reliability(trace_id, "passed", "no fallbacks")
+    if i % 10:
+        tracker.complete_operation(trace_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--report", type=int, default=100_000)
+    parser.add_argument("--legacy", action="store_true", help="unbounded dict, contexts never removed")
+    parser.add_argument("--trace", action="store_true", help="also report tracemalloc (several times slower)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # one log line per checkpoint would dominate
+    tracker = GovernanceTracker()
+    if args.legacy:
+        tracker.active_contexts = {}
+        tracker.complete_operation = lambda trace_id: tracker.active_contexts[trace_id].complete()
+
+    if args.trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    print(f"{'operations':>12}{'tracked':>10}{'traced MB':>11}{'RSS MB':>9}{'ops/s':>9}")
+    for i in range(1, args.ops + 1):
+        run_operation(tracker, i)
+        if i % args.report == 0:
+            flush_governance_metrics()
+            traced = tracemalloc.get_traced_memory()[0] / 1e6 if args.trace else float("nan")
+            print(f"{i:>12}{len(tracker.active_contexts):>10}{traced:>11.1f}{rss_mb():>9.1f}"
+                  f"{i / (time.perf_counter() - start):>9.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
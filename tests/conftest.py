@@ -131,9 +131,18 @@ class _StubScoredPoint:
         self.vector = vector
 
 
+class _StubPointStruct:
+    """Stub for qdrant_client.models.PointStruct."""
+    def __init__(self, id=None, vector=None, payload=None):
+        self.id = id
+        self.vector = vector
+        self.payload = payload or {}
+
+
 qdrant_models_module.VectorParams = _StubVectorParams
 qdrant_models_module.Distance = _StubDistance
 qdrant_models_module.ScoredPoint = _StubScoredPoint
+qdrant_models_module.PointStruct = _StubPointStruct
 sys.modules["qdrant_client.http.models"] = qdrant_models_module
 
 # Also expose as qdrant_client.models for direct imports
@@ -239,11 +248,11 @@ _RERANK_MODEL = _StubRerankerModel()
 _CURRENT_RERANK_PATH = _RERANK_MODEL.resolved_model_path
 
 
-def _get_embedding_model():
+def _get_embedding_model(model_id=None):
     return _EMBED_MODEL
 
 
-def _get_reranker_model():
+def _get_reranker_model(model_id=None):
     return _RERANK_MODEL
 
 
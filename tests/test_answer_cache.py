@@ -0,0 +1,261 @@
+"""Unit tests for the multi-layer answer cache and its indexes."""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from backend.models.rag_schemas import RAGResponse
+from backend.services.answer_cache import MultiLayerAnswerCache
+from backend.services.sparse_index import IncrementalTfidfIndex
+from backend.services.vector_index import FlatVectorIndex
+
+
+def _response(answer: str) -> RAGResponse:
+    return RAGResponse(
+        answer=answer,
+        retrieval_time_ms=1.0,
+        confidence=0.9,
+        num_chunks_retrieved=1,
+    )
+
+
+def _fake_embedder(vectors):
+    async def embed(text: str):
+        return vectors[text]
+
+    return embed
+
+
+def test_flat_index_top_k_skips_expired_and_removed():
+    index = FlatVectorIndex(initial_capacity=2)
+    now = time.time()
+    index.add("a", np.array([1.0, 0.0], dtype=np.float32), expires_at=now + 60)
+    index.add("b", np.array([0.8, 0.6], dtype=np.float32), expires_at=now + 60)
+    index.add("c", np.array([1.0, 0.0], dtype=np.float32), expires_at=now - 1)
+
+    hits = index.search(np.array([1.0, 0.0], dtype=np.float32), k=3)
+    assert [key for key, _ in hits] == ["a", "b"]
+    assert index.expired_keys() == ["c"]
+
+    index.remove("a")
+    assert index.search(np.array([1.0, 0.0], dtype=np.float32), k=1)[0][0] == "b"
+
+    # Freed row is recycled
+    index.add("d", np.array([0.0, 1.0], dtype=np.float32), expires_at=now + 60)
+    assert len(index) == 3
+    assert index.search(np.array([0.0, 1.0], dtype=np.float32), k=1)[0][0] == "d"
+
+
+def test_semantic_layer_hit_and_eviction():
+    vectors = {
+        "who wrote pride and prejudice": [1.0, 0.0, 0.0],
+        "author of pride and prejudice?": [0.99, 0.14, 0.0],
+        "capital of france": [0.0, 0.0, 1.0],
+    }
+    cache = MultiLayerAnswerCache(similarity_threshold=0.9, tfidf_threshold=1.1, max_cache_size=1)
+    cache.set_embedder(_fake_embedder(vectors))
+
+    asyncio.run(cache.cache_answer("who wrote pride and prejudice", _response("Jane Austen")))
+    hit = asyncio.run(cache._layer3_semantic_match("author of pride and prejudice?"))
+    assert hit is not None
+    assert hit["answer"].answer == "Jane Austen"
+
+    # Second insert evicts the first from both the dict and the index
+    asyncio.run(cache.cache_answer("capital of france", _response("Paris")))
+    assert len(cache.semantic_cache) == 1
+    assert len(cache.semantic_index) == 1
+    assert asyncio.run(cache._layer3_semantic_match("author of pride and prejudice?")) is None
+
+
+def test_incremental_tfidf_matches_sklearn_scores():
+    docs = [
+        "What is prop building?",
+        "Who wrote Pride and Prejudice",
+        "How to build a prop for theatre",
+        "prop building materials list",
+    ]
+    query = "prop building guide"
+
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words="english")
+    doc_matrix = vectorizer.fit_transform(docs)
+    expected = cosine_similarity(vectorizer.transform([query]), doc_matrix)[0]
+
+    index = IncrementalTfidfIndex()
+    for i, doc in enumerate(docs):
+        index.add(str(i), doc)
+    scores = dict(index.search(query, k=len(docs)))
+
+    # Docs without a shared term are never scored
+    assert "1" not in scores
+    for i, score in enumerate(expected):
+        if score > 0:
+            assert abs(scores[str(i)] - score) < 1e-9
+
+    index.remove("0")
+    assert index.search(query, k=1)[0][0] == "3"
+
+
+def test_incremental_tfidf_norms_follow_adds_and_removes():
+    docs = {str(i): f"prop building {'stage ' * (i % 3)}guide part{i}" for i in range(12)}
+    index = IncrementalTfidfIndex()
+    for key, doc in docs.items():
+        index.add(key, doc)
+    index.search("prop", k=1)
+    # df moves for shared terms after norms were last brought up to date
+    for key in ("0", "4", "7"):
+        index.remove(key)
+        del docs[key]
+    docs["12"] = "stage prop guide"
+    index.add("12", docs["12"])
+
+    keys = list(docs)
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words="english")
+    doc_matrix = vectorizer.fit_transform([docs[key] for key in keys])
+    for query in ("stage prop", "building guide part5", "part9"):
+        expected = cosine_similarity(vectorizer.transform([query]), doc_matrix)[0]
+        scores = dict(index.search(query, k=len(keys)))
+        assert set(scores) == {key for key, score in zip(keys, expected) if score > 0}
+        for key, score in zip(keys, expected):
+            if score > 0:
+                assert abs(scores[key] - score) < 1e-9
+
+
+def test_tfidf_index_compaction_keeps_live_documents():
+    index = IncrementalTfidfIndex()
+    for i in range(3000):
+        index.add(f"doc{i}", f"topic{i} shared words")
+    for i in range(2500):
+        index.remove(f"doc{i}")
+
+    assert len(index) == 500
+    assert index._num_entries < 3000 * 5  # tombstoned entries were compacted away
+    assert index.search("topic2999 shared", k=1)[0][0] == "doc2999"
+    assert index.search("topic10", k=1) == []
+    assert index.doc_terms("doc2600") == ["topic2600", "shared", "words", "topic2600 shared", "shared words"]
+
+
+def test_tfidf_layer_hit_and_invalidate():
+    cache = MultiLayerAnswerCache(tfidf_threshold=0.3)
+    cache.set_embedder(_fake_embedder({"how do I build a stage prop": [1.0, 0.0]}))
+
+    asyncio.run(cache.cache_answer("how do I build a stage prop", _response("Use foam")))
+    hit = asyncio.run(cache._layer2_tfidf_match("build stage prop"))
+    assert hit is not None
+    assert hit["cache_layer"] == 2
+
+    asyncio.run(cache.invalidate("how do I build a stage prop"))
+    assert len(cache.tfidf_index) == 0
+    assert asyncio.run(cache._layer2_tfidf_match("build stage prop")) is None
+
+
+def _shared_caches(store):
+    vectors = {
+        "who wrote pride and prejudice": [1.0, 0.0, 0.0],
+        "author of pride and prejudice?": [0.99, 0.14, 0.0],
+    }
+    caches = []
+    for _ in range(2):
+        cache = MultiLayerAnswerCache(
+            similarity_threshold=0.9, tfidf_threshold=1.1, store=store, sync_interval_s=0.0
+        )
+        cache.set_embedder(_fake_embedder(vectors))
+        caches.append(cache)
+    return caches
+
+
+def _assert_shared_and_persistent(store):
+    writer, reader = _shared_caches(store)
+    asyncio.run(writer.cache_answer("who wrote pride and prejudice", _response("Jane Austen")))
+
+    # Another worker picks the entry up on its next lookup
+    hit = asyncio.run(reader.find_cached_answer("author of pride and prejudice?"))
+    assert hit is not None
+    assert hit["cache_layer"] == 3
+    assert hit["answer"].answer == "Jane Austen"
+
+    # A fresh process warm-starts all three layers
+    restarted = MultiLayerAnswerCache(store=store)
+    assert restarted.warm_start() == 1
+    assert len(restarted.exact_cache) == len(restarted.tfidf_index) == len(restarted.semantic_index) == 1
+    # Answer payload is fetched lazily on the first hit
+    hit = asyncio.run(restarted.find_cached_answer("Who wrote Pride and Prejudice"))
+    assert hit["cache_layer"] == 1
+    assert hit["answer"].answer == "Jane Austen"
+
+    # Invalidation propagates as a tombstone
+    asyncio.run(writer.invalidate("who wrote pride and prejudice"))
+    assert asyncio.run(reader.find_cached_answer("who wrote pride and prejudice")) is None
+    assert MultiLayerAnswerCache(store=store).warm_start() == 0
+
+
+def test_sqlite_store_shares_entries_across_caches(tmp_path):
+    from backend.services.cache_store import SQLiteCacheStore
+
+    _assert_shared_and_persistent(SQLiteCacheStore(str(tmp_path / "cache.sqlite3")))
+
+
+def test_redis_store_shares_entries_across_caches():
+    fakeredis = pytest.importorskip("fakeredis")
+    from backend.services.cache_store import RedisCacheStore
+
+    _assert_shared_and_persistent(RedisCacheStore(client=fakeredis.FakeRedis()))
+
+
+def test_lookup_misses_when_another_worker_dropped_the_payload(tmp_path):
+    from backend.services.cache_store import SQLiteCacheStore
+
+    store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"))
+    writer, _ = _shared_caches(store)
+    asyncio.run(writer.cache_answer("who wrote pride and prejudice", _response("Jane Austen")))
+
+    reader = MultiLayerAnswerCache(store=store, sync_interval_s=3600)
+    assert reader.warm_start() == 1
+    reader._last_sync = time.monotonic()  # tombstone not pulled yet
+    asyncio.run(writer.invalidate("who wrote pride and prejudice"))
+
+    assert asyncio.run(reader.find_cached_answer("who wrote pride and prejudice")) is None
+    assert len(reader.exact_cache) == len(reader.tfidf_index) == len(reader.semantic_index) == 0
+
+
+def test_warm_start_restores_snapshot_without_retokenizing(tmp_path, monkeypatch):
+    from backend.services.cache_store import SQLiteCacheStore
+
+    store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"))
+    writer, _ = _shared_caches(store)
+    for query in ("who wrote pride and prejudice", "author of pride and prejudice?"):
+        asyncio.run(writer.cache_answer(query, _response(query)))
+
+    # First start builds the layers from the records and saves a snapshot
+    assert MultiLayerAnswerCache(store=store).warm_start() == 2
+    assert store.get_snapshot("answer_cache") is not None
+
+    # Written after the snapshot: replayed from the log on the next start
+    asyncio.run(writer.invalidate("author of pride and prejudice?"))
+    asyncio.run(writer.cache_answer("how do I build a stage prop", _response("carefully")))
+
+    tokenized = []
+    add_terms = IncrementalTfidfIndex.add_terms
+
+    def counting_add_terms(index, key, terms):
+        tokenized.append(key)
+        add_terms(index, key, terms)
+
+    restarted = MultiLayerAnswerCache(tfidf_threshold=0.3, store=store)
+    restarted.set_embedder(_fake_embedder({"who wrote pride and prejudice": [1.0, 0.0, 0.0]}))
+    monkeypatch.setattr(IncrementalTfidfIndex, "add_terms", counting_add_terms)
+
+    async def start():
+        task = restarted.start_warm_start()
+        assert task is not None  # runs in a worker thread under an event loop
+        return await task
+
+    assert asyncio.run(start()) == 2
+    assert tokenized == ["how do I build a stage prop"]  # only the replayed write
+    assert len(restarted.exact_cache) == len(restarted.tfidf_index) == 2
+    assert len(restarted.semantic_index) == 1  # the new entry has no embedding
+    assert asyncio.run(restarted._layer2_tfidf_match("build stage prop"))["answer"].answer == "carefully"
+    hit = asyncio.run(restarted._layer3_semantic_match("who wrote pride and prejudice"))
+    assert hit["answer"].answer == "who wrote pride and prejudice"
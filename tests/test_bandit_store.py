@@ -0,0 +1,87 @@
+"""Unit tests for the write-behind bandit store and bounded feedback history."""
+import asyncio
+import json
+
+from backend.services import bandit_store
+from backend.services.bandit_store import BanditStore, FeedbackHistory
+
+
+def test_updates_stay_in_memory_until_flush(tmp_path):
+    state_file = tmp_path / "bandit.json"
+    store = BanditStore(str(state_file))
+    assert store.cold_start
+
+    store.update("hybrid", 0.75)
+    store.update("graph", 1.5)  # clamped to 1.0
+    assert not store.update("unknown", 1.0)
+    assert not state_file.exists()
+    assert store.arms["hybrid"] == {"alpha": 1.75, "beta": 1.25}
+
+    assert store.flush()
+    saved = json.loads(state_file.read_text())
+    assert saved["hybrid"] == {"alpha": 1.75, "beta": 1.25}
+    assert saved["graph"] == {"alpha": 2.0, "beta": 1.0}
+    assert store.pending_updates == 0
+
+
+def test_workers_sharing_a_state_file_merge_deltas(tmp_path):
+    state_file = tmp_path / "bandit.json"
+    state_file.write_text(json.dumps({"hybrid": {"alpha": 5.0, "beta": 5.0}}))
+    worker_a = BanditStore(str(state_file))
+    worker_b = BanditStore(str(state_file))
+
+    worker_a.update("hybrid", 1.0)
+    worker_b.update("hybrid", 0.0)
+    worker_b.update("hybrid", 0.0)
+    worker_a.flush()
+    worker_b.flush()
+
+    # Neither worker's updates are lost, and worker_b now sees worker_a's
+    assert json.loads(state_file.read_text())["hybrid"] == {"alpha": 6.0, "beta": 7.0}
+    assert worker_b.arms["hybrid"] == {"alpha": 6.0, "beta": 7.0}
+
+
+def test_failed_flush_keeps_deltas_for_the_next_one(tmp_path, monkeypatch):
+    state_file = tmp_path / "bandit.json"
+    store = BanditStore(str(state_file))
+    store.update("table", 1.0)
+
+    real_replace = bandit_store.os.replace
+    monkeypatch.setattr(bandit_store.os, "replace", lambda *a: (_ for _ in ()).throw(OSError("disk full")))
+    assert not store.flush()
+    monkeypatch.setattr(bandit_store.os, "replace", real_replace)
+
+    assert store.flush()
+    assert json.loads(state_file.read_text())["table"] == {"alpha": 2.0, "beta": 1.0}
+
+
+def test_background_flusher_and_close(tmp_path):
+    state_file = tmp_path / "bandit.json"
+    store = BanditStore(str(state_file), flush_interval_s=0.01)
+
+    async def run():
+        store.update("iterative", 1.0)
+        await asyncio.sleep(0.1)
+        assert json.loads(state_file.read_text())["iterative"]["alpha"] == 2.0
+        store.update("iterative", 1.0)
+        await store.close()
+
+    asyncio.run(run())
+    assert json.loads(state_file.read_text())["iterative"]["alpha"] == 3.0
+
+
+def test_feedback_history_is_bounded_by_size_and_age(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(bandit_store.time, "monotonic", lambda: clock[0])
+    history = FeedbackHistory(max_entries=3, ttl_s=60)
+
+    for i in range(5):
+        history[f"q{i}"] = {"strategy": "hybrid"}
+    assert len(history) == 3
+    assert "q1" not in history and "q4" in history
+
+    clock[0] += 61
+    history["fresh"] = {"strategy": "graph"}
+    assert "q4" not in history
+    assert history["fresh"]["strategy"] == "graph"
+    assert history.get("q2", {}) == {}
@@ -0,0 +1,232 @@
+"""Unit tests for the persistent BM25 index and its ingestion hooks."""
+import asyncio
+import math
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+
+from backend.services import bm25_index
+from backend.services.bm25_index import BM25Index, index_dir_for, tokenize
+from backend.services.hybrid_retriever import HybridRetriever, HybridRetrieverRegistry
+
+DOCS = {
+    "a": "the quick brown fox jumps over the lazy dog",
+    "b": "a quick brown dog outpaces a quick fox",
+    "c": "lorem ipsum dolor sit amet",
+    "d": "the dog sleeps all day in the sun",
+    "e": "foxes and dogs are not natural friends",
+}
+
+
+def _okapi_scores(docs, query, k1=1.5, b=0.75, epsilon=0.25):
+    """Reference scores using rank_bm25.BM25Okapi's formula."""
+    corpus = {doc_id: tokenize(text) for doc_id, text in docs.items()}
+    avgdl = sum(len(tokens) for tokens in corpus.values()) / len(corpus)
+    df = Counter(term for tokens in corpus.values() for term in set(tokens))
+    n = len(corpus)
+    idf = {term: math.log(n - freq + 0.5) - math.log(freq + 0.5) for term, freq in df.items()}
+    floor = epsilon * sum(idf.values()) / len(idf)
+    idf = {term: value if value >= 0 else floor for term, value in idf.items()}
+
+    scores = {}
+    for doc_id, tokens in corpus.items():
+        counts = Counter(tokens)
+        score = 0.0
+        for term in tokenize(query):
+            tf = counts.get(term, 0)
+            score += idf.get(term, 0.0) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / avgdl))
+        scores[doc_id] = score
+    return scores
+
+
+def _assert_matches(index, docs, query):
+    expected = _okapi_scores(docs, query)
+    hits = dict(index.search(tokenize(query), top_k=len(docs)))
+    assert set(hits) == {doc_id for doc_id, score in expected.items() if score > 0}
+    for doc_id, score in hits.items():
+        assert abs(score - expected[doc_id]) < 1e-5
+
+
+def test_scores_match_okapi_through_updates_and_reload(tmp_path):
+    index = BM25Index(index_dir=tmp_path / "idx")
+    index.build((doc_id, tokenize(text)) for doc_id, text in DOCS.items() if doc_id != "e")
+    index.save()
+
+    docs = {k: v for k, v in DOCS.items() if k != "e"}
+    _assert_matches(index, docs, "quick fox dog")
+
+    # Incremental add / delete / replace are logged, not rebuilt
+    index.add_document("e", tokenize(DOCS["e"]))
+    index.remove_document("c")
+    index.add_document("a", tokenize("the fox returns"))
+    docs = {**docs, "e": DOCS["e"], "a": "the fox returns"}
+    del docs["c"]
+    _assert_matches(index, docs, "quick fox dog")
+
+    # A fresh load maps the base arrays and replays the delta log
+    reloaded = BM25Index.load(tmp_path / "idx")
+    assert len(reloaded) == len(docs)
+    _assert_matches(reloaded, docs, "quick fox dog")
+
+    # Compaction folds the log into new base arrays
+    reloaded.save()
+    assert (tmp_path / "idx" / "delta.log").stat().st_size == 0
+    _assert_matches(BM25Index.load(tmp_path / "idx"), docs, "the quick fox")
+
+
+def test_other_workers_pick_up_ops_and_compaction(tmp_path):
+    writer = BM25Index(index_dir=tmp_path / "idx")
+    writer.build((doc_id, tokenize(DOCS[doc_id])) for doc_id in "acde")
+    writer.save()
+    reader = BM25Index.load(tmp_path / "idx")
+
+    writer.add_document("b", tokenize(DOCS["b"]))
+    reader.refresh()
+    assert {doc_id for doc_id, _ in reader.search(["quick"], top_k=5)} == {"a", "b"}
+
+    writer.remove_document("a")
+    writer.save()
+    reader.refresh()
+    assert [doc_id for doc_id, _ in reader.search(["quick"], top_k=5)] == ["b"]
+
+
+def test_appends_wait_for_compaction_in_another_worker(tmp_path):
+    import threading
+
+    index_dir = index_dir_for("books", str(tmp_path))
+    compactor = BM25Index(index_dir=index_dir)
+    compactor.build((doc_id, tokenize(DOCS[doc_id])) for doc_id in "acde")
+    compactor.save()
+    writer = BM25Index.load(index_dir)
+
+    # The compactor is between replaying delta.log and truncating it; neither the
+    # writer's own append nor the hooks of a worker without a live index may land
+    appends = [
+        threading.Thread(target=writer.add_document, args=("b", tokenize(DOCS["b"]))),
+        threading.Thread(target=bm25_index.record_upsert, args=("books", [("f", "a quick fox")], str(tmp_path))),
+        threading.Thread(target=bm25_index.record_delete, args=("books", ["c"], str(tmp_path))),
+    ]
+    with bm25_index._file_lock(index_dir):
+        for thread in appends:
+            thread.start()
+        for thread in appends:
+            thread.join(timeout=0.2)
+        assert all(thread.is_alive() for thread in appends)
+        assert (index_dir / "delta.log").read_bytes() == b""
+    for thread in appends:
+        thread.join()
+
+    compactor.save()
+    reloaded = BM25Index.load(index_dir)
+    assert {doc_id for doc_id, _ in reloaded.search(["quick"], top_k=5)} == {"a", "b", "f"}
+    assert "c" not in reloaded.doc_ids
+
+class _FakeQdrant:
+    def __init__(self, points):
+        self.points = points
+        self.scrolls = 0
+
+    def scroll(self, collection_name, limit, offset, with_payload, with_vectors):
+        self.scrolls += 1
+        start = offset or 0
+        page = self.points[start:start + limit]
+        next_offset = start + limit if start + limit < len(self.points) else None
+        return page, next_offset
+
+
+def test_hybrid_retriever_builds_once_then_follows_ingestion(tmp_path):
+    points = [SimpleNamespace(id=doc_id, payload={"content": text}) for doc_id, text in DOCS.items()]
+    qdrant = _FakeQdrant(points)
+
+    first = HybridRetriever(qdrant, "docs", cache_dir=str(tmp_path))
+    asyncio.run(first.initialize())
+    assert qdrant.scrolls == 1
+
+    # Restart loads from disk without scrolling
+    second = HybridRetriever(qdrant, "docs", cache_dir=str(tmp_path))
+    asyncio.run(second.initialize())
+    assert qdrant.scrolls == 1
+    assert len(second.doc_ids) == len(DOCS)
+
+    bm25_index.record_upsert("docs", [("z", "zebra crossing")], cache_dir=str(tmp_path))
+    assert asyncio.run(first._bm25_search("zebra", 5))[0][0] == "z"
+
+    bm25_index.record_delete("docs", cache_dir=str(tmp_path))
+    assert asyncio.run(second._bm25_search("quick fox", 5)) == []
+    assert index_dir_for("docs", str(tmp_path)).exists()
+
+
+def test_concurrent_searches_on_a_stale_index_rebuild_once(tmp_path):
+    points = [SimpleNamespace(id=doc_id, payload={"content": text}) for doc_id, text in DOCS.items()]
+    qdrant = _FakeQdrant(points)
+    retriever = HybridRetriever(qdrant, "docs", cache_dir=str(tmp_path))
+    asyncio.run(retriever.initialize())
+    assert qdrant.scrolls == 1
+
+    bm25_index.invalidate("docs", cache_dir=str(tmp_path))
+
+    async def run():
+        return await asyncio.gather(*(retriever._bm25_search("lorem", 5) for _ in range(5)))
+
+    assert all(results[0][0] == "c" for results in asyncio.run(run()))
+    assert qdrant.scrolls == 2
+
+
+def test_registry_shares_one_build_across_concurrent_callers(tmp_path):
+    points = [SimpleNamespace(id=doc_id, payload={"content": text}) for doc_id, text in DOCS.items()]
+    qdrant = _FakeQdrant(points)
+    registry = HybridRetrieverRegistry(qdrant, cache_dir=str(tmp_path))
+
+    async def run():
+        retrievers = await asyncio.gather(*(registry.acquire("docs") for _ in range(5)))
+        return retrievers + [await registry.acquire("docs")]
+
+    retrievers = asyncio.run(run())
+    assert all(retriever is retrievers[0] for retriever in retrievers)
+    assert qdrant.scrolls == 1
+
+    # Saved files removed by another process (re-seeding): rebuilt on next search
+    import shutil
+    shutil.rmtree(index_dir_for("docs", str(tmp_path)))
+    assert asyncio.run(retrievers[0]._bm25_search("lorem", 5))[0][0] == "c"
+    assert qdrant.scrolls == 2
+
+
+def test_registry_evicts_least_recently_used_over_budget(tmp_path):
+    points = [SimpleNamespace(id=doc_id, payload={"content": text}) for doc_id, text in DOCS.items()]
+    registry = HybridRetrieverRegistry(_FakeQdrant(points), cache_dir=str(tmp_path), memory_budget_bytes=1)
+
+    async def run():
+        await registry.acquire("first")
+        await registry.acquire("second")
+
+    asyncio.run(run())
+    assert "second" in registry
+    assert "first" not in registry
+
+
+def test_maxscore_pruning_matches_exhaustive_search():
+    rng = np.random.default_rng(3)
+    vocab = [f"t{i}" for i in range(300)]
+    # Zipf-ish term distribution so common terms get low (and some negative) idf
+    weights = 1.0 / np.arange(1, len(vocab) + 1)
+    weights /= weights.sum()
+
+    index = BM25Index()
+    index.build(
+        (str(i), list(rng.choice(vocab, rng.integers(5, 60), p=weights)))
+        for i in range(2000)
+    )
+    for i in range(0, 2000, 7):
+        index.remove_document(str(i))
+    for i in range(2000, 2200):
+        index.add_document(str(i), list(rng.choice(vocab, rng.integers(5, 60), p=weights)))
+
+    for _ in range(50):
+        query = list(rng.choice(vocab[5:], rng.integers(1, 6)))
+        for top_k in (1, 10, 100):
+            pruned = index.search(query, top_k=top_k)
+            exhaustive = index.search(query, top_k=top_k, prune=False)
+            assert [doc_id for doc_id, _ in pruned] == [doc_id for doc_id, _ in exhaustive]
+            assert np.allclose([s for _, s in pruned], [s for _, s in exhaustive])
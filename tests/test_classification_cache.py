@@ -0,0 +1,75 @@
+"""Unit tests for the incrementally indexed, log-backed classification cache."""
+import json
+
+from backend.services.classification_cache import ClassificationCache
+
+
+def _cache(tmp_path, **kwargs):
+    return ClassificationCache(cache_file=str(tmp_path / "classification_cache.json"), **kwargs)
+
+
+def test_exact_and_similar_lookups_without_refit(tmp_path):
+    cache = _cache(tmp_path)
+    cache.cache_classification("how do transformers use attention heads", "conceptual")
+    cache.cache_classification("show me the table of benchmark results", "table")
+
+    assert cache.get_classification("how do transformers use attention heads") == (
+        "conceptual", 0.95, "exact_cache"
+    )
+    query_type, confidence, source = cache.get_classification("how do transformers use attention")
+    assert (query_type, source) == ("conceptual", "semantic_cache")
+    assert 0.70 <= confidence < 0.95
+    assert cache.get_classification("completely unrelated words here") is None
+
+
+def test_writes_are_buffered_then_appended_to_the_log(tmp_path):
+    cache = _cache(tmp_path, flush_every=3)
+    cache.cache_classification("first query", "factual")
+    cache.cache_classification("second query", "factual")
+    assert not cache.log_file.exists()
+
+    cache.cache_classification("third query", "table")
+    ops = [json.loads(line) for line in cache.log_file.read_text().splitlines()]
+    assert [op["op"] for op in ops] == ["put", "put", "put", "stats"]
+    assert not cache.cache_file.exists()  # no full rewrite per change
+
+
+def test_close_appends_buffered_ops(tmp_path):
+    cache = _cache(tmp_path, flush_every=10)
+    cache.cache_classification("first query", "factual")
+    cache.get_classification("first query")
+    assert not cache.log_file.exists()
+
+    cache.close()
+    reloaded = _cache(tmp_path)
+    assert reloaded.cache["first query"]["uses"] == 2
+    assert reloaded.stats["total_queries"] == 1
+
+
+def test_reload_replays_log_and_compaction_truncates_it(tmp_path):
+    cache = _cache(tmp_path, flush_every=1, compact_every=1000)
+    cache.cache_classification("what is retrieval augmented generation", "conceptual")
+    cache.cache_classification("list the authors of the paper", "metadata")
+    cache.get_classification("list the authors of the paper")
+
+    reloaded = _cache(tmp_path)
+    assert set(reloaded.cache) == set(cache.cache)
+    assert reloaded.cache["list the authors of the paper"]["uses"] == 2
+    assert reloaded.get_classification("what is retrieval augmented generation")[0] == "conceptual"
+    assert reloaded.find_similar_query("retrieval augmented generation")["query_type"] == "conceptual"
+
+    compacting = _cache(tmp_path, flush_every=1, compact_every=1)
+    compacting.cache_classification("one more query", "factual")
+    assert compacting.log_file.read_text() == ""
+    snapshot = json.loads(compacting.cache_file.read_text())
+    assert len(snapshot["cache"]) == 3 and "one more query" in snapshot["terms"]
+    assert len(_cache(tmp_path).cache) == 3
+
+
+def test_lru_eviction_updates_index(tmp_path):
+    cache = _cache(tmp_path, max_cache_size=10)
+    for i in range(11):
+        cache.cache_classification(f"query number {i} about topic{i}", "factual")
+    assert len(cache.cache) == 10
+    assert "query number 0 about topic0" not in cache.index
+    assert cache.find_similar_query("topic0") is None
@@ -0,0 +1,66 @@
+"""Unit tests for the sandboxed, pre-warmed code executor."""
+import asyncio
+import textwrap
+
+from backend.services.code_executor import CodeExecutor
+
+SAMPLE = textwrap.dedent(
+    '''
+    def add(a, b):
+        return a + b
+
+    print("direct", add(1, 2))
+
+    def test_add():
+        assert add(2, 2) == 4
+    '''
+)
+
+
+def _write(tmp_path, name, code):
+    path = tmp_path / name
+    path.write_text(code)
+    return str(path)
+
+
+def test_python_run_splits_program_output_from_pytest(tmp_path):
+    executor = CodeExecutor(max_workers=2, warm_pool_size=1)
+    passing = _write(tmp_path, "test_pass.py", SAMPLE)
+    failing = _write(tmp_path, "test_fail.py", SAMPLE.replace("== 4", "== 5"))
+
+    async def run():
+        await executor.warm_up()
+        results = await asyncio.gather(executor.run_python(passing), executor.run_python(failing))
+        await executor.close()
+        return results
+
+    ok, bad = asyncio.run(run())
+    assert ok.returncode == 0 and not ok.timed_out
+    assert ok.program_output.strip() == "direct 3"
+    assert "test_add PASSED" in ok.stdout and "direct 3" in ok.stdout  # -s shows module output
+    assert bad.returncode == 1 and "test_add FAILED" in bad.stdout
+    assert executor.stats["warm_hits"] >= 1
+
+
+def test_direct_run_timeout_and_bounded_pool(tmp_path):
+    executor = CodeExecutor(max_workers=1, warm_pool_size=0)
+    looping = _write(tmp_path, "test_loop.py", "while True:\n    pass\n")
+    script = _write(tmp_path, "hello.sh", "echo hi; exit 3\n")
+
+    async def run():
+        return await asyncio.gather(
+            executor.run_python(looping, direct_timeout_s=0.5, test_timeout_s=5),
+            executor.run(["bash", script], language="bash", timeout_s=5),
+        )
+
+    timed_out, bash = asyncio.run(run())
+    assert timed_out.timed_out and timed_out.returncode == 124
+    assert bash.returncode == 3 and bash.stdout == "hi\n"
+    assert executor.stats == {"runs": 2, "timeouts": 1, "warm_hits": 0, "cold_starts": 1}
+
+
+def test_command_timeout_kills_process(tmp_path):
+    executor = CodeExecutor(max_workers=1, warm_pool_size=0)
+    result = asyncio.run(executor.run(["sleep", "5"], language="bash", timeout_s=0.2))
+    assert result.timed_out and result.returncode == 124
+    assert result.duration_ms < 2000
@@ -0,0 +1,97 @@
+"""Unit tests for the /embed request-coalescing scheduler and /rerank bucketing helpers."""
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.services.inference.batching import EmbedBatcher, length_batches, truncate_pair
+
+
+class _Recorder:
+    def __init__(self):
+        self.values = []
+
+    def observe(self, value):
+        self.values.append(value)
+
+
+def _encoder(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[float(len(text)), float(i)] for i, text in enumerate(texts)])
+
+    return encode
+
+
+def test_concurrent_requests_share_one_batch_and_get_their_rows():
+    calls, sizes, waits = [], _Recorder(), _Recorder()
+    batcher = EmbedBatcher(
+        _encoder(calls), max_batch_size=8, max_wait_ms=50,
+        batch_size_histogram=sizes, queue_wait_histogram=waits
+    )
+
+    async def run():
+        requests = [["a"], ["bb", "ccc"], ["dddd"]]
+        results = await asyncio.gather(*(batcher.submit(texts) for texts in requests))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert calls == [["a", "bb", "ccc", "dddd"]]
+    assert [r[:, 0].tolist() for r in results] == [[1.0], [2.0, 3.0], [4.0]]
+    assert sizes.values == [4]
+    assert len(waits.values) == 3
+
+
+def test_batches_are_capped_and_errors_propagate():
+    calls = []
+    batcher = EmbedBatcher(_encoder(calls), max_batch_size=3, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit([str(i), str(i)]) for i in range(3)))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [len(batch) for batch in calls] == [2, 2, 2]
+    assert all(len(r) == 2 for r in results)
+
+    def failing(texts):
+        raise RuntimeError("model crashed")
+
+    async def run_failing():
+        failing_batcher = EmbedBatcher(failing, max_batch_size=4, max_wait_ms=5)
+        try:
+            await failing_batcher.submit(["x"])
+        finally:
+            await failing_batcher.close()
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        asyncio.run(run_failing())
+
+
+def test_length_batches_respect_token_budget():
+    lengths = np.array([3, 40, 5, 38, 4, 39])
+    order = np.argsort(lengths, kind="stable")
+    batches = length_batches(order, lengths, max_batch_size=8, max_batch_tokens=80)
+    assert [sorted(lengths[b].tolist()) for b in batches] == [[3, 4, 5], [38, 39], [40]]
+
+
+def test_truncate_pair_matches_fast_tokenizer_longest_first():
+    # The side that was longer keeps the odd token; the document on a tie
+    assert [len(side) for side in truncate_pair([1] * 55, [2] * 25, 13)] == [7, 6]
+    assert [len(side) for side in truncate_pair([1] * 39, [2] * 42, 29)] == [14, 15]
+    assert [len(side) for side in truncate_pair([1] * 20, [2] * 20, 29)] == [14, 15]
+    assert truncate_pair([1, 2], [3], 5) == ([1, 2], [3])
+
+
+def test_truncate_pair_ignores_document_tokens_past_budget_plus_query():
+    # /rerank tokenizes documents with max_length=budget + len(query): enough to keep the tie-break
+    budget = 13
+    for query_len in range(0, 30):
+        for doc_len in range(0, 60):
+            query, doc = [1] * query_len, [2] * doc_len
+            assert truncate_pair(query, doc[:budget + query_len], budget) == truncate_pair(query, doc, budget)
+    # Cutting to the budget alone flips which side keeps the odd token
+    assert [len(side) for side in truncate_pair([1] * 15, [2] * 20, budget)] == [6, 7]
+    assert [len(side) for side in truncate_pair([1] * 15, [2] * budget, budget)] == [7, 6]
@@ -0,0 +1,70 @@
+"""Unit tests for the process-wide query-embedding cache."""
+import asyncio
+
+import numpy as np
+
+from backend.services.embedding_cache import EmbeddingCache, _ENTRY_OVERHEAD_BYTES
+
+
+def _embedder(calls):
+    async def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    return embed
+
+
+def test_repeated_queries_embed_once_per_model():
+    cache, calls = EmbeddingCache(), []
+    embed = _embedder(calls)
+
+    async def run():
+        first = await cache.embed("minilm", ["who wrote it?"], embed)
+        again = await cache.embed("minilm", ["  who   wrote it? "], embed)
+        other_model = await cache.embed("bge", ["who wrote it?"], embed)
+        return first, again, other_model
+
+    first, again, other_model = asyncio.run(run())
+    assert first == again == other_model == [[13.0, 1.0]]
+    assert calls == [["who wrote it?"], ["who wrote it?"]]
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2
+    assert stats['hit_rate'] == 1 / 3
+
+
+def test_only_misses_are_computed_in_one_call():
+    cache, calls = EmbeddingCache(), []
+    embed = _embedder(calls)
+
+    async def run():
+        await cache.embed("m", ["a"], embed)
+        return await cache.embed("m", ["bb", "a", "bb", "ccc"], embed)
+
+    results = asyncio.run(run())
+    assert calls == [["a"], ["bb", "ccc"]]
+    assert [row[0] for row in results] == [2.0, 1.0, 2.0, 3.0]
+
+
+def test_lru_eviction_respects_byte_budget():
+    entry_bytes = 4 * 4 + _ENTRY_OVERHEAD_BYTES
+    cache = EmbeddingCache(max_bytes=2 * entry_bytes)
+    vector = np.ones(4, dtype=np.float32)
+
+    cache.put("m", "a", vector)
+    cache.put("m", "b", vector)
+    assert cache.get("m", "a") is not None  # "b" is now least recently used
+    cache.put("m", "c", vector)
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") is not None
+    assert cache.get("m", "c") is not None
+    assert cache.get_stats()['evictions'] == 1
+    assert cache.get_stats()['bytes'] <= cache.max_bytes
+
+
+def test_hits_accumulate_saved_time():
+    cache = EmbeddingCache()
+    cache.put("m", "q", [0.5, 0.5], cost_ms=12.0)
+    cache.get("m", "q")
+    cache.get("m", "q")
+    assert cache.get_stats()['saved_ms'] == 24.0
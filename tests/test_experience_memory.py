@@ -0,0 +1,97 @@
+"""Unit tests for the indexed codegen/autoplan experience stores."""
+import json
+import random
+
+import pytest
+
+from backend.services.autoplan_learn import memory as autoplan_memory
+from backend.services.autoplan_learn.signature import Signature, build_signature
+from backend.services.autoplan_learn.signature import signature_sim as autoplan_sim
+from backend.services.codegen_learn import memory as codegen_memory
+from backend.services.codegen_learn.signature import CodeGenSignature
+from backend.services.codegen_learn.signature import signature_sim as codegen_sim
+
+STRATEGIES = [{"name": "fast"}, {"name": "careful"}, {"name": "parallel"}]
+WORDS = "plan trip auckland wellington food museum hike beach budget family cheap luxury".split()
+
+
+def _brute_force(sim_fn, from_dict, path, sig, k):
+    """nearest() as it was: re-read the log and score every record."""
+    scored = []
+    for idx, line in enumerate(path.read_text().splitlines()):
+        rec = json.loads(line)
+        ss = from_dict(rec["signature"])
+        sim = sim_fn(sig, ss)
+        if rec["outcome"]["success"] == False:
+            if sig.failure_pattern and ss.failure_pattern:
+                overlap = set(sig.failure_pattern.split("+")) & set(ss.failure_pattern.split("+"))
+                sim *= 0.3 if overlap else 0.6
+            else:
+                sim *= 0.5
+        scored.append((sim, idx))
+    return sorted(scored, reverse=True)[:k]
+
+
+def _random_plan_signature(rng):
+    prompt = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6)))
+    constraints = {
+        "city": rng.choice([None, "Auckland", "auckland", "Queenstown"]),
+        "days": rng.choice([None, 2, 3, 5]),
+        "budget_nzd": rng.choice([None, 400, 900, 1500]),
+    }
+    sig = build_signature(prompt, constraints, rng.sample(["flights", "weather", "attractions"], rng.randint(0, 2)), None)
+    sig.failure_pattern = rng.choice([None, "flights_timeout", "weather_rate_limit+flights_timeout"])
+    return sig
+
+
+def _random_code_signature(rng):
+    return CodeGenSignature(
+        language=rng.choice(["python", "rust"]),
+        task_type=rng.choice(["algorithm", "data_processing", "api"]),
+        complexity=rng.choice(["simple", "medium", "complex"]),
+        test_framework=rng.choice(["pytest", "auto"]),
+        has_external_deps=rng.random() < 0.3,
+        estimated_loc=rng.choice([30, 80, 150]),
+        failure_pattern=rng.choice([None, "syntax_error", "logic_error+timeout"]),
+    )
+
+
+@pytest.mark.parametrize("store, make_sig, sim_fn, from_dict", [
+    (autoplan_memory, _random_plan_signature, autoplan_sim, Signature.from_dict),
+    (codegen_memory, _random_code_signature, codegen_sim, CodeGenSignature.from_dict),
+])
+def test_indexed_nearest_matches_full_scan(tmp_path, store, make_sig, sim_fn, from_dict):
+    rng = random.Random(5)
+    path = tmp_path / "experiences.jsonl"
+    mem = store.ExperienceMemory(str(path))
+    for _ in range(300):
+        mem.update_outcome(make_sig(rng), rng.choice(STRATEGIES), success=rng.random() < 0.6, reward=rng.random())
+
+    for _ in range(40):
+        sig, k = make_sig(rng), rng.choice([1, 5, 10])
+        got = [(item["sim"], item["reward"]) for item in mem.nearest(sig, k=k)]
+        lines = path.read_text().splitlines()
+        expected = [(sim, json.loads(lines[i])["reward"]) for sim, i in _brute_force(sim_fn, from_dict, path, sig, k)]
+        assert [s for s, _ in got] == pytest.approx([s for s, _ in expected])
+        assert [r for _, r in got] == [r for _, r in expected]
+
+
+def test_bandits_rebuilt_on_restart_and_other_writers_picked_up(tmp_path):
+    path = tmp_path / "experiences.jsonl"
+    writer = autoplan_memory.ExperienceMemory(str(path))
+    reader = autoplan_memory.ExperienceMemory(str(path))
+    sig = build_signature("museum trip", {"city": "Auckland", "days": 3, "budget_nzd": 900}, ["weather"], None)
+    for success in (True, True, False):
+        writer.update_outcome(sig, STRATEGIES[1], success=success, reward=0.8 if success else 0.2)
+
+    # Another instance on the same log sees the appends without re-reading it
+    assert len(reader.nearest(sig, k=10)) == 3
+    path.open("a").write('{"signature": {"prompt": "half a rec')  # writer mid-line
+    assert len(reader.nearest(sig, k=10)) == 3
+
+    restarted = autoplan_memory.ExperienceMemory(str(tmp_path / "experiences.jsonl"))
+    arm = json.dumps(STRATEGIES[1], sort_keys=True)
+    stats = restarted.bandits[restarted._cluster_key(sig)].stats()[arm]
+    expected = writer.bandits[writer._cluster_key(sig)].stats()[arm]
+    assert (stats.a, stats.b, stats.n) == (expected.a, expected.b, expected.n) == (3.0, 2.0, 3)
+    assert stats.avg_reward == pytest.approx(expected.avg_reward)
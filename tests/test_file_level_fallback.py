@@ -0,0 +1,82 @@
+"""Unit tests for the batched, cached file-level BGE fallback."""
+import asyncio
+import os
+
+import numpy as np
+
+from backend.services import file_level_fallback
+from backend.services.embedding_cache import EmbeddingCache
+from backend.services.file_level_fallback import FileLevelFallbackRetriever
+
+
+class _Models:
+    """Fake embedding/reranker models recording every call and requested model id."""
+
+    def __init__(self):
+        self.path = None
+        self.encode_calls = []
+        self.score_calls = []
+
+    def get(self, model_id=None):
+        self.path = model_id
+        return self
+
+    def encode(self, texts):
+        self.encode_calls.append((self.path, list(texts)))
+        # Dimension 0 counts "fox", so chunks mentioning it score highest
+        return np.array([[text.count("fox") + 0.1, 1.0] for text in texts], dtype=np.float32)
+
+    def score(self, query, documents):
+        self.score_calls.append(list(documents))
+        return np.array([float(len(doc)) for doc in documents], dtype=np.float32)
+
+
+def _retriever(monkeypatch, tmp_path, models):
+    monkeypatch.setattr(file_level_fallback, "get_embedding_model", models.get)
+    monkeypatch.setattr(file_level_fallback, "get_reranker_model", lambda model_id=None: models)
+    monkeypatch.setattr(file_level_fallback, "get_embedding_cache", lambda: cache)
+    cache = EmbeddingCache()
+
+    retriever = FileLevelFallbackRetriever(chunk_size=40, chunk_overlap=0)
+    retriever.minilm_path = "./models/minilm"
+    retriever.bge_path = "./models/bge"
+    retriever.cache_dir = tmp_path / "cache"
+    return retriever
+
+
+def test_fallback_embeds_file_once_then_serves_from_cache(monkeypatch, tmp_path):
+    models = _Models()
+    retriever = _retriever(monkeypatch, tmp_path, models)
+    book = tmp_path / "book.txt"
+    book.write_text(" ".join(f"sentence {i} about a {'fox' if i % 7 == 0 else 'cat'}." for i in range(200)))
+
+    first = asyncio.run(retriever._rechunk_file_with_bge(str(book), "where is the fox"))
+
+    chunk_calls = [texts for path, texts in models.encode_calls if len(texts) > 1]
+    assert len(chunk_calls) == 1 and models.encode_calls[0][0] == "./models/bge"
+    assert len(models.score_calls) == 1 and len(models.score_calls[0]) == file_level_fallback.RERANK_CANDIDATES
+    assert all(path == "./models/bge" for path, _ in models.encode_calls)
+    assert "fox" in first[0]['text']
+
+    hashed = []
+    cache_key = retriever._cache_key
+    monkeypatch.setattr(retriever, "_cache_key", lambda raw: hashed.append(raw) or cache_key(raw))
+    models.encode_calls.clear()
+    second = asyncio.run(retriever._rechunk_file_with_bge(str(book), "where is the fox"))
+
+    # Cached chunk embeddings + cached query embedding: no encode at all, and
+    # the unchanged file (same size and mtime) is not even re-read and hashed
+    assert models.encode_calls == []
+    assert hashed == []
+    assert [c['text'] for c in second] == [c['text'] for c in first]
+
+    # Touched but identical: re-hashed once, still a cache hit
+    stat = book.stat()
+    os.utime(book, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    asyncio.run(retriever._rechunk_file_with_bge(str(book), "where is the fox"))
+    assert len(hashed) == 1 and models.encode_calls == []
+
+    # Changed content misses the cache
+    book.write_text("a completely different fox story")
+    asyncio.run(retriever._rechunk_file_with_bge(str(book), "where is the fox"))
+    assert any(texts == ["a completely different fox story"] for _, texts in models.encode_calls)
@@ -0,0 +1,54 @@
+"""Unit tests for the bounded GovernanceTracker context store and batched metrics."""
+import time
+
+from backend.services import governance_tracker as gt
+
+
+def _counter(metric, **labels):
+    return metric.labels(**labels)._value.get()
+
+
+def test_contexts_leave_on_completion_and_abandoned_ones_are_bounded():
+    tracker = gt.GovernanceTracker(max_contexts=50, context_ttl_s=60)
+    for _ in range(500):
+        context = tracker.start_operation("code")
+        tracker.checkpoint_audit(context.trace_id)
+        completed = tracker.complete_operation(context.trace_id)
+        assert completed is context and context.end_time is not None
+    assert len(tracker.active_contexts) == 0
+
+    abandoned = [tracker.start_operation("rag") for _ in range(200)]
+    assert len(tracker.active_contexts) == 50
+    assert tracker.active_contexts.evictions == 150
+    assert tracker.get_context(abandoned[0].trace_id) is None  # oldest went first
+    assert tracker.get_context(abandoned[-1].trace_id) is abandoned[-1]
+
+    # Completing an evicted operation is a no-op, like an unknown trace id
+    assert tracker.complete_operation(abandoned[0].trace_id) is None
+
+
+def test_contexts_expire_after_ttl():
+    tracker = gt.GovernanceTracker(max_contexts=100, context_ttl_s=0.05)
+    context = tracker.start_operation("chat")
+    time.sleep(0.1)
+    tracker.checkpoint_reliability(context.trace_id, "passed", "late")  # ignored once expired
+    assert tracker.get_context(context.trace_id) is None
+    assert len(context.checkpoints) == 2 and len(tracker.active_contexts) == 0
+
+
+def test_metrics_are_aggregated_until_flush():
+    gt.flush_governance_metrics()
+    labels = {"criteria": "g7_observability", "status": "failed", "risk_tier": "low_risk_internal"}
+    before = _counter(gt.governance_checkpoint_counter, **labels)
+
+    tracker = gt.GovernanceTracker()
+    for i in range(4):
+        context = tracker.start_operation("statistics")
+        tracker.checkpoint_audit(context.trace_id, audit_logged=i == 0)
+        tracker.complete_operation(context.trace_id)
+    assert _counter(gt.governance_checkpoint_counter, **labels) == before  # nothing exported yet
+
+    gt.flush_governance_metrics()
+    assert _counter(gt.governance_checkpoint_counter, **labels) == before + 3
+    # Compliance rate over the operations completed since the last flush: 1 of 4 audits passed
+    assert _counter(gt.governance_compliance_gauge, criteria="g7_observability", risk_tier="low_risk_internal") == 0.25
@@ -0,0 +1,94 @@
+"""Unit tests for the streaming ingestion pipeline."""
+import asyncio
+import threading
+
+from backend.services.ingestion_pipeline import IngestDocument, IngestionPipeline, content_hash, point_id_for
+from backend.utils.text_splitter import split_text
+
+
+class _Store:
+    """Async Qdrant stand-in tracking the largest number of points held by upserts in flight."""
+
+    def __init__(self):
+        self.points = {}
+        self.upserts = []
+
+    async def retrieve(self, collection_name, ids, **kwargs):
+        return [self.points[i] for i in ids if i in self.points]
+
+    async def upsert(self, collection_name, points):
+        await asyncio.sleep(0)
+        self.upserts.append(len(points))
+        for point in points:
+            self.points[point.id] = point
+
+
+def _pipeline(store, embed_calls, **kwargs):
+    async def embed(texts):
+        embed_calls.append(len(texts))
+        await asyncio.sleep(0)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    return IngestionPipeline(
+        "docs", embed, qdrant=store, chunk_size=20, chunk_overlap=0,
+        embed_batch_size=4, upsert_batch_size=6, queue_batches=1, **kwargs
+    )
+
+
+def _doc(title, words):
+    return IngestDocument(title=title, content=" ".join(f"{title}-{i:04d}" for i in range(words)), source=title)
+
+
+def _num_chunks(doc):
+    return len(split_text(doc.content, chunk_size=20, chunk_overlap=0))
+
+
+def test_pipeline_batches_across_documents_and_preserves_payloads():
+    store, embed_calls, recorded, threads = _Store(), [], [], set()
+
+    def on_upsert(points):
+        threads.add(threading.get_ident())
+        recorded.extend(points)
+
+    pipeline = _pipeline(store, embed_calls, on_upsert=on_upsert)
+    docs = [_doc("a", 20), _doc("b", 3)]
+    stats = asyncio.run(pipeline.run(docs))
+    total = sum(_num_chunks(doc) for doc in docs)
+
+    assert [s.num_chunks for s in stats] == [_num_chunks(doc) for doc in docs]
+    assert all(n <= 4 for n in embed_calls) and sum(embed_calls) == total
+    assert all(n <= 6 for n in store.upserts) and len(store.points) == total
+    assert len(recorded) == total
+    assert threading.get_ident() not in threads  # index file I/O stays off the event loop
+
+    first_b = split_text(docs[1].content, chunk_size=20, chunk_overlap=0)[0]
+    point = store.points[point_id_for(content_hash(first_b))]
+    assert point.payload["title"] == "b" and point.payload["chunk_index"] == 0
+    assert point.payload["document_id"] == stats[1].document_id
+
+
+def test_pipeline_skips_chunks_already_stored_or_repeated():
+    store, embed_calls = _Store(), []
+    asyncio.run(_pipeline(store, embed_calls).run([_doc("a", 10)]))
+    embed_calls.clear()
+
+    repeated = IngestDocument(title="r", content="x" * 40, source="r")
+    stats = asyncio.run(_pipeline(store, embed_calls).run([_doc("a", 10), repeated]))
+
+    assert stats[0].duplicates == _num_chunks(_doc("a", 10))  # already stored: not re-embedded
+    assert stats[1].num_chunks == 2 and stats[1].duplicates == 1
+    assert embed_calls == [1]
+
+
+def test_pipeline_failure_cancels_all_stages():
+    class _FailingStore(_Store):
+        async def upsert(self, collection_name, points):
+            raise RuntimeError("qdrant down")
+
+    pipeline = _pipeline(_FailingStore(), [])
+    try:
+        asyncio.run(pipeline.run([_doc("a", 200)]))
+    except RuntimeError as exc:
+        assert "qdrant down" in str(exc)
+    else:
+        raise AssertionError("upsert failure should propagate")
@@ -0,0 +1,221 @@
+"""Unit tests for the write-behind AccessTracker in knowledge_tier."""
+import asyncio
+import importlib
+import sys
+import types
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import Boolean, Column, DateTime, Integer
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class KnowledgeDocument(Base):
+    __tablename__ = "knowledge_documents"
+    id = Column(Integer, primary_key=True)
+    access_count = Column(Integer, default=0)
+    last_access_at = Column(DateTime)
+    is_cold = Column(Boolean, default=False)
+
+
+class KnowledgeChunk(Base):
+    __tablename__ = "knowledge_chunks"
+    id = Column(Integer, primary_key=True)
+    last_used_at = Column(DateTime)
+
+
+@pytest.fixture
+def knowledge_tier(monkeypatch):
+    """Import knowledge_tier against stand-ins for the app's models, metrics and embedding helpers."""
+    stubs = {
+        "models": types.ModuleType("models"),
+        "services": types.ModuleType("services"),
+        "services.metrics": types.ModuleType("services.metrics"),
+        "utils": types.ModuleType("utils"),
+        "utils.rag": types.ModuleType("utils.rag"),
+    }
+    stubs["models"].KnowledgeDocument = KnowledgeDocument
+    stubs["models"].KnowledgeChunk = KnowledgeChunk
+    for name in ("knowledge_tier_operations_counter", "knowledge_cold_documents_gauge",
+                 "knowledge_hot_documents_gauge", "knowledge_cold_chunks_gauge"):
+        setattr(stubs["services.metrics"], name, MagicMock())
+    stubs["utils.rag"].embed_texts = MagicMock()
+    for name, module in stubs.items():
+        monkeypatch.setitem(sys.modules, name, module)
+
+    monkeypatch.delitem(sys.modules, "backend.services.knowledge_tier", raising=False)
+    module = importlib.import_module("backend.services.knowledge_tier")
+    monkeypatch.setitem(sys.modules, "backend.services.knowledge_tier", module)  # dropped again on teardown
+    return module
+
+
+class _Result:
+    def __init__(self, ids):
+        self._ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self._ids)
+
+
+class _FakeSession:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        if self.db.fail:
+            raise RuntimeError("database unavailable")
+        if statement.is_select:
+            return _Result(self.db.cold_ids)
+        self.db.updates.append((statement.table.name, statement.compile().params))
+        return _Result([])
+
+    async def commit(self):
+        self.db.commits += 1
+
+
+class _FakeDB:
+    """session_factory stand-in recording UPDATE parameters and commits."""
+
+    def __init__(self):
+        self.updates = []
+        self.commits = 0
+        self.fail = False
+        self.cold_ids = []
+
+    def __call__(self):
+        return _FakeSession(self)
+
+
+def _doc_counts(params):
+    # CASE(doc_counts, value=id) binds each (id, count) pair as consecutive parameters
+    values = [value for name, value in params.items() if name.startswith("param_")]
+    return dict(zip(values[::2], values[1::2]))
+
+
+def test_flush_aggregates_accesses_into_one_update_per_table(knowledge_tier):
+    db = _FakeDB()
+    tracker = knowledge_tier.AccessTracker(db, flush_interval_s=3600)
+    tracker.record([3, 1], [10])
+    tracker.record([1], [11, 10])
+    tracker.record([1, 2], [])
+
+    assert asyncio.run(tracker.flush()) is True
+    assert tracker.pending == 0
+    assert db.commits == 1
+    (doc_table, doc_params), (chunk_table, chunk_params) = db.updates
+    assert doc_table == "knowledge_documents"
+    assert _doc_counts(doc_params) == {1: 3, 2: 1, 3: 1}
+    assert doc_params["id_1"] == [1, 2, 3]
+    assert chunk_table == "knowledge_chunks"
+    assert chunk_params["id_1"] == [10, 11]
+
+    # Nothing pending: no session opened at all
+    assert asyncio.run(tracker.flush()) is True
+    assert len(db.updates) == 2
+
+
+def test_failed_flush_keeps_counts_for_the_next_one(knowledge_tier):
+    db = _FakeDB()
+    tracker = knowledge_tier.AccessTracker(db, flush_interval_s=3600)
+    tracker.record([1, 1], [10])
+
+    db.fail = True
+    assert asyncio.run(tracker.flush()) is False
+    assert tracker.stats["flush_errors"] == 1
+    assert tracker.pending == 2
+
+    tracker.record([1, 2], [12])
+    db.fail = False
+    assert asyncio.run(tracker.flush()) is True
+    (_, doc_params), (_, chunk_params) = db.updates
+    assert _doc_counts(doc_params) == {1: 3, 2: 1}
+    assert chunk_params["id_1"] == [10, 12]
+
+
+def test_rehydration_queue_deduplicates_documents(knowledge_tier, monkeypatch):
+    db = _FakeDB()
+    db.cold_ids = [7, 8]
+    rehydrated = []
+    gate = asyncio.Event()
+
+    async def fake_rehydrate(session, document_id):
+        rehydrated.append(document_id)
+        await gate.wait()
+
+    monkeypatch.setattr(knowledge_tier, "rehydrate_document", fake_rehydrate)
+    tracker = knowledge_tier.AccessTracker(db, flush_interval_s=3600)
+
+    async def run():
+        assert tracker.enqueue_rehydration(7) is True
+        assert tracker.enqueue_rehydration(7) is False
+
+        # Cold documents found by a flush join the queue once, even while 7 is in progress
+        tracker.record([7, 8], [])
+        assert await tracker.flush() is True
+        await asyncio.sleep(0)
+        assert tracker.stats["rehydrations_queued"] == 2
+
+        gate.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert rehydrated == [7, 8]
+
+        # Finished documents can be queued again
+        assert tracker.enqueue_rehydration(7) is True
+        for _ in range(10):
+            await asyncio.sleep(0)
+        await tracker.close()
+
+    asyncio.run(run())
+    assert rehydrated == [7, 8, 7]
+
+
+def test_lifespan_shutdown_flushes_counts_recorded_by_retrieval(knowledge_tier, monkeypatch):
+    from backend import main
+
+    # utils/rag.py needs torch / sentence-transformers / the reranker class only for its models
+    with monkeypatch.context() as import_stubs:
+        for name in ("torch", "sentence_transformers"):
+            stub = types.ModuleType(name)
+            stub.SentenceTransformer = MagicMock()
+            import_stubs.setitem(sys.modules, name, stub)
+        import_stubs.setattr(
+            sys.modules["transformers"], "AutoModelForSequenceClassification", MagicMock(), raising=False
+        )
+        import_stubs.delitem(sys.modules, "backend.utils.rag", raising=False)
+        rag = importlib.import_module("backend.utils.rag")
+    monkeypatch.setitem(sys.modules, "backend.utils.rag", rag)
+
+    # Retrieval finds the tracker under the top-level "services" path only, as in the app
+    monkeypatch.setitem(sys.modules, "services.knowledge_tier", knowledge_tier)
+    monkeypatch.delitem(sys.modules, "backend.services.knowledge_tier")
+    monkeypatch.setattr(knowledge_tier, "async_sessionmaker", lambda bind, **_: bind)
+    # Keep startup to the in-process parts: no warm-up requests or sandbox interpreters
+    monkeypatch.setenv("WARM_SMART_RAG", "0")
+    monkeypatch.setattr(main, "get_code_executor", lambda: MagicMock(warm_up=AsyncMock(), close=AsyncMock()))
+    db = _FakeDB()
+
+    async def run():
+        async with main.lifespan(main.app):
+            await rag._track_retrieval_access(
+                types.SimpleNamespace(bind=db),
+                [{"id": 10, "document_id": 1}, {"id": 11, "document_id": 1}],
+            )
+            assert db.updates == []  # still buffered
+
+    asyncio.run(run())
+    (_, doc_params), (_, chunk_params) = db.updates
+    assert _doc_counts(doc_params) == {1: 1}
+    assert chunk_params["id_1"] == [10, 11]
+    assert knowledge_tier._access_tracker is None
@@ -0,0 +1,118 @@
+"""Unit tests for the trigram title index in metadata_index."""
+from types import SimpleNamespace
+
+from backend.services import metadata_index
+from backend.services.metadata_index import MetadataEntry, TitleIndex
+
+
+def _entry(point_id, title, authors="Someone"):
+    return MetadataEntry(point_id=str(point_id), content=f"chunk {point_id}", source="seed", authors=authors, title=title)
+
+
+def _index():
+    index = TitleIndex(max_entries_per_title=2)
+    index.add([
+        _entry(1, "Pride and Prejudice", "Jane Austen"),
+        _entry(2, "Pride and Prejudice", "Jane Austen"),
+        _entry(3, "Pride and Prejudice", "Jane Austen"),  # over the per-title cap
+        _entry(4, "Daddy Take Me Skating"),
+        _entry(5, "Sense and Sensibility", "Jane Austen"),
+        _entry(6, None),
+    ])
+    return index
+
+
+def test_title_search_ranks_substring_and_fuzzy_matches():
+    index = _index()
+    assert len(index) == 3
+    assert [e.point_id for e in index.entries[0]] == ["1", "2"]
+
+    # Title contained in the question scores 1.0
+    best_id, best_score = index.search("daddy take me skating")[0]
+    assert index.titles[best_id] == "daddy take me skating" and best_score == 1.0
+
+    # Misspelled title still ranks first, approximately
+    results = index.search("prid and prejudise")
+    assert index.titles[results[0][0]] == "pride and prejudice"
+    assert 0.5 < results[0][1] < 1.0
+
+    assert index.search("zzzz qqqq") == []
+    assert index.search("?!") == []
+
+
+def test_snapshot_round_trip_and_collection_check(tmp_path):
+    path = tmp_path / "docs_titles.json"
+    _index().save(path, "docs")
+
+    loaded = TitleIndex.load(path, "docs")
+    assert loaded.titles == _index().titles
+    assert loaded.entries[0][0].authors == "Jane Austen"
+    assert TitleIndex.load(path, "other") is None
+    assert TitleIndex.load(tmp_path / "missing.json", "docs") is None
+
+
+def test_search_by_title_loads_snapshot_without_scrolling(monkeypatch, tmp_path):
+    collection = metadata_index.settings.QDRANT_COLLECTION
+    monkeypatch.setattr(metadata_index, "snapshot_path_for", lambda c: tmp_path / f"{c}_titles.json")
+    scrolls = []
+
+    def scroll(**kwargs):
+        scrolls.append(kwargs)
+        point = SimpleNamespace(id=7, payload={"content": "It is a truth", "title": "Pride and Prejudice"})
+        return [point], None
+
+    monkeypatch.setattr(metadata_index, "get_qdrant_client", lambda: SimpleNamespace(scroll=scroll))
+    metadata_index._title_index.cache_clear()
+    try:
+        assert not metadata_index.title_index_ready()
+        assert [e.point_id for e in metadata_index.search_by_title("pride and prejudice")] == ["7"]
+        assert len(scrolls) == 1
+
+        # Ingestion extends the live index and its snapshot
+        metadata_index.record_upsert(collection, [("8", {"content": "Emma Woodhouse", "title": "Emma"})])
+
+        # A fresh process loads the snapshot instead of scrolling
+        metadata_index._title_index.cache_clear()
+        assert [e.point_id for e in metadata_index.search_by_title("emma")] == ["8"]
+        assert len(scrolls) == 1
+    finally:
+        metadata_index._title_index.cache_clear()
+
+
+def test_updates_append_to_a_shared_delta_until_compaction(monkeypatch, tmp_path):
+    collection = metadata_index.settings.QDRANT_COLLECTION
+    path = tmp_path / f"{collection}_titles.json"
+    monkeypatch.setattr(metadata_index, "snapshot_path_for", lambda c: tmp_path / f"{c}_titles.json")
+    point = SimpleNamespace(id=7, payload={"content": "It is a truth", "title": "Pride and Prejudice"})
+    monkeypatch.setattr(metadata_index, "get_qdrant_client", lambda: SimpleNamespace(scroll=lambda **_: ([point], None)))
+    metadata_index._title_index.cache_clear()
+    try:
+        metadata_index.warm_metadata_index()
+        other_worker = TitleIndex.load(path, collection)
+        snapshot = path.read_text()
+
+        metadata_index.record_upsert(collection, [("8", {"content": "Emma Woodhouse", "title": "Emma"})])
+        metadata_index.record_upsert(collection, [("9", {"content": "Untitled chunk"})])
+        assert path.read_text() == snapshot  # appended to the delta, snapshot untouched
+        assert [e.point_id for e in metadata_index.search_by_title("emma")] == ["8"]
+        other_worker.refresh(collection)
+        assert [e.point_id for e, _ in other_worker.matches("emma")] == ["8"]
+
+        metadata_index.record_delete(collection, ["8"])
+        assert metadata_index.search_by_title("emma") == []
+        other_worker.refresh(collection)
+        assert other_worker.matches("emma") == [] and len(other_worker) == 1
+
+        # Once the delta outgrows the snapshot it is folded in; other workers reload
+        monkeypatch.setattr(metadata_index, "MIN_COMPACT_BYTES", 0)
+        metadata_index.record_upsert(collection, [("10", {"content": "Mr. Knightley", "title": "Emma"})])
+        assert path.with_suffix(".delta").stat().st_size == 0
+        assert TitleIndex.load(path, collection).titles == ["pride and prejudice", "emma"]
+        other_worker.refresh(collection)
+        assert [e.point_id for e, _ in other_worker.matches("emma")] == ["10"]
+
+        metadata_index.record_delete(collection)
+        other_worker.refresh(collection)
+        assert len(other_worker) == 0 and metadata_index.search_by_title("pride and prejudice") == []
+    finally:
+        metadata_index._title_index.cache_clear()
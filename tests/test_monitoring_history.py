@@ -0,0 +1,108 @@
+"""Unit tests for the ring-buffer histories behind DataMonitor and UnifiedLLMMetrics."""
+import asyncio
+import random
+from datetime import datetime
+
+import numpy as np
+import pandas
+import pytest
+
+from backend.services import data_monitor
+from backend.services.column_ring import ColumnRing
+from backend.services.token_counter import TokenUsage
+from backend.services.unified_llm_metrics import CALL_COLUMNS, UnifiedLLMMetrics
+
+
+def test_ring_windows_follow_list_slicing_across_wraparound():
+    ring = ColumnRing(7, {"value": np.int64, "name": str})
+    rows = []
+    for i in range(23):
+        ring.append(value=i, name=f"n{i % 3}")
+        rows = (rows + [i])[-7:]
+        assert len(ring) == len(rows)
+        assert sorted(ring.column("value").tolist()) == sorted(rows)
+        for start, stop in [(None, None), (-5, -2), (-3, None), (1, 4), (-10, 2), (5, 3)]:
+            assert ring.window("value", start, stop).tolist() == rows[start:stop]
+        names = ring.labels("name", ring.window("name"))
+        assert names.tolist() == [f"n{v % 3}" for v in rows]
+
+    ring.add_column("late", np.float64)
+    ring.append(value=23, late=1.5)
+    assert np.isnan(ring.window("late", None, -1)).all()
+    assert ring.window("late", -1).tolist() == [1.5]
+    assert ring.labels("name", ring.window("name", -1)).tolist() == [None]
+
+
+class _FakeTracker:
+    async def track_chat_completion(self, model, messages, completion, duration, endpoint):
+        return TokenUsage(len(messages), len(completion), len(messages) + len(completion), model, datetime.utcnow())
+
+
+def test_llm_summary_and_recent_calls_match_filtered_lists():
+    rng = random.Random(2)
+    metrics = UnifiedLLMMetrics()
+    metrics.llm_tracker = _FakeTracker()
+    metrics.call_history = ColumnRing(50, CALL_COLUMNS)
+    calls = []
+    for _ in range(130):
+        call = asyncio.run(metrics.track_chat_completion(
+            model=rng.choice(["gpt-4o-mini", "gpt-4"]),
+            messages=[{"role": "user", "content": "hi"}] * rng.randint(1, 4),
+            completion="x" * rng.randint(0, 40),
+            duration=rng.random(),
+            endpoint=rng.choice(["chat", "rag", "code"]),
+            success=rng.random() < 0.8,
+            retry_count=rng.randint(0, 2),
+        ))
+        calls = (calls + [call])[-50:]
+
+    for model in (None, "gpt-4", "unknown"):
+        for endpoint in (None, "rag"):
+            kept = [c for c in calls if (not model or c.model == model) and (not endpoint or c.endpoint == endpoint)]
+            stats = metrics.get_summary_stats(model=model, endpoint=endpoint, time_window_minutes=5)
+            assert stats["total_calls"] == len(kept)
+            if kept:
+                assert stats["successful_calls"] == sum(c.success for c in kept)
+                assert stats["total_tokens"] == sum(c.usage.total_tokens for c in kept)
+                assert stats["total_cost"] == pytest.approx(sum(c.cost for c in kept))
+                assert stats["avg_duration"] == pytest.approx(sum(c.duration for c in kept) / len(kept))
+                assert stats["total_retries"] == sum(c.retry_count for c in kept)
+                assert sorted(stats["models"]) == sorted({c.model for c in kept})
+            recent = metrics.get_recent_calls(limit=7, model=model, endpoint=endpoint)
+            assert recent == [c.to_dict() for c in reversed(kept[-7:])]
+
+
+def test_data_monitor_summary_and_drift_frames(monkeypatch):
+    monitor = data_monitor.DataMonitor(reference_window_size=20, current_window_size=5, max_history_size=40)
+    rng = random.Random(4)
+    rows = []
+    for i in range(97):
+        row = dict(query="q" * rng.randint(1, 60), answer="a" * rng.randint(1, 300), total_tokens=rng.randint(10, 900),
+                   prompt_tokens=5, completion_tokens=5, duration_ms=rng.random() * 900,
+                   model=rng.choice(["gpt-4o-mini", "gpt-4"]), num_retrieved=rng.randint(0, 8),
+                   avg_score=rng.random(), success=rng.random() < 0.9)
+        monitor.log_rag_query(**row, metadata={"trace_id": "t", "cached": i % 2 == 0} if i > 60 else None)
+        rows = (rows + [row])[-40:]
+
+    stats = monitor.get_summary_stats("rag", time_window_hours=1)
+    assert stats["total_interactions"] == 40
+    assert stats["successful_interactions"] == sum(r["success"] for r in rows)
+    assert stats["avg_query_length"] == pytest.approx(np.mean([len(r["query"]) for r in rows]))
+    assert stats["avg_duration_ms"] == pytest.approx(np.mean([r["duration_ms"] for r in rows]))
+    assert sorted(stats["models_used"]) == sorted({r["model"] for r in rows})
+    assert monitor.get_summary_stats("code") == {"total_interactions": 0}
+
+    monkeypatch.setattr(data_monitor, "EVIDENTLY_AVAILABLE", True)
+    monkeypatch.setattr(data_monitor, "pd", pandas)
+    history = monitor.rag_history
+    current = monitor._to_dataframe(history, "rag", -5)
+    assert current["model"].tolist() == [r["model"] for r in rows[-5:]]
+    assert current["num_retrieved"].tolist() == [r["num_retrieved"] for r in rows[-5:]]
+    assert current["cached"].tolist() == [float(i % 2 == 0) for i in range(92, 97)]
+    assert (current["interaction_type"] == "rag").all()
+    assert current["timestamp"].is_monotonic_increasing
+
+    # Metadata keys never seen in a window are left out, as with row-by-row frames
+    reference = monitor._to_dataframe(history, "rag", -40, -37)
+    assert "cached" not in reference and "trace_id" not in reference
+    assert reference["total_tokens"].tolist() == [r["total_tokens"] for r in rows[:3]]
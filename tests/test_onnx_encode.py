@@ -0,0 +1,196 @@
+"""Unit tests for ONNX embedding/rerank batching and the ModelRegistry."""
+import importlib.util
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# conftest replaces backend.services.onnx_inference with a stub; load the real module
+_spec = importlib.util.spec_from_file_location(
+    "onnx_inference_under_test",
+    Path(__file__).resolve().parents[1] / "backend" / "backend" / "services" / "onnx_inference.py",
+)
+onnx_inference = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(onnx_inference)
+
+
+class _WordTokenizer:
+    pad_token_id = 0
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts, padding, truncation, max_length):
+        self.calls += 1
+        ids = [[len(word) + 1 for word in text.split()][:max_length] for text in texts]
+        return {"input_ids": ids, "attention_mask": [[1] * len(row) for row in ids]}
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.shapes = []
+
+    def run(self, _outputs, inputs):
+        ids = inputs["input_ids"]
+        self.shapes.append(ids.shape)
+        # Token embedding depends only on its id, so padding must be masked out
+        hidden = np.stack([ids, ids ** 2, np.ones_like(ids)], axis=-1).astype(np.float32)
+        return [hidden]
+
+
+def _model():
+    model = object.__new__(onnx_inference.ONNXEmbeddingModel)
+    model.tokenizer = _WordTokenizer()
+    model.session = _RecordingSession()
+    model.vector_size = 3
+    return model
+
+
+def test_length_bucketing_preserves_order_and_cuts_padding():
+    texts = ["a " * n for n in (40, 2, 35, 3, 38, 1, 4, 39)]
+    model = _model()
+    bucketed = model.encode(texts, batch_size=2, max_batch_tokens=10_000)
+
+    # Same vectors as encoding each text on its own, in input order
+    expected = np.vstack([_model().encode([text]) for text in texts])
+    assert np.allclose(bucketed, expected, atol=1e-6)
+
+    # Tokenized once; short and long texts never share a padded batch
+    assert model.tokenizer.calls == 1
+    padded_tokens = sum(rows * width for rows, width in model.session.shapes)
+    assert padded_tokens == 2 * (2 + 4 + 38 + 40)
+
+
+def test_token_budget_bounds_batch_shape():
+    model = _model()
+    model.encode(["w " * 50] * 10 + ["w"] * 10, batch_size=32, max_batch_tokens=120)
+    assert all(rows * width <= 120 or rows == 1 for rows, width in model.session.shapes)
+    assert (10, 1) in model.session.shapes
+
+
+class _PairTokenizer:
+    """BERT-like pair layout: [CLS] query [SEP] doc [SEP], one id per word."""
+
+    pad_token_id = 0
+    model_input_names = ["input_ids", "token_type_ids", "attention_mask"]
+
+    def __init__(self):
+        self.texts = []
+
+    def __call__(self, texts, add_special_tokens, truncation=False, max_length=None):
+        assert not add_special_tokens
+        self.texts.extend(texts)
+        ids = [[len(word) + 1 for word in text.split()] for text in texts]
+        return {"input_ids": [row[:max_length] if truncation else row for row in ids]}
+
+    def num_special_tokens_to_add(self, pair):
+        return 3 if pair else 2
+
+    def build_inputs_with_special_tokens(self, first, second):
+        return [101] + first + [102] + second + [102]
+
+    def create_token_type_ids_from_sequences(self, first, second):
+        return [0] * (len(first) + 2) + [1] * (len(second) + 1)
+
+
+class _PairSession:
+    def __init__(self):
+        self.shapes = []
+
+    def run(self, _outputs, inputs):
+        ids, mask, types = inputs["input_ids"], inputs["attention_mask"], inputs["token_type_ids"]
+        self.shapes.append(ids.shape)
+        # Depends on every real token and its segment; padding must be masked out
+        logits = ((ids * (1 + types)) * mask).sum(axis=1) / mask.sum(axis=1)
+        return [logits[:, None].astype(np.float32)]
+
+
+def _reranker(max_length=512):
+    model = object.__new__(onnx_inference.ONNXRerankerModel)
+    model.tokenizer = _PairTokenizer()
+    model.session = _PairSession()
+    model.max_length = max_length
+    model._uses_token_types = True
+    return model
+
+
+def test_rerank_buckets_by_length_and_keeps_input_order():
+    docs = ["word " * n for n in (60, 3, 55, 2, 58, 4, 1, 57)]
+    model = _reranker()
+    scores = model.score("short query", docs, batch_size=4, max_batch_tokens=10_000)
+
+    expected = np.concatenate([_reranker().score("short query", [doc]) for doc in docs])
+    assert np.allclose(scores, expected, atol=1e-5)
+
+    # Query tokenized once; short and long pairs never share a padded batch
+    assert model.tokenizer.texts.count("short query") == 1
+    assert sorted(model.session.shapes) == [(4, 9), (4, 65)]
+
+
+def test_rerank_truncates_pairs_to_model_max_length():
+    model = _reranker(max_length=16)
+    model.score("q " * 10, ["d " * 40, "d " * 2])
+    widths = sorted(width for _, width in model.session.shapes)
+    assert widths[-1] == 16
+
+    # longest_first: long document trimmed to the query, then both share the rest
+    assert onnx_inference._truncate_pair(list(range(10)), list(range(40)), 13) == (
+        list(range(7)), list(range(6))
+    )
+
+
+def test_rerank_max_length_skips_malformed_overrides(monkeypatch, tmp_path):
+    model_dir = tmp_path / "bge-reranker"
+    model_dir.mkdir()
+    monkeypatch.setattr(onnx_inference.settings, "RERANK_MAX_LENGTH", 512)
+    monkeypatch.setattr(onnx_inference.settings, "RERANK_MAX_LENGTH_OVERRIDES", "bge-reranker=long, other=64")
+    assert onnx_inference._rerank_max_length(str(model_dir), _PairTokenizer()) == 512
+
+    monkeypatch.setattr(onnx_inference.settings, "RERANK_MAX_LENGTH_OVERRIDES", "bge-reranker=x,bge-reranker=256")
+    assert onnx_inference._rerank_max_length(str(model_dir), _PairTokenizer()) == 256
+
+
+class _FakeSession:
+    """Stand-in model whose 'file size' comes from the path, e.g. 'embed-300'."""
+
+    loads = []
+
+    def __init__(self, model_path):
+        _FakeSession.loads.append(model_path)
+        time.sleep(0.01)  # widen the window for concurrent loaders
+        self.model_path = model_path
+        self.size = int(model_path.rsplit("-", 1)[1])
+
+
+def _registry(monkeypatch, budget):
+    _FakeSession.loads = []
+    monkeypatch.setattr(onnx_inference.ModelRegistry, "_FACTORIES", {"embed": _FakeSession, "rerank": _FakeSession})
+    monkeypatch.setattr(onnx_inference, "_model_bytes", lambda model: model.size)
+    return onnx_inference.ModelRegistry(memory_budget_bytes=budget)
+
+
+def test_registry_loads_each_model_once_under_concurrency(monkeypatch):
+    registry = _registry(monkeypatch, budget=1000)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda i: registry.get("embed", f"embed-{100 + i % 2}"), range(16)))
+
+    assert sorted(_FakeSession.loads) == ["embed-100", "embed-101"]
+    assert len({id(model) for model in models}) == 2
+
+
+def test_registry_keeps_mixed_models_resident_and_unloads_lru(monkeypatch):
+    registry = _registry(monkeypatch, budget=1000)
+    for _ in range(3):  # interleaved requests for different models never reload
+        registry.get("embed", "embed-300")
+        registry.get("embed", "bge-400")
+        registry.get("rerank", "rerank-200")
+    assert len(_FakeSession.loads) == 3
+    assert registry.resident_bytes() == 900
+
+    registry.get("embed", "embed-300")  # most recently used
+    registry.get("rerank", "cascade-250")  # over budget: least recently used goes
+    assert [(m["kind"], m["model_path"]) for m in registry.resident()] == [
+        ("rerank", "rerank-200"), ("embed", "embed-300"), ("rerank", "cascade-250"),
+    ]
+    assert registry.stats["unloads"] == 1
@@ -0,0 +1,126 @@
+"""Unit tests for concurrent tool execution in the planning agent."""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.models.agent_schemas import PlanRequest
+from backend.services import planning_agent
+from backend.services.agent_metrics_store import PlanningMetricsStore
+from backend.services.planning_agent import PlanningAgent
+
+DELAYS = {"search_flights": 0.3, "get_weather_forecast": 0.2, "search_attractions": 0.25}
+
+
+class _SlowTools:
+    """Tools that sleep like remote APIs and record every execution."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def _run(self, name, **kwargs):
+        self.calls.append((name, kwargs))
+        start = time.perf_counter()
+        await asyncio.sleep(DELAYS[name])
+        return {"success": True, "tool": name, "args": kwargs, "execution_time_ms": (time.perf_counter() - start) * 1000}
+
+    async def search_flights(self, **kwargs):
+        return await self._run("search_flights", **kwargs)
+
+    async def get_weather_forecast(self, **kwargs):
+        return await self._run("get_weather_forecast", **kwargs)
+
+    async def search_attractions(self, **kwargs):
+        return await self._run("search_attractions", **kwargs)
+
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    # create_plan records metrics; keep them out of ./data
+    monkeypatch.setattr(planning_agent, "planning_metrics_store", PlanningMetricsStore(str(tmp_path / "metrics.json")))
+    agent = PlanningAgent(enable_learning=False)
+    agent.tools = _SlowTools()
+    return agent
+
+
+def test_tool_calls_run_concurrently_in_order_with_timeouts_and_cache(agent):
+    agent.tool_timeouts = {"search_flights": 0.1}
+    calls = [
+        ("search_flights", {"origin": "Auckland", "destination": "Tokyo", "date": "2026-11-01"}),
+        ("get_weather_forecast", {"location": "Tokyo", "start_date": "2026-11-01", "days": 5}),
+        ("search_attractions", {"city": "Tokyo", "limit": 5}),
+        ("get_weather_forecast", {"days": 5, "start_date": "2026-11-01", "location": " tokyo "}),
+    ]
+
+    async def run():
+        cache = {}
+        start = time.perf_counter()
+        first = await agent._execute_tools(calls, cache)
+        first_wall = time.perf_counter() - start
+        second = await agent._execute_tools(calls[1:3] + [calls[0]], cache)
+        return first, first_wall, second
+
+    first, wall, second = asyncio.run(run())
+
+    # Concurrent: the step takes about as long as its slowest tool, not the sum
+    assert wall < 0.4
+    assert [result.get("tool") for result, _ in first] == [None, "get_weather_forecast", "search_attractions",
+                                                           "get_weather_forecast"]
+    assert first[0][0]["success"] is False and "timed out" in first[0][0]["error"]
+    assert 90 <= first[0][0]["execution_time_ms"] < 300
+    assert [cached for _, cached in first] == [False, False, False, True]
+    assert first[3][0] is first[1][0]
+
+    # Later steps reuse successful results; the timed-out call runs again
+    assert [cached for _, cached in second] == [True, True, False]
+    assert [name for name, _ in agent.tools.calls].count("get_weather_forecast") == 1
+    assert [name for name, _ in agent.tools.calls].count("search_flights") == 2
+
+
+def test_invalid_timeout_overrides_are_skipped(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setitem(planning_agent.AGENT_CONFIG, "tool_timeout_overrides",
+                        "search_flights=4, get_weather_forecast=soon,=3,search_attractions=")
+    agent = PlanningAgent(enable_learning=False)
+    assert agent.tool_timeouts == {"search_flights": 4.0}
+
+
+def _tool_call(call_id, name, arguments):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=json.dumps(arguments)))
+
+
+class _ScriptedCompletions:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs["messages"])
+        message = self.messages.pop(0)
+        finish_reason = "tool_calls" if message.tool_calls else "stop"
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)], usage=None)
+
+
+def test_create_plan_reports_tool_results_by_call_id_and_wall_clock(agent):
+    script = [
+        SimpleNamespace(content="", tool_calls=[
+            _tool_call("call_w", "get_weather_forecast", {"location": "Tokyo", "start_date": "2026-11-01"}),
+            _tool_call("call_a", "search_attractions", {"city": "Tokyo"}),
+        ]),
+        SimpleNamespace(content="Here is your plan.", tool_calls=None),
+    ]
+    completions = _ScriptedCompletions(script)
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    response = asyncio.run(agent.create_plan(PlanRequest(prompt="Three days in Tokyo", max_iterations=3)))
+
+    tool_messages = [m for m in completions.requests[1] if m["role"] == "tool"]
+    assert [(m["tool_call_id"], m["name"]) for m in tool_messages] == [
+        ("call_w", "get_weather_forecast"), ("call_a", "search_attractions")]
+    assert [tc.tool_name for tc in response.tool_calls] == ["get_weather_forecast", "search_attractions"]
+    assert response.tool_time_ms == pytest.approx(sum(tc.execution_time_ms for tc in response.tool_calls))
+    assert response.tool_time_ms > 400
+    assert response.tool_wall_time_ms < response.tool_time_ms
@@ -0,0 +1,35 @@
+"""Unit tests for the async Qdrant access path."""
+import asyncio
+import time
+
+import pytest
+
+from backend.services.qdrant_client import AsyncQdrant
+
+
+class _SlowClient:
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+
+    def search(self, **kwargs):
+        time.sleep(self.latency_s)
+        return [kwargs["collection_name"]]
+
+
+def test_sync_client_calls_do_not_block_the_event_loop():
+    qdrant = AsyncQdrant(_SlowClient(0.2))
+
+    async def run():
+        start = time.perf_counter()
+        results = await asyncio.gather(*(qdrant.search(collection_name=str(i)) for i in range(4)))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [["0"], ["1"], ["2"], ["3"]]
+    assert elapsed < 0.6
+
+
+def test_per_call_timeout():
+    qdrant = AsyncQdrant(_SlowClient(0.5), timeout_s=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(qdrant.search(collection_name="docs"))
@@ -33,3 +33,81 @@ def test_should_not_switch_when_gpu_available(monkeypatch):
     assert rag_pipeline._should_switch_reranker(600.0) is False
     assert rag_pipeline._reranker_switch_locked is True
     rag_pipeline._reranker_switch_locked = False
+
+
+class _CountingReranker:
+    def __init__(self, path, score_of):
+        self.configured_path = path
+        self.resolved_model_path = f"{path}/model.onnx"
+        self.score_of = score_of
+        self.calls = []
+
+    def score(self, query, documents, **kwargs):
+        import numpy as np
+
+        self.calls.append(list(documents))
+        return np.array([self.score_of(doc) for doc in documents], dtype=np.float32)
+
+
+def _chunks(texts):
+    return [
+        rag_pipeline.RetrievedChunk(content=text, source="s", score=0.5, metadata={"point_id": str(i)})
+        for i, text in enumerate(texts)
+    ]
+
+
+def _setup_rerank(monkeypatch, full_model):
+    from backend.services.rerank_cache import RerankScoreCache
+
+    rag_pipeline._reranker_switch_locked = True  # keep the CPU auto-switch out of the way
+    monkeypatch.setattr(rag_pipeline.inference_config, "ENABLE_REMOTE_INFERENCE", False)
+    monkeypatch.setattr(rag_pipeline, "_apply_reranker_override", lambda choice: ("auto", full_model.configured_path))
+    monkeypatch.setattr(rag_pipeline, "get_reranker_model", lambda model_id=None: full_model)
+    cache = RerankScoreCache(max_entries=100)
+    monkeypatch.setattr(rag_pipeline, "get_rerank_cache", lambda: cache)
+    return cache
+
+
+def test_rerank_reuses_cached_scores(monkeypatch):
+    import asyncio
+
+    model = _CountingReranker("./models/full", lambda doc: float(len(doc)))
+    _setup_rerank(monkeypatch, model)
+    monkeypatch.setattr(rag_pipeline.settings, "RERANK_CASCADE_ENABLED", False)
+
+    asyncio.run(rag_pipeline._rerank("who?", _chunks(["aa", "b"])))
+    timings = {}
+    reranked, _, _, _ = asyncio.run(
+        rag_pipeline._rerank("  who? ", _chunks(["aa", "b", "cccc"]), stage_timings=timings)
+    )
+
+    assert model.calls == [["aa", "b"], ["cccc"]]
+    assert [chunk.content for chunk in reranked] == ["cccc", "aa", "b"]
+    assert timings["rerank_cache_hits"] == 2
+    rag_pipeline._reranker_switch_locked = False
+
+
+def test_rerank_cascade_sends_only_survivors_to_full_model(monkeypatch):
+    import asyncio
+    import sys
+
+    full = _CountingReranker("./models/full", lambda doc: -float(len(doc)))
+    cheap = _CountingReranker("./models/cheap", lambda doc: float(len(doc)))
+    _setup_rerank(monkeypatch, full)
+    monkeypatch.setattr(rag_pipeline.settings, "RERANK_CASCADE_ENABLED", True)
+    monkeypatch.setattr(rag_pipeline.settings, "RERANK_CASCADE_KEEP", 2)
+    monkeypatch.setattr(
+        sys.modules["backend.services.onnx_inference"], "get_cascade_reranker_model", lambda: cheap, raising=False
+    )
+
+    timings = {}
+    reranked, _, _, _ = asyncio.run(
+        rag_pipeline._rerank("q", _chunks(["a", "bbb", "cc", "dddd"]), stage_timings=timings)
+    )
+
+    assert cheap.calls == [["a", "bbb", "cc", "dddd"]]
+    assert full.calls == [["bbb", "dddd"]]
+    assert [chunk.content for chunk in reranked] == ["bbb", "dddd"]
+    assert timings["rerank_candidates"] == 4 and timings["rerank_scored"] == 2
+    assert "rerank_cascade_ms" in timings and "rerank_full_ms" in timings
+    rag_pipeline._reranker_switch_locked = False
@@ -0,0 +1,57 @@
+"""Unit tests for the sentence-aware, token-budget text splitter."""
+from backend.utils.text_splitter import iter_sentence_spans, iter_spans, split_text
+
+TEXT = (
+    "The first sentence is short. The second one is a little longer than that!\n"
+    "Is a third one here? Yes.\n\n"
+    "A new paragraph starts here. It has two sentences."
+)
+
+
+def _words(texts):
+    return [len(text.split()) for text in texts]
+
+
+def test_sentence_spans_are_offsets_into_the_text():
+    spans = list(iter_sentence_spans(TEXT))
+    sentences = [TEXT[start:end] for start, end, _ in spans]
+    assert sentences[:2] == ["The first sentence is short.", "The second one is a little longer than that!"]
+    assert sentences[3] == "Yes." and spans[3][2]  # ends a paragraph
+    assert [paragraph for _, _, paragraph in spans].count(True) == 2
+    cjk = "第一句。第二句！"
+    assert [cjk[s:e] for s, e, _ in iter_sentence_spans(cjk)] == ["第一句。", "第二句！"]
+
+
+def test_chunks_end_on_sentence_boundaries_within_budget():
+    for chunk in split_text(TEXT, chunk_size=60, chunk_overlap=0):
+        assert len(chunk) <= 60
+        assert chunk[-1] in ".!?"
+    # Each chunk starts and ends on a sentence boundary of the source
+    sentences = list(iter_sentence_spans(TEXT))
+    starts, ends = {s for s, _, _ in sentences}, {e for _, e, _ in sentences}
+    for span in iter_spans(TEXT, chunk_size=45, chunk_overlap=10):
+        assert span.start in starts and span.end in ends
+
+
+def test_token_budget_and_paragraph_preference():
+    spans = list(iter_spans(TEXT, chunk_size=12, chunk_overlap=2, count_tokens=_words))
+    chunks = [TEXT[span.start:span.end] for span in spans]
+    assert all(span.num_tokens <= 12 for span in spans)
+    assert [span.num_tokens for span in spans] == _words(chunks)
+    # Half-full chunk closes at the paragraph break, and overlap does not cross it
+    assert chunks[2:] == ["Is a third one here? Yes.", "A new paragraph starts here. It has two sentences."]
+
+
+def test_overlap_repeats_whole_trailing_sentences():
+    text = "a b. c d. e f. g h."
+    assert split_text(text, chunk_size=5, chunk_overlap=2, count_tokens=_words) == [
+        "a b. c d.", "c d. e f.", "e f. g h."
+    ]
+
+
+def test_oversized_sentences_are_cut_at_whitespace():
+    long_sentence = " ".join(f"word{i}" for i in range(30)) + "."
+    pieces = split_text(long_sentence, chunk_size=8, chunk_overlap=0, count_tokens=_words)
+    assert all(len(piece.split()) <= 8 for piece in pieces)
+    assert " ".join(pieces) == long_sentence
+    assert split_text("x" * 40, chunk_size=20, chunk_overlap=0) == ["x" * 20, "x" * 20]